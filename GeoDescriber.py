@@ -36,36 +36,52 @@
 #               a field to an in_memory table four times. Until this is resolved use the
 #               function JoinField_Workaround() instead.
 #-------------------------------------------------------------------------------
+from __future__ import print_function
 
 
 try:
-    # Import modules and start the clock
+    # Import modules and start the clock. arcpy, the Spatial Analyst tools and numpy
+    # are loaded by loadGIS() the first time a raster stage needs them, so the
+    # dictionaries and the text synthesis can be imported without arcpy.
     import os, sys, math, time, os.path
-    import arcpy
     import traceback
     import warnings
-    arcpy.CheckOutExtension("Spatial")
-    #from arcpy import env
-    from arcpy.sa import *
     from random import shuffle
     import tempfile
     import shutil
+    import glob
+    import collections
+    import bisect
+    import operator
     import multiprocessing as mp
-    import numpy as np
+    import argparse
+    import json
+    import csv
+    import contextlib
+    import re
+    import cProfile
+    import pstats
     from uuid import uuid4
+    try:
+        import Queue as queue
+    except ImportError:
+        import queue
+    #clock() is wall time and cpuclock() the CPU time of this process, in seconds.
+    try:
+        clock = time.perf_counter
+        cpuclock = time.process_time
+    except AttributeError:
+        clock = time.time
+        cpuclock = lambda: sum(os.times()[:2])
 
-    global currentTime
-    startTime = time.clock()
-    currentTime = 0
-    print("Start time is "+str(startTime))
+    arcpy = None
+    np = None
+
+    startTime = clock()
     TEMP= os.getenv("TEMP")
 
-    arcpy.env.overwriteOutput=True
     #output is the geodatabase containing some rasters created by GeoDescriber.
     output= r"C:\gis\GeoDescriber\GeoDescriber.gdb"
-    arcpy.env.workspace = "in_memory"
-    arcpy.env.scratchWorkspace ="in_memory"
-    arcpy.env.compression = "LZW"
     #os.environ["TEMP"] = arcpy.env.scratchWorkspace
     #os.environ["TMP"] = arcpy.env.scratchWorkspace
     tempspace = output
@@ -75,29 +91,90 @@ try:
     #output=arcpy.GetParameterAsText(0)
     #set the cellsize to the global default for the population and ELU datasets: 231.9156058
     cellsize = 231.9156058
-    #Set the spatial reference to the Mollweide Projection (54009), the equal area projection shown to have
-    #the least loss of accuracy in counting up the area of geographic phenomena from a global dataset.
-    sr = arcpy.SpatialReference(54009)
-    arcpy.env.outputCoordinateSystem = sr
-    arcpy.env.overwriteOutput=True
-    arcpy.SetLogHistory(False)
+    #The spatial reference is set by loadGIS() to the Mollweide Projection (54009).
+    sr = None
+
     #---------------------------------------------------------------------------
     #---------Provide the path to the polygon you would like to characterize----
     #inFeatureClass = arcpy.GetParameterAsText(0)
     inFeatLyr=r"C:\gis\GeoDescriber\GeoDescriber.gdb\Austria"
 
+    #---------------------------------------------------------------------------
+    #---------Polygon order and raster cache------------------------------------
+    #Polygons are processed in "oid" order, or sorted along a "hilbert" or "zorder"
+    #curve through their centroids so that neighbors are processed one after another.
+    polygonOrder = "oid"
+    #Folder where rasters fetched from the server are kept and reused by nearby
+    #polygons. Fetches are snapped to tiles of cacheTileCells cells. None turns it off.
+    cacheFolder = None
+    cacheTileCells = 64
+    cacheMaxBytes = 2 * 1024 * 1024 * 1024
+    #Folder where the facts of every polygon are recorded, so descriptions can be
+    #synthesized again from them without any GIS work. None does not record them.
+    factsFolder = None
+    #Folder where the timing of every stage and fetch is written as timings.json and
+    #timings.csv at the end of a run. None only prints the summary.
+    timingsFolder = None
+    #Folder where the polygons in profileIDs, and every profileEvery-th polygon, are
+    #profiled with cProfile as profile_<OBJECTID>.pstats. With neither set, every
+    #polygon is profiled. None does not profile.
+    profileFolder = None
+    profileIDs = None
+    profileEvery = None
+    #Seconds between the progress lines, with the ETA, printed during a run, and a
+    #file where the progress is also written as JSON for a scheduler to poll. None
+    #does not write it.
+    progressInterval = 60
+    statusFile = None
+    #A dry run only plans the run: the cells, downloads, cache hits, memory and, from
+    #the timings.json of an earlier run in historyFile (or in timingsFolder), the
+    #seconds of every polygon. Nothing is fetched or written to the input. The plan
+    #is also written as JSON to planFile. None does not write it.
+    dryRun = False
+    planFile = None
+    historyFile = None
+
+    #---------------------------------------------------------------------------
+    #---------Polygon workers---------------------------------------------------
+    #Number of worker processes that describe polygons at the same time. Each worker
+    #has its own scratch geodatabase next to output. Polygons are placed largest-first.
+    polygonWorkers = 1
+    #Memory budget in bytes of every worker, or a list with one budget per worker.
+    #None places polygons on any worker.
+    workerMemory = None
+    #Polygons of fewer cells than tinyPolygonCells are described in batches of tinyBatchSize.
+    tinyPolygonCells = 1000
+    tinyBatchSize = 25
+
+    #---------------------------------------------------------------------------
+    #---------Memory budget-----------------------------------------------------
+    #Memory budget in bytes for describing one polygon. Polygons that do not fit read
+    #the 30 m water layer in at most maxWaterWindows strips, or write their rasters to
+    #the scratch geodatabase instead of in_memory. None keeps everything in_memory.
+    memoryBudget = None
+    maxWaterWindows = 16
+
+    #---------------------------------------------------------------------------
+    #---------Fetching----------------------------------------------------------
+    #Number of processes that fetch the rasters of one polygon from the server at once.
+    fetchWorkers = 5
+    #Only the polygons with these OBJECTIDs are described, and those in skipIDs are not.
+    #None describes every polygon.
+    onlyIDs = None
+    skipIDs = None
+
 except:
-    print("A connection to a valid Spatial Analyst license, a valid")
-    print("ArcInfo license, and the internet is required to run this script.")
+    print("Could not import the modules GeoDescriber needs.")
     raise
 
 #-------------------------------------------------------------------------------
 #-------------------Use your own Credentials for Landscape Account--------------
 
-# set parameter for username and password
-userName = ""
+# set parameter for username and password. They are read from the environment
+# so that the fetch processes started on Windows see them too.
+userName = os.getenv("GEODESCRIBER_USERNAME", "")
 #userName = arcpy.GetParameterAsText(2)
-passWord = ""
+passWord = os.getenv("GEODESCRIBER_PASSWORD", "")
 #passWord = arcpy.GetParameterAsText(3)
 
 #-------------------------------------------------------------------------------
@@ -432,17 +509,126 @@ shortname_matrix = [
 #
 # Calculate the percent of each class in the study area. Put the percents into a table.
 # Then join the table back to the original raster so the class text can be used in characterization.
+# Load arcpy and the Spatial Analyst tools only when raster work is about to run.
+# Checking out the Spatial Analyst license takes seconds, and the dictionaries and
+# the text synthesis do not need it.
+def loadGIS():
+    """loadGIS()
+
+    Imports arcpy, numpy and the Spatial Analyst tools, checks out the
+    Spatial Analyst extension and sets up the geoprocessing environment.
+    Does nothing if they are already loaded.
+
+    """
+    global arcpy
+    global sr
+    global Con
+    global Aspect
+    global RemapRange
+    global ExtractByAttributes
+    if arcpy is not None:
+        return
+    try:
+        import arcpy
+        loadNumpy()
+        arcpy.CheckOutExtension("Spatial")
+        from arcpy.sa import Con, Aspect, RemapRange, ExtractByAttributes
+    except:
+        print("A connection to a valid Spatial Analyst license, a valid")
+        print("ArcInfo license, and the internet is required to run this script.")
+        raise
+    arcpy.env.overwriteOutput=True
+    arcpy.env.workspace = "in_memory"
+    arcpy.env.scratchWorkspace ="in_memory"
+    arcpy.env.compression = "LZW"
+    #Set the spatial reference to the Mollweide Projection (54009), the equal area projection shown to have
+    #the least loss of accuracy in counting up the area of geographic phenomena from a global dataset.
+    sr = arcpy.SpatialReference(54009)
+    arcpy.env.outputCoordinateSystem = sr
+    arcpy.SetLogHistory(False)
+
+def loadNumpy():
+    """loadNumpy()
+
+    Imports numpy as np. Does nothing if it is already loaded.
+
+    """
+    global np
+    if np is None:
+        import numpy as np
+
 # functions for multi-processing
+# The fetch processes report to the parent over a log channel, a multiprocessing
+# queue that the parent drains with drainLog() while it waits for the results.
+# A process never waits on the channel. If the queue is full the message is dropped.
+logChannel = None
+
+def send(kind, payload):
+    """send(kind, payload)
+
+    Puts a message on the log channel without waiting. Returns False
+    if there is no channel, as in the parent, or the message was dropped.
+
+    """
+    if logChannel is None:
+        return False
+    try:
+        logChannel.put_nowait((kind, os.getpid(), payload))
+    except queue.Full:
+        return False
+    return True
+
 def p(m):
-    global lock
-    if lock: lock.acquire()
-    #print(m)
-    if lock: lock.release()
+    if logChannel is None:
+        print(m)
+    else:
+        send("log", m)
 
 # multiprocessing pool
-def initPool(lk):
-    global lock
-    lock = lk
+def initPool(channel):
+    global logChannel
+    logChannel = channel
+    loadGIS()
+
+def layerCells(layerInfo):
+    """layerCells(layerInfo)
+
+    Returns the number of cells in the extent of a layer at its cell size.
+
+    """
+    xmin, ymin, xmax, ymax = [float(v) for v in layerInfo['extentlayer'].split()]
+    return int(math.ceil((xmax - xmin) / layerInfo['cellsize']) * math.ceil((ymax - ymin) / layerInfo['cellsize']))
+
+def errorCode(text):
+    """errorCode(text)
+
+    Returns the first ArcGIS error code, such as "ERROR 000732", in the
+    text, or None.
+
+    """
+    match = re.search(r"ERROR (\d{6})", text or "")
+    return match.group(1) if match else None
+
+def sendMetrics(layerInfo, wall, cpu, mark, messages):
+    """sendMetrics(layerInfo, wall, cpu, mark, messages)
+
+    Sends the wall and CPU seconds, cells and bytes of the fetch of one
+    layer over the log channel, with the peak memory of the fetch process
+    since the memoryMark() mark, the messages of the geoprocessing tools
+    and the error code of a failed fetch.
+
+    """
+    exception = layerInfo.get('exception')
+    rss, peak = memoryPeak(mark)
+    metrics = {'layer': layerInfo['name'], 'wall': clock() - wall, 'cpu': cpuclock() - cpu,
+               'cells': layerCells(layerInfo), 'bytes': layerInfo.get('bytes', 0), 'ok': exception is None,
+               'error': errorCode(messages) or errorCode(exception), 'messages': messages.strip(),
+               'rss': rss, 'rss_peak': peak}
+    if exception is not None:
+        metrics['exception'] = exception
+    if 'window' in layerInfo:
+        metrics['window'] = layerInfo['window']
+    send("fetch", metrics)
 
 # The getResult() function retrieves raster layers from the server asynchronously (using multiprocessing).
 # Then it saves each raster layer as a TIF image in a temporary folder. TIF images in a temporary
@@ -458,10 +644,15 @@ def getResult(layerInfo):
     Connects to ArcGIS Online to asynchronously create image server layers.
     Saves each raster as a TIFF image in a temp folder.
     Parameters for the layers are stored in the layerInfo variable.
+    The size of the TIFF is added to layerInfo, and the metrics and messages
+    of the fetch are sent to the parent over the log channel.
 
     """
+    wall = clock()
+    cpu = cpuclock()
+    mark = memoryMark()
+    m = ""
     try:
-        m = ""
         id = str(layerInfo.get('id', str(uuid4().fields[-1])[:5]))
         imageLayer = layerInfo['name']
         outRaster = os.path.join(layerInfo['scratchFolder'], "{0}_{1}.{2}".format(imageLayer, id, "TIF"))
@@ -497,11 +688,14 @@ def getResult(layerInfo):
         layerInfo['path'] = outRaster
         layerInfo['messages'] = m
         layerInfo['id'] = id
+        layerInfo['bytes'] = os.path.getsize(outRaster)
         p("  . [{0}] Done:  Saving results".format(id))
         p(". [{0}] Done working on: {1}".format(id, imageLayer))
     except Exception as e:
-        layerInfo['exception'] = e.message
+        layerInfo['exception'] = str(e)
+        sendMetrics(layerInfo, wall, cpu, mark, m)
         return None
+    sendMetrics(layerInfo, wall, cpu, mark, m)
     return layerInfo
 
 #This function is nearly identical to getResult() but modified a bit for a second run-through.
@@ -515,8 +709,11 @@ def getResult2(layerInfo2):
     Parameters for the layers are stored in the layerInfo2 variable.
 
     """
+    wall = clock()
+    cpu = cpuclock()
+    mark = memoryMark()
+    m = ""
     try:
-        m = ""
         id = str(layerInfo2.get('id', str(uuid4().fields[-1])[:5]))
         imageLayer = layerInfo2['name']
         outRaster = os.path.join(layerInfo2['scratchFolder'], "{0}_{1}.{2}".format(imageLayer, id, "TIF"))
@@ -551,127 +748,16 @@ def getResult2(layerInfo2):
         layerInfo2['path'] = outRaster
         layerInfo2['messages'] = m
         layerInfo2['id'] = id
+        layerInfo2['bytes'] = os.path.getsize(outRaster)
         p("  . [{0}] Done:  Saving results".format(id))
         p(". [{0}] Done working on: {1}".format(id, imageLayer))
     except Exception as e:
-        layerInfo2['exception'] = e.message
+        layerInfo2['exception'] = str(e)
+        sendMetrics(layerInfo2, wall, cpu, mark, m)
         return None
+    sendMetrics(layerInfo2, wall, cpu, mark, m)
     return layerInfo2
 
-#Finds the percentage of classes within a featurelayer, then joins a table of percentages to the studyarea table.
-def percent(featurelayer, newlayer, casefield):
-    """percent(featurelayer, newlayer, casefield)
-
-    Returns the percent of the study area occupied by every
-    significant class found in the study area. These percentages
-    are used later to craft sentences in the description.
-
-    """
-
-    if arcversion == '10.5.1':
-        ##tempspace = "C:\\gis\\GeoDescriber\\notinmem.gdb"
-        print (featurelayer + " is ready for the percent function")
-        statFields=[["Count","SUM"]]
-        arcpy.Statistics_analysis(featurelayer, newlayer, statFields, casefield)
-        arcpy.AddField_management(newlayer, "percent", "DOUBLE")
-        sum1=0
-        with arcpy.da.SearchCursor(newlayer,["SUM_Count"]) as cursors:
-            for row1 in cursors:
-                sum1=row1[0]+sum1
-        with arcpy.da.UpdateCursor(newlayer,["SUM_Count","percent"]) as cursor:
-            for row in cursor:
-                row[1]=(row[0]*100)/sum1
-                cursor.updateRow(row)
-        joinedField=["FREQUENCY","percent"]
-        JoinField_Workaround(featurelayer, casefield, newlayer, casefield, joinedField)
-    else:
-        statFields=[["Count","SUM"]]
-        stattable=arcpy.Statistics_analysis (featurelayer, newlayer, statFields, casefield)
-        arcpy.AddField_management (stattable, "percent", "DOUBLE")
-        sum1=0
-        with arcpy.da.SearchCursor(stattable,["SUM_Count"]) as cursors:
-            for row1 in cursors:
-                sum1=row1[0]+sum1
-        with arcpy.da.UpdateCursor(stattable,["SUM_Count","percent"]) as cursor:
-            for row in cursor:
-                row[1]=(row[0]*100)/sum1
-                cursor.updateRow(row)
-        joinedField=["FREQUENCY","percent"]
-        arcpy.JoinField_management(featurelayer, casefield, stattable, casefield, joinedField)
-
-#find and return the largest value in the percent table.
-def largest(layer,field):
-    """largest(layer,field)
-
-    Returns the largest area significant class in the study area.
-
-    """
-    theitems = []
-    rows = arcpy.SearchCursor(layer)
-    for row in rows:
-        theitems.append(row.getValue(field))
-    del rows
-    theitems.sort()
-    max1= theitems[-1]
-    return max1
-
-#find string
-def findString(featureCl,largVal):
-    """findString(featureCl,largVal)
-
-    Returns the name of the significant class which is the
-    largest area in the study area.
-
-    """
-    global sideopslist
-    with arcpy.da.SearchCursor(featureCl,["ClassName","percent"]) as cursor:
-        for row in cursor:
-            if row[1]== largVal:
-                randomstr = str(row[0])
-                sideopslist.append(row[1])
-                sideopslist.append(row[0])
-                sideopslist.append(i)
-                return randomstr
-
-# Find the other land cover, lithology, bioclimate and landform classes that are bigger than 10% but
-# smaller than the largest in their classes.
-def restofValues (featurelayer, largVal, dictionary):
-    """restofValues (featurelayer, largVal, dictionary)
-
-    Returns the names of significant classes making up over 10%
-    of the study area but are smaller than the largest class.
-
-    """
-    global restopslist
-    stringvalues=""
-    row_pairs=set()
-    z = 0
-    with arcpy.da.UpdateCursor(featurelayer,["ClassName","percent"]) as cursor:
-            for row in cursor:
-                row_pair= tuple(sorted(row))
-                if row_pair in row_pairs:
-                    cursor.deleteRow()
-                else:
-                    row_pairs.add(row_pair)
-                    if row[1] > int(10) and row[1] != largVal:
-                        z = z + 1
-                        restopslist.append(row[1])
-                        restopslist.append(row[0])
-                        restopslist.append(i)
-                        stringvalues += str(int(row[1])) +"% is " + dictionary[str(row[0])] + ", "
-            restvaluescount = z
-            if restvaluescount == 1:
-                stringval= stringvalues[:-2]
-                restvalues = "but "+stringval+". "
-            else:
-                stringval=stringvalues[:-2]
-                pos = stringval.rfind(',')
-                stringv = stringval[:pos] + ', and' + stringval[pos+1:]
-                restvalues="while "+stringv+". "
-            restvaluescount = 0
-    return restvalues
-
-
 def JoinField_Workaround (indataset,infield,jointable,joinfld,workaroundfields):
     """JoinField_Workaround(indataset,infield,jointable,joinfld,workaroundfields) # joinfield
 
@@ -702,12 +788,845 @@ def JoinField_Workaround (indataset,infield,jointable,joinfld,workaroundfields):
         tb = sys.exc_info()[2]
         tbinfo = traceback.format_tb(tb)[0]
         # Concatenate information together concerning the error into a message string
-        pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
         # Write Python error messages to log
         err= pymsg + "\n"
         print(err)
 
 
+#-------------------------------------------------------------------------------
+#--------------------------polygon geometries-----------------------------------
+
+# Every polygon is read once from the projected feature class and kept in memory
+# as vertex arrays, with its extents. GeoDescriber() builds each polygon from its
+# record instead of querying, copying and reprojecting the feature class.
+class PolygonRecord(object):
+    """PolygonRecord(oid, parts, extent, ceaextent, area, centroid)
+
+    One projected polygon. parts is a list of NumPy arrays of x,y vertices,
+    one array per part, with a row of NaN between rings. extent and ceaextent
+    are (xmin, ymin, xmax, ymax) in Mollweide and in cylindrical equal area.
+    area and centroid (x, y) are in Mollweide.
+
+    """
+
+    def __init__(self, oid, parts, extent, ceaextent, area, centroid):
+        self.oid = oid
+        self.parts = parts
+        self.extent = extent
+        self.ceaextent = ceaextent
+        self.area = area
+        self.centroid = centroid
+
+def streamPolygons(featureclass, ceasr):
+    """streamPolygons(featureclass, ceasr)
+
+    Reads every polygon of featureclass in one cursor pass and yields a
+    PolygonRecord for each, in OBJECTID order. The cylindrical equal area
+    extent is computed by projecting the geometry in memory to ceasr.
+
+    """
+    with arcpy.da.SearchCursor(featureclass,["OID@","SHAPE@"]) as cursor:
+        for row in cursor:
+            geom = row[1]
+            if geom is None:
+                print("OBJECTID "+str(row[0])+" has no geometry, skipping it")
+                continue
+            parts = []
+            for part in geom:
+                vertices = []
+                for point in part:
+                    if point is None:
+                        vertices.append((np.nan, np.nan))
+                    else:
+                        vertices.append((point.X, point.Y))
+                parts.append(np.array(vertices, dtype=np.float64))
+            ext = geom.extent
+            ceaext = geom.projectAs(ceasr).extent
+            centroid = geom.trueCentroid
+            yield PolygonRecord(row[0], parts,
+                                (ext.XMin, ext.YMin, ext.XMax, ext.YMax),
+                                (ceaext.XMin, ceaext.YMin, ceaext.XMax, ceaext.YMax),
+                                geom.area, (centroid.X, centroid.Y))
+
+def polygonGeometry(record, spatialreference):
+    """polygonGeometry(record, spatialreference)
+
+    Rebuilds an arcpy Polygon from the vertex arrays of a PolygonRecord.
+
+    """
+    rings = arcpy.Array()
+    for part in record.parts:
+        ring = arcpy.Array()
+        for x, y in part:
+            if math.isnan(x):
+                rings.add(ring)
+                ring = arcpy.Array()
+            else:
+                ring.add(arcpy.Point(x, y))
+        rings.add(ring)
+    return arcpy.Polygon(rings, spatialreference)
+
+def polygonToFeatureClass(record, name, spatialreference):
+    """polygonToFeatureClass(record, name, spatialreference)
+
+    Writes the polygon of a PolygonRecord to an in_memory feature class
+    called name, so it can be used by geoprocessing tools.
+
+    """
+    feature = os.path.join(inmem,name)
+    if arcpy.Exists(feature):
+        arcpy.Delete_management(feature)
+    arcpy.CreateFeatureclass_management(inmem,name,"POLYGON","","","",spatialreference)
+    with arcpy.da.InsertCursor(inmem+"\\"+name,["SHAPE@"]) as cursor:
+        cursor.insertRow([polygonGeometry(record, spatialreference)])
+    return inmem+"\\"+name
+
+#-------------------------------------------------------------------------------
+#--------------------------polygon order----------------------------------------
+
+# Consecutive polygons in OBJECTID order are often far apart. Sorting the polygons
+# by the position of their centroids along a space-filling curve keeps neighbors
+# together, so rasters fetched for one polygon can be reused by the next.
+def hilbertKey(x, y, order):
+    """hilbertKey(x, y, order)
+
+    Returns the distance along a Hilbert curve of the cell x, y
+    on a grid of 2**order by 2**order cells.
+
+    """
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if (x & s) > 0 else 0
+        ry = 1 if (y & s) > 0 else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant so the curve stays continuous
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+def zorderKey(x, y, order):
+    """zorderKey(x, y, order)
+
+    Returns the Z-order (Morton) key of the cell x, y on a grid of
+    2**order by 2**order cells, by interleaving the bits of x and y.
+
+    """
+    d = 0
+    for bit in range(order):
+        d |= ((x >> bit) & 1) << (2 * bit)
+        d |= ((y >> bit) & 1) << (2 * bit + 1)
+    return d
+
+def orderPolygons(records, mode):
+    """orderPolygons(records, mode)
+
+    Returns the OBJECTIDs of a list of PolygonRecords in processing order.
+    mode is "oid" for OBJECTID order, or "hilbert" or "zorder" to sort by the
+    curve key of each centroid in Mollweide space.
+
+    """
+    if mode == "oid" or len(records) < 2:
+        return sorted(record.oid for record in records)
+    if mode == "hilbert":
+        curvekey = hilbertKey
+    elif mode == "zorder":
+        curvekey = zorderKey
+    else:
+        raise ValueError("Unknown polygon order '{0}'. Use oid, hilbert or zorder.".format(mode))
+    order = 16
+    cells = (1 << order) - 1
+    xs = [record.centroid[0] for record in records]
+    ys = [record.centroid[1] for record in records]
+    xmin, ymin = min(xs), min(ys)
+    span = max(max(xs) - xmin, max(ys) - ymin) or 1.0
+    keyed = []
+    for record in records:
+        x = int((record.centroid[0] - xmin) / span * cells)
+        y = int((record.centroid[1] - ymin) / span * cells)
+        keyed.append((curvekey(x, y, order), record.oid))
+    keyed.sort()
+    return [oid for key, oid in keyed]
+
+#-------------------------------------------------------------------------------
+#--------------------------polygon scheduling-----------------------------------
+
+# Polygon runtimes span orders of magnitude, so one country can hold up a batch of
+# parks. The work of each polygon is estimated from its Mollweide geometry before
+# anything is fetched. Polygons are then placed largest-first on the least loaded
+# worker that has enough memory, and tiny polygons are batched together.
+def estimateWork(record):
+    """estimateWork(record)
+
+    Estimates the work of describing one PolygonRecord. Returns a dictionary
+    with the cells inside the polygon (area / cellsize**2), the cells of its
+    extent at cellsize and at the 30 m resolution of the water layer, the cost
+    in cells read and written, and the peak bytes from stageFootprints().
+
+    """
+    width = record.extent[2] - record.extent[0]
+    height = record.extent[3] - record.extent[1]
+    cells = record.area / (cellsize * cellsize)
+    extentcells = math.ceil(width / cellsize) * math.ceil(height / cellsize)
+    watercells = math.ceil(width / 30.0) * math.ceil(height / 30.0)
+    # nine layers are fetched at cellsize and one, water, at 30 m. The analysis
+    # passes over the cells inside the polygon once per layer.
+    return {'cells': cells,
+            'extentcells': extentcells,
+            'watercells': watercells,
+            'cost': 9 * extentcells + watercells + 10 * cells,
+            'bytes': max(stageFootprints(record).values())}
+
+def planSchedule(oids, work, workers, workermemory=None, tinycells=1000, batchsize=25):
+    """planSchedule(oids, work, workers, workermemory=None, tinycells=1000, batchsize=25)
+
+    Places the polygons in oids on a number of workers. work maps every
+    OBJECTID to the dictionary of estimateWork(). Polygons of fewer than
+    tinycells cells are grouped into batches of batchsize, in the order of
+    oids. Tasks are then placed largest-first on the least loaded worker.
+    workermemory is None, one budget in bytes for every worker, or a list
+    with the budget of each worker; a polygon only goes to a worker whose
+    budget holds it. Returns one list of tasks per worker, and each task
+    is a list of OBJECTIDs.
+
+    """
+    if not isinstance(workermemory, (list, tuple)):
+        workermemory = [workermemory] * workers
+    if len(workermemory) != workers:
+        raise ValueError("workerMemory needs one budget for each of the {0} workers.".format(workers))
+    tasks = []
+    tiny = []
+    for oid in oids:
+        if work[oid]['cells'] < tinycells:
+            tiny.append(oid)
+            if len(tiny) == batchsize:
+                tasks.append(tiny)
+                tiny = []
+        else:
+            tasks.append([oid])
+    if tiny:
+        tasks.append(tiny)
+    def taskcost(task):
+        return sum(work[oid]['cost'] for oid in task)
+    def taskbytes(task):
+        return max(work[oid]['bytes'] for oid in task)
+    tasks.sort(key=taskcost, reverse=True)
+    plan = [[] for w in range(workers)]
+    load = [0.0] * workers
+    for task in tasks:
+        need = taskbytes(task)
+        fits = [w for w in range(workers) if workermemory[w] is None or workermemory[w] >= need]
+        if not fits:
+            w = max(range(workers), key=lambda m: workermemory[m])
+            warnings.warn("Warning: OBJECTID "+str(task[0])+" needs about "+str(int(need / 1048576))+" MB, more than any worker has. It is placed on worker "+str(w)+".", UserWarning, stacklevel=2)
+        else:
+            w = min(fits, key=lambda m: load[m])
+        plan[w].append(task)
+        load[w] += taskcost(task)
+    return plan
+
+#-------------------------------------------------------------------------------
+#--------------------------memory governor--------------------------------------
+
+# Bytes per cell of each layer as it is served. All layers are masked to cellsize,
+# but the water layer is read at 30 m while it is masked.
+layerBytes = {'Elevation': 2, 'Population': 4, 'Landform': 1, 'Lithology': 1, 'Bioclimate': 1,
+              'Landcover': 1, 'Slope': 4, 'Water': 1, 'Diversity': 1, 'Biomass': 4}
+
+# The governor estimates the peak memory of every stage of GeoDescriber() for a
+# polygon. If the peak fits in memoryBudget the polygon runs in_memory. If only the
+# 30 m water read is too big, water is fetched and resampled in windows. Otherwise
+# every intermediate raster is spilled to the scratch geodatabase.
+def stageFootprints(record, windows=1):
+    """stageFootprints(record, windows=1)
+
+    Returns an OrderedDict with the estimated peak bytes of each stage of
+    GeoDescriber() for a PolygonRecord, from its extent in cells and the
+    bytes per cell of every layer. windows is the number of strips the
+    water layer is read in.
+
+    """
+    width = record.extent[2] - record.extent[0]
+    height = record.extent[3] - record.extent[1]
+    extentcells = math.ceil(width / cellsize) * math.ceil(height / cellsize)
+    watercells = math.ceil(width / 30.0) * math.ceil(height / 30.0)
+    # the masked layers stay in memory until the polygon is described, with
+    # mask_extent (4 bytes) and con_extent (1 byte).
+    resident = extentcells * (sum(layerBytes.values()) + 5)
+    footprints = collections.OrderedDict()
+    footprints['mask'] = resident + watercells * layerBytes['Water'] / windows
+    footprints['water'] = resident + 2 * extentcells
+    footprints['zones'] = resident + 2 * 4 * extentcells
+    footprints['aspect'] = resident + 4 * 4 * extentcells
+    return footprints
+
+def chooseMemoryMode(record, budget):
+    """chooseMemoryMode(record, budget)
+
+    Returns (mode, windows) for a PolygonRecord and a memory budget in bytes.
+    mode is "memory" if every stage fits in the budget, "windowed" if the
+    water layer has to be read in windows strips to fit, or "disk" if the
+    rasters of the polygon do not fit in the budget at all. A budget of None
+    always returns ("memory", 1).
+
+    """
+    if budget is None or max(stageFootprints(record).values()) <= budget:
+        return "memory", 1
+    for windows in range(2, maxWaterWindows + 1):
+        if max(stageFootprints(record, windows).values()) <= budget:
+            return "windowed", windows
+    return "disk", 1
+
+def splitWindows(layers, name, windows):
+    """splitWindows(layers, name, windows)
+
+    Returns a copy of the list of layerInfo dictionaries in which the layer
+    called name is replaced by windows layers, each fetching one horizontal
+    strip of its extent. Strips have a 'window' key with their number.
+
+    """
+    split = []
+    for a in layers:
+        if a['name'] != name:
+            split.append(a)
+            continue
+        xmin, ymin, xmax, ymax = [float(v) for v in a['extentlayer'].split()]
+        step = (ymax - ymin) / windows
+        for w in range(windows):
+            strip = dict(a)
+            strip['window'] = w
+            top = ymax if w == windows - 1 else ymin + (w + 1) * step
+            strip['extentlayer'] = " ".join(str(v) for v in (xmin, ymin + w * step, xmax, top))
+            split.append(strip)
+    return split
+
+def mosaicWindows(strips, cellsize):
+    """mosaicWindows(strips, cellsize)
+
+    Mosaics the rasters fetched for the strips of one layer into a single
+    raster at cellsize, one strip at a time, and returns a layerInfo
+    dictionary for it.
+
+    """
+    strips = sorted(strips, key=lambda s: s['window'])
+    first = strips[0]
+    mosaicname = "{0}_mosaic.TIF".format(first['name'])
+    arcpy.MosaicToNewRaster_management([s['path'] for s in strips], first['scratchFolder'], mosaicname,
+                                       "#", "8_BIT_UNSIGNED", cellsize, 1, "FIRST")
+    mosaic = os.path.join(first['scratchFolder'], mosaicname)
+    arcpy.BuildRasterAttributeTable_management(mosaic, "Overwrite")
+    rasterInfo = dict(first)
+    del rasterInfo['window']
+    rasterInfo['path'] = mosaic
+    return rasterInfo
+
+#-------------------------------------------------------------------------------
+#--------------------------raster cache-----------------------------------------
+
+# The RasterCache keeps rasters fetched from the server in a folder. Fetch extents
+# are snapped outward to a grid of tiles, so a raster fetched for one polygon
+# covers its neighbors too. A cached raster is reused when its tiles contain the
+# tiles of the polygon being described. The least recently used rasters are
+# deleted when the cache grows past maxbytes.
+class RasterCache(object):
+    """RasterCache(folder, tilecells, cellsize, maxbytes, readonly=False)
+
+    Cache of fetched rasters. tiles(extent) snaps an extent to the tile grid,
+    lookup(name, tiles) returns the path of a cached raster covering those
+    tiles or None, and store(name, tiles, path) moves a freshly fetched raster
+    into the cache. Hits and misses are counted per layer for summary().
+    A readonly cache does not create its folder; dry runs plan with it.
+
+    """
+
+    def __init__(self, folder, tilecells, cellsize, maxbytes, readonly=False):
+        self.folder = folder
+        self.tilesize = tilecells * cellsize
+        self.maxbytes = maxbytes
+        self.entries = collections.OrderedDict()
+        self.totalbytes = 0
+        self.hits = {}
+        self.misses = {}
+        if not readonly and not os.path.exists(folder):
+            os.makedirs(folder)
+        #rasters left in the folder by earlier runs are reused
+        for path in sorted(glob.glob(os.path.join(folder, "*.TIF"))):
+            fields = os.path.splitext(os.path.basename(path))[0].split("_")
+            try:
+                tiles = tuple(int(v) for v in fields[-4:])
+            except ValueError:
+                continue
+            if len(fields) > 4 and len(tiles) == 4:
+                self._register("_".join(fields[:-4]), tiles, path)
+
+    def tiles(self, extent):
+        """tiles(extent)
+
+        Returns the first and last tile columns and rows (tx0, ty0, tx1, ty1)
+        touched by an extent (xmin, ymin, xmax, ymax).
+
+        """
+        return (int(math.floor(extent[0] / self.tilesize)), int(math.floor(extent[1] / self.tilesize)),
+                int(math.floor(extent[2] / self.tilesize)), int(math.floor(extent[3] / self.tilesize)))
+
+    def tileExtent(self, tiles):
+        """tileExtent(tiles)
+
+        Returns the extent (xmin, ymin, xmax, ymax) covered by a range of tiles.
+
+        """
+        return (tiles[0] * self.tilesize, tiles[1] * self.tilesize,
+                (tiles[2] + 1) * self.tilesize, (tiles[3] + 1) * self.tilesize)
+
+    def lookup(self, name, tiles):
+        """lookup(name, tiles)
+
+        Returns the path of a cached raster of the layer name that covers
+        tiles, or None. The smallest covering raster is used.
+
+        """
+        found = None
+        for key, entry in self.entries.items():
+            if key[0] != name:
+                continue
+            t = key[1]
+            if t[0] <= tiles[0] and t[1] <= tiles[1] and t[2] >= tiles[2] and t[3] >= tiles[3]:
+                if found is None or entry[1] < self.entries[found][1]:
+                    found = key
+        if found is None:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            return None
+        self.hits[name] = self.hits.get(name, 0) + 1
+        entry = self.entries.pop(found)
+        self.entries[found] = entry
+        return entry[0]
+
+    def store(self, name, tiles, path):
+        """store(name, tiles, path)
+
+        Moves a fetched raster (and its side files) into the cache folder,
+        evicts the least recently used rasters if needed, and returns the
+        new path of the raster.
+
+        """
+        base = "{0}_{1}_{2}_{3}_{4}".format(name, tiles[0], tiles[1], tiles[2], tiles[3])
+        cachedpath = os.path.join(self.folder, base + ".TIF")
+        if (name, tiles) in self.entries:
+            self._evict((name, tiles))
+        stem = os.path.splitext(path)[0]
+        for sidefile in glob.glob(stem + ".*"):
+            shutil.move(sidefile, os.path.join(self.folder, base + os.path.basename(sidefile)[len(os.path.basename(stem)):]))
+        self._register(name, tiles, cachedpath)
+        while self.totalbytes > self.maxbytes and len(self.entries) > 1:
+            self._evict(next(iter(self.entries)))
+        return cachedpath
+
+    def reserve(self, name, tiles, size):
+        """reserve(name, tiles, size)
+
+        Records a raster of size bytes as if it had been stored, without a
+        file, and forgets the least recently used rasters past maxbytes
+        without deleting them. Dry runs follow what the cache would hold
+        with it.
+
+        """
+        if (name, tiles) in self.entries:
+            self.totalbytes -= self.entries.pop((name, tiles))[1]
+        self.entries[(name, tiles)] = (None, size)
+        self.totalbytes += size
+        while self.totalbytes > self.maxbytes and len(self.entries) > 1:
+            self.totalbytes -= self.entries.pop(next(iter(self.entries)))[1]
+
+    def hitRate(self):
+        """hitRate()
+
+        Returns the fraction of lookups served from the cache, or None
+        if there were no lookups.
+
+        """
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        if lookups == 0:
+            return None
+        return float(hits) / lookups
+
+    def summary(self):
+        """summary()
+
+        Returns a report of cache hits and misses, per layer and in total.
+
+        """
+        lines = []
+        for name in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(name, 0)
+            misses = self.misses.get(name, 0)
+            lines.append("  {0}: {1} hits, {2} misses, hit rate {3:.1f}%".format(name, hits, misses, 100.0 * hits / (hits + misses)))
+        rate = self.hitRate()
+        if rate is None:
+            lines.append("raster cache was not used")
+        else:
+            lines.append("raster cache: {0} hits, {1} misses, hit rate {2:.1f}%, {3:.1f} MB cached".format(
+                sum(self.hits.values()), sum(self.misses.values()), 100.0 * rate, self.totalbytes / 1048576.0))
+        return "\n".join(lines)
+
+    def _register(self, name, tiles, path):
+        size = os.path.getsize(path)
+        self.entries[(name, tiles)] = (path, size)
+        self.totalbytes += size
+
+    def _evict(self, key):
+        path, size = self.entries.pop(key)
+        self.totalbytes -= size
+        for sidefile in glob.glob(os.path.splitext(path)[0] + ".*"):
+            try:
+                os.remove(sidefile)
+            except OSError:
+                pass
+
+#-------------------------------------------------------------------------------
+#--------------------------class codes------------------------------------------
+
+# Every class of the four ecophysiographic criteria has a small integer code, its
+# place in the sorted keys of the dictionary of that criterion. The masked rasters
+# keep the values the image services use, and a lookup array indexed by those
+# values gives the code of every cell, so areas are added up by code with numpy
+# and the class names are only looked up when the facts are written.
+class ClassRegistry(object):
+    """ClassRegistry(name, dictionary, classfields)
+
+    Integer codes for the classes of one criterion. register(value, classname)
+    records the class of a raster value, codes(values) returns the codes of an
+    array of raster values, tally(values, counts) adds up cell counts by code,
+    and whereClause(classname) selects the raster values of a class, or
+    raises if none of them has been read.
+
+    """
+    def __init__(self, name, dictionary, classfields):
+        self.name = name
+        self.classfields = classfields
+        self.names = sorted(dictionary)
+        self.phrases = [dictionary[classname] for classname in self.names]
+        self.index = dict((classname, code) for code, classname in enumerate(self.names))
+        self.undefined = self.index['None']
+        self.values = {}
+        self.lookup = None
+
+    def register(self, value, classname):
+        value = int(value)
+        if value in self.values:
+            return self.values[value]
+        code = self.index.get(str(classname))
+        if code is None:
+            print("Unknown "+self.name.lower()+" class "+str(classname)+" is counted as undefined.")
+            code = self.undefined
+        self.values[value] = code
+        self.lookup = None
+        return code
+
+    def codes(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        if self.lookup is None:
+            size = max([0] + list(self.values.keys())) + 1
+            self.lookup = np.zeros(size, dtype=np.int16) + self.undefined
+            for value, code in self.values.items():
+                self.lookup[value] = code
+        if len(values) != 0 and (values.min() < 0 or values.max() >= len(self.lookup)):
+            codes = np.zeros(len(values), dtype=np.int16) + self.undefined
+            inside = (values >= 0) & (values < len(self.lookup))
+            codes[inside] = self.lookup[values[inside]]
+            return codes
+        return self.lookup[values]
+
+    def tally(self, values, counts):
+        if len(values) == 0:
+            return np.zeros(len(self.names))
+        return np.bincount(self.codes(values), weights=np.asarray(counts, dtype=np.float64),
+                           minlength=len(self.names))
+
+    def whereClause(self, classname):
+        code = self.index.get(classname, self.undefined)
+        values = sorted(value for value, valuecode in self.values.items() if valuecode == code)
+        if values == []:
+            raise ValueError("No raster value of the "+self.name.lower()+" class "+str(classname)+" has been read.")
+        return "Value IN (" + ", ".join(str(value) for value in values) + ")"
+
+classRegistries = {
+    'Bioclimate': ClassRegistry("Bioclimate", bioclimate_dict, ["Bioclimate"]),
+    'Landform': ClassRegistry("Landform", landform_dict, ["ClassName_1", "ClassName"]),
+    'Lithology': ClassRegistry("Lithology", lithology_dict, ["EF_Litho"]),
+    'Landcover': ClassRegistry("Landcover", landcover_dict, ["ClassName_1", "ClassName"]),
+}
+
+def registryOf(path):
+    """registryOf(path)
+
+    Returns the ClassRegistry of a masked class raster such as
+    inmem+"\\Landform_R".
+
+    """
+    return classRegistries[path.split("\\")[-1][:-2]]
+
+def readClasses(path):
+    """readClasses(path)
+
+    Registers the class of every value in the attribute table of a
+    masked class raster, and returns the cells of every class by code.
+
+    """
+    registry = registryOf(path)
+    fields = [field.name for field in arcpy.ListFields(path)]
+    classfield = [name for name in registry.classfields if name in fields][0]
+    values = []
+    counts = []
+    with arcpy.da.SearchCursor(path, ["Value", classfield, "Count"]) as cursor:
+        for row in cursor:
+            registry.register(row[0], row[1])
+            values.append(row[0])
+            counts.append(row[2])
+    return registry.tally(values, counts)
+
+def topClass(path, registry):
+    """topClass(path, registry)
+
+    Returns the cell count and the name of the largest class in the
+    attribute table of a raster holding the values of a class raster,
+    or 0 and the undefined class when the raster is empty.
+
+    """
+    values = []
+    counts = []
+    with arcpy.da.SearchCursor(path, ["Value", "Count"]) as cursor:
+        for row in cursor:
+            values.append(row[0])
+            counts.append(row[1])
+    cells = registry.tally(values, counts)
+    if cells.sum() == 0:
+        return 0, registry.names[registry.undefined]
+    code = int(np.argmax(cells))
+    return cells[code], registry.names[code]
+
+#-------------------------------------------------------------------------------
+#--------------------------names and short names--------------------------------
+
+# name, short name, short name singular and plural used when a feature has no name.
+studyareanames = ("study area","study area","study area is","study area are")
+
+# The short name of a place is found by an Aho-Corasick automaton built once from
+# the keys of shortname_matrix, so every name is scanned once, in time that depends
+# on the length of the name and not on the number of keys.
+class KeywordAutomaton(object):
+    """KeywordAutomaton(keywords)
+
+    Aho-Corasick automaton over a list of keywords. matches(text) yields
+    (end, index) for every occurrence of every keyword in text, where end
+    is the position just past the occurrence and index is the position of
+    the keyword in keywords.
+
+    """
+    def __init__(self, keywords):
+        self.keywords = keywords
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+        # breadth first, so the failure state of every state is done before its children.
+        pending = collections.deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, child in self.goto[state].items():
+                pending.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def matches(self, text):
+        goto = self.goto
+        fail = self.fail
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in self.output[state]:
+                yield position + 1, index
+
+shortnameAutomaton = KeywordAutomaton([row[0] for row in shortname_matrix])
+
+def shortName(polyname):
+    """shortName(polyname)
+
+    Returns the short name of a place and its singular and plural versions
+    from shortname_matrix, for example ("park","park is","park are").
+    The name is padded with a space on both sides so keys such as " mount "
+    also match at its ends. The key that ends last in the name wins, and
+    of the keys ending there the longest, so "Grand Canyon National Park"
+    is a park and "Yellowstone Parks" are parks. Returns the "study area"
+    versions if no short name is found in polyname.
+
+    """
+    best = None
+    for end, index in shortnameAutomaton.matches(" " + polyname.lower() + " "):
+        key = shortname_matrix[index][0]
+        # the spaces around a key mark word boundaries and are not part of the word.
+        rank = (end - (len(key) - len(key.rstrip())), len(key.strip()))
+        if best is None or rank > best[0]:
+            best = (rank, index)
+    if best is None:
+        return studyareanames[1:]
+    row = shortname_matrix[best[1]]
+    return (row[0].strip(), row[1], row[2])
+
+def buildNameTable(featureclass):
+    """buildNameTable(featureclass)
+
+    Resolves the name of every feature in one cursor pass and returns a
+    dictionary indexed by OBJECTID. Each entry holds the name, the short
+    name and the short name singular and plural versions. The name is read
+    from the first field with NAM, NOM or NAAM in its name. Features without
+    a name are called "study area".
+
+    """
+    nametable = {}
+    field_names = [f.name for f in arcpy.ListFields(featureclass)]
+    namefields = []
+    for field in field_names:
+        fieldsupper = field.upper()
+        if "NAM" in fieldsupper or "NOM" in fieldsupper or "NAAM" in fieldsupper:
+            namefields.append(field)
+    if namefields == []:
+        print("no name field found, using the generic term study area")
+        return nametable
+    print("resolving names from the field "+namefields[0]+"...")
+    #many features share a name, so look up each short name once
+    shortnames = {}
+    with arcpy.da.SearchCursor(featureclass,["OBJECTID",namefields[0]]) as cursor:
+        for row in cursor:
+            polyname = row[1]
+            if polyname is None or polyname.strip() == "":
+                nametable[row[0]] = studyareanames
+                continue
+            if polyname not in shortnames:
+                shortnames[polyname] = shortName(polyname)
+            nametable[row[0]] = (polyname,) + shortnames[polyname]
+    return nametable
+
+#-------------------------------------------------------------------------------
+#-----------------write descriptions back to the feature class------------------
+
+# The DescriptionWriter collects the description of every polygon and writes them
+# back to the Description field in batches, keyed by OBJECTID. Only the rows in
+# a batch are read and updated, instead of every row in the feature class for
+# every polygon. Every batch is saved in an edit session of its own, so a run
+# that stops loses at most the descriptions of the batch it was collecting.
+class DescriptionWriter(object):
+    """DescriptionWriter(featureclass, batchsize=100)
+
+    Buffers descriptions with add(oid, description) and commits them to the
+    Description field of featureclass in OBJECTID-keyed batches. A batch
+    that can not be written stays buffered and is written with the next
+    one. Call close() when the run is done to write the last batch.
+
+    """
+
+    def __init__(self, featureclass, batchsize=100):
+        self.featureclass = featureclass
+        self.batchsize = batchsize
+        self.pending = {}
+        self.workspace = None
+        self.written = 0
+
+    def add(self, oid, description):
+        """add(oid, description)
+
+        Buffers the description of one polygon. Writes a batch when the
+        buffer holds batchsize descriptions. A failed write is printed
+        rather than raised, since the polygon being added is not the one
+        at fault, and the descriptions stay buffered.
+
+        """
+        self.pending[oid] = description
+        if len(self.pending) >= self.batchsize:
+            try:
+                self.flush()
+            except Exception as e:
+                print("Could not write descriptions for OBJECTIDs {0}, keeping them for the next batch: {1}".format(
+                    sorted(self.pending), e))
+
+    def flush(self):
+        """flush()
+
+        Writes the buffered descriptions and saves them. They stay
+        buffered if the write raises.
+
+        """
+        if not self.pending:
+            return
+        self._write(self.pending)
+        self.written += len(self.pending)
+        self.pending = {}
+
+    def close(self):
+        """close()
+
+        Writes any buffered descriptions. Raises if they can not be
+        written.
+
+        """
+        self.flush()
+        print("{0} descriptions written to {1}".format(self.written, self.featureclass))
+
+    def _write(self, batch):
+        if self.workspace is None:
+            #a layer name or a relative path has no folder of its own, its catalog path does.
+            workspace = os.path.dirname(os.path.abspath(arcpy.Describe(self.featureclass).catalogPath))
+            if arcpy.Describe(workspace).dataType == "FeatureDataset":
+                workspace = os.path.dirname(workspace)
+            self.workspace = workspace
+        oids = sorted(batch)
+        qstr = "OBJECTID IN ({0})".format(",".join(str(oid) for oid in oids))
+        editor = arcpy.da.Editor(self.workspace)
+        editor.startEditing(False, False)
+        editor.startOperation()
+        try:
+            with arcpy.da.UpdateCursor(self.featureclass, ["OBJECTID","Description"], qstr) as cursor:
+                for row in cursor:
+                    row[1] = batch[row[0]]
+                    cursor.updateRow(row)
+        except Exception:
+            self._undo(editor)
+            raise
+        editor.stopOperation()
+        editor.stopEditing(True)
+
+    def _undo(self, editor):
+        #undoes a failed write as far as it can. The failures are only printed, so the
+        #error of the write is the one raised, with its traceback on Python 2 as well.
+        try:
+            editor.abortOperation()
+        except Exception as e:
+            print("Could not abort the edit operation: {0}".format(e))
+        try:
+            editor.stopEditing(False)
+        except Exception as e:
+            print("Could not stop editing: {0}".format(e))
+
 #-------------------------------------------------------------------------------
 #-----------------retrieve landscape6 and landscape7 rasters--------------------
 
@@ -720,7 +1639,7 @@ def CleanUp():
     """
     try:
         print("cleaning up...")
-        cleanupg = ['aspectg','aspectindexg','Bioclimate_R','Biomass_R','con_extent','cong','Diversity_R','Ecophysdiv_R','Elevation_R','epfcea','extractg','Landcover_R','Landform_R','Lithology_R','mask_extent','mask30','maskext2','mw_zonedg','northupg','Population_R','projcea','Slope_R','thiesmw','thiespts','Water_R','Water30m_R','stattbl','Bioclimates_CR','Bioclimates_ST','Landcover_CR','Landcover_ST','Landform_CR','Landform_ST','Lithology_CR','Lithology_ST','thiesmw','Population_RS','conglf','temp','temppts','cf0']
+        cleanupg = ['aspectg','aspectindexg','Bioclimate_R','Biomass_R','con_extent','cong','Diversity_R','Ecophysdiv_R','Elevation_R','epfcea','extractg','Landcover_R','Landform_R','Lithology_R','mask_extent','mask30','maskext2','mw_zonedg','northupg','Population_R','projcea','Slope_R','thiesmw','thiespts','Water_R','Water30m_R','stattbl','thiesmw','Population_RS','conglf','temp','temppts','cf0']
         for fd in cleanupg:
             feature = os.path.join(output,fd)
             if arcpy.Exists(feature):
@@ -730,842 +1649,1445 @@ def CleanUp():
             if arcpy.Exists(feature):
                 arcpy.Delete_management(feature)
                 print("deleting "+feature+"...")
+            if tempspace != output:
+                feature = os.path.join(tempspace,fd)
+                if arcpy.Exists(feature):
+                    arcpy.Delete_management(feature)
+                    print("deleting "+feature+"...")
 
     except:
         # Get the traceback object
         tb = sys.exc_info()[2]
         tbinfo = traceback.format_tb(tb)[0]
         # Concatenate information together concerning the error into a message string
-        pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
         # Write Python error messages to log
         err= pymsg + "\n"
         print(err)
 
     print("Cleanup done.")
 
-def GeoDescriber():
-    """
+#-------------------------------------------------------------------------------
+#--------------------------fact records-----------------------------------------
+
+# The facts about the study area and about each significant class are held in
+# records with one named slot per fact. Slots that no sentence uses hold
+# dummyvalue, and every other slot is None until its fact is found, so a fact
+# that could not be found is named instead of shifting the facts after it.
+# Records still read and write by position, in the order of their slots, which
+# is the order synthesizeDescription() and the recorded facts use.
+dummyvalue = -9999
 
-    GeoDescriber creates a field called description on a feature
-    class, it analyzes each polygon in the feature class, then it
-    writes a landscape description in the field for each polygon.
+class FactRecord(object):
+    """FactRecord(**facts)
+
+    Base of the fact records. missing() returns the names of the facts
+    not found yet, toList() returns the facts in slot order, and
+    fromList(values) makes a record from them.
 
     """
-    global sideopslist
-    global lock
-    global sr
-    global GeoDescriberTries
-    global article
+    __slots__ = ()
 
-    try:
-        #The GeoDescriber() function loops through each polygon (using the polygon ID).
-        #First it creates a feature layer from one polygon (epf) then it makes a raster
-        #for that polygon called mask_extent.
-        qstr = "OBJECTID" + " = " + str(intPolyID)
-        print("making single poly feature class")
-        epf = arcpy.MakeFeatureLayer_management(FL_MollPrj,"EachPolyFeat", qstr)
-        thefieldname="OBJECTID"
-        arcpy.env.cellSize = cellsize
-        thisPolyTime = time.clock()
-        currentTime = time.clock()
-        print(str(currentTime-startTime)+" seconds. Converting single poly feature to raster...")
-        arcpy.CopyFeatures_management(epf,inmem+"\\cf0")
-        rasterExt=arcpy.PolygonToRaster_conversion(inmem+"\\cf0", "OBJECTID" ,inmem+"\\mask_extent")
-        #rasterExt=arcpy.PolygonToRaster_conversion(epf, "OBJECTID" ,inmem+"\\mask_extent")
-        extentRaster=Con(arcpy.Raster(rasterExt),1)
-        er=extentRaster.save(inmem+"\\con_extent")
-        fieldsdk=["SHAPE@"]
-        #obtain the minimum and maximum x and y for the polygon. Used as a template when making image server layers.
-        with arcpy.da.SearchCursor(epf, fieldsdk) as cursordk:
-            for rowdk in cursordk:
-                geom = rowdk[0]
-                ext = geom.extent  # or row.Shape.extent
-                #print ext
-                extentlayer_feature= str(ext.XMin) + " " + str(ext.YMin) + " " + str(ext.XMax) + " " + str(ext.YMax)
-                #print extentlayer_feature
-
-        layerInfo2 = []
-        lock = None
-        mp.freeze_support()
-
-        tempFolder = tempfile.mkdtemp(prefix="agd_")    # Warning: this folder is deleted at the end of this script.
-
-        p(". Scratch workspace is: {0}".format(tempFolder))
-
-        serviceURLLandform = os.path.join(tempFolder, "landscape7", "World_Landforms_Improved_Hammond_Method" + ".ImageServer")
-        serviceURLLandcover = os.path.join(tempFolder, "landscape7", "World_Land_Cover_ESA_2010" + ".ImageServer")
-        serviceURLLithology = os.path.join(tempFolder, "landscape6", "World_Lithology" + ".ImageServer")
-        serviceURLBioclimate = os.path.join(tempFolder, "landscape6", "World_Bioclimates" + ".ImageServer")
-        serviceURLElevation = os.path.join(tempFolder, "landscape6", "World_Elevation_GMTED" + ".ImageServer")
-        serviceURLPopulation = os.path.join(tempFolder, "landscape6", "World_Population_Estimated" + ".ImageServer")
-        serviceURLSlope = os.path.join(tempFolder, "landscape6", "World_Slope_GMTED" + ".ImageServer")
-        serviceURLWater= os.path.join(tempFolder,"landscape6", "World_Surface_Water_30m_BaseVue_2013" + ".ImageServer")
-        serviceURLDiversity = os.path.join(tempFolder,"landscape7", "World_Ecophysiographic_Diversity_2015" + ".ImageServer")
-        serviceURLBiomass = os.path.join(tempFolder,"landscape6", "World_Biomass" + ".ImageServer")
-
-        service7="landscape7.ags"
-        serviceURL7="http://landscape7.arcgis.com/arcgis/rest/services"
-        service6="landscape6.ags"
-        serviceURL6="http://landscape6.arcgis.com/arcgis/rest/services"
-
-        outRaster = "in_memory"
-
-        #Parameters needed by the getResult and processResult methods are stored in this dictionary.
-        layerInfo = [
-            {'name': "Elevation", 'url': serviceURLElevation, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value", "Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Population" , 'url': serviceURLPopulation, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Landform", 'url': serviceURLLandform, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List': ["Value", "ClassName"], 'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':"Ecophysiographic_Facet_Landform_Classes.rft"},
-            {'name': "Lithology", 'url': serviceURLLithology, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value", "EF_Litho"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Bioclimate", 'url': serviceURLBioclimate, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["BioClim","Bioclimate"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Landcover", 'url': serviceURLLandcover, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["ELU_ID","ClassName"],'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Slope" , 'url': serviceURLSlope, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Water" , 'url': serviceURLWater, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':30,  'processingTemplate':'#'},
-            {'name': "Diversity" , 'url': serviceURLDiversity, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","ecoPhysdiv"],'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':'#'},
-            {'name': "Biomass" , 'url': serviceURLBiomass, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'}
-            ]
+    def __init__(self, **facts):
+        for name in self.__slots__:
+            setattr(self, name, dummyvalue if name.startswith("unused") else None)
+        for name, value in facts.items():
+            setattr(self, name, value)
 
-#------------------------------------------------------------------------
-#
-# Use parallel processing with the getResult function to retrieve images
-# for analysis and cut them to the shape of the study area.
-#
-#------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.__slots__)
 
-        currentTime = time.clock()
-        print(str(currentTime-startTime)+" seconds. Starting multiprocessing...")
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(self, name) for name in self.__slots__[index]]
+        return getattr(self, self.__slots__[index])
 
-        t0 = time.time()
-        arcpy.env.outputCoordinateSystem = sr
-        lock = mp.Lock()
-        pool = mp.Pool(5, initializer=initPool, initargs=(lock,))
-        results = [pool.apply_async(getResult, args=(a,)) for a in layerInfo]
-        L = []
-        if arcversion == '10.5.1':
-            for z in results:
-                rasterInfo = z.get()
-                if rasterInfo is None:
-                    continue
-                L = L + [rasterInfo]
-            for r in L:
-                print("fetching " + r['name'] + " from server")
-                print(r['path'])
-                arcpy.env.outputCoordinateSystem = sr
-                outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), r['path'])
-                p ( arcpy.GetMessages())
-                od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                #Replace nodata from population estimate raster with zero. That way the sums
-                #still work. Nodata will will cause GeoDescriber() to fail.
-                if r['name'] == "Population":
-                    if not arcpy.sa.Raster(inmem+"\\Population_R").maximum > 0:
-                        outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), 0)
-                        od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                if r['name'] == "Biomass":
-                    if not arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
-                        p ( arcpy.GetMessages())
-                        saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                        ##arcpy.CopyRaster_management(inmem+"\\"+ r['name'] +"_R", r"C:\gis\GeoDescriber\current.gdb"+"\\"+ r['name'] +"_R")
-                    else:
-                        p ( arcpy.GetMessages())
-                        saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                        JoinField_Workaround(inmem+"\\"+ r['name'] +"_R", "Value", r['path'], "Value", r['List'])
-                        p ( arcpy.GetMessages())
-                        outputRaster = None
-                else:
-                    p ( arcpy.GetMessages())
-                    saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                    JoinField_Workaround(inmem+"\\"+ r['name'] +"_R", "Value", r['path'], "Value", r['List'])
-                    p ( arcpy.GetMessages())
-                    outputRaster = None
-        else:
-            for z in results:
-                rasterInfo = z.get()
-                if rasterInfo is None:
-                    continue
-                L = L + [rasterInfo]
-            for r in L:
-                print("fetching " + r['name'] + " from server")
-                arcpy.env.outputCoordinateSystem = sr
-                outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), r['path'])
-                p ( arcpy.GetMessages())
-                od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                #Replace nodata from population estimate raster with zero. That way the sums
-                #still work. Nodata will will cause GeoDescriber() to fail.
-                if r['name'] == "Population":
-                    if not arcpy.sa.Raster(inmem+"\\Population_R").maximum > 0:
-                        outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), 0)
-                        od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                if r['name'] == "Biomass":
-                    if not arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
-                        p ( arcpy.GetMessages())
-                        saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                    else:
-                        p ( arcpy.GetMessages())
-                        saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                        d = arcpy.JoinField_management(saved_raster, "Value", r['path'], "Value", r['List'])
-                        p ( arcpy.GetMessages())
-                        outputRaster = None
-                else:
-                    p ( arcpy.GetMessages())
-                    saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                    d = arcpy.JoinField_management(saved_raster, "Value", r['path'], "Value", r['List'])
-                    p ( arcpy.GetMessages())
-                    outputRaster = None
-        p(". Shutting down worker pool. Elapsed time: {0:.2f} seconds.".format(time.time()-t0))
-        pool.close()
-        pool.join()
-        #if os.path.exists(tempFolder):
-        #    shutil.rmtree(tempFolder)
-        p("*** Process complete. {0} jobs in {1:.2f} seconds.".format(len(layerInfo), time.time()-t0))
+    def __setitem__(self, index, value):
+        setattr(self, self.__slots__[index], value)
 
-#
-#Check to see if all of the image datasets were retrieved from landscape6 and landscape7.
-#If the receipt of all the datasets is not confirmed, copy data for the missing rasters
-#from layerInfo to layerInfo2.
+    def __iter__(self):
+        return iter(self.toList())
 
-        try:
-            for d in layerInfo:
-                print("checking for " + d['name'])
-                dataset = inmem +"\\"+ d['name'] +"_R"
-                if not arcpy.Exists(dataset):
-                    print(dataset+" dataset was not received from server. Trying again...")
-                    layerInfo2.append(d)
+    def __repr__(self):
+        return self.__class__.__name__ + "(" + ", ".join(name + "=" + repr(getattr(self, name)) for name in self.__slots__) + ")"
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    def missing(self):
+        return [name for name in self.__slots__ if getattr(self, name) is None]
 
-#----------------------------------------------------------------------------
-#
-# If any of the ten rasters needed for analysis are missing, retrieve them again,
-# this time one at a time. Otherwise the script will skip this step.
-#
-#----------------------------------------------------------------------------
+    def toList(self):
+        return list(self.allFacts(self))
 
-        try:
-            print layerInfo2
-            if layerInfo2 != []:
-            #a second round of parallel processing if any rasters are missing
-                lock = None
-                mp.freeze_support()
-                p(". Scratch workspace is: {0}".format(tempFolder))
-                print("Retrieving lost datasets again from the server...")
-                t0 = time.time()
-                arcpy.env.outputCoordinateSystem = sr
-                lock = mp.Lock()
-                #note that this time there is only one process in the pool at a time.
-                pool = mp.Pool(1, initializer=initPool, initargs=(lock,))
-                results = [pool.apply_async(getResult2, args=(a,)) for a in layerInfo2]
-                L2 = []
-                for z in results:
-                    rasterInfo = z.get()
-                    if rasterInfo is None:
-                        continue
-                    L2 = L2 + [rasterInfo]
-                    print(L2)
-                for r in L2:
-                    if arcversion == '10.5.1':
-                        print("fetching " + r['name'] + " from server")
-                        ##arcpy.CopyRaster_management(r['path'], "C:\\gis\\GeoDescriber\\junk\\" + r['name'] + ".TIF")
-                        arcpy.env.outputCoordinateSystem = sr
-                        outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), r['path'])
-                        p ( arcpy.GetMessages())
-                        od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                        if r['name'] == "Population":
-                            if not arcpy.sa.Raster(inmem+"\\Population_R").maximum > 0:
-                                outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), 0)
-                                od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                        if r['name'] == "Biomass":
-                            if not arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
-                                p ( arcpy.GetMessages())
-                                saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                                arcpy.BuildRasterAttributeTable_management(inmem+"\\"+ r['name'] +"_R")
-                                ##arcpy.CopyRaster_management(inmem+"\\"+ r['name'] +"_R", r"C:\gis\GeoDescriber\current.gdb"+"\\"+ r['name'] +"_R")
-                            else:
-                                p ( arcpy.GetMessages())
-                                saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                                JoinField_Workaround(inmem+"\\"+ r['name'] +"_R", "Value", r['path'], "Value", r['List'])
-                                p ( arcpy.GetMessages())
-                                outputRaster = None
-                        else:
-                            p ( arcpy.GetMessages())
-                            saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                            JoinField_Workaround(inmem+"\\"+ r['name'] +"_R", "Value", r['path'], "Value", r['List'])
-                            p ( arcpy.GetMessages())
-                            outputRaster = None
-                    else:
-                        print("fetching " + r['name'] + " from server")
-                        arcpy.env.outputCoordinateSystem = sr
-                        outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), r['path'])
-                        p ( arcpy.GetMessages())
-                        od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                        if r['name'] == "Population":
-                            if not arcpy.sa.Raster(inmem+"\\Population_R").maximum > 0:
-                                outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), 0)
-                                od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
-                        if r['name'] == "Biomass":
-                            if not arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
-                                p ( arcpy.GetMessages())
-                                saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                            else:
-                                p ( arcpy.GetMessages())
-                                saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                                d = arcpy.JoinField_management(saved_raster, "Value", r['path'], "Value", r['List'])
-                                p ( arcpy.GetMessages())
-                                outputRaster = None
-                        else:
-                            p ( arcpy.GetMessages())
-                            saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
-                            d = arcpy.JoinField_management(saved_raster, "Value", r['path'], "Value", r['List'])
-                            p ( arcpy.GetMessages())
-                            outputRaster = None
-                p(". Shutting down worker pool. Elapsed time: {0:.2f} seconds.".format(time.time()-t0))
-                pool.close()
-                pool.join()
-                if os.path.exists(tempFolder):
-                    shutil.rmtree(tempFolder)
-                p("*** Round 2 process complete. {0} jobs in {1:.2f} seconds.".format(len(layerInfo2), time.time()-t0))
-
-        except arcpy.ExecuteError:
-            print()
-            print("Did you provide a valid username and password?")
-            print("Do you have enough RAM for a polygon this large?")
-            print("Also, shapefiles are not yet supported by this script...")
-            print("Be sure your extent layer is a polygon feature class.")
-            print()
-            raise
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    @classmethod
+    def fromList(cls, values):
+        if len(values) != len(cls.__slots__):
+            raise ValueError("A "+cls.__name__+" has "+str(len(cls.__slots__))+" facts, not "+str(len(values))+".")
+        record = cls()
+        for name, value in zip(cls.__slots__, values):
+            setattr(record, name, value)
+        return record
 
-        try:
-            #Delete the temporary folder used to store TIF rasters retrieved from the server.
-            if os.path.exists(tempFolder):
-                shutil.rmtree(tempFolder)
-
-            # Derive the aspect of the study area terrain. Reclass the aspect into 8 directions. Later the script will
-            # add 180 degrees together facing all 8 directions to find a general aspect trend.
-            webmerc = arcpy.SpatialReference(3857)
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Projecting elevation to webmerc to derive aspect...")
-            arcpy.ProjectRaster_management(inmem+"\\Elevation_R",inmem+"\\northupg",webmerc,"NEAREST",cellsize)
-            arcpy.BuildRasterAttributeTable_management(inmem+"\\northupg", "Overwrite")
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Deriving aspect from webmerc elevation raster...")
-            #xbz = arcpy.sa.Aspect(inmem+"\\northupg")
-            xbz = Aspect(inmem+"\\northupg")
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Projecting aspect raster back to Mollweide...")
-            arcpy.ProjectRaster_management(xbz,inmem+"\\aspectg",sr,"NEAREST",cellsize)
-            #arcpy.BuildRasterAttributeTable_management(inmem+"\\aspectg", "Overwrite")
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Generating remap range for aspect raster...")
-            aspectRemapRange = RemapRange([[0,45,1],[45,90,2],[90,135,3],[135,180,4],[180,225,5],[225,270,6],[270,315,7],[315,360,8]])
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Reclassifying aspect raster into aspect index raster...")
-            aspectindexg = arcpy.sa.Reclassify(arcpy.Raster(inmem+"\\aspectg"),"Value",aspectRemapRange)
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds. Saving and cleaning up after aspect job...")
-            aspectindexg.save(inmem+"\\aspectindexg")
-            #clean up and free up memory
-            cleanupg = ['northupg','aspectg']
-            for fd in cleanupg:
-                feature = os.path.join(inmem,fd)
-                if arcpy.Exists(feature):
-                    arcpy.Delete_management(feature)
-                    print("deleting "+feature+"...")
+zoneSlots = ('zonesw', 'zonew', 'zonenw', 'zones', 'zonec', 'zonen', 'zonese', 'zonee', 'zonene')
+classSlots = ('path', 'name', 'area', 'percent', 'rank', 'minelevation', 'maxelevation', 'meanelevation', 'medianelevation')
+partSlots = ('partcells', 'partphrase', 'partpercent')
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+class StudyAreaFacts(FactRecord):
+    """StudyAreaFacts(**facts)
+
+    The 31 facts about the whole study area: its names, elevation, bodies
+    of water, ELU diversity and the cells in each of its nine zones.
+
+    """
+    __slots__ = ('name', 'shortname', 'shortnamesingular', 'shortnameplural', 'area',
+                 'minelevation', 'maxelevation', 'meanelevation', 'medianelevation',
+                 'lowelevation', 'highelevation', 'waterpercent',
+                 'meandiversity', 'mediandiversity', 'lowdiversity', 'highdiversity',
+                 'unused16', 'unused17', 'unused18', 'unused19', 'unused20', 'unused21') + zoneSlots
+
+class BioclimateFacts(FactRecord):
+    """BioclimateFacts(**facts)
+
+    The 34 facts about a significant bioclimate class.
+
+    """
+    __slots__ = classSlots + ('unused9', 'unused10', 'toplandform', 'toplandformpercent',
+                              'toplithology', 'toplithologypercent', 'toplandcover', 'toplandcoverpercent',
+                              'meandiversity', 'mediandiversity', 'unused19', 'unused20', 'unused21') + zoneSlots + partSlots
+
+class LandformFacts(FactRecord):
+    """LandformFacts(**facts)
+
+    The 34 facts about a significant landform class, with its slope and
+    the way it faces.
+
+    """
+    __slots__ = classSlots + ('topbioclimate', 'topbioclimatepercent', 'unused11', 'unused12',
+                              'toplithology', 'toplithologypercent', 'toplandcover', 'toplandcoverpercent',
+                              'meandiversity', 'mediandiversity', 'meanslope', 'medianslope', 'aspect') + zoneSlots + partSlots
+
+class LithologyFacts(FactRecord):
+    """LithologyFacts(**facts)
+
+    The 34 facts about a significant lithology class.
+
+    """
+    __slots__ = classSlots + ('topbioclimate', 'topbioclimatepercent', 'toplandform', 'toplandformpercent',
+                              'unused13', 'unused14', 'toplandcover', 'toplandcoverpercent',
+                              'meandiversity', 'mediandiversity', 'unused19', 'unused20', 'unused21') + zoneSlots + partSlots
+
+class LandcoverFacts(FactRecord):
+    """LandcoverFacts(**facts)
+
+    The 34 facts about a significant land cover class, with its population
+    and biomass.
+
+    """
+    __slots__ = classSlots + ('topbioclimate', 'topbioclimatepercent', 'toplandform', 'toplandformpercent',
+                              'toplithology', 'toplithologypercent', 'unused15', 'unused16',
+                              'meandiversity', 'mediandiversity', 'population', 'biomass', 'unused21') + zoneSlots + partSlots
+
+classRecords = {'Bioclimate': BioclimateFacts, 'Landform': LandformFacts,
+                'Lithology': LithologyFacts, 'Landcover': LandcoverFacts}
+
+# allFacts(record) reads every slot of a record at once, in slot order.
+for factRecord in [StudyAreaFacts] + list(classRecords.values()):
+    factRecord.allFacts = staticmethod(operator.attrgetter(*factRecord.__slots__))
+
+def classFacts(values):
+    """classFacts(values)
+
+    Returns the record of a significant class from its facts in slot
+    order, choosing the record by the class raster in values[0].
+
+    """
+    return classRecords[values[0].split("\\")[-1][:-2]].fromList(values)
+
+#-------------------------------------------------------------------------------
+#--------------------------timing-----------------------------------------------
+
+# Every stage of every polygon and every layer fetched from the server is timed
+# as a span, with its wall and CPU seconds and the cells and bytes it handled.
+# The spans of worker processes are sent back to the parent with their results.
+# At the end of a run the spans are summarized by percentiles, and written to
+# timings.json and timings.csv when a timings folder is set.
+timingColumns = ['oid', 'span', 'layer', 'attempt', 'ok', 'wall', 'cpu', 'cells', 'bytes', 'rss', 'rss_peak',
+                 'workspace_bytes']
+
+def percentile(values, q):
+    """percentile(values, q)
+
+    Returns the nearest-rank q percentile, 0 to 100, of a sorted list.
+
+    """
+    return values[int(round(q / 100.0 * (len(values) - 1)))]
+
+class SpanTimer(object):
+    """SpanTimer()
+
+    Records timed spans. span(name, **fields) times the block it wraps,
+    add(name, wall, cpu, **fields) records a span timed somewhere else,
+    such as in a fetch process, and extend(records) adds the spans of
+    another SpanTimer. records holds a dictionary for every span.
+
+    """
+    def __init__(self):
+        self.records = []
 
-    #-----------------------------------------------------------------------------------------
-    #-----------------------------------------------------------------------------------------
+    @contextlib.contextmanager
+    def span(self, name, **fields):
+        """span(name, **fields)
 
+        Times the block it wraps. The block can add fields to the
+        dictionary it is given. ok is False if the block raised.
+
+        """
+        record = dict(fields, span=name, ok=False)
+        wall = clock()
+        cpu = cpuclock()
         try:
-            # Calculate the percentage of every class for the four main ecophysiographic
-            # criteria in the study area, bioclimate, landform, lithology, and land cover.
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Calculating percentages...")
-            list_FC=[inmem+"\\Bioclimate_R", inmem+"\\Landform_R", inmem+"\\Lithology_R", inmem+"\\Landcover_R"]
-            if arcversion == '10.5.1':
-                for fc in list_FC:
-                    if fc.endswith("Bioclimate_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName":
-                                arcpy.DeleteField_management(fc,"ClassName")
-                        arcpy.AddField_management(inmem+"\\Bioclimate_R","ClassName", "TEXT", "", "", "250")
-                        with arcpy.da.UpdateCursor(inmem+"\\Bioclimate_R", ['Bioclimate','ClassName']) as cursor:
-                            for row in cursor:
-                                row[1] = row[0]
-                                cursor.updateRow(row)
-                        lookmeupl = arcpy.sa.Lookup(inmem+"\\Bioclimate_R","ClassName")
-                        lookmeupl.save(inmem+"\\Bioclimate_R")
-                        percent(inmem+"\\Bioclimate_R", inmem+"\\Bioclimates_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Bioclimate_R",inmem+"\\Bioclimates_CR")
-                    elif fc.endswith("Landform_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName_1":
-                                for field in fields:
-                                    if field.name == "ClassName":
-                                        arcpy.DeleteField_management(fc,"ClassName")
-                                arcpy.AddField_management(inmem+"\\Landform_R","ClassName", "TEXT", "", "", "250")
-                                with arcpy.da.UpdateCursor(inmem+"\\Landform_R", ['ClassName_1','ClassName']) as cursor:
-                                    for row in cursor:
-                                        row[1] = row[0]
-                                        cursor.updateRow(row)
-                                fields = arcpy.ListFields(fc)
-                                for field in fields:
-                                    if field.name == "ClassName_1":
-                                        arcpy.DeleteField_management(fc,"ClassName_1")
-                        lookmeup2 = arcpy.sa.Lookup(inmem+"\\Landform_R","ClassName")
-                        lookmeup2.save(inmem+"\\Landform_R")
-                        percent(inmem+"\\Landform_R",inmem+"\\Landform_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Landform_R",inmem+"\\Landform_CR")
-                    elif fc.endswith("Lithology_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName":
-                                arcpy.DeleteField_management(fc,"ClassName")
-                        arcpy.AddField_management(inmem+"\\Lithology_R","ClassName", "TEXT", "", "", "250" )
-                        with arcpy.da.UpdateCursor(inmem+"\\Lithology_R", ("EF_Litho","ClassName")) as cursor:
-                            for row in cursor:
-                                row[1]=row[0]
-                                cursor.updateRow(row)
-                        lookmeup3 = arcpy.sa.Lookup(inmem+"\\Lithology_R","ClassName")
-                        lookmeup3.save(inmem+"\\Lithology_R")
-                        percent(inmem+"\\Lithology_R",inmem+"\\Lithology_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Lithology_R",inmem+"\\Lithology_CR")
-                    elif fc.endswith("Landcover_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName_1":
-                                for field in fields:
-                                    if field.name == "ClassName":
-                                        arcpy.DeleteField_management(fc,"ClassName")
-                                arcpy.AddField_management(inmem+"\\Landcover_R","ClassName", "TEXT", "", "", "250")
-                                with arcpy.da.UpdateCursor(inmem+"\\Landcover_R", ['ClassName_1','ClassName']) as cursor:
-                                    for row in cursor:
-                                        row[1] = row[0]
-                                        cursor.updateRow(row)
-                                fields = arcpy.ListFields(fc)
-                                for field in fields:
-                                    if field.name == "ClassName_1":
-                                        arcpy.DeleteField_management(fc,"ClassName_1")
-                        lookmeup4 = arcpy.sa.Lookup(inmem+"\\Landcover_R","ClassName")
-                        lookmeup4.save(inmem+"\\Landcover_R")
-                        percent(inmem+"\\Landcover_R",inmem+"\\Landcover_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Landcover_R",inmem+"\\Landcover_CR")
-                    else:
-                        p("*** dictionaries starting ")
+            yield record
+            record['ok'] = True
+        finally:
+            record['wall'] = clock() - wall
+            record['cpu'] = cpuclock() - cpu
+            self.records.append(record)
+
+    def add(self, name, wall, cpu, **fields):
+        self.records.append(dict(fields, span=name, wall=wall, cpu=cpu, ok=fields.get('ok', True)))
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def summary(self):
+        """summary()
+
+        Returns a table of the spans by name, and by layer for the fetches,
+        with their count and the total, median, 90th and 99th percentile
+        and maximum of their wall seconds, their total CPU seconds and the
+        highest peak of their resident memory in megabytes.
+
+        """
+        groups = collections.OrderedDict()
+        for record in self.records:
+            key = record['span'] + (":" + record['layer'] if 'layer' in record else "")
+            groups.setdefault(key, []).append(record)
+        lines = ["{0:<22}{1:>7}{2:>11}{3:>9}{4:>9}{5:>9}{6:>9}{7:>11}{8:>9}".format(
+            "span", "count", "wall", "p50", "p90", "p99", "max", "cpu", "rss MB")]
+        for key, records in groups.items():
+            walls = sorted(record['wall'] for record in records)
+            peaks = [record['rss_peak'] for record in records if record.get('rss_peak') is not None]
+            lines.append("{0:<22}{1:>7}{2:>11.2f}{3:>9.2f}{4:>9.2f}{5:>9.2f}{6:>9.2f}{7:>11.2f}{8:>9}".format(
+                key, len(records), sum(walls), percentile(walls, 50), percentile(walls, 90),
+                percentile(walls, 99), walls[-1], sum(record['cpu'] for record in records),
+                "{0:.0f}".format(max(peaks) / 1048576.0) if peaks else "-"))
+        return "\n".join(lines)
+
+    def writeJSON(self, path):
+        with open(path, "w") as f:
+            json.dump(self.records, f, indent=1)
+
+    def writeCSV(self, path):
+        columns = timingColumns + sorted(set(name for record in self.records for name in record) - set(timingColumns))
+        if sys.version_info[0] < 3:
+            f = open(path, "wb")
+        else:
+            f = open(path, "w", newline="")
+        with f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+timings = SpanTimer()
+
+#-------------------------------------------------------------------------------
+#--------------------------memory use-------------------------------------------
+
+# The resident memory of the process is recorded with every stage span: rss after
+# the stage and rss_peak, its high-water mark during the stage, with the bytes of
+# the rasters left in the inmem workspace. On Linux the high-water mark is reset
+# at the start of every stage. Elsewhere it is only known for a stage that raised
+# the high-water mark of the process, and rss_peak is otherwise the larger of the
+# resident memory before and after the stage.
+
+# Bytes per cell of the raster pixel types.
+pixelBytes = {'U1': 0.125, 'U2': 0.25, 'U4': 0.5, 'U8': 1, 'S8': 1, 'U16': 2, 'S16': 2,
+              'U32': 4, 'S32': 4, 'F32': 4, 'F64': 8}
+
+def memoryUse():
+    """memoryUse()
+
+    Returns the resident bytes of this process and their high-water mark.
+    Either is None where it can not be read.
+
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None, None
+        return counters.WorkingSetSize, counters.PeakWorkingSetSize
+    try:
+        rss = peak = None
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+        return rss, peak
+    except (IOError, OSError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None, peak if sys.platform == "darwin" else peak * 1024
+
+def memoryMark():
+    """memoryMark()
+
+    Resets the high-water mark of this process where the system allows it
+    and returns a mark to measure the peak since with memoryPeak().
+
+    """
+    reset = False
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        reset = True
+    except (IOError, OSError):
+        pass
+    rss, peak = memoryUse()
+    return {'rss': rss, 'peak': peak, 'reset': reset}
+
+def memoryPeak(mark):
+    """memoryPeak(mark)
+
+    Returns the resident bytes now and their high-water mark since the
+    memoryMark() mark, as well as it is known.
+
+    """
+    rss, peak = memoryUse()
+    if peak is not None and (mark['reset'] or mark['peak'] is None or peak > mark['peak']):
+        return rss, peak
+    known = [value for value in (mark['rss'], rss) if value is not None]
+    return rss, max(known) if known else None
+
+def workspaceFootprint(workspace):
+    """workspaceFootprint(workspace)
+
+    Returns the bytes of the cells of every raster in workspace, as a
+    dictionary by raster name. Returns an empty dictionary if the rasters
+    can not be listed.
+
+    """
+    sizes = {}
+    saved = arcpy.env.workspace
+    try:
+        arcpy.env.workspace = workspace
+        for name in arcpy.ListRasters() or []:
+            raster = arcpy.Raster(os.path.join(workspace, name))
+            sizes[name] = int(raster.width * raster.height * pixelBytes.get(raster.pixelType, 4))
+    except Exception:
+        pass
+    finally:
+        arcpy.env.workspace = saved
+    return sizes
+
+def recordMemory(span, mark, workspace, state):
+    """recordMemory(span, mark, workspace, state)
+
+    Adds rss, rss_peak, workspace_bytes and the largest raster of the
+    workspace to the span of a stage, and keeps the highest of them, with
+    the stage they were reached in, in state['memory'] for the polygon.
+
+    """
+    rss, peak = memoryPeak(mark)
+    sizes = workspaceFootprint(workspace)
+    span['rss'] = rss
+    span['rss_peak'] = peak
+    span['workspace_bytes'] = sum(sizes.values())
+    if sizes:
+        span['workspace_largest'] = max(sizes, key=sizes.get)
+    memory = state.setdefault('memory', {'rss_peak': None, 'peak_stage': None,
+                                         'workspace_peak': 0, 'workspace_stage': None})
+    if peak is not None and (memory['rss_peak'] is None or peak > memory['rss_peak']):
+        memory['rss_peak'] = peak
+        memory['peak_stage'] = span['span']
+    if span['workspace_bytes'] > memory['workspace_peak']:
+        memory['workspace_peak'] = span['workspace_bytes']
+        memory['workspace_stage'] = span['span']
+
+#-------------------------------------------------------------------------------
+#--------------------------profiling--------------------------------------------
+
+# The polygons chosen for profiling are described under cProfile, and their
+# statistics are written to profileFolder as profile_<OBJECTID>.pstats. At the end
+# of a run the profiles are merged into profiles.pstats and summarized by cumulative
+# time, for the functions of GeoDescriber and the geoprocessing tools of arcpy. The
+# fetch processes are not profiled; their work shows as waiting in fetchStage.
+profiledIDs = set()
+
+def chooseProfiled(oids, ids, every):
+    """chooseProfiled(oids, ids, every)
+
+    Returns the set of OBJECTIDs to profile: those of oids in ids, and
+    every every-th of oids in the order they are described. With neither
+    ids nor every, all of oids.
+
+    """
+    if ids is None and every is None:
+        return set(oids)
+    chosen = set(oid for oid in oids if ids is not None and oid in ids)
+    if every is not None:
+        chosen.update(oids[::every])
+    return chosen
+
+def startProfile(oid):
+    """startProfile(oid)
+
+    Starts and returns a profiler if the polygon oid is profiled, or
+    returns None.
+
+    """
+    if profileFolder is None or oid not in profiledIDs:
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def stopProfile(profiler, oid):
+    """stopProfile(profiler, oid)
+
+    Stops a profiler from startProfile() and writes its statistics as
+    profile_<oid>.pstats.
+
+    """
+    if profiler is None:
+        return
+    profiler.disable()
+    if not os.path.exists(profileFolder):
+        os.makedirs(profileFolder)
+    profiler.dump_stats(os.path.join(profileFolder, "profile_{0}.pstats".format(oid)))
+
+def hotspots(folder, top=20):
+    """hotspots(folder, top=20)
+
+    Merges the profile_*.pstats files in folder into profiles.pstats and
+    returns a report of the top functions of GeoDescriber and the top
+    geoprocessing tools by cumulative seconds, with their calls and the
+    seconds spent in the function itself.
+
+    """
+    paths = sorted(glob.glob(os.path.join(folder, "profile_*.pstats")))
+    if paths == []:
+        return "No profiles in " + folder
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    stats.dump_stats(os.path.join(folder, "profiles.pstats"))
+    arcpyFolder = os.path.dirname(os.path.abspath(arcpy.__file__)) if arcpy is not None else None
+    functions = {}
+    tools = {}
+    for (filename, line, name), (primitive, calls, own, cumulative, callers) in stats.stats.items():
+        if arcpyFolder is not None and os.path.abspath(filename).startswith(arcpyFolder):
+            #the tools and classes of arcpy are capitalized, its helpers are not.
+            if not name[:1].isupper():
+                continue
+            totals = tools.setdefault(name, [0, 0.0, 0.0])
+        elif os.path.basename(filename).startswith("GeoDescriber"):
+            totals = functions.setdefault("{0}:{1}".format(name, line), [0, 0.0, 0.0])
+        else:
+            continue
+        totals[0] += calls
+        totals[1] += cumulative
+        totals[2] += own
+    lines = ["Hotspots of {0} profiled polygons, merged into {1}".format(
+        len(paths), os.path.join(folder, "profiles.pstats"))]
+    for title, table in (("function", functions), ("geoprocessing tool", tools)):
+        lines.append("{0:<44}{1:>10}{2:>13}{3:>11}".format(title, "calls", "cumulative", "own"))
+        for name, (calls, cumulative, own) in sorted(table.items(), key=lambda item: -item[1][1])[:top]:
+            lines.append("{0:<44}{1:>10}{2:>13.2f}{3:>11.2f}".format(name[:43], calls, cumulative, own))
+    return "\n".join(lines)
+
+#-------------------------------------------------------------------------------
+#--------------------------progress---------------------------------------------
+
+# The progress of a run is measured in the predicted cost of estimateWork(), so a
+# large polygon counts for more than many small ones, and the ETA is the remaining
+# cost at the rate of cost finished so far.
+class ProgressReporter(object):
+    """ProgressReporter(work, interval=60, statuspath=None)
+
+    Tracks a run against the predicted work of its polygons, work mapping
+    every OBJECTID to estimateWork(). done(oid, described, source, hits,
+    lookups) records a finished polygon and the raster cache lookups of
+    the process that described it so far. A progress line with the ETA is
+    printed at most every interval seconds, and the progress is written as
+    JSON to statuspath.
+
+    """
+    def __init__(self, work, interval=60, statuspath=None):
+        self.work = work
+        self.interval = interval
+        self.statuspath = statuspath
+        self.totalcost = sum(w['cost'] for w in work.values())
+        self.totalcells = sum(w['cells'] for w in work.values())
+        self.donecost = 0.0
+        self.donecells = 0.0
+        self.described = 0
+        self.failed = 0
+        self.cache = {}
+        self.started = time.time()
+        self.start = clock()
+        self.last = None
+
+    def done(self, oid, described, source=None, hits=0, lookups=0):
+        """done(oid, described, source=None, hits=0, lookups=0)
+
+        Records that the polygon oid is finished, described or not. hits
+        and lookups are the raster cache counts so far of source, the
+        process that described it.
+
+        """
+        self.donecost += self.work[oid]['cost']
+        self.donecells += self.work[oid]['cells']
+        if described:
+            self.described += 1
+        else:
+            self.failed += 1
+        self.cache[source] = (hits, lookups)
+        if self.finished() == len(self.work):
+            self.report("finished")
+        else:
+            self.tick()
+
+    def tick(self):
+        #reports if interval seconds have passed since the last report.
+        if self.last is None or clock() - self.last >= self.interval:
+            self.report()
+
+    def finished(self):
+        return self.described + self.failed
+
+    def status(self, state="running"):
+        """status(state="running")
+
+        Returns the progress as a dictionary: polygons and predicted cost
+        finished, the rates, the cache hit rate and the ETA.
+
+        """
+        elapsed = clock() - self.start
+        rate = self.donecost / elapsed if elapsed > 0 else 0.0
+        #rounding can leave a tiny negative remainder; a finished run has no time left.
+        if self.finished() == len(self.work):
+            eta = 0.0
+        else:
+            eta = max(0.0, self.totalcost - self.donecost) / rate if rate > 0 else None
+        hits = sum(counts[0] for counts in self.cache.values())
+        lookups = sum(counts[1] for counts in self.cache.values())
+        return {'state': state, 'started': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                'updated': time.strftime("%Y-%m-%d %H:%M:%S"), 'elapsed': elapsed,
+                'polygons': len(self.work), 'finished': self.finished(), 'described': self.described,
+                'failed': self.failed, 'cost': self.totalcost, 'cost_done': self.donecost,
+                'cells': self.totalcells, 'cells_done': self.donecells,
+                'percent': 100.0 * self.donecost / self.totalcost if self.totalcost > 0 else 100.0,
+                'polygons_per_minute': 60.0 * self.finished() / elapsed if elapsed > 0 else 0.0,
+                'cost_per_second': rate, 'cache_hit_rate': float(hits) / lookups if lookups > 0 else None,
+                'eta_seconds': eta,
+                'eta': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + eta)) if eta is not None else None}
+
+    def report(self, state="running"):
+        """report(state="running")
+
+        Prints a progress line and writes the status file.
+
+        """
+        self.last = clock()
+        status = self.status(state)
+        line = "progress: {0}/{1} polygons ({2} failed), {3:.1f}% of the predicted work, {4:.1f} polygons/min".format(
+            status['finished'], status['polygons'], status['failed'], status['percent'], status['polygons_per_minute'])
+        if status['cache_hit_rate'] is not None:
+            line += ", cache hit rate {0:.1f}%".format(100.0 * status['cache_hit_rate'])
+        if state == "running" and status['eta_seconds'] is not None:
+            line += ", ETA {0} ({1:.0f} min)".format(status['eta'], status['eta_seconds'] / 60.0)
+        print(line)
+        if self.statuspath is not None:
+            #written to a side file first and moved over the status file in one step,
+            #so a reader never sees half of it. Python 2 has no os.replace, and on
+            #Windows there the status file is briefly missing.
+            partial = self.statuspath + ".tmp"
+            with open(partial, "w") as f:
+                json.dump(status, f, indent=1, sort_keys=True)
+            if hasattr(os, "replace"):
+                os.replace(partial, self.statuspath)
             else:
-                for fc in list_FC:
-                    if fc.endswith("Bioclimate_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName":
-                                arcpy.DeleteField_management(fc,"ClassName")
-                                print("Deleting ClassName...")
-                        arcpy.AddField_management(inmem+"\\Bioclimate_R","ClassName", "TEXT", "", "", "250" )
-                        with arcpy.da.UpdateCursor(inmem+"\\Bioclimate_R", ("Bioclimate","ClassName")) as cursor:
-                            for row in cursor:
-                                row[1]=  row[0]
-                                cursor.updateRow(row)
-                        lookmeupl = arcpy.sa.Lookup(inmem+"\\Bioclimate_R","ClassName")
-                        lookmeupl.save(inmem+"\\Bioclimate_R")
-                        percent(inmem+"\\Bioclimate_R", inmem+"\\Bioclimates_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Bioclimate_R",inmem+"\\Bioclimates_CR")
-                    elif fc.endswith("Landform_R") == True:
-                        lookmeupl = arcpy.sa.Lookup(inmem+"\\Landform_R","ClassName")
-                        lookmeupl.save(inmem+"\\Landform_R")
-                        percent(inmem+"\\Landform_R",inmem+"\\Landform_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Landform_R",inmem+"\\Landform_CR")
-                    elif fc.endswith("Lithology_R") == True:
-                        fields = arcpy.ListFields(fc)
-                        for field in fields:
-                            if field.name == "ClassName":
-                                arcpy.DeleteField_management(fc,"ClassName")
-                                print("Deleting ClassName...")
-                        arcpy.AddField_management(inmem+"\\Lithology_R","ClassName", "TEXT", "", "", "250" )
-                        with arcpy.da.UpdateCursor(inmem+"\\Lithology_R", ("EF_Litho","ClassName")) as cursor:
-                            for row in cursor:
-                                row[1]=  row[0]
-                                cursor.updateRow(row)
-                        lookmeupl = arcpy.sa.Lookup(inmem+"\\Lithology_R","ClassName")
-                        lookmeupl.save(inmem+"\\Lithology_R")
-                        percent(inmem+"\\Lithology_R",inmem+"\\Lithology_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Lithology_R",inmem+"\\Lithology_CR")
-                    elif fc.endswith("Landcover_R") == True:
-                        lookmeupl = arcpy.sa.Lookup(inmem+"\\Landcover_R","ClassName")
-                        lookmeupl.save(inmem+"\\Landcover_R")
-                        percent(inmem+"\\Landcover_R",inmem+"\\Landcover_ST","ClassName")
-                        arcpy.CopyRows_management(inmem+"\\Landcover_R",inmem+"\\Landcover_CR")
-                    else:
-                        p("*** dictionaries starting ")
+                if os.name == "nt" and os.path.exists(self.statuspath):
+                    os.remove(self.statuspath)
+                os.rename(partial, self.statuspath)
 
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Done calculating percentages.")
+def cacheCounts():
+    """cacheCounts()
 
+    Returns the raster cache hits and lookups of this process so far.
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    """
+    if rasterCache is None:
+        return 0, 0
+    hits = sum(rasterCache.hits.values())
+    return hits, hits + sum(rasterCache.misses.values())
 
-        #--------------------------------------------------------------------------------
-        #
-        #                  study area facts (studyarealist)
-        #
-        #--------------------------------------------------------------------------------
+#-------------------------------------------------------------------------------
+#--------------------------dry run----------------------------------------------
 
-        #assemble statistics for entire study area into a single list called studyarealist.
+# A dry run plans a run from the polygon extents alone, so hosts and shards can be
+# sized before anything is fetched: the bytes every layer of a polygon downloads,
+# the layers the raster cache would serve, the memory mode, and the seconds that
+# the timings of an earlier run predict.
+def downloadBytes(extent):
+    """downloadBytes(extent)
 
-        try:
-            #assemble statistics for entire study area into a single list
-            dummyvalue = -9999
-            studyarealist = []
+    Returns a dictionary with the bytes of every layer fetched over an
+    extent (xmin, ymin, xmax, ymax), at cellsize, and at 30 m for water.
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
-            #What's this area named?
+    """
+    width = extent[2] - extent[0]
+    height = extent[3] - extent[1]
+    download = {}
+    for name, cellbytes in layerBytes.items():
+        size = 30.0 if name == 'Water' else cellsize
+        download[name] = math.ceil(width / size) * math.ceil(height / size) * cellbytes
+    return download
+
+def runtimeModel(path):
+    """runtimeModel(path)
+
+    Fits the seconds of a polygon to the timings.json of an earlier run:
+    the fetch stage in seconds per byte actually downloaded, counted as in
+    downloadBytes() from the cells of every "layer" span that arrived, so
+    cache hits download nothing, and the rest as a fixed overhead plus
+    seconds per cell. Returns a dictionary with overhead, percell, perbyte and the
+    polygons it was fitted to, or None if path holds no described
+    polygons. The model holds for the host, fetch workers and server of
+    that run.
 
-        try:
-            #search for a name field. If there isn't one, the script will use
-            #the generic term "study area"
-            #studyarealist[0] = name
-            polyname = "study area"
-            field_names = [f.name for f in arcpy.ListFields(inFeatLyr)]
-            for field in reversed(field_names):
-                fieldsupper = field.upper()
-                if "NAM" in fieldsupper:
-                    fields = []
-                    fields.append(field)
-                    fields.append("OBJECTID")
-                    with arcpy.da.SearchCursor(inFeatLyr,fields) as cursor:
-                        for row in cursor:
-                            if row[1] == intPolyID:
-                                polyname = row[0]
-                elif "NOM" in fieldsupper:
-                    fields = []
-                    fields.append(field)
-                    fields.append("OBJECTID")
-                    with arcpy.da.SearchCursor(inFeatLyr,fields) as cursor:
-                        for row in cursor:
-                            if row[1] == intPolyID:
-                                polyname = row[0]
-                elif "NAAM" in fieldsupper:
-                    fields = []
-                    fields.append(field)
-                    fields.append("OBJECTID")
-                    with arcpy.da.SearchCursor(inFeatLyr,fields) as cursor:
-                        for row in cursor:
-                            if row[1] == intPolyID:
-                                polyname = row[0]
-            studyarealist.append(polyname)
+    """
+    with open(path) as f:
+        records = json.load(f)
+    fetched = {}
+    downloaded = {}
+    for record in records:
+        if record['span'] == 'fetch':
+            fetched[record.get('oid')] = fetched.get(record.get('oid'), 0.0) + record['wall']
+        if record['span'] == 'layer' and record.get('ok') and record.get('layer') in layerBytes:
+            downloaded[record.get('oid')] = (downloaded.get(record.get('oid'), 0)
+                                             + (record.get('cells') or 0) * layerBytes[record['layer']])
+    polygons = [record for record in records
+                if record['span'] == 'polygon' and record.get('described') and record.get('cells')]
+    if not polygons:
+        return None
+    #a run served from the cache alone leaves the fetches to the cells.
+    downloads = [downloaded.get(record['oid'], 0) for record in polygons]
+    perbyte = (sum(fetched.get(record['oid'], 0.0) for record in polygons) / sum(downloads)
+               if sum(downloads) > 0 else 0.0)
+    #what the downloads do not explain is fitted to the cells by least squares.
+    cells = [float(record['cells']) for record in polygons]
+    rest = [record['wall'] - perbyte * download for record, download in zip(polygons, downloads)]
+    meancells = sum(cells) / len(cells)
+    meanrest = sum(rest) / len(rest)
+    spread = sum((c - meancells) ** 2 for c in cells)
+    if spread > 0:
+        percell = sum((c - meancells) * (r - meanrest) for c, r in zip(cells, rest)) / spread
+        overhead = meanrest - percell * meancells
+    else:
+        percell = meanrest / meancells
+        overhead = 0.0
+    if percell < 0:
+        percell = 0.0
+        overhead = meanrest
+    elif overhead < 0:
+        percell = sum(c * r for c, r in zip(cells, rest)) / sum(c * c for c in cells)
+        overhead = 0.0
+    return {'overhead': overhead, 'percell': percell, 'perbyte': perbyte, 'polygons': len(polygons)}
+
+def planDryRun(plan, records, work, cachefolders, budgets, model):
+    """planDryRun(plan, records, work, cachefolders, budgets, model)
+
+    Plans the polygons of plan, one list of tasks per worker as returned
+    by planSchedule(), from their PolygonRecords in records and their
+    estimateWork() in work. cachefolders is the raster cache folder of
+    every worker, or None without a cache; the cached rasters are looked
+    up and the rasters a polygon would fetch are reserved in the order the
+    worker describes its polygons. budgets is the memory budget of every
+    worker, and model is from runtimeModel() or None. Returns a list with
+    the plan of every polygon and a dictionary of totals.
 
-        except IOError:
-            print("An error has occurred. Please provide a valid pathname to your extent layer and try again.")
-            raise
+    """
+    rows = []
+    workers = []
+    for w, tasks in enumerate(plan):
+        cache = None
+        if cachefolders is not None:
+            cache = RasterCache(cachefolders[w], cacheTileCells, cellsize, cacheMaxBytes, readonly=True)
+        seconds = 0.0
+        for task in tasks:
+            for oid in task:
+                record = records[oid]
+                extent = record.extent
+                if cache is not None:
+                    tiles = cache.tiles(record.extent)
+                    extent = cache.tileExtent(tiles)
+                download = downloadBytes(extent)
+                hits = 0
+                if cache is not None:
+                    for name in sorted(download):
+                        if cache.lookup(name, tiles) is not None:
+                            hits += 1
+                            download[name] = 0
+                        else:
+                            cache.reserve(name, tiles, download[name])
+                mode, windows = chooseMemoryMode(record, budgets[w])
+                row = {'oid': oid, 'worker': w, 'cells': work[oid]['cells'], 'extentcells': work[oid]['extentcells'],
+                       'watercells': work[oid]['watercells'], 'cost': work[oid]['cost'], 'download': download,
+                       'download_bytes': sum(download.values()), 'cache_hits': hits,
+                       'cache_lookups': len(download) if cache is not None else 0,
+                       'memory_mode': mode, 'water_windows': windows, 'peak_bytes': work[oid]['bytes'], 'seconds': None}
+                if model is not None:
+                    row['seconds'] = model['overhead'] + model['percell'] * row['cells'] + model['perbyte'] * row['download_bytes']
+                    seconds += row['seconds']
+                rows.append(row)
+        workerrows = [row for row in rows if row['worker'] == w]
+        if workerrows:
+            workers.append({'worker': w, 'polygons': len(workerrows), 'cost': sum(row['cost'] for row in workerrows),
+                            'download_bytes': sum(row['download_bytes'] for row in workerrows),
+                            'peak_bytes': max(row['peak_bytes'] for row in workerrows),
+                            'seconds': seconds if model is not None else None})
+    hits = sum(row['cache_hits'] for row in rows)
+    lookups = sum(row['cache_lookups'] for row in rows)
+    modes = {}
+    for row in rows:
+        modes[row['memory_mode']] = modes.get(row['memory_mode'], 0) + 1
+    totals = {'polygons': len(rows), 'cells': sum(row['cells'] for row in rows),
+              'extentcells': sum(row['extentcells'] for row in rows), 'cost': sum(row['cost'] for row in rows),
+              'download': dict((name, sum(row['download'][name] for row in rows)) for name in layerBytes),
+              'download_bytes': sum(row['download_bytes'] for row in rows), 'cache_hits': hits,
+              'cache_lookups': lookups, 'cache_hit_rate': float(hits) / lookups if lookups > 0 else None,
+              'memory_modes': modes, 'peak_bytes': max([row['peak_bytes'] for row in rows] or [0]),
+              'workers': workers, 'model': model, 'seconds': None, 'wall': None}
+    if model is not None:
+        #the workers run at once, so the run takes as long as its busiest worker.
+        totals['seconds'] = sum(row['seconds'] for row in rows)
+        totals['wall'] = max([worker['seconds'] for worker in workers] or [0.0])
+    return rows, totals
+
+def dryRunReport(rows, totals):
+    """dryRunReport(rows, totals)
+
+    Returns the plan of planDryRun() as a table of the polygons, the
+    downloads by layer, the workers and the totals.
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    """
+    def megabytes(nbytes):
+        return "{0:.1f}".format(nbytes / 1048576.0)
+    def seconds(value):
+        return "-" if value is None else "{0:.1f}".format(value)
+    line = "{0:>9}{1:>7}{2:>13}{3:>13}{4:>14}{5:>12}{6:>7}{7:>10}{8:>10}{9:>10}"
+    lines = [line.format("OBJECTID", "worker", "cells", "extent", "water cells", "download MB", "hits",
+                         "memory", "peak MB", "seconds")]
+    for row in rows:
+        lines.append(line.format(row['oid'], row['worker'], "{0:.0f}".format(row['cells']), "{0:.0f}".format(row['extentcells']),
+                                 "{0:.0f}".format(row['watercells']), megabytes(row['download_bytes']),
+                                 "{0}/{1}".format(row['cache_hits'], row['cache_lookups']) if row['cache_lookups'] else "-",
+                                 row['memory_mode'], megabytes(row['peak_bytes']), seconds(row['seconds'])))
+    lines.append("")
+    lines.append("download by layer:")
+    for name in sorted(totals['download']):
+        lines.append("  {0:<12}{1:>12} MB".format(name, megabytes(totals['download'][name])))
+    lines.append("")
+    for worker in totals['workers']:
+        lines.append("worker {0}: {1} polygons, {2:.0f} cells of work, {3} MB to download, {4} MB peak, {5} seconds".format(
+            worker['worker'], worker['polygons'], worker['cost'], megabytes(worker['download_bytes']),
+            megabytes(worker['peak_bytes']), seconds(worker['seconds'])))
+    lines.append("{0} polygons, {1:.0f} cells, {2:.0f} cells of work, {3} MB to download".format(
+        totals['polygons'], totals['cells'], totals['cost'], megabytes(totals['download_bytes'])))
+    if totals['cache_hit_rate'] is not None:
+        lines.append("raster cache: {0} of {1} layers cached, hit rate {2:.1f}%".format(
+            totals['cache_hits'], totals['cache_lookups'], 100.0 * totals['cache_hit_rate']))
+    lines.append("memory: {0}, peak {1} MB for one polygon".format(
+        ", ".join("{0} {1}".format(totals['memory_modes'][mode], mode) for mode in sorted(totals['memory_modes'])),
+        megabytes(totals['peak_bytes'])))
+    if totals['model'] is None:
+        lines.append("no timings of an earlier run, so no runtime is predicted")
+    else:
+        model = totals['model']
+        lines.append("runtime from {0} polygons of an earlier run: {1:.2f} s per polygon, {2:.3g} s per cell, {3:.3g} s per MB".format(
+            model['polygons'], model['overhead'], model['percell'], model['perbyte'] * 1048576.0))
+        lines.append("predicted: {0:.0f} seconds of polygons, {1:.0f} seconds ({2:.1f} hours) of wall time".format(
+            totals['seconds'], totals['wall'], totals['wall'] / 3600.0))
+    return "\n".join(lines)
 
-        try:
-            #What's this area's short name? studyarealist[1]
-            #What's this area's short name singular version? studyarealist[2]
-            #What's this area's short name plural version? studyarealist[3]
-            shortname = "study area"
-            shortname_sing = "study area is"
-            shortname_plur = "study area are"
-            for row in shortname_matrix:
-                if row[0] in studyarealist[0].lower():
-                    shortname = row[0]
-                    shortname_sing = row[1]
-                    shortname_plur = row[2]
-            studyarealist.append(shortname)
-            studyarealist.append(shortname_sing)
-            studyarealist.append(shortname_plur)
-            del shortname
-            del shortname_sing
-            del shortname_plur
+#-------------------------------------------------------------------------------
+#--------------------------pipeline stages--------------------------------------
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+# GeoDescriber() runs every polygon through these stages in order: fetch, mask,
+# percentages, zones, aspect, classfacts, synthesis and write. The stages share a
+# state dictionary that is kept for the polygon until it is described. Every stage
+# checks its outputs and raises if they are missing, so a retry picks up at the
+# stage that failed instead of refetching and remasking all ten layers.
 
+def reopenStage(state, name):
+    """reopenStage(state, name)
+
+    Marks a finished stage of the polygon as not done, so the next
+    try runs it again.
+
+    """
+    if name in state['done']:
+        state['done'].remove(name)
+
+def drainLog(channel, state):
+    """drainLog(channel, state)
+
+    Empties the log channel of the fetch processes without waiting. Log
+    messages are printed, and the metrics of every fetch, failed or not,
+    are recorded as a "layer" span with the error code and the messages
+    of the geoprocessing tools. The messages of a failed fetch are printed.
+
+    """
+    while True:
         try:
-            #Generate a grid with north, south, east, and west sides, coded, to evaluate the study area.
-            #First change the projection to cylindrical equal area so directions are true.
-            cea = arcpy.SpatialReference(54034)
-            arcpy.env.outputCoordinateSystem = cea
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Generating N/S/E/W. Spatial reference is cylindrical equal area.")
-            arcpy.env.overwriteOutput=True
-            arcpy.env.cellSize = cellsize
-            arcpy.env.extent = "MAXOF"
-            qstr = "OBJECTID" + " = " + str(intPolyID)
-            epfcea0 = arcpy.Project_management(epf,output+"\\epfcea",cea)
-            epf2 = arcpy.MakeFeatureLayer_management(epfcea0,"EachPolyFeat", qstr)
-
-            #Obtain the envelope for the polygon, then make its limits the limits of the
-            #grid which divides the shape into north, south, east, west, northeast, northwest,
-            #southeast, southwest, and center. Create points at the center of each of the nine zones,
-            #then generate thiessen polygons from the points to generate the zones.
-            fieldsdk = ["SHAPE@"]
-            with arcpy.da.SearchCursor(epf2, fieldsdk) as cursordk:
-                for rowdk in cursordk:
-                    #if rowdk[0] == intPolyID:
-                    #geom = rowdk[1]
-                    geom = rowdk[0]
-                    ext = geom.extent  # or row.Shape.extent
-                    ceaxmin = ext.XMin
-                    ceaymin = ext.YMin
-                    ceaxmax = ext.XMax
-                    ceaymax = ext.YMax
-
-            ceay1 = ((ceaymax - ceaymin) * 0.4) + ceaymin
-            ceay2 = ((ceaymax - ceaymin) * 0.6) + ceaymin
-            ceax1 = ((ceaxmax - ceaxmin) * 0.4) + ceaxmin
-            ceax2 = ((ceaxmax - ceaxmin) * 0.6) + ceaxmin
-
-            point11 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceay1-ceaymin)/2)+ceaymin)
-            point12 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceay2-ceay1)/2)+ceay1)
-            point13 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceaymax-ceay2)/2)+ceay2)
-            point21 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceay1-ceaymin)/2)+ceaymin)
-            point22 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceay2-ceay1)/2)+ceay1)
-            point23 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceaymax-ceay2)/2)+ceay2)
-            point31 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceay1-ceaymin)/2)+ceaymin)
-            point32 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceay2-ceay1)/2)+ceay1)
-            point33 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceaymax-ceay2)/2)+ceay2)
-
-            point10x = ((ceax1-ceaxmin)/2)+ceaxmin
-            point20x = ((ceax2-ceax1)/2)+ceax1
-            point30x = ((ceaxmax-ceax2)/2)+ceax2
-            point1y = ((ceay1-ceaymin)/2)+ceaymin
-            point2y = ((ceay2-ceay1)/2)+ceay1
-            point3y = ((ceaymax-ceay2)/2)+ceay2
-
-            row_values = [(11,(point10x,point1y)),(12,(point10x,point2y)),(13,(point10x,point3y)),(21,(point20x,point1y)),(22,(point20x,point2y)),(23,(point20x,point3y)),(31,(point30x,point1y)),(32,(point30x,point2y)),(33,(point30x,point3y))]
-
-            feature_class = "temppts"
-            arcpy.CreateFeatureclass_management(inmem,feature_class,"POINT")
-            arcpy.AddField_management(inmem+"\\"+feature_class,"ZONE","SHORT")
-            cursor = arcpy.da.InsertCursor(inmem+"\\"+feature_class,["ZONE","SHAPE@XY"])
-            for row in row_values:
-                cursor.insertRow(row)
-            del cursor
-            arcpy.env.extent = ext
-
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Creating Thiessen Polygons for N/S/E/W")
-            arcpy.CreateThiessenPolygons_analysis(inmem+"\\"+feature_class, inmem+"\\thiespts", "ALL")
-
-            #return spatial reference to mollweide for the most accurate calculations (equal area projection)
-            sr = arcpy.SpatialReference(54009)
+            kind, pid, payload = channel.get_nowait()
+        except queue.Empty:
+            return
+        if kind == "log":
+            print("  [{0}] {1}".format(pid, payload))
+            continue
+        metrics = dict(payload)
+        timings.add("layer", metrics.pop('wall'), metrics.pop('cpu'), oid=state['record'].oid,
+                    attempt=state['tries'] + 1, pid=pid, **metrics)
+        if not metrics['ok']:
+            print("  [{0}] {1} failed (error {2}): {3}".format(pid, metrics['layer'], metrics['error'], metrics['exception']))
+            if metrics['messages']:
+                print(metrics['messages'])
+
+def fetchStage(state):
+    """fetchStage(state)
+
+    Fetches the ten landscape layers covering the polygon from the image
+    servers, or from the raster cache, into the polygon's temporary folder.
+    Layers fetched on an earlier try are not fetched again, and layers that
+    did not arrive are retried one at a time. In the windowed memory mode
+    only the water strips that did not arrive are retried, and the water
+    layer is never fetched whole. Raises if a layer is missing.
+
+    """
+    record = state['record']
+    fetched = state['fetched']
+    #the water strips that arrived, by window, kept across tries.
+    strips = state.setdefault('waterStrips', {})
+
+    #the minimum and maximum x and y for the polygon. Used as a template when making image server layers.
+    #With the raster cache on, the extent is snapped outward to the cache tiles.
+    if rasterCache is not None:
+        cachetiles = rasterCache.tiles(record.extent)
+        extentlayer_feature = " ".join(str(v) for v in rasterCache.tileExtent(cachetiles))
+    else:
+        extentlayer_feature = " ".join(str(v) for v in record.extent)
+
+    layerInfo2 = []
+    mp.freeze_support()
+
+    if 'tempFolder' not in state:
+        state['tempFolder'] = tempfile.mkdtemp(prefix="agd_")    # Warning: this folder is deleted when the polygon is described.
+    tempFolder = state['tempFolder']
+
+    p(". Scratch workspace is: {0}".format(tempFolder))
+
+    serviceURLLandform = os.path.join(tempFolder, "landscape7", "World_Landforms_Improved_Hammond_Method" + ".ImageServer")
+    serviceURLLandcover = os.path.join(tempFolder, "landscape7", "World_Land_Cover_ESA_2010" + ".ImageServer")
+    serviceURLLithology = os.path.join(tempFolder, "landscape6", "World_Lithology" + ".ImageServer")
+    serviceURLBioclimate = os.path.join(tempFolder, "landscape6", "World_Bioclimates" + ".ImageServer")
+    serviceURLElevation = os.path.join(tempFolder, "landscape6", "World_Elevation_GMTED" + ".ImageServer")
+    serviceURLPopulation = os.path.join(tempFolder, "landscape6", "World_Population_Estimated" + ".ImageServer")
+    serviceURLSlope = os.path.join(tempFolder, "landscape6", "World_Slope_GMTED" + ".ImageServer")
+    serviceURLWater= os.path.join(tempFolder,"landscape6", "World_Surface_Water_30m_BaseVue_2013" + ".ImageServer")
+    serviceURLDiversity = os.path.join(tempFolder,"landscape7", "World_Ecophysiographic_Diversity_2015" + ".ImageServer")
+    serviceURLBiomass = os.path.join(tempFolder,"landscape6", "World_Biomass" + ".ImageServer")
+
+    service7="landscape7.ags"
+    serviceURL7="http://landscape7.arcgis.com/arcgis/rest/services"
+    service6="landscape6.ags"
+    serviceURL6="http://landscape6.arcgis.com/arcgis/rest/services"
+
+    outRaster = "in_memory"
+
+    #Parameters needed by the getResult and processResult methods are stored in this dictionary.
+    layerInfo = [
+        {'name': "Elevation", 'url': serviceURLElevation, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value", "Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Population" , 'url': serviceURLPopulation, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Landform", 'url': serviceURLLandform, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List': ["Value", "ClassName"], 'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':"Ecophysiographic_Facet_Landform_Classes.rft"},
+        {'name': "Lithology", 'url': serviceURLLithology, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value", "EF_Litho"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Bioclimate", 'url': serviceURLBioclimate, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["BioClim","Bioclimate"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Landcover", 'url': serviceURLLandcover, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["ELU_ID","ClassName"],'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Slope" , 'url': serviceURLSlope, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Water" , 'url': serviceURLWater, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':30,  'processingTemplate':'#'},
+        {'name': "Diversity" , 'url': serviceURLDiversity, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","ecoPhysdiv"],'service': service7, 'serviceURL':serviceURL7, 'cellsize':cellsize, 'processingTemplate':'#'},
+        {'name': "Biomass" , 'url': serviceURLBiomass, 'scratchFolder': tempFolder, 'extentlayer': extentlayer_feature, 'List':["Value","Count"],'service': service6, 'serviceURL':serviceURL6, 'cellsize':cellsize, 'processingTemplate':'#'}
+        ]
+    state['layers'] = [a['name'] for a in layerInfo]
+
+#------------------------------------------------------------------------
+#
+# Use parallel processing with the getResult function to retrieve images
+# for analysis.
+#
+#------------------------------------------------------------------------
+
+    print("Starting multiprocessing...")
+
+    t0 = time.time()
+    arcpy.env.outputCoordinateSystem = sr
+    #Layers fetched on an earlier try, and rasters covering this polygon that are
+    #in the raster cache, are not fetched again.
+    fetchInfo = []
+    for a in layerInfo:
+        if a['name'] in fetched:
+            continue
+        cachedpath = None
+        if rasterCache is not None:
+            cachedpath = rasterCache.lookup(a['name'], cachetiles)
+        if cachedpath is None:
+            fetchInfo.append(a)
+        else:
+            a['path'] = cachedpath
+            fetched[a['name']] = a
+    #With the windowed memory mode the water layer is fetched in strips, and the
+    #strips that arrived on an earlier try are not fetched again.
+    if state['memoryMode'] == "windowed":
+        fetchInfo = [a for a in splitWindows(fetchInfo, "Water", state['waterWindows'])
+                     if a.get('window') is None or a['window'] not in strips]
+    if fetchInfo != []:
+        channel = mp.Queue()
+        pool = mp.Pool(fetchWorkers, initializer=initPool, initargs=(channel,))
+        results = [pool.apply_async(getResult, args=(a,)) for a in fetchInfo]
+        for z in results:
+            rasterInfo = z.get()
+            drainLog(channel, state)
+            if rasterInfo is None:
+                continue
+            if 'window' in rasterInfo:
+                strips[rasterInfo['window']] = rasterInfo
+                continue
+            if rasterCache is not None:
+                rasterInfo['path'] = rasterCache.store(rasterInfo['name'], cachetiles, rasterInfo['path'])
+            fetched[rasterInfo['name']] = rasterInfo
+        p(". Shutting down worker pool. Elapsed time: {0:.2f} seconds.".format(time.time()-t0))
+        pool.close()
+        pool.join()
+        drainLog(channel, state)
+        p("*** Process complete. {0} jobs in {1:.2f} seconds.".format(len(fetchInfo), time.time()-t0))
+
+    mosaicStrips(state, cachetiles if rasterCache is not None else None)
+
+#
+#Check to see if all of the image datasets were retrieved from landscape6 and landscape7.
+#If the receipt of all the datasets is not confirmed, copy data for the missing rasters
+#from layerInfo to layerInfo2. Only the missing strips of a windowed water layer are copied.
+
+    for d in layerInfo:
+        print("checking for " + d['name'])
+        if d['name'] not in fetched:
+            print(d['name']+" dataset was not received from server. Trying again...")
+            if d['name'] == "Water" and state['memoryMode'] == "windowed":
+                layerInfo2.extend(a for a in splitWindows([d], "Water", state['waterWindows']) if a['window'] not in strips)
+            else:
+                layerInfo2.append(d)
+
+#----------------------------------------------------------------------------
+#
+# If any of the ten rasters needed for analysis are missing, retrieve them again,
+# this time one at a time. Otherwise the script will skip this step.
+#
+#----------------------------------------------------------------------------
+
+    try:
+        if layerInfo2 != []:
+        #a second round of parallel processing if any rasters are missing
+            print(layerInfo2)
+            mp.freeze_support()
+            p(". Scratch workspace is: {0}".format(tempFolder))
+            print("Retrieving lost datasets again from the server...")
+            t0 = time.time()
             arcpy.env.outputCoordinateSystem = sr
-            arcpy.env.cellSize = cellsize
-            arcpy.env.extent = "MAXOF"
-
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Projecting and rasterizing Thiessen polygons")
-
-            #project thiessen polygons into mollweide then create a raster of the thiessen zones.
-            epfcea = arcpy.Project_management(inmem+"\\thiespts",output+"\\thiesmw",sr)
-            zonedg = arcpy.PolygonToRaster_conversion(output+"\\thiesmw","ZONE")
-            mw_zonedg = arcpy.sa.Con(rasterExt,zonedg)
-            mw_zonedg.save(inmem+"\\mw_zonedg")
-            feature = os.path.join(output,"thiesmw")
-            if arcpy.Exists(feature):
-                arcpy.Delete_management(feature)
-                print("deleting "+feature+"...")
+            channel = mp.Queue()
+            #note that this time there is only one process in the pool at a time.
+            pool = mp.Pool(1, initializer=initPool, initargs=(channel,))
+            results = [pool.apply_async(getResult2, args=(a,)) for a in layerInfo2]
+            for z in results:
+                rasterInfo = z.get()
+                drainLog(channel, state)
+                if rasterInfo is None:
+                    continue
+                if 'window' in rasterInfo:
+                    strips[rasterInfo['window']] = rasterInfo
+                    continue
+                if rasterCache is not None:
+                    rasterInfo['path'] = rasterCache.store(rasterInfo['name'], cachetiles, rasterInfo['path'])
+                fetched[rasterInfo['name']] = rasterInfo
+            p(". Shutting down worker pool. Elapsed time: {0:.2f} seconds.".format(time.time()-t0))
+            pool.close()
+            pool.join()
+            drainLog(channel, state)
+            p("*** Round 2 process complete. {0} jobs in {1:.2f} seconds.".format(len(layerInfo2), time.time()-t0))
+            mosaicStrips(state, cachetiles if rasterCache is not None else None)
+
+    except arcpy.ExecuteError:
+        print()
+        print("Did you provide a valid username and password?")
+        print("Do you have enough RAM for a polygon this large?")
+        print("Also, shapefiles are not yet supported by this script...")
+        print("Be sure your extent layer is a polygon feature class.")
+        print()
+        raise
+
+    missing = [a['name'] for a in layerInfo if a['name'] not in fetched]
+    if missing != []:
+        message = "These layers were not received from the server: "+", ".join(missing)
+        if "Water" in missing and state['memoryMode'] == "windowed":
+            #the next try fetches only the strips still missing.
+            message += " ({0} of {1} water strips arrived)".format(len(strips), state['waterWindows'])
+        raise Exception(message)
+
+def mosaicStrips(state, cachetiles):
+    """mosaicStrips(state, cachetiles)
+
+    Mosaics the water strips of a windowed polygon into its water layer
+    once every strip has arrived, and stores it in the raster cache under
+    cachetiles unless that is None.
+
+    """
+    strips = state['waterStrips']
+    if 'Water' in state['fetched'] or not strips or len(strips) < state['waterWindows']:
+        return
+    rasterInfo = mosaicWindows(list(strips.values()), cellsize)
+    if cachetiles is not None:
+        rasterInfo['path'] = rasterCache.store(rasterInfo['name'], cachetiles, rasterInfo['path'])
+    state['fetched'][rasterInfo['name']] = rasterInfo
 
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("spatial reference is back to MW")
-            arcpy.env.overwriteOutput=True
-
-            #zero out the variables that keep a tally of the spatial position
-            #of geographic phenomena
-            zonesw= 0
-            zonew = 0
-            zonenw = 0
-            zones = 0
-            zonec = 0
-            zonen = 0
-            zonese = 0
-            zonee = 0
-            zonene = 0
-            neq_n = -9999
-            seq_n = -9999
-            swq_n = -9999
-            nwq_n = -9999
-            zes_n = -9999
-            zws_n = -9999
-            zss_n = -9999
-            zns_n = -9999
-            zonesw_n = -9999
-            zonew_n = -9999
-            zonenw_n = -9999
-            zones_n = -9999
-            zonec_n = -9999
-            zonen_n = -9999
-            zonese_n = -9999
-            zonee_n = -9999
-            zonene_n = -9999
-
-            #count the number of cells in each of the nine zones in the study area.
-            #Transfer them to nine variables to be used later for comparison with
-            #counts of parts of the study area.
-            print("populating variables from the nine parts of the study area")
-            fieldsmwz = ["Value","Count"]
-            with arcpy.da.SearchCursor(inmem+"\\mw_zonedg",fieldsmwz) as cursormwz:
-                for rowmwz in cursormwz:
-                    if rowmwz[0] == 11:
-                        zonesw = rowmwz[1]
-                    if rowmwz[0] == 12:
-                        zonew = rowmwz[1]
-                    if rowmwz[0] == 13:
-                        zonenw = rowmwz[1]
-                    if rowmwz[0] == 21:
-                        zones = rowmwz[1]
-                    if rowmwz[0] == 22:
-                        zonec = rowmwz[1]
-                    if rowmwz[0] == 23:
-                        zonen = rowmwz[1]
-                    if rowmwz[0] == 31:
-                        zonese = rowmwz[1]
-                    if rowmwz[0] == 32:
-                        zonee = rowmwz[1]
-                    if rowmwz[0] == 33:
-                        zonene = rowmwz[1]
+def maskLayer(r):
+    """maskLayer(r)
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    Masks a fetched layer to con_extent, saves it as the raster
+    <name>_R and joins the fields in r['List'] from the attribute
+    table of the fetched raster.
 
-        try:
-            print("appending elevation statistics to the study area...")
-            #Obtain the mean and standard deviation of the elevation for the whole study area,
-            #and store the values in meanelevation and stdelevation. Used later in comparison.
-            a=arcpy.sa.ZonalStatisticsAsTable(extentRaster,"Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
-            with arcpy.da.SearchCursor(inmem+"\\stattbl",["COUNT","MIN","MAX","MEAN","MEDIAN","STD"]) as cursor:
-                for row in cursor:
-                    #What is its area? studyarealist[4]
-                    studyarealist.append(row[0])
-                    #What is its lowest elevation? studyarealist[5]
-                    studyarealist.append(row[1])
-                    #What is its highest elevation? studyarealist[6]
-                    studyarealist.append(row[2])
-                    #What is its mean elevation? studyarealist[7]
-                    studyarealist.append(row[3])
-                    #What is its median elevation? studyarealist[8]
-                    studyarealist.append(row[4])
-                    #What is one standard deviation below the mean elevation? studyarealist[9]
-                    studyarealist.append(row[3]-row[5])
-                    #What is one standard deviation above the mean elevation? studyarealist[10]
-                    studyarealist.append(row[3]+row[5])
-            print("done appending elevation statistics to the study area...")
+    """
+    print("masking " + r['name'])
+    print(r['path'])
+    arcpy.env.outputCoordinateSystem = sr
+    outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), r['path'])
+    p ( arcpy.GetMessages())
+    od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
+    #Replace nodata from population estimate raster with zero. That way the sums
+    #still work. Nodata will will cause GeoDescriber() to fail.
+    if r['name'] == "Population":
+        if not arcpy.sa.Raster(inmem+"\\Population_R").maximum > 0:
+            outputRaster = Con(arcpy.Raster(inmem+"\\con_extent"), 0)
+            od = outputRaster.save(inmem +"\\"+ r['name'] +"_R")
+    p ( arcpy.GetMessages())
+    #A biomass raster without any biomass has no attribute table to join.
+    if r['name'] == "Biomass":
+        if not arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
+            if arcversion == '10.5.1':
+                arcpy.BuildRasterAttributeTable_management(inmem+"\\"+ r['name'] +"_R")
+            return
+    saved_raster=arcpy.Raster(inmem+"\\"+ r['name'] +"_R")
+    if arcversion == '10.5.1':
+        JoinField_Workaround(inmem+"\\"+ r['name'] +"_R", "Value", r['path'], "Value", r['List'])
+    else:
+        d = arcpy.JoinField_management(saved_raster, "Value", r['path'], "Value", r['List'])
+    p ( arcpy.GetMessages())
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+def maskStage(state):
+    """maskStage(state)
 
-            #If bodies of water make up a significant class, use the 30m resolution raster
-            #to estimate its area with more accuracy. This improves estimates in areas where
-            #there are a lot of small lakes, such as Minnesota
+    Converts the polygon to the mask_extent and con_extent rasters, then
+    masks every fetched layer to the polygon. Layers masked on an earlier
+    try are not masked again. Layers that can not be masked are dropped,
+    so the next try fetches them again, and the stage raises.
 
-        try:
-            print("getting statistics on bodies of water...")
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            divzero = 0
-            bowno = -9999
-            bowyes = -9999
-
-            xyy=Con(arcpy.Raster(inmem+"\\Water_R") == 11, 1, 0)
-            xyz=Con(rasterExt,xyy)
-            xyz.save(inmem+"\\Water30m_R")
-            arcpy.BuildRasterAttributeTable_management(inmem+"\\Water30m_R", "Overwrite")
+    """
+    #The polygon's geometry was read once by streamPolygons(). It is written to
+    #an in_memory feature class (cf0), then it makes a raster for that polygon
+    #called mask_extent.
+    record = state['record']
+    masked = state['masked']
+    print("making single poly feature class")
+    arcpy.env.cellSize = cellsize
+    print("Converting single poly feature to raster...")
+    polygonToFeatureClass(record, "cf0", sr)
+    rasterExt=arcpy.PolygonToRaster_conversion(inmem+"\\cf0", "OBJECTID" ,inmem+"\\mask_extent")
+    extentRaster=Con(arcpy.Raster(rasterExt),1)
+    er=extentRaster.save(inmem+"\\con_extent")
+
+    failed = []
+    previousExtent = arcpy.env.extent
+    #cached rasters cover more than this polygon, so mask within the polygon's extent.
+    if rasterCache is not None:
+        arcpy.env.extent = extentRaster.extent
+    try:
+        for name in state['layers']:
+            if name in masked:
+                continue
+            try:
+                maskLayer(state['fetched'][name])
+                masked.append(name)
+            except:
+                failed.append(name)
+                # Get the traceback object
+                tb = sys.exc_info()[2]
+                tbinfo = traceback.format_tb(tb)[0]
+                # Concatenate information together concerning the error into a message string
+                pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+                # Write Python error messages to log
+                err= pymsg + "\n"
+                print(err)
+    finally:
+        arcpy.env.extent = previousExtent
+
+    if failed != []:
+        for name in failed:
+            del state['fetched'][name]
+        reopenStage(state, 'fetch')
+        raise Exception("These layers could not be masked and will be fetched again: "+", ".join(failed))
+
+def percentagesStage(state):
+    """percentagesStage(state)
+
+    Calculates the percentage of every class of the bioclimate, landform,
+    lithology and land cover rasters into state['percentages'], an array
+    indexed by class code for each raster. Rasters done on an earlier try
+    are skipped. A raster that fails is masked again on the next try, and
+    the stage raises.
+
+    """
+    try:
+        # Calculate the percentage of every class for the four main ecophysiographic
+        # criteria in the study area, bioclimate, landform, lithology, and land cover.
+        print("Calculating percentages...")
+        list_FC=[inmem+"\\Bioclimate_R", inmem+"\\Landform_R", inmem+"\\Lithology_R", inmem+"\\Landcover_R"]
+        for fc in list_FC:
+            if fc in state['percentages']:
+                continue
+            cells = readClasses(fc)
+            if cells.sum() == 0:
+                raise Exception("The mask leaves no cells in "+fc+".")
+            state['percentages'][fc] = cells * 100 / cells.sum()
+
+        print("Done calculating percentages.")
+
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    missing = [fc for fc in list_FC if fc not in state['percentages']]
+    if missing != []:
+        for fc in missing:
+            name = fc.split("\\")[-1][:-2]
+            if name in state['masked']:
+                state['masked'].remove(name)
+        reopenStage(state, 'mask')
+        raise Exception("Percentages could not be calculated for "+", ".join(missing))
+
+def zonesStage(state):
+    """zonesStage(state)
+
+    Assembles the facts about the whole study area in studyarealist: its
+    names, elevation, bodies of water, diversity and the cells in each of
+    its nine zones. Raises unless all 31 facts were found.
+
+    """
+    global sr
+    global article
+
+    record = state['record']
+    rasterExt = inmem+"\\mask_extent"
+    extentRaster = arcpy.Raster(inmem+"\\con_extent")
+
+    #--------------------------------------------------------------------------------
+    #
+    #                  study area facts (studyarealist)
+    #
+    #--------------------------------------------------------------------------------
+
+    #assemble statistics for entire study area into a single list called studyarealist.
+
+    try:
+        #assemble statistics for entire study area into a single list
+        dummyvalue = -9999
+        studyarealist = StudyAreaFacts()
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+        #What's this area named?
+
+    try:
+        #The name and short name of every feature were resolved once, before the
+        #loop, by buildNameTable(). If there isn't a name, the script will use
+        #the generic term "study area"
+        polyname, shortname, shortname_sing, shortname_plur = nameTable.get(intPolyID, studyareanames)
+        #studyarealist[0] = name
+        studyarealist.name = polyname
+        #What's this area's short name? studyarealist[1]
+        studyarealist.shortname = shortname
+        #What's this area's short name singular version? studyarealist[2]
+        studyarealist.shortnamesingular = shortname_sing
+        #What's this area's short name plural version? studyarealist[3]
+        studyarealist.shortnameplural = shortname_plur
+        del shortname
+        del shortname_sing
+        del shortname_plur
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    try:
+        #Generate a grid with north, south, east, and west sides, coded, to evaluate the study area.
+        #First change the projection to cylindrical equal area so directions are true.
+        cea = arcpy.SpatialReference(54034)
+        arcpy.env.outputCoordinateSystem = cea
+        print("Generating N/S/E/W. Spatial reference is cylindrical equal area.")
+        arcpy.env.overwriteOutput=True
+        arcpy.env.cellSize = cellsize
+        arcpy.env.extent = "MAXOF"
+
+        #Obtain the envelope for the polygon, then make its limits the limits of the
+        #grid which divides the shape into north, south, east, west, northeast, northwest,
+        #southeast, southwest, and center. Create points at the center of each of the nine zones,
+        #then generate thiessen polygons from the points to generate the zones.
+        #The cylindrical equal area envelope was computed by streamPolygons().
+        ceaxmin, ceaymin, ceaxmax, ceaymax = record.ceaextent
+        ext = arcpy.Extent(ceaxmin, ceaymin, ceaxmax, ceaymax)
+
+        ceay1 = ((ceaymax - ceaymin) * 0.4) + ceaymin
+        ceay2 = ((ceaymax - ceaymin) * 0.6) + ceaymin
+        ceax1 = ((ceaxmax - ceaxmin) * 0.4) + ceaxmin
+        ceax2 = ((ceaxmax - ceaxmin) * 0.6) + ceaxmin
+
+        point11 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceay1-ceaymin)/2)+ceaymin)
+        point12 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceay2-ceay1)/2)+ceay1)
+        point13 = arcpy.Point(((ceax1-ceaxmin)/2)+ceaxmin,((ceaymax-ceay2)/2)+ceay2)
+        point21 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceay1-ceaymin)/2)+ceaymin)
+        point22 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceay2-ceay1)/2)+ceay1)
+        point23 = arcpy.Point(((ceax2-ceax1)/2)+ceax1,((ceaymax-ceay2)/2)+ceay2)
+        point31 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceay1-ceaymin)/2)+ceaymin)
+        point32 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceay2-ceay1)/2)+ceay1)
+        point33 = arcpy.Point(((ceaxmax-ceax2)/2)+ceax2,((ceaymax-ceay2)/2)+ceay2)
+
+        point10x = ((ceax1-ceaxmin)/2)+ceaxmin
+        point20x = ((ceax2-ceax1)/2)+ceax1
+        point30x = ((ceaxmax-ceax2)/2)+ceax2
+        point1y = ((ceay1-ceaymin)/2)+ceaymin
+        point2y = ((ceay2-ceay1)/2)+ceay1
+        point3y = ((ceaymax-ceay2)/2)+ceay2
+
+        row_values = [(11,(point10x,point1y)),(12,(point10x,point2y)),(13,(point10x,point3y)),(21,(point20x,point1y)),(22,(point20x,point2y)),(23,(point20x,point3y)),(31,(point30x,point1y)),(32,(point30x,point2y)),(33,(point30x,point3y))]
+
+        feature_class = "temppts"
+        arcpy.CreateFeatureclass_management(inmem,feature_class,"POINT")
+        arcpy.AddField_management(inmem+"\\"+feature_class,"ZONE","SHORT")
+        cursor = arcpy.da.InsertCursor(inmem+"\\"+feature_class,["ZONE","SHAPE@XY"])
+        for row in row_values:
+            cursor.insertRow(row)
+        del cursor
+        arcpy.env.extent = ext
+
+        print("Creating Thiessen Polygons for N/S/E/W")
+        arcpy.CreateThiessenPolygons_analysis(inmem+"\\"+feature_class, inmem+"\\thiespts", "ALL")
+
+        #return spatial reference to mollweide for the most accurate calculations (equal area projection)
+        sr = arcpy.SpatialReference(54009)
+        arcpy.env.outputCoordinateSystem = sr
+        arcpy.env.cellSize = cellsize
+        arcpy.env.extent = "MAXOF"
+
+        print("Projecting and rasterizing Thiessen polygons")
+
+        #project thiessen polygons into mollweide then create a raster of the thiessen zones.
+        epfcea = arcpy.Project_management(inmem+"\\thiespts",tempspace+"\\thiesmw",sr)
+        zonedg = arcpy.PolygonToRaster_conversion(tempspace+"\\thiesmw","ZONE")
+        mw_zonedg = arcpy.sa.Con(rasterExt,zonedg)
+        mw_zonedg.save(inmem+"\\mw_zonedg")
+        feature = os.path.join(tempspace,"thiesmw")
+        if arcpy.Exists(feature):
+            arcpy.Delete_management(feature)
+            print("deleting "+feature+"...")
+
+        print("spatial reference is back to MW")
+        arcpy.env.overwriteOutput=True
+
+        #zero out the variables that keep a tally of the spatial position
+        #of geographic phenomena
+        zonesw= 0
+        zonew = 0
+        zonenw = 0
+        zones = 0
+        zonec = 0
+        zonen = 0
+        zonese = 0
+        zonee = 0
+        zonene = 0
+        neq_n = -9999
+        seq_n = -9999
+        swq_n = -9999
+        nwq_n = -9999
+        zes_n = -9999
+        zws_n = -9999
+        zss_n = -9999
+        zns_n = -9999
+        zonesw_n = -9999
+        zonew_n = -9999
+        zonenw_n = -9999
+        zones_n = -9999
+        zonec_n = -9999
+        zonen_n = -9999
+        zonese_n = -9999
+        zonee_n = -9999
+        zonene_n = -9999
+
+        #count the number of cells in each of the nine zones in the study area.
+        #Transfer them to nine variables to be used later for comparison with
+        #counts of parts of the study area.
+        print("populating variables from the nine parts of the study area")
+        fieldsmwz = ["Value","Count"]
+        with arcpy.da.SearchCursor(inmem+"\\mw_zonedg",fieldsmwz) as cursormwz:
+            for rowmwz in cursormwz:
+                if rowmwz[0] == 11:
+                    zonesw = rowmwz[1]
+                if rowmwz[0] == 12:
+                    zonew = rowmwz[1]
+                if rowmwz[0] == 13:
+                    zonenw = rowmwz[1]
+                if rowmwz[0] == 21:
+                    zones = rowmwz[1]
+                if rowmwz[0] == 22:
+                    zonec = rowmwz[1]
+                if rowmwz[0] == 23:
+                    zonen = rowmwz[1]
+                if rowmwz[0] == 31:
+                    zonese = rowmwz[1]
+                if rowmwz[0] == 32:
+                    zonee = rowmwz[1]
+                if rowmwz[0] == 33:
+                    zonene = rowmwz[1]
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    try:
+        print("appending elevation statistics to the study area...")
+        #Obtain the mean and standard deviation of the elevation for the whole study area,
+        #and store the values in meanelevation and stdelevation. Used later in comparison.
+        a=arcpy.sa.ZonalStatisticsAsTable(extentRaster,"Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
+        with arcpy.da.SearchCursor(inmem+"\\stattbl",["COUNT","MIN","MAX","MEAN","MEDIAN","STD"]) as cursor:
+            for row in cursor:
+                #What is its area? studyarealist[4]
+                studyarealist.area = row[0]
+                #What is its lowest elevation? studyarealist[5]
+                studyarealist.minelevation = row[1]
+                #What is its highest elevation? studyarealist[6]
+                studyarealist.maxelevation = row[2]
+                #What is its mean elevation? studyarealist[7]
+                studyarealist.meanelevation = row[3]
+                #What is its median elevation? studyarealist[8]
+                studyarealist.medianelevation = row[4]
+                #What is one standard deviation below the mean elevation? studyarealist[9]
+                studyarealist.lowelevation = row[3]-row[5]
+                #What is one standard deviation above the mean elevation? studyarealist[10]
+                studyarealist.highelevation = row[3]+row[5]
+        print("done appending elevation statistics to the study area...")
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+        #If bodies of water make up a significant class, use the 30m resolution raster
+        #to estimate its area with more accuracy. This improves estimates in areas where
+        #there are a lot of small lakes, such as Minnesota
+
+    try:
+        print("getting statistics on bodies of water...")
+        divzero = 0
+        bowno = -9999
+        bowyes = -9999
+
+        xyy=Con(arcpy.Raster(inmem+"\\Water_R") == 11, 1, 0)
+        xyz=Con(rasterExt,xyy)
+        xyz.save(inmem+"\\Water30m_R")
+        arcpy.BuildRasterAttributeTable_management(inmem+"\\Water30m_R", "Overwrite")
+        with arcpy.da.SearchCursor(inmem+"\\Water30m_R",["Value","Count"]) as cursor:
+            for row in cursor:
+                if row[0] == 0 and row[1] == 0:
+                    divzero == 1
+        if divzero == 0:
             with arcpy.da.SearchCursor(inmem+"\\Water30m_R",["Value","Count"]) as cursor:
                 for row in cursor:
-                    if row[0] == 0 and row[1] == 0:
-                        divzero == 1
-            if divzero == 0:
-                with arcpy.da.SearchCursor(inmem+"\\Water30m_R",["Value","Count"]) as cursor:
-                    for row in cursor:
-                        if row[0] == 0:
-                            bowno = row[1]
-                        if row[0] == 1:
-                            bowyes = row[1]
-                    #What percentage of the study area is bodies of water, at 30m resolution? studyarealist[11]
-                studyarealist.append((bowyes/bowno) * 100)
-            else:
-                studyarealist.append(-9999)
-            if arcpy.Exists(xyy):
-            	arcpy.Delete_management(xyy)
-            if arcpy.Exists(xyz):
-            	arcpy.Delete_management(xyz)
+                    if row[0] == 0:
+                        bowno = row[1]
+                    if row[0] == 1:
+                        bowyes = row[1]
+                #What percentage of the study area is bodies of water, at 30m resolution? studyarealist[11]
+            studyarealist.waterpercent = (bowyes/bowno) * 100
+        else:
+            studyarealist.waterpercent = -9999
+        if arcpy.Exists(xyy):
+            arcpy.Delete_management(xyy)
+        if arcpy.Exists(xyz):
+            arcpy.Delete_management(xyz)
 
 ##            arcpy.env.cellSize = 30
 ##
@@ -1650,469 +3172,542 @@ def GeoDescriber():
 ##                if arcpy.Exists(feature):
 ##                	arcpy.Delete_management(feature)
 
-        except:
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    try:
+        print("Calculating mean ELU diversity")
+        print("looking up diversity")
+        ecophysdivg=arcpy.sa.Lookup(inmem+"\\Diversity_R","ecoPhysdiv")
+        print("saving diversity")
+        ecophysdivg.save(inmem+"\\Ecophysdiv_R")
+        print("populating list with the diversity")
+        a=arcpy.sa.ZonalStatisticsAsTable(extentRaster,"Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+        with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN","STD"]) as cursor:
+            for row in cursor:
+                #What is the mean ELU diversity in the study area? studyarealist[12]
+                studyarealist.meandiversity = row[0]
+                #What is the median ELU diversity in the study area? studyarealist[13]
+                #median is not available from floating point raster, using mean as dummy value!
+                studyarealist.mediandiversity = row[0]
+                #What is one standard deviation below the mean ELU diversity? studyarealist[14]
+                studyarealist.lowdiversity = row[0]-row[1]
+                #What is one standard deviation above the mean ELU diversity? studyarealist[15]
+                studyarealist.highdiversity = row[0]+row[1]
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    try:
+        #number of cells in the southwest. studyarealist[22]
+        studyarealist.zonesw = zonesw
+        #number of cells in the west. studyarealist[23]
+        studyarealist.zonew = zonew
+        #number of cells in the northwest. studyarealist[24]
+        studyarealist.zonenw = zonenw
+        #number of cells in the south. studyarealist[25]
+        studyarealist.zones = zones
+        #number of cells in the center. studyarealist[26]
+        studyarealist.zonec = zonec
+        #number of cells in the north. studyarealist[27]
+        studyarealist.zonen = zonen
+        #number of cells in the southeast. studyarealist[28]
+        studyarealist.zonese = zonese
+        #number of cells in the east. studyarealist[29]
+        studyarealist.zonee = zonee
+        #number of cells in the northeast. studyarealist[30]
+        studyarealist.zonene = zonene
+
+        neq_n = studyarealist.zonec+studyarealist.zonen+studyarealist.zonee+studyarealist.zonene
+        seq_n = studyarealist.zonec+studyarealist.zones+studyarealist.zonee+studyarealist.zonese
+        swq_n = studyarealist.zonesw+studyarealist.zonew+studyarealist.zones+studyarealist.zonec
+        nwq_n = studyarealist.zonew+studyarealist.zonenw+studyarealist.zonec+studyarealist.zonen
+        zes_n = studyarealist.zonese+studyarealist.zonee+studyarealist.zonene
+        zws_n = studyarealist.zonesw+studyarealist.zonew+studyarealist.zonenw
+        zss_n = studyarealist.zonesw+studyarealist.zones+studyarealist.zonese
+        zns_n = studyarealist.zonenw+studyarealist.zonen+studyarealist.zonene
+        zonesw_n = studyarealist.zonesw
+        zonew_n = studyarealist.zonew
+        zonenw_n = studyarealist.zonenw
+        zones_n = studyarealist.zones
+        zonec_n = studyarealist.zonec
+        zonen_n = studyarealist.zonen
+        zonese_n = studyarealist.zonese
+        zonee_n = studyarealist.zonee
+        zonene_n = studyarealist.zonene
+
+        article = ""
+        if studyarealist.name[0].isupper():
+            article = ""
+        else:
+            article = "the "
+        print(article)
+
+        print(studyarealist)
+
+    except ValueError:
+        print("value error")
+
+    except IndexError:
+        print("index error")
+        neq_n = 0
+        seq_n = 0
+        swq_n = 0
+        nwq_n = 0
+        zes_n = 0
+        zws_n = 0
+        zss_n = 0
+        zns_n = 0
+        zonesw_n = 0
+        zonew_n = 0
+        zonenw_n = 0
+        zones_n = 0
+        zonec_n = 0
+        zonen_n = 0
+        zonese_n = 0
+        zonee_n = 0
+        zonene_n = 0
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    if studyarealist.missing() != []:
+        raise Exception("Could not find "+", ".join(studyarealist.missing())+" of the study area.")
+    state['studyarealist'] = studyarealist
+    state['polyname'] = polyname
+    state['zonetotals'] = (neq_n, seq_n, swq_n, nwq_n, zes_n, zws_n, zss_n, zns_n, zonesw_n, zonew_n,
+                           zonenw_n, zones_n, zonec_n, zonen_n, zonese_n, zonee_n, zonene_n)
+
+def aspectStage(state):
+    """aspectStage(state)
+
+    Derives the aspect of the study area terrain from the elevation
+    raster and reclassifies it into eight directions in aspectindexg.
+
+    """
+    try:
+        # Derive the aspect of the study area terrain. Reclass the aspect into 8 directions. Later the script will
+        # add 180 degrees together facing all 8 directions to find a general aspect trend.
+        webmerc = arcpy.SpatialReference(3857)
+        print("Projecting elevation to webmerc to derive aspect...")
+        arcpy.ProjectRaster_management(inmem+"\\Elevation_R",inmem+"\\northupg",webmerc,"NEAREST",cellsize)
+        arcpy.BuildRasterAttributeTable_management(inmem+"\\northupg", "Overwrite")
+        print("Deriving aspect from webmerc elevation raster...")
+        #xbz = arcpy.sa.Aspect(inmem+"\\northupg")
+        xbz = Aspect(inmem+"\\northupg")
+        print("Projecting aspect raster back to Mollweide...")
+        arcpy.ProjectRaster_management(xbz,inmem+"\\aspectg",sr,"NEAREST",cellsize)
+        #arcpy.BuildRasterAttributeTable_management(inmem+"\\aspectg", "Overwrite")
+        print("Generating remap range for aspect raster...")
+        aspectRemapRange = RemapRange([[0,45,1],[45,90,2],[90,135,3],[135,180,4],[180,225,5],[225,270,6],[270,315,7],[315,360,8]])
+        print("Reclassifying aspect raster into aspect index raster...")
+        aspectindexg = arcpy.sa.Reclassify(arcpy.Raster(inmem+"\\aspectg"),"Value",aspectRemapRange)
+        print("Saving and cleaning up after aspect job...")
+        aspectindexg.save(inmem+"\\aspectindexg")
+        #clean up and free up memory
+        cleanupg = ['northupg','aspectg']
+        for fd in cleanupg:
+            feature = os.path.join(inmem,fd)
+            if arcpy.Exists(feature):
+                arcpy.Delete_management(feature)
+                print("deleting "+feature+"...")
+
+    except:
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        # Write Python error messages to log
+        err= pymsg + "\n"
+        print(err)
+
+    if not arcpy.Exists(inmem+"\\aspectindexg"):
+        raise Exception("The aspect index raster was not created.")
+
+def classFactsStage(state):
+    """classFactsStage(state)
+
+    Looks up the significant classes of the study area, orders them, and
+    analyzes every class over 10% of the study area into classlist. Raises
+    unless every significant class has its 34 facts.
+
+    """
+    global sideopslist
 
+    record = state['record']
+    studyarealist = state['studyarealist']
+    polyname = state['polyname']
+    (neq_n, seq_n, swq_n, nwq_n, zes_n, zws_n, zss_n, zns_n, zonesw_n, zonew_n,
+     zonenw_n, zones_n, zonec_n, zonen_n, zonese_n, zonee_n, zonene_n) = state['zonetotals']
+    alllist = []
+    classlist = []
+    landcovertimes = 0
+    lithologytimes = 0
+    bioclimatetimes = 0
+    landformtimes = 0
+
+    #---------------------------------------------------------------------------------
+    #
+    #                        look up significant classes
+    #
+    #
+    #--------------------------------------------------------------------------------
+    if studyarealist.area > 15:
         try:
-            currentTime = time.clock()
-            print(str(currentTime-startTime)+" seconds have elapsed so far")
-            print("Calculating mean ELU diversity")
-            print("looking up diversity")
-            ecophysdivg=arcpy.sa.Lookup(inmem+"\\Diversity_R","ecoPhysdiv")
-            print("saving diversity")
-            ecophysdivg.save(inmem+"\\Ecophysdiv_R")
-            print("populating list with the diversity")
-            a=arcpy.sa.ZonalStatisticsAsTable(extentRaster,"Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
-            with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN","STD"]) as cursor:
-                for row in cursor:
-                    #What is the mean ELU diversity in the study area? studyarealist[12]
-                    studyarealist.append(row[0])
-                    #What is the median ELU diversity in the study area? studyarealist[13]
-                    #median is not available from floating point raster, using mean as dummy value!
-                    studyarealist.append(row[0])
-                    #What is one standard deviation below the mean ELU diversity? studyarealist[14]
-                    studyarealist.append(row[0]-row[1])
-                    #What is one standard deviation above the mean ELU diversity? studyarealist[15]
-                    studyarealist.append(row[0]+row[1])
-                    #dummy value studyarealist[16]
-                    studyarealist.append(dummyvalue)
-                    #dummy value studyarealist[17]
-                    studyarealist.append(dummyvalue)
-                    #dummy value studyarealist[18]
-                    studyarealist.append(dummyvalue)
-                    #dummy value studyarealist[19]
-                    studyarealist.append(dummyvalue)
-                    #dummy value studyarealist[20]
-                    studyarealist.append(dummyvalue)
-                    #dummy value studyarealist[21]
-                    studyarealist.append(dummyvalue)
+            global restopslist
+            p("*** look up significant classes...")
+            sideopslist = []
+            restopslist = []
+            alllist = []
+
+            #Assemble characterization text.
+            print("Assembling characterization text...")
+            AllPoly=[inmem+"\\Bioclimate_R", inmem+"\\Landform_R", inmem+"\\Lithology_R", inmem+"\\Landcover_R"]
+            for i in AllPoly:
+                # The largest class of each criterion leads its paragraph, and the
+                # other classes over 10% of the study area follow it.
+                registry = registryOf(i)
+                percents = state['percentages'][i]
+                largest = int(np.argmax(percents))
+                sideopslist.extend([float(percents[largest]), registry.names[largest], i])
+                for code in np.nonzero((percents > 10) & (percents != percents[largest]))[0]:
+                    restopslist.extend([float(percents[code]), registry.names[code], i])
+                if i.endswith("Landcover_R") == True:
+                    #Warn about polygons smaller than the 1000 cells the descriptions are designed for.
+                    if record.area < warnthreshold:
+                        warnings.warn("Warning: "+polyname+" is less than 1000 pixels. This is less than the minimum designed study area size.", UserWarning, stacklevel=2)
+
+        except IOError:
+            print("This does not appear to be a valid polygon feature class. A valid")
+            print("feature class contains at least some land area and can not be")
+            print("completely over ocean.")
+            raise
 
         except:
             # Get the traceback object
             tb = sys.exc_info()[2]
             tbinfo = traceback.format_tb(tb)[0]
             # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
             # Write Python error messages to log
             err= pymsg + "\n"
             print(err)
 
-        try:
-            #number of cells in the southwest. studyarealist[22]
-            studyarealist.append(zonesw)
-            #number of cells in the west. studyarealist[23]
-            studyarealist.append(zonew)
-            #number of cells in the northwest. studyarealist[24]
-            studyarealist.append(zonenw)
-            #number of cells in the south. studyarealist[25]
-            studyarealist.append(zones)
-            #number of cells in the center. studyarealist[26]
-            studyarealist.append(zonec)
-            #number of cells in the north. studyarealist[27]
-            studyarealist.append(zonen)
-            #number of cells in the southeast. studyarealist[28]
-            studyarealist.append(zonese)
-            #number of cells in the east. studyarealist[29]
-            studyarealist.append(zonee)
-            #number of cells in the northeast. studyarealist[30]
-            studyarealist.append(zonene)
-
-            neq_n = studyarealist[26]+studyarealist[27]+studyarealist[29]+studyarealist[30]
-            seq_n = studyarealist[26]+studyarealist[25]+studyarealist[29]+studyarealist[28]
-            swq_n = studyarealist[22]+studyarealist[23]+studyarealist[25]+studyarealist[26]
-            nwq_n = studyarealist[23]+studyarealist[24]+studyarealist[26]+studyarealist[27]
-            zes_n = studyarealist[28]+studyarealist[29]+studyarealist[30]
-            zws_n = studyarealist[22]+studyarealist[23]+studyarealist[24]
-            zss_n = studyarealist[22]+studyarealist[25]+studyarealist[28]
-            zns_n = studyarealist[24]+studyarealist[27]+studyarealist[30]
-            zonesw_n = studyarealist[22]
-            zonew_n = studyarealist[23]
-            zonenw_n = studyarealist[24]
-            zones_n = studyarealist[25]
-            zonec_n = studyarealist[26]
-            zonen_n = studyarealist[27]
-            zonese_n = studyarealist[28]
-            zonee_n = studyarealist[29]
-            zonene_n = studyarealist[30]
 
-            article = ""
-            if studyarealist[0][0].isupper():
-                article = ""
-            else:
-                article = "the "
-            print(article)
-
-            print(studyarealist)
-            #print("The study area list is "+str(len(studyarealist))+" tokens in length. (should be 31)")
-
-            if len(studyarealist) != 31:
-                GeoDescriberTries +=1
-                return
-
-        except ValueError:
-            print("value error")
-
-        except IndexError:
-            print("index error")
-            neq_n = 0
-            seq_n = 0
-            swq_n = 0
-            nwq_n = 0
-            zes_n = 0
-            zws_n = 0
-            zss_n = 0
-            zns_n = 0
-            zonesw_n = 0
-            zonew_n = 0
-            zonenw_n = 0
-            zones_n = 0
-            zonec_n = 0
-            zonen_n = 0
-            zonese_n = 0
-            zonee_n = 0
-            zonene_n = 0
+        #----------------------------------side operations--------------------------------
+        #
+        # Order a list so the four predominant ecophysiographic criteria appear in order from highest
+        # to lowest by percentage. If lithology appears first, demote it to second place.
+        # Follow up listing each of the other criteria that are over 10% with the predominant criteria,
+        # so all the lithology are together, all the bioclimate, landform and land cover are together
+        # in their own paragraphs from predominant value, in descending order to the least significant value.
+        #
+        #--------------------------------------------------------------------------------
+
+    p("*** side operations..")
+    dummyvalue = -9999
+    alllist = []
+    descendingorderlist = []
+    descendingrestlist = []
+    junklist = []
+    connectors = [['In addition, '],['Furthermore, '],['Also, '],['Moreover, ']]
+
+    if studyarealist.area > 15:
+        try:
+            while len(sideopslist) != 0:
+                sideoppct = sideopslist.pop(0)
+                sideopclass = sideopslist.pop(0)
+                sideoppath = sideopslist.pop(0)
+                sideoppctrnd = int(sideoppct + .5)
+                junklist.append(sideoppct)
+                junklist.append(sideopclass)
+                junklist.append(sideoppath)
+                descendingorderlist.append(junklist)
+                junklist = []
+            descendingorderlist.sort(reverse=True)
+            x = 0
+            # move lithology paragraph so that it is the last paragraph.
+            for triplet in descendingorderlist:
+                if triplet[2].endswith("Lithology_R") == True and x <= 2:
+                    lithofirst = descendingorderlist.pop(x)
+                    descendingorderlist.insert(3,lithofirst)
+                x += 1
+            x = 0
+            # now if landcover appears first or second, move it to third place. The characterization will now lead with either landform or bioclimate.
+            for triplet in descendingorderlist:
+                if triplet[2].endswith("Landcover_R") == True and x <= 1:
+                    lcfirst = descendingorderlist.pop(x)
+                    descendingorderlist.insert(2,lcfirst)
+                x += 1
+            for triplet in descendingorderlist:
+                if triplet[2].endswith("Bioclimate_R") == True:
+                    topbioclimatepercent = triplet[0]
+                if triplet[2].endswith("Landform_R") == True:
+                    toplandformpercent = triplet[0]
+                if triplet[2].endswith("Landcover_R") == True:
+                    toplandcoverpercent = triplet[0]
+                if triplet[2].endswith("Lithology_R") == True:
+                    toplithopercent = triplet[0]
+            while len(restopslist) != 0:
+                sideoppct = restopslist.pop(0)
+                sideopclass = restopslist.pop(0)
+                sideoppath = restopslist.pop(0)
+                sideoppctrnd = int(sideoppct + .5)
+                junklist.append(sideoppct)
+                junklist.append(sideopclass)
+                junklist.append(sideoppath)
+                descendingrestlist.append(junklist)
+                junklist = []
+            descendingrestlist.sort(reverse=True)
+            for triplet in descendingorderlist:
+                alllist.append(triplet)
+                for resttriplet in descendingrestlist:
+                    if triplet[2] == resttriplet[2]:
+                        alllist.append(resttriplet)
 
         except:
             # Get the traceback object
             tb = sys.exc_info()[2]
             tbinfo = traceback.format_tb(tb)[0]
             # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
             # Write Python error messages to log
             err= pymsg + "\n"
             print(err)
 
         #---------------------------------------------------------------------------------
         #
-        #                        look up significant classes
+        #                            significant class facts
         #
+        #  This section analyzes every lithology, landcover, landform, and bioclimate that
+        #  makes up over 10% of the study area and populates classlist with the analysis facts.
         #
-        #--------------------------------------------------------------------------------
-        if studyarealist[4] > 15:
-            try:
-                global i
-                global restopslist
-                p("*** look up significant classes...")
-                sideopslist = []
-                restopslist = []
-                alllist = []
-
-                #Assemble characterization text.
-                currentTime = time.clock()
-                print(str(currentTime-startTime)+" seconds have elapsed so far")
-                print("Assembling characterization text...")
-                AllPoly=[inmem+"\\Bioclimate_R", inmem+"\\Landform_R", inmem+"\\Lithology_R", inmem+"\\Landcover_R"]
-                for i in AllPoly:
-                    if i.endswith("Bioclimate_R") == True:
-                        Bio = i
-                        #Bio
-                        largVal_bio=largest(Bio,"percent")
-                        key_bioclimate= findString(Bio, largVal_bio)
-                        bioclimate_string = bioclimate_dict[key_bioclimate]
-                        #find other values bigger than 10% smaller than the largest value
-                        bioclimate_rest= restofValues(Bio, largVal_bio, bioclimate_dict)
-                    elif i.endswith("Landform_R") == True:
-                        Landform=i
-                        #Landform
-                        largVal_landform=largest(Landform,"percent")
-                        key_landform=findString(Landform,largVal_landform)
-                        landform_string = landform_dict[key_landform]
-                        #find other values bigger than 10% smaller than the largest value
-                        landform_rest= restofValues(Landform, largVal_landform, landform_dict)
-                    elif i.endswith("Lithology_R") == True:
-                        Lithology=i
-                        #Lithology
-                        largVal_lit=largest(Lithology,"percent")
-                        ##tr_lit=int(round((largVal_lit/10)-.5))
-                        key_lithology=findString(Lithology,largVal_lit)
-                        lithology_string = lithology_dict[key_lithology]
-                        #find rest of the values bigger than 10% smaller than the biggest value
-                        lithology_rest= restofValues(Lithology, largVal_lit, lithology_dict)
-                    elif i.endswith("Landcover_R") == True:
-                        Landcover= i
-                        largVal_landcover=largest(Landcover,"percent")
-                        key_landcover=findString(Landcover, largVal_landcover)
-                        landcover_string = landcover_dict[key_landcover]
-                        #find rest of the values bigger than 10%  smaller than the biggest value
-                        landcover_rest= restofValues(Landcover, largVal_landcover, landcover_dict)
-
-                        polygonfc=output+"\\proj"
-
-                        #The area of the polygonfc determines some text, if it's called a place, area, or region.
-                        largVal_polygonfc=largest(polygonfc,"SHAPE_Area")
-
-                        if largVal_polygonfc < warnthreshold:
-                            warnings.warn("Warning: "+polyname+" is less than 1000 pixels. This is less than the minimum designed study area size.", UserWarning, stacklevel=2)
-
-            except IOError:
-                print("This does not appear to be a valid polygon feature class. A valid")
-                print("feature class contains at least some land area and can not be")
-                print("completely over ocean.")
-                raise
-
-            except:
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
-
-
-            #----------------------------------side operations--------------------------------
-            #
-            # Order a list so the four predominant ecophysiographic criteria appear in order from highest
-            # to lowest by percentage. If lithology appears first, demote it to second place.
-            # Follow up listing each of the other criteria that are over 10% with the predominant criteria,
-            # so all the lithology are together, all the bioclimate, landform and land cover are together
-            # in their own paragraphs from predominant value, in descending order to the least significant value.
-            #
-            #--------------------------------------------------------------------------------
-
-        p("*** side operations..")
-        dummyvalue = -9999
-        alllist = []
-        descendingorderlist = []
-        descendingrestlist = []
-        junklist = []
-        connectors = [['In addition, '],['Furthermore, '],['Also, '],['Moreover, ']]
-
-        if studyarealist[4] > 15:
-            try:
-                while len(sideopslist) != 0:
-                    sideoppct = sideopslist.pop(0)
-                    sideopclass = sideopslist.pop(0)
-                    sideoppath = sideopslist.pop(0)
-                    sideoppctrnd = int(sideoppct + .5)
-                    junklist.append(sideoppct)
-                    junklist.append(sideopclass)
-                    junklist.append(sideoppath)
-                    descendingorderlist.append(junklist)
-                    junklist = []
-                descendingorderlist.sort(reverse=True)
-                x = 0
-                # move lithology paragraph so that it is the last paragraph.
-                for triplet in descendingorderlist:
-                    if triplet[2].endswith("Lithology_R") == True and x <= 2:
-                        lithofirst = descendingorderlist.pop(x)
-                        descendingorderlist.insert(3,lithofirst)
-                    x += 1
-                x = 0
-                # now if landcover appears first or second, move it to third place. The characterization will now lead with either landform or bioclimate.
-                for triplet in descendingorderlist:
-                    if triplet[2].endswith("Landcover_R") == True and x <= 1:
-                        lcfirst = descendingorderlist.pop(x)
-                        descendingorderlist.insert(2,lcfirst)
-                    x += 1
-                for triplet in descendingorderlist:
-                    if triplet[2].endswith("Bioclimate_R") == True:
-                        topbioclimatepercent = triplet[0]
-                    if triplet[2].endswith("Landform_R") == True:
-                        toplandformpercent = triplet[0]
-                    if triplet[2].endswith("Landcover_R") == True:
-                        toplandcoverpercent = triplet[0]
-                    if triplet[2].endswith("Lithology_R") == True:
-                        toplithopercent = triplet[0]
-                while len(restopslist) != 0:
-                    sideoppct = restopslist.pop(0)
-                    sideopclass = restopslist.pop(0)
-                    sideoppath = restopslist.pop(0)
-                    sideoppctrnd = int(sideoppct + .5)
-                    junklist.append(sideoppct)
-                    junklist.append(sideopclass)
-                    junklist.append(sideoppath)
-                    descendingrestlist.append(junklist)
-                    junklist = []
-                descendingrestlist.sort(reverse=True)
-                for triplet in descendingorderlist:
-                    alllist.append(triplet)
-                    for resttriplet in descendingrestlist:
-                        if triplet[2] == resttriplet[2]:
-                            alllist.append(resttriplet)
-
-            except:
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
-
-            #---------------------------------------------------------------------------------
-            #
-            #                            significant class facts
-            #
-            #  This section analyzes every lithology, landcover, landform, and bioclimate that
-            #  makes up over 10% of the study area and populates classlist with the analysis facts.
-            #
-            #---------------------------------------------------------------------------------
-
-        if studyarealist[4] > 15:
-            try:
-                #p("Analyzing significant ecophysiographic phenomena in detail...")
-                currentTime = time.clock()
-                print(str(currentTime-startTime)+" seconds have elapsed so far")
-                print("Analyzing significant ecophysiographic phenomena in detail...")
-
-                # clear counters which count off how many times a loop has been executed on each ecophysiographic class.
-                landcovertimes = 0
-                lithologytimes = 0
-                bioclimatetimes = 0
-                landformtimes = 0
-                classlist = []
-                count0 = 0
-                classname0 = []
-
-                # clear variables which store the text that is used to create the output text fields.
-                # description = this variable collects the text for the bulleted fact sheet, with percentages written out.
-                # description = the text for the four paragraph characterization, using adjectives to approximate quantity.
-                preface = ""
-                description = ""
-                description = ""
-
-
-                # Now that alllist is ordered in the order that sentences will be written, perform some analysis
-                # to find out what to say about each class. The analysis results will populate the classlist list object.
-                # bioclimatelist,
-                for analclass in alllist:
-                    thepct = analclass[0]
-                    theclass = analclass[1]
-
-                    # BIOCLIMATES side operations
-                    # Extract the bioclimate class from the bioclimates raster. Output the minimum, mean, and maximum elevation
-                    # for that bioclimates raster into variables. Use those variables in a sentence which gives the minimum and
-                    # maximum elevation as context for that bioclimate. If the mean of the bioclimate is greater than the mean
-                    # plus the standard deviation of the con_extent, add "at the higher elevations" to the sentence. If the mean
-                    # of the bioclimate is less than the mean minus the standard deviation of con_extent, add "at the lower
-                    # elevations" to the sentence.
-                    #
-                    # If any bioclimate classes are over 10% of the study area, find out more details about those classes.
-                    #if analclass[2] == inmem+"\\Bioclimate_R":
-                    if analclass[2].endswith("Bioclimate_R") == True:
-                        bioclimatelist = []
-                        #What is the pathname to this bioclimate subclass? bioclimatelist[0]
-                        bioclimatelist.append(analclass[2])
-                        #What's the bioclimate called? bioclimatelist[1]
-                        bioclimatelist.append(analclass[1])
-                        currentTime = time.clock()
-                        print(str(currentTime-startTime)+" seconds have elapsed so far")
-                        print("-----performing side operations on bioclimate class " + analclass[1]+"-----")
-                        bioclimatetimes += 1
-                        attExtract = ExtractByAttributes(analclass[2], "ClassName = '"+analclass[1]+"'")
-
-                        feature = os.path.join(inmem,'extractg')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
+        #---------------------------------------------------------------------------------
 
-                        attExtract.save(inmem+"\\extractg")
-                        # For each significant bioclimate, find out if its mean elevation is above or below
-                        # one standard deviation of the study area mean elevation.
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
-                            for row in cursor:
-                                #What is this bioclimate subclass' area? bioclimatelist[2]
-                                bioclimatelist.append(row[0])
-                                #What is this bioclimate subclass' percentage of the overall study area? bioclimatelist[3]
-                                bioclimatelist.append(analclass[0])
-                                #What is this bioclimate subclass' rank in order of greatest to least percent of the study area? bioclimatelist[4]
-                                bioclimatelist.append(bioclimatetimes)
-                                #What is this bioclimate subclass' lowest elevation? bioclimatelist[5]
-                                bioclimatelist.append(row[1])
-                                #What is this bioclimate subclass' highest elevation? bioclimatelist[6]
-                                bioclimatelist.append(row[2])
-                                #What is this bioclimate subclass' mean elevation? bioclimatelist[7]
-                                bioclimatelist.append(row[3])
-                                #What is this bioclimate subclass' median elevation? bioclimatelist[8]
-                                bioclimatelist.append(row[4])
-                        #dummy bioclimatelist[9]
-                        bioclimatelist.append(dummyvalue)
-                        #dummy bioclimatelist[10]
-                        bioclimatelist.append(dummyvalue)
-                        # Take the extracted bioclimate class from the bioclimates raster and use it as a conditional raster to
-                        # output the landcover on just that bioclimate class. If a particular land cover is over half of the
-                        # bioclimate class, write a sentence that says most of this bioclimate zone is covered by a particular land
-                        # cover class. If a particular land cover class is over 89%, change 'over half' to 'almost all'. And if
-                        # that land cover class is over 99%, change 'over half' to 'all'.
-                        feature = os.path.join(inmem,'cong')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            ##arcpy.CopyRaster_management(inmem+"\\cong", r"C:\gis\GeoDescriber\current.gdb\cong")
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top landform in the area covered by this subclass? bioclimatelist[11]
-                        bioclimatelist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top landform? bioclimatelist[12]
-                        bioclimatelist.append((count0/bioclimatelist[2])*100)
-                        feature = os.path.join(inmem,'cong')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top rock type in the area covered by this subclass? bioclimatelist[13]
-                        bioclimatelist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top rock type? bioclimatelist[14]
-                        bioclimatelist.append((count0/bioclimatelist[2])*100)
+    if studyarealist.area > 15:
+        try:
+            #p("Analyzing significant ecophysiographic phenomena in detail...")
+            print("Analyzing significant ecophysiographic phenomena in detail...")
+
+            # clear counters which count off how many times a loop has been executed on each ecophysiographic class.
+            landcovertimes = 0
+            lithologytimes = 0
+            bioclimatetimes = 0
+            landformtimes = 0
+            classlist = []
+            count0 = 0
+            classname0 = []
+
+            # clear variables which store the text that is used to create the output text fields.
+            # description = this variable collects the text for the bulleted fact sheet, with percentages written out.
+            # description = the text for the four paragraph characterization, using adjectives to approximate quantity.
+            preface = ""
+            description = ""
+            description = ""
+
+
+            # Now that alllist is ordered in the order that sentences will be written, perform some analysis
+            # to find out what to say about each class. The analysis results will populate the classlist list object.
+            # bioclimatelist,
+            for analclass in alllist:
+                thepct = analclass[0]
+                theclass = analclass[1]
+
+                # BIOCLIMATES side operations
+                # Extract the bioclimate class from the bioclimates raster. Output the minimum, mean, and maximum elevation
+                # for that bioclimates raster into variables. Use those variables in a sentence which gives the minimum and
+                # maximum elevation as context for that bioclimate. If the mean of the bioclimate is greater than the mean
+                # plus the standard deviation of the con_extent, add "at the higher elevations" to the sentence. If the mean
+                # of the bioclimate is less than the mean minus the standard deviation of con_extent, add "at the lower
+                # elevations" to the sentence.
+                #
+                # If any bioclimate classes are over 10% of the study area, find out more details about those classes.
+                #if analclass[2] == inmem+"\\Bioclimate_R":
+                if analclass[2].endswith("Bioclimate_R") == True:
+                    bioclimatelist = BioclimateFacts()
+                    #What is the pathname to this bioclimate subclass? bioclimatelist[0]
+                    bioclimatelist.path = analclass[2]
+                    #What's the bioclimate called? bioclimatelist[1]
+                    bioclimatelist.name = analclass[1]
+                    print("-----performing side operations on bioclimate class " + analclass[1]+"-----")
+                    bioclimatetimes += 1
+                    attExtract = ExtractByAttributes(analclass[2], registryOf(analclass[2]).whereClause(analclass[1]))
+
+                    feature = os.path.join(inmem,'extractg')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+
+                    attExtract.save(inmem+"\\extractg")
+                    # For each significant bioclimate, find out if its mean elevation is above or below
+                    # one standard deviation of the study area mean elevation.
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
+                        for row in cursor:
+                            #What is this bioclimate subclass' area? bioclimatelist[2]
+                            bioclimatelist.area = row[0]
+                            #What is this bioclimate subclass' percentage of the overall study area? bioclimatelist[3]
+                            bioclimatelist.percent = analclass[0]
+                            #What is this bioclimate subclass' rank in order of greatest to least percent of the study area? bioclimatelist[4]
+                            bioclimatelist.rank = bioclimatetimes
+                            #What is this bioclimate subclass' lowest elevation? bioclimatelist[5]
+                            bioclimatelist.minelevation = row[1]
+                            #What is this bioclimate subclass' highest elevation? bioclimatelist[6]
+                            bioclimatelist.maxelevation = row[2]
+                            #What is this bioclimate subclass' mean elevation? bioclimatelist[7]
+                            bioclimatelist.meanelevation = row[3]
+                            #What is this bioclimate subclass' median elevation? bioclimatelist[8]
+                            bioclimatelist.medianelevation = row[4]
+                    # Take the extracted bioclimate class from the bioclimates raster and use it as a conditional raster to
+                    # output the landcover on just that bioclimate class. If a particular land cover is over half of the
+                    # bioclimate class, write a sentence that says most of this bioclimate zone is covered by a particular land
+                    # cover class. If a particular land cover class is over 89%, change 'over half' to 'almost all'. And if
+                    # that land cover class is over 99%, change 'over half' to 'all'.
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landform'])
+                    #What is the top landform in the area covered by this subclass? bioclimatelist[11]
+                    bioclimatelist.toplandform = classname0
+                    #What percentage of the area covered by this subclass is the top landform? bioclimatelist[12]
+                    bioclimatelist.toplandformpercent = (count0/bioclimatelist.area)*100
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Lithology'])
+                    #What is the top rock type in the area covered by this subclass? bioclimatelist[13]
+                    bioclimatelist.toplithology = classname0
+                    #What percentage of the area covered by this subclass is the top rock type? bioclimatelist[14]
+                    bioclimatelist.toplithologypercent = (count0/bioclimatelist.area)*100
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landcover'])
+                    #What is the top land cover in the area covered by this subclass? bioclimatelist[15]
+                    bioclimatelist.toplandcover = classname0
+                    #What percentage of the area covered by this subclass is the top land cover? bioclimatelist[16]
+                    bioclimatelist.toplandcoverpercent = (count0/bioclimatelist.area)*100
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
+                        for row in cursor:
+                            #What is the mean ELU diversity in this climate zone? bioclimatelist[17]
+                            bioclimatelist.meandiversity = row[0]
+                            #What is the median ELU diversity in this climate zone? bioclimatelist[18]
+                            #this is a dummy value because there is no median in floating point
+                            bioclimatelist.mediandiversity = row[0]
+
+                    neq = 0
+                    seq = 0
+                    swq = 0
+                    nwq = 0
+                    zes = 0
+                    zws = 0
+                    zss = 0
+                    zns = 0
+                    zonesw = 0
+                    zonew = 0
+                    zonenw = 0
+                    zones = 0
+                    zonec = 0
+                    zonen = 0
+                    zonese = 0
+                    zonee = 0
+                    zonene = 0
+
+                    try:
                         feature = os.path.join(inmem,'cong')
                         if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                            arcpy.Delete_management(feature)
+                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
                         cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
+                        with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
+                            for rowmwz in cursor:
+                                if rowmwz[0] == 11:
+                                    zonesw = rowmwz[1]
+                                if rowmwz[0] == 12:
+                                    zonew = rowmwz[1]
+                                if rowmwz[0] == 13:
+                                    zonenw = rowmwz[1]
+                                if rowmwz[0] == 21:
+                                    zones = rowmwz[1]
+                                if rowmwz[0] == 22:
+                                    zonec = rowmwz[1]
+                                if rowmwz[0] == 23:
+                                    zonen = rowmwz[1]
+                                if rowmwz[0] == 31:
+                                    zonese = rowmwz[1]
+                                if rowmwz[0] == 32:
+                                    zonee = rowmwz[1]
+                                if rowmwz[0] == 33:
+                                    zonene = rowmwz[1]
+
+                        del cong
+                        #number of cells in the southwest. bioclimatelist[22]
+                        bioclimatelist.zonesw = zonesw
+                        #number of cells in the west. bioclimatelist[23]
+                        bioclimatelist.zonew = zonew
+                        #number of cells in the northwest. bioclimatelist[24]
+                        bioclimatelist.zonenw = zonenw
+                        #number of cells in the south. bioclimatelist[25]
+                        bioclimatelist.zones = zones
+                        #number of cells in the center. bioclimatelist[26]
+                        bioclimatelist.zonec = zonec
+                        #number of cells in the north. bioclimatelist[27]
+                        bioclimatelist.zonen = zonen
+                        #number of cells in the southeast. bioclimatelist[28]
+                        bioclimatelist.zonese = zonese
+                        #number of cells in the east. bioclimatelist[29]
+                        bioclimatelist.zonee = zonee
+                        #number of cells in the northeast. bioclimatelist[30]
+                        bioclimatelist.zonene = zonene
+
+                        neq = bioclimatelist.zonec+bioclimatelist.zonen+bioclimatelist.zonee+bioclimatelist.zonene
+                        seq = bioclimatelist.zonec+bioclimatelist.zones+bioclimatelist.zonee+bioclimatelist.zonese
+                        swq = bioclimatelist.zonesw+bioclimatelist.zonew+bioclimatelist.zones+bioclimatelist.zonec
+                        nwq = bioclimatelist.zonew+bioclimatelist.zonenw+bioclimatelist.zonec+bioclimatelist.zonen
+                        zes = bioclimatelist.zonese+bioclimatelist.zonee+bioclimatelist.zonene
+                        zws = bioclimatelist.zonesw+bioclimatelist.zonew+bioclimatelist.zonenw
+                        zss = bioclimatelist.zonesw+bioclimatelist.zones+bioclimatelist.zonese
+                        zns = bioclimatelist.zonenw+bioclimatelist.zonen+bioclimatelist.zonene
+
+                        maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
+
+                        #How many cells are in the most likely part of the bioclimate class?[31]
+                        bioclimatelist.partcells = maxzone[0]
+                        #What phrase describes the most likely part of this bioclimate class?[32]
+                        bioclimatelist.partphrase = maxzone[1]
+                        #What percentage of the most likely part of the bioclimate class is this bioclimate class?[33]
+                        if maxzone[2] != 0:
+                            bioclimatelist.partpercent = (maxzone[0]/maxzone[2])*100
                         else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top land cover in the area covered by this subclass? bioclimatelist[15]
-                        bioclimatelist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top land cover? bioclimatelist[16]
-                        bioclimatelist.append((count0/bioclimatelist[2])*100)
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
-                            for row in cursor:
-                                #What is the mean ELU diversity in this climate zone? bioclimatelist[17]
-                                bioclimatelist.append(row[0])
-                                #What is the median ELU diversity in this climate zone? bioclimatelist[18]
-                                #this is a dummy value because there is no median in floating point
-                                bioclimatelist.append(row[0])
-                        #dummy value bioclimatelist[19]
-                        bioclimatelist.append(dummyvalue)
-                        #dummy value bioclimatelist[20]
-                        bioclimatelist.append(dummyvalue)
-                        #dummy value bioclimatelist[21]
-                        bioclimatelist.append(dummyvalue)
+                            bioclimatelist.partpercent = 0
 
                         neq = 0
                         seq = 0
@@ -2132,291 +3727,259 @@ def GeoDescriber():
                         zonee = 0
                         zonene = 0
 
-                        try:
-                            feature = os.path.join(inmem,'cong')
-                            if arcpy.Exists(feature):
-                            	arcpy.Delete_management(feature)
-                            cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
-                            cong.save(inmem+"\\cong")
-                            with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
-                                for rowmwz in cursor:
-                                    if rowmwz[0] == 11:
-                                        zonesw = rowmwz[1]
-                                    if rowmwz[0] == 12:
-                                        zonew = rowmwz[1]
-                                    if rowmwz[0] == 13:
-                                        zonenw = rowmwz[1]
-                                    if rowmwz[0] == 21:
-                                        zones = rowmwz[1]
-                                    if rowmwz[0] == 22:
-                                        zonec = rowmwz[1]
-                                    if rowmwz[0] == 23:
-                                        zonen = rowmwz[1]
-                                    if rowmwz[0] == 31:
-                                        zonese = rowmwz[1]
-                                    if rowmwz[0] == 32:
-                                        zonee = rowmwz[1]
-                                    if rowmwz[0] == 33:
-                                        zonene = rowmwz[1]
-
-                            del cong
-                            #number of cells in the southwest. bioclimatelist[22]
-                            bioclimatelist.append(zonesw)
-                            #number of cells in the west. bioclimatelist[23]
-                            bioclimatelist.append(zonew)
-                            #number of cells in the northwest. bioclimatelist[24]
-                            bioclimatelist.append(zonenw)
-                            #number of cells in the south. bioclimatelist[25]
-                            bioclimatelist.append(zones)
-                            #number of cells in the center. bioclimatelist[26]
-                            bioclimatelist.append(zonec)
-                            #number of cells in the north. bioclimatelist[27]
-                            bioclimatelist.append(zonen)
-                            #number of cells in the southeast. bioclimatelist[28]
-                            bioclimatelist.append(zonese)
-                            #number of cells in the east. bioclimatelist[29]
-                            bioclimatelist.append(zonee)
-                            #number of cells in the northeast. bioclimatelist[30]
-                            bioclimatelist.append(zonene)
-
-                            neq = bioclimatelist[26]+bioclimatelist[27]+bioclimatelist[29]+bioclimatelist[30]
-                            seq = bioclimatelist[26]+bioclimatelist[25]+bioclimatelist[29]+bioclimatelist[28]
-                            swq = bioclimatelist[22]+bioclimatelist[23]+bioclimatelist[25]+bioclimatelist[26]
-                            nwq = bioclimatelist[23]+bioclimatelist[24]+bioclimatelist[26]+bioclimatelist[27]
-                            zes = bioclimatelist[28]+bioclimatelist[29]+bioclimatelist[30]
-                            zws = bioclimatelist[22]+bioclimatelist[23]+bioclimatelist[24]
-                            zss = bioclimatelist[22]+bioclimatelist[25]+bioclimatelist[28]
-                            zns = bioclimatelist[24]+bioclimatelist[27]+bioclimatelist[30]
-
-                            maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
-
-                            #How many cells are in the most likely part of the bioclimate class?[31]
-                            bioclimatelist.append(maxzone[0])
-                            #What phrase describes the most likely part of this bioclimate class?[32]
-                            bioclimatelist.append(maxzone[1])
-                            #What percentage of the most likely part of the bioclimate class is this bioclimate class?[33]
-                            if maxzone[2] != 0:
-                                bioclimatelist.append((maxzone[0]/maxzone[2])*100)
-                            else:
-                                bioclimatelist.append(0)
-
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-
-                        except ValueError:
-                            print("value error")
-
-                        except IndexError:
-                            print("index error")
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-
-                        classlist.append(bioclimatelist)
-                        #print bioclimatelist
-                        print("length of bioclimatelist is "+str(len(bioclimatelist)))
-
-                        if len(bioclimatelist) != 34:
-                            GeoDescriberTries +=1
-                            return
-
-                    # LANDFORMS side operations
-                    # Extract the landform class from the landforms raster and
-                    # if any landform classes are over 10% of the study area, find out more details about those classes.
-                    elif analclass[2].endswith("Landform_R") == True:
-                    #elif analclass[2] == output+"\\Landform_R":
-                        landformlist = []
-                        #What is the pathname to this landform subclass? landformlist[0]
-                        landformlist.append(analclass[2])
-                        #What's the landform called? landformlist[1]
-                        landformlist.append(analclass[1])
-                        currentTime = time.clock()
-                        print(str(currentTime-startTime)+" seconds have elapsed so far")
-                        print("-----performing side operations on landform class " + analclass[1]+"-----")
-                        landformtimes += 1
-                        attExtract = ExtractByAttributes(analclass[2], "ClassName = '"+analclass[1]+"'")
-
-                        feature = os.path.join(inmem,'extractg')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
+                    except ValueError:
+                        print("value error")
 
-                        attExtract.save(inmem+"\\extractg")
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
-                            for row in cursor:
-                                #What is this landform subclass' area? landformlist[2]
-                                landformlist.append(row[0])
-                                #What is this landform subclass' percentage of the overall study area? landformlist[3]
-                                landformlist.append(analclass[0])
-                                #What is this landform subclass' rank in order of greatest to least percent of the study area? landformlist[4]
-                                landformlist.append(landformtimes)
-                                #What is this landform subclass' lowest elevation? landformlist[5]
-                                landformlist.append(row[1])
-                                #What is this landform subclass' highest elevation? landformlist[6]
-                                landformlist.append(row[2])
-                                #What is this landform subclass' mean elevation? landformlist[7]
-                                landformlist.append(row[3])
-                                #What is this landform subclass' median elevation? landformlist[8]
-                                landformlist.append(row[4])
-                        # Take the extracted landform class from the landforms raster and use it as a conditional raster to
-                        # output the landcover on just that landform class. If a particular land cover is over half of the
-                        # landform class, write a sentence that says most of this landform zone is covered by a particular land
-                        # cover class. If a particular land cover class is over 89%, change 'over half' to 'almost all'. And if
-                        # that land cover class is over 99%, change 'over half' to 'all'.
+                    except IndexError:
+                        print("index error")
+                        neq = 0
+                        seq = 0
+                        swq = 0
+                        nwq = 0
+                        zes = 0
+                        zws = 0
+                        zss = 0
+                        zns = 0
+                        zonesw = 0
+                        zonew = 0
+                        zonenw = 0
+                        zones = 0
+                        zonec = 0
+                        zonen = 0
+                        zonese = 0
+                        zonee = 0
+                        zonene = 0
+
+                    classlist.append(bioclimatelist)
+                    #print bioclimatelist
+
+                    if bioclimatelist.missing() != []:
+                        raise ValueError("Could not find "+", ".join(bioclimatelist.missing())+" of "+str(theclass)+".")
+
+                # LANDFORMS side operations
+                # Extract the landform class from the landforms raster and
+                # if any landform classes are over 10% of the study area, find out more details about those classes.
+                elif analclass[2].endswith("Landform_R") == True:
+                #elif analclass[2] == output+"\\Landform_R":
+                    landformlist = LandformFacts()
+                    #What is the pathname to this landform subclass? landformlist[0]
+                    landformlist.path = analclass[2]
+                    #What's the landform called? landformlist[1]
+                    landformlist.name = analclass[1]
+                    print("-----performing side operations on landform class " + analclass[1]+"-----")
+                    landformtimes += 1
+                    attExtract = ExtractByAttributes(analclass[2], registryOf(analclass[2]).whereClause(analclass[1]))
+
+                    feature = os.path.join(inmem,'extractg')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+
+                    attExtract.save(inmem+"\\extractg")
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
+                        for row in cursor:
+                            #What is this landform subclass' area? landformlist[2]
+                            landformlist.area = row[0]
+                            #What is this landform subclass' percentage of the overall study area? landformlist[3]
+                            landformlist.percent = analclass[0]
+                            #What is this landform subclass' rank in order of greatest to least percent of the study area? landformlist[4]
+                            landformlist.rank = landformtimes
+                            #What is this landform subclass' lowest elevation? landformlist[5]
+                            landformlist.minelevation = row[1]
+                            #What is this landform subclass' highest elevation? landformlist[6]
+                            landformlist.maxelevation = row[2]
+                            #What is this landform subclass' mean elevation? landformlist[7]
+                            landformlist.meanelevation = row[3]
+                            #What is this landform subclass' median elevation? landformlist[8]
+                            landformlist.medianelevation = row[4]
+                    # Take the extracted landform class from the landforms raster and use it as a conditional raster to
+                    # output the landcover on just that landform class. If a particular land cover is over half of the
+                    # landform class, write a sentence that says most of this landform zone is covered by a particular land
+                    # cover class. If a particular land cover class is over 89%, change 'over half' to 'almost all'. And if
+                    # that land cover class is over 99%, change 'over half' to 'all'.
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Bioclimate'])
+                    #What is the top bioclimate in the area covered by this subclass? landformlist[9]
+                    landformlist.topbioclimate = classname0
+                    #What percentage of the area covered by this subclass is the top bioclimate? landformlist[10]
+                    landformlist.topbioclimatepercent = (count0/landformlist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Lithology'])
+                    #What is the top rock type in the area covered by this subclass? landformlist[13]
+                    landformlist.toplithology = classname0
+                    #What percentage of the area covered by this subclass is the top rock type? landformlist[14]
+                    landformlist.toplithologypercent = (count0/landformlist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landcover'])
+                    #What is the top land cover in the area covered by this subclass? landformlist[15]
+                    landformlist.toplandcover = classname0
+                    #What percentage of the area covered by this subclass is the top land cover? landformlist[16]
+                    landformlist.toplandcoverpercent = (count0/landformlist.area)*100
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
+                        for row in cursor:
+                            #What is the mean ELU diversity in this landform zone? landformlist[17]
+                            landformlist.meandiversity = row[0]
+                            #What is the median ELU diversity in this landform zone? landformlist[18]
+                            #this is a dummy value because there is no median in floating point
+                            landformlist.mediandiversity = row[0]
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Slope_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN","MEDIAN"]) as cursor:
+                        for row in cursor:
+                            #What is the mean slope percentage of this landform subclass? landformlist[19]
+                            landformlist.meanslope = row[0]
+                            #What is the median slope percentage of this landform subclass? landformlist[20]
+                            landformlist.medianslope = row[1]
+                    # Take the extracted landform class raster and use it as a conditional raster, this time with the aspect
+                    # raster aspectindexg. Next, sum up aspect counts for the 180 degrees which face all 8 directions. Of all
+                    # 8 directions, take the largest number. If this number does not equal half of the cell count for the whole
+                    # area of the extracted landform class, populate the variable aspectstatement with the phrase "not facing
+                    # any direction, by majority. " Otherwise populate the variable aspectstatement with the phrase "generally
+                    # facing ____. ", for example "north", filling in the blank with the direction with the largest cell count
+                    # in its 180 degree face.
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    xbx=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\aspectindexg")
+                    xbx.save(inmem+"\\cong")
+                    aspecttuples = []
+                    with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
+                        for row in cursor:
+                            aspecttuples.append([row[0],row[1]])
+                        aspectdict0 = dict(aspecttuples)
+                        aspectkeys = [-1,1,2,3,4,5,6,7,8]
+                        for key in aspectkeys:
+                            try:
+                                aspectdict0[key]
+                            except:
+                                aspecttuples.append([key,0])
+                        aspectdict = dict(aspecttuples)
+                        face_n = int(aspectdict[7] + aspectdict[8] + aspectdict[1] + aspectdict[2])
+                        face_ne = int(aspectdict[8] + aspectdict[1] + aspectdict[2] + aspectdict[3])
+                        face_e = int(aspectdict[1] + aspectdict[2] + aspectdict[3] + aspectdict[4])
+                        face_se = int(aspectdict[2] + aspectdict[3] + aspectdict[4] + aspectdict[5])
+                        face_s = int(aspectdict[3] + aspectdict[4] + aspectdict[5] + aspectdict[6])
+                        face_sw = int(aspectdict[4] + aspectdict[5] + aspectdict[6] + aspectdict[7])
+                        face_w = int(aspectdict[5] + aspectdict[6] + aspectdict[7] + aspectdict[8])
+                        face_nw = int(aspectdict[6] + aspectdict[7] + aspectdict[8] + aspectdict[1])
+                        all_faces = int(aspectdict[1] + aspectdict[2] + aspectdict[3] + aspectdict[4] + aspectdict[5] + aspectdict[6] + aspectdict[7] + aspectdict[8] + aspectdict[-1])
+                        largest_face = max(face_n, face_nw, face_w, face_sw, face_s, face_se, face_e, face_ne)
+                        aspectstatement = ""
+                        #aspectstatement = " "
+                        #aspectstatement = "not facing any direction, by majority"
+                        if float(largest_face)/float(all_faces) > .583:
+                            if largest_face == face_n:
+                                aspectstatement = ", generally facing north"
+                            elif largest_face == face_nw:
+                                aspectstatement = ", generally facing northwest"
+                            elif largest_face == face_ne:
+                                aspectstatement = ", generally facing northeast"
+                            elif largest_face == face_se:
+                                aspectstatement = ", generally facing southeast"
+                            elif largest_face == face_s:
+                                aspectstatement = ", generally facing south"
+                            elif largest_face == face_sw:
+                                aspectstatement = ", generally facing southwest"
+                            elif largest_face == face_w:
+                                aspectstatement = ", generally facing west"
+                            elif largest_face == face_e:
+                                aspectstatement = ", generally facing east"
+                        #What aspect does this landform face, by majority?  landformlist[21]
+                        landformlist.aspect = aspectstatement
+
+                    neq = 0
+                    seq = 0
+                    swq = 0
+                    nwq = 0
+                    zes = 0
+                    zws = 0
+                    zss = 0
+                    zns = 0
+                    zonesw = 0
+                    zonew = 0
+                    zonenw = 0
+                    zones = 0
+                    zonec = 0
+                    zonen = 0
+                    zonese = 0
+                    zonee = 0
+                    zonene = 0
+
+                    try:
                         feature = os.path.join(inmem,'cong')
                         if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top bioclimate in the area covered by this subclass? landformlist[9]
-                        landformlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top bioclimate? landformlist[10]
-                        landformlist.append((count0/landformlist[2])*100)
-            			#dummy values landformlist[11] and landformlist[12]
-                        landformlist.append(dummyvalue)
-                        landformlist.append(dummyvalue)
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top rock type in the area covered by this subclass? landformlist[13]
-                        landformlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top rock type? landformlist[14]
-                        landformlist.append((count0/landformlist[2])*100)
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                            arcpy.Delete_management(feature)
+                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
                         cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top land cover in the area covered by this subclass? landformlist[15]
-                        landformlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top land cover? landformlist[16]
-                        landformlist.append((count0/landformlist[2])*100)
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
-                            for row in cursor:
-                                #What is the mean ELU diversity in this landform zone? landformlist[17]
-                                landformlist.append(row[0])
-                                #What is the median ELU diversity in this landform zone? landformlist[18]
-                                #this is a dummy value because there is no median in floating point
-                                landformlist.append(row[0])
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Slope_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN","MEDIAN"]) as cursor:
-                            for row in cursor:
-                                #What is the mean slope percentage of this landform subclass? landformlist[19]
-                                landformlist.append(row[0])
-                                #What is the median slope percentage of this landform subclass? landformlist[20]
-                                landformlist.append(row[1])
-                        # Take the extracted landform class raster and use it as a conditional raster, this time with the aspect
-                        # raster aspectindexg. Next, sum up aspect counts for the 180 degrees which face all 8 directions. Of all
-                        # 8 directions, take the largest number. If this number does not equal half of the cell count for the whole
-                        # area of the extracted landform class, populate the variable aspectstatement with the phrase "not facing
-                        # any direction, by majority. " Otherwise populate the variable aspectstatement with the phrase "generally
-                        # facing ____. ", for example "north", filling in the blank with the direction with the largest cell count
-                        # in its 180 degree face.
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        xbx=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\aspectindexg")
-                        xbx.save(inmem+"\\cong")
-                        aspecttuples = []
                         with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
-                            for row in cursor:
-                                aspecttuples.append([row[0],row[1]])
-                            aspectdict0 = dict(aspecttuples)
-                            aspectkeys = [-1,1,2,3,4,5,6,7,8]
-                            for key in aspectkeys:
-                                try:
-                                    aspectdict0[key]
-                                except:
-                                    aspecttuples.append([key,0])
-                            aspectdict = dict(aspecttuples)
-                            face_n = int(aspectdict[7] + aspectdict[8] + aspectdict[1] + aspectdict[2])
-                            face_ne = int(aspectdict[8] + aspectdict[1] + aspectdict[2] + aspectdict[3])
-                            face_e = int(aspectdict[1] + aspectdict[2] + aspectdict[3] + aspectdict[4])
-                            face_se = int(aspectdict[2] + aspectdict[3] + aspectdict[4] + aspectdict[5])
-                            face_s = int(aspectdict[3] + aspectdict[4] + aspectdict[5] + aspectdict[6])
-                            face_sw = int(aspectdict[4] + aspectdict[5] + aspectdict[6] + aspectdict[7])
-                            face_w = int(aspectdict[5] + aspectdict[6] + aspectdict[7] + aspectdict[8])
-                            face_nw = int(aspectdict[6] + aspectdict[7] + aspectdict[8] + aspectdict[1])
-                            all_faces = int(aspectdict[1] + aspectdict[2] + aspectdict[3] + aspectdict[4] + aspectdict[5] + aspectdict[6] + aspectdict[7] + aspectdict[8] + aspectdict[-1])
-                            largest_face = max(face_n, face_nw, face_w, face_sw, face_s, face_se, face_e, face_ne)
-                            aspectstatement = ""
-                            #aspectstatement = " "
-                            #aspectstatement = "not facing any direction, by majority"
-                            if float(largest_face)/float(all_faces) > .583:
-                                if largest_face == face_n:
-                                    aspectstatement = ", generally facing north"
-                                elif largest_face == face_nw:
-                                    aspectstatement = ", generally facing northwest"
-                                elif largest_face == face_ne:
-                                    aspectstatement = ", generally facing northeast"
-                                elif largest_face == face_se:
-                                    aspectstatement = ", generally facing southeast"
-                                elif largest_face == face_s:
-                                    aspectstatement = ", generally facing south"
-                                elif largest_face == face_sw:
-                                    aspectstatement = ", generally facing southwest"
-                                elif largest_face == face_w:
-                                    aspectstatement = ", generally facing west"
-                                elif largest_face == face_e:
-                                    aspectstatement = ", generally facing east"
-                            #What aspect does this landform face, by majority?  landformlist[21]
-                            landformlist.append(aspectstatement)
+                            for rowmwz in cursor:
+                                if rowmwz[0] == 11:
+                                    zonesw = rowmwz[1]
+                                if rowmwz[0] == 12:
+                                    zonew = rowmwz[1]
+                                if rowmwz[0] == 13:
+                                    zonenw = rowmwz[1]
+                                if rowmwz[0] == 21:
+                                    zones = rowmwz[1]
+                                if rowmwz[0] == 22:
+                                    zonec = rowmwz[1]
+                                if rowmwz[0] == 23:
+                                    zonen = rowmwz[1]
+                                if rowmwz[0] == 31:
+                                    zonese = rowmwz[1]
+                                if rowmwz[0] == 32:
+                                    zonee = rowmwz[1]
+                                if rowmwz[0] == 33:
+                                    zonene = rowmwz[1]
+
+                        del cong
+                        #number of cells in the southwest. landformlist[22]
+                        landformlist.zonesw = zonesw
+                        #number of cells in the west. landformlist[23]
+                        landformlist.zonew = zonew
+                        #number of cells in the northwest. landformlist[24]
+                        landformlist.zonenw = zonenw
+                        #number of cells in the south. landformlist[25]
+                        landformlist.zones = zones
+                        #number of cells in the center. landformlist[26]
+                        landformlist.zonec = zonec
+                        #number of cells in the north. landformlist[27]
+                        landformlist.zonen = zonen
+                        #number of cells in the southeast. landformlist[28]
+                        landformlist.zonese = zonese
+                        #number of cells in the east. landformlist[29]
+                        landformlist.zonee = zonee
+                        #number of cells in the northeast. landformlist[30]
+                        landformlist.zonene = zonene
+                        neq = landformlist.zonec+landformlist.zonen+landformlist.zonee+landformlist.zonene
+                        seq = landformlist.zonec+landformlist.zones+landformlist.zonee+landformlist.zonese
+                        swq = landformlist.zonesw+landformlist.zonew+landformlist.zones+landformlist.zonec
+                        nwq = landformlist.zonew+landformlist.zonenw+landformlist.zonec+landformlist.zonen
+                        zes = landformlist.zonese+landformlist.zonee+landformlist.zonene
+                        zws = landformlist.zonesw+landformlist.zonew+landformlist.zonenw
+                        zss = landformlist.zonesw+landformlist.zones+landformlist.zonese
+                        zns = landformlist.zonenw+landformlist.zonen+landformlist.zonene
+
+                        maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
+
+                        #How many cells are in the most likely part of the landform class?[31]
+                        landformlist.partcells = maxzone[0]
+                        #What phrase describes the most likely part of this landform class?[32]
+                        landformlist.partphrase = maxzone[1]
+                        #What percentage of the most likely part of the landform class is this landform class?[33]
+                        if maxzone[2] != 0:
+                            landformlist.partpercent = (maxzone[0]/maxzone[2])*100
+                        else:
+                            landformlist.partpercent = 0
 
                         neq = 0
                         seq = 0
@@ -2436,235 +3999,198 @@ def GeoDescriber():
                         zonee = 0
                         zonene = 0
 
-                        try:
-                            feature = os.path.join(inmem,'cong')
-                            if arcpy.Exists(feature):
-                            	arcpy.Delete_management(feature)
-                            cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
-                            cong.save(inmem+"\\cong")
-                            with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
-                                for rowmwz in cursor:
-                                    if rowmwz[0] == 11:
-                                        zonesw = rowmwz[1]
-                                    if rowmwz[0] == 12:
-                                        zonew = rowmwz[1]
-                                    if rowmwz[0] == 13:
-                                        zonenw = rowmwz[1]
-                                    if rowmwz[0] == 21:
-                                        zones = rowmwz[1]
-                                    if rowmwz[0] == 22:
-                                        zonec = rowmwz[1]
-                                    if rowmwz[0] == 23:
-                                        zonen = rowmwz[1]
-                                    if rowmwz[0] == 31:
-                                        zonese = rowmwz[1]
-                                    if rowmwz[0] == 32:
-                                        zonee = rowmwz[1]
-                                    if rowmwz[0] == 33:
-                                        zonene = rowmwz[1]
-
-                            del cong
-                            #number of cells in the southwest. landformlist[22]
-                            landformlist.append(zonesw)
-                            #number of cells in the west. landformlist[23]
-                            landformlist.append(zonew)
-                            #number of cells in the northwest. landformlist[24]
-                            landformlist.append(zonenw)
-                            #number of cells in the south. landformlist[25]
-                            landformlist.append(zones)
-                            #number of cells in the center. landformlist[26]
-                            landformlist.append(zonec)
-                            #number of cells in the north. landformlist[27]
-                            landformlist.append(zonen)
-                            #number of cells in the southeast. landformlist[28]
-                            landformlist.append(zonese)
-                            #number of cells in the east. landformlist[29]
-                            landformlist.append(zonee)
-                            #number of cells in the northeast. landformlist[30]
-                            landformlist.append(zonene)
-                            neq = landformlist[26]+landformlist[27]+landformlist[29]+landformlist[30]
-                            seq = landformlist[26]+landformlist[25]+landformlist[29]+landformlist[28]
-                            swq = landformlist[22]+landformlist[23]+landformlist[25]+landformlist[26]
-                            nwq = landformlist[23]+landformlist[24]+landformlist[26]+landformlist[27]
-                            zes = landformlist[28]+landformlist[29]+landformlist[30]
-                            zws = landformlist[22]+landformlist[23]+landformlist[24]
-                            zss = landformlist[22]+landformlist[25]+landformlist[28]
-                            zns = landformlist[24]+landformlist[27]+landformlist[30]
-
-                            maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
-
-                            #How many cells are in the most likely part of the landform class?[31]
-                            landformlist.append(maxzone[0])
-                            #What phrase describes the most likely part of this landform class?[32]
-                            landformlist.append(maxzone[1])
-                            #What percentage of the most likely part of the landform class is this landform class?[33]
-                            if maxzone[2] != 0:
-                                landformlist.append((maxzone[0]/maxzone[2])*100)
-                            else:
-                                landformlist.append(0)
-
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-
-                        except ValueError:
-                            print("value error")
-                            print("starting over")
-
-                        except IndexError:
-                            print("index error")
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-                            print("starting over")
-
-                        classlist.append(landformlist)
-                        #print landformlist
-                        print("length of landformlist is "+str(len(landformlist)))
-
-                        if len(landformlist) != 34:
-                            GeoDescriberTries +=1
-                            return
-
-                    # LITHOLOGY side operations
-                    # If any lithology classes are over 10% of the study area, find out more details about those classes.
-                    elif analclass[2].endswith("Lithology_R") == True:
-                    #elif analclass[2] == output+"\\Lithology_R":
-                        lithologylist = []
-                        #What is the pathname to this lithology subclass? lithologylist[0]
-                        lithologylist.append(analclass[2])
-                        #What's the rock type called?  lithologylist[1]
-                        lithologylist.append(analclass[1])
-                        currentTime = time.clock()
-                        print(str(currentTime-startTime)+" seconds have elapsed so far")
-                        print("-----performing side operations on lithology class " + analclass[1]+"-----")
-                        lithologytimes += 1
-                        attExtract = ExtractByAttributes(analclass[2], "ClassName = '"+analclass[1]+"'")
-
-                        feature = os.path.join(inmem,'extractg')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-
-                        attExtract.save(inmem+"\\extractg")
-                        # Extract the lithology class from the lithology raster. Output the minimum and maximum elevation
-                        # for that lithology raster into variables. Use those variables in a phrase which gives the minimum and
-                        # maximum elevation as context for that bioclimate. " found at surface elevations between ______ and
-                        # _______m. "
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
-                            for row in cursor:
-                                #What is this rock type subclass' area? lithologylist[2]
-                                lithologylist.append(row[0])
-                                #What is this rock type subclass' percentage of the overall study area? lithologylist[3]
-                                lithologylist.append(analclass[0])
-                                #What is this rock type subclass' rank in order of greatest to least percent of the study area? lithologylist[4]
-                                lithologylist.append(lithologytimes)
-                                #What is this rock type subclass' lowest elevation? lithologylist[5]
-                                lithologylist.append(row[1])
-                                #What is this rock type subclass' highest elevation? lithologylist[6]
-                                lithologylist.append(row[2])
-                                #What is this rock type subclass' mean elevation? lithologylist[7]
-                                lithologylist.append(row[3])
-                                #What is this rock type subclass' median elevation? lithologylist[8]
-                                lithologylist.append(row[4])
+                    except ValueError:
+                        print("value error")
+                        print("starting over")
+
+                    except IndexError:
+                        print("index error")
+                        neq = 0
+                        seq = 0
+                        swq = 0
+                        nwq = 0
+                        zes = 0
+                        zws = 0
+                        zss = 0
+                        zns = 0
+                        zonesw = 0
+                        zonew = 0
+                        zonenw = 0
+                        zones = 0
+                        zonec = 0
+                        zonen = 0
+                        zonese = 0
+                        zonee = 0
+                        zonene = 0
+                        print("starting over")
+
+                    classlist.append(landformlist)
+                    #print landformlist
+
+                    if landformlist.missing() != []:
+                        raise ValueError("Could not find "+", ".join(landformlist.missing())+" of "+str(theclass)+".")
+
+                # LITHOLOGY side operations
+                # If any lithology classes are over 10% of the study area, find out more details about those classes.
+                elif analclass[2].endswith("Lithology_R") == True:
+                #elif analclass[2] == output+"\\Lithology_R":
+                    lithologylist = LithologyFacts()
+                    #What is the pathname to this lithology subclass? lithologylist[0]
+                    lithologylist.path = analclass[2]
+                    #What's the rock type called?  lithologylist[1]
+                    lithologylist.name = analclass[1]
+                    print("-----performing side operations on lithology class " + analclass[1]+"-----")
+                    lithologytimes += 1
+                    attExtract = ExtractByAttributes(analclass[2], registryOf(analclass[2]).whereClause(analclass[1]))
+
+                    feature = os.path.join(inmem,'extractg')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+
+                    attExtract.save(inmem+"\\extractg")
+                    # Extract the lithology class from the lithology raster. Output the minimum and maximum elevation
+                    # for that lithology raster into variables. Use those variables in a phrase which gives the minimum and
+                    # maximum elevation as context for that bioclimate. " found at surface elevations between ______ and
+                    # _______m. "
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
+                        for row in cursor:
+                            #What is this rock type subclass' area? lithologylist[2]
+                            lithologylist.area = row[0]
+                            #What is this rock type subclass' percentage of the overall study area? lithologylist[3]
+                            lithologylist.percent = analclass[0]
+                            #What is this rock type subclass' rank in order of greatest to least percent of the study area? lithologylist[4]
+                            lithologylist.rank = lithologytimes
+                            #What is this rock type subclass' lowest elevation? lithologylist[5]
+                            lithologylist.minelevation = row[1]
+                            #What is this rock type subclass' highest elevation? lithologylist[6]
+                            lithologylist.maxelevation = row[2]
+                            #What is this rock type subclass' mean elevation? lithologylist[7]
+                            lithologylist.meanelevation = row[3]
+                            #What is this rock type subclass' median elevation? lithologylist[8]
+                            lithologylist.medianelevation = row[4]
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Bioclimate'])
+                    #What is the top bioclimate in the area covered by this subclass? lithologylist[9]
+                    lithologylist.topbioclimate = classname0
+                    #What percentage of the area covered by this subclass is the top bioclimate? lithologylist[10]
+                    lithologylist.topbioclimatepercent = (count0/lithologylist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landform'])
+                    #What is the top landform in the area covered by this subclass? lithologylist[11]
+                    lithologylist.toplandform = classname0
+                    #What percentage of the area covered by this subclass is the top landform? lithologylist[12]
+                    lithologylist.toplandformpercent = (count0/lithologylist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landcover'])
+                    #What is the top land cover in the area covered by this subclass? lithologylist[15]
+                    lithologylist.toplandcover = classname0
+                    #What percentage of the area covered by this subclass is the top land cover? lithologylist[16]
+                    lithologylist.toplandcoverpercent = (count0/lithologylist.area) * 100
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
+                        for row in cursor:
+                            #What is the mean ELU diversity in this lithology zone? landformlist[17]
+                            lithologylist.meandiversity = row[0]
+                            #What is the median ELU diversity in this lithology zone? landformlist[18]
+                            #this is a dummy value because there is no median in floating point
+                            lithologylist.mediandiversity = row[0]
+
+
+                    neq = 0
+                    seq = 0
+                    swq = 0
+                    nwq = 0
+                    zes = 0
+                    zws = 0
+                    zss = 0
+                    zns = 0
+                    zonesw = 0
+                    zonew = 0
+                    zonenw = 0
+                    zones = 0
+                    zonec = 0
+                    zonen = 0
+                    zonese = 0
+                    zonee = 0
+                    zonene = 0
+
+                    try:
                         feature = os.path.join(inmem,'cong')
                         if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top bioclimate in the area covered by this subclass? lithologylist[9]
-                        lithologylist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top bioclimate? lithologylist[10]
-                        lithologylist.append((count0/lithologylist[2])*100)
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top landform in the area covered by this subclass? lithologylist[11]
-                        lithologylist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top landform? lithologylist[12]
-                        lithologylist.append((count0/lithologylist[2])*100)
-                        #dummy lithologylist[13]
-                        lithologylist.append(dummyvalue)
-                        #dummy lithologylist[14]
-                        lithologylist.append(dummyvalue)
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landcover_R")
+                            arcpy.Delete_management(feature)
+                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
                         cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
+                        with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
+                            for rowmwz in cursor:
+                                if rowmwz[0] == 11:
+                                    zonesw = rowmwz[1]
+                                if rowmwz[0] == 12:
+                                    zonew = rowmwz[1]
+                                if rowmwz[0] == 13:
+                                    zonenw = rowmwz[1]
+                                if rowmwz[0] == 21:
+                                    zones = rowmwz[1]
+                                if rowmwz[0] == 22:
+                                    zonec = rowmwz[1]
+                                if rowmwz[0] == 23:
+                                    zonen = rowmwz[1]
+                                if rowmwz[0] == 31:
+                                    zonese = rowmwz[1]
+                                if rowmwz[0] == 32:
+                                    zonee = rowmwz[1]
+                                if rowmwz[0] == 33:
+                                    zonene = rowmwz[1]
+                        del cong
+                        #number of cells in the southwest. lithologylist[22]
+                        lithologylist.zonesw = zonesw
+                        #number of cells in the west. lithologylist[23]
+                        lithologylist.zonew = zonew
+                        #number of cells in the northwest. lithologylist[24]
+                        lithologylist.zonenw = zonenw
+                        #number of cells in the south. lithologylist[25]
+                        lithologylist.zones = zones
+                        #number of cells in the center. lithologylist[26]
+                        lithologylist.zonec = zonec
+                        #number of cells in the north. lithologylist[27]
+                        lithologylist.zonen = zonen
+                        #number of cells in the southeast. lithologylist[28]
+                        lithologylist.zonese = zonese
+                        #number of cells in the east. lithologylist[29]
+                        lithologylist.zonee = zonee
+                        #number of cells in the northeast. lithologylist[30]
+                        lithologylist.zonene = zonene
+
+                        neq = lithologylist.zonec+lithologylist.zonen+lithologylist.zonee+lithologylist.zonene
+                        seq = lithologylist.zonec+lithologylist.zones+lithologylist.zonee+lithologylist.zonese
+                        swq = lithologylist.zonesw+lithologylist.zonew+lithologylist.zones+lithologylist.zonec
+                        nwq = lithologylist.zonew+lithologylist.zonenw+lithologylist.zonec+lithologylist.zonen
+                        zes = lithologylist.zonese+lithologylist.zonee+lithologylist.zonene
+                        zws = lithologylist.zonesw+lithologylist.zonew+lithologylist.zonenw
+                        zss = lithologylist.zonesw+lithologylist.zones+lithologylist.zonese
+                        zns = lithologylist.zonenw+lithologylist.zonen+lithologylist.zonene
+
+                        maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
+
+                        #How many cells are in the most likely part of the lithology class?[31]
+                        lithologylist.partcells = maxzone[0]
+                        #What phrase describes the most likely part of this lithology class?[32]
+                        lithologylist.partphrase = maxzone[1]
+                        #What percentage of the most likely part of the lithology class is this lithology class?[33]
+                        if maxzone[2] != 0:
+                            lithologylist.partpercent = (maxzone[0]/maxzone[2])*100
                         else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landcover_CR", "Value", ["Value","ClassName"])
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top land cover in the area covered by this subclass? lithologylist[15]
-                        lithologylist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top land cover? lithologylist[16]
-                        lithologylist.append((count0/lithologylist[2]) * 100)
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
-                            for row in cursor:
-                                #What is the mean ELU diversity in this lithology zone? landformlist[17]
-                                lithologylist.append(row[0])
-                                #What is the median ELU diversity in this lithology zone? landformlist[18]
-                                #this is a dummy value because there is no median in floating point
-                                lithologylist.append(row[0])
-
-                        #dummy value lithologylist[19]
-                        lithologylist.append(dummyvalue)
-                        #dummy value lithologylist[20]
-                        lithologylist.append(dummyvalue)
-                        #dummy value lithologylist[21]
-                        lithologylist.append(dummyvalue)
+                            lithologylist.partpercent = 0
 
                         neq = 0
                         seq = 0
@@ -2684,265 +4210,271 @@ def GeoDescriber():
                         zonee = 0
                         zonene = 0
 
-                        try:
-                            feature = os.path.join(inmem,'cong')
-                            if arcpy.Exists(feature):
-                            	arcpy.Delete_management(feature)
-                            cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
-                            cong.save(inmem+"\\cong")
-                            with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
-                                for rowmwz in cursor:
-                                    if rowmwz[0] == 11:
-                                        zonesw = rowmwz[1]
-                                    if rowmwz[0] == 12:
-                                        zonew = rowmwz[1]
-                                    if rowmwz[0] == 13:
-                                        zonenw = rowmwz[1]
-                                    if rowmwz[0] == 21:
-                                        zones = rowmwz[1]
-                                    if rowmwz[0] == 22:
-                                        zonec = rowmwz[1]
-                                    if rowmwz[0] == 23:
-                                        zonen = rowmwz[1]
-                                    if rowmwz[0] == 31:
-                                        zonese = rowmwz[1]
-                                    if rowmwz[0] == 32:
-                                        zonee = rowmwz[1]
-                                    if rowmwz[0] == 33:
-                                        zonene = rowmwz[1]
-                            del cong
-                            #number of cells in the southwest. lithologylist[22]
-                            lithologylist.append(zonesw)
-                            #number of cells in the west. lithologylist[23]
-                            lithologylist.append(zonew)
-                            #number of cells in the northwest. lithologylist[24]
-                            lithologylist.append(zonenw)
-                            #number of cells in the south. lithologylist[25]
-                            lithologylist.append(zones)
-                            #number of cells in the center. lithologylist[26]
-                            lithologylist.append(zonec)
-                            #number of cells in the north. lithologylist[27]
-                            lithologylist.append(zonen)
-                            #number of cells in the southeast. lithologylist[28]
-                            lithologylist.append(zonese)
-                            #number of cells in the east. lithologylist[29]
-                            lithologylist.append(zonee)
-                            #number of cells in the northeast. lithologylist[30]
-                            lithologylist.append(zonene)
-
-                            neq = lithologylist[26]+lithologylist[27]+lithologylist[29]+lithologylist[30]
-                            seq = lithologylist[26]+lithologylist[25]+lithologylist[29]+lithologylist[28]
-                            swq = lithologylist[22]+lithologylist[23]+lithologylist[25]+lithologylist[26]
-                            nwq = lithologylist[23]+lithologylist[24]+lithologylist[26]+lithologylist[27]
-                            zes = lithologylist[28]+lithologylist[29]+lithologylist[30]
-                            zws = lithologylist[22]+lithologylist[23]+lithologylist[24]
-                            zss = lithologylist[22]+lithologylist[25]+lithologylist[28]
-                            zns = lithologylist[24]+lithologylist[27]+lithologylist[30]
-
-                            maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
-
-                            #How many cells are in the most likely part of the lithology class?[31]
-                            lithologylist.append(maxzone[0])
-                            #What phrase describes the most likely part of this lithology class?[32]
-                            lithologylist.append(maxzone[1])
-                            #What percentage of the most likely part of the lithology class is this lithology class?[33]
-                            if maxzone[2] != 0:
-                                lithologylist.append((maxzone[0]/maxzone[2])*100)
-                            else:
-                                lithologylist.append(0)
-
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-
-                        except ValueError:
-                            print("value error")
-                            print("starting over")
-
-                        except IndexError:
-                            print("index error")
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-                            print("starting over")
-
-                        classlist.append(lithologylist)
-                        #print lithologylist
-                        print("length of lithologylist is "+str(len(lithologylist)))
-
-                        if len(lithologylist) != 34:
-                            GeoDescriberTries +=1
-                            return
-
-                    # LAND COVER side operations
-                    # Extract the land cover class from the landcover raster. Use it as a conditional raster to cut out a piece of elevation data
-                    # that matches the area of the landcover class raster. Use zonal statistics to find the mean elevation for the land cover.
-                    # If the mean of the landcover is greater than the mean plus the standard deviation of the con_extent, add
-                    # ", found at the higher elevations" to landcoverelevstr. If the mean of the bioclimate is less than the mean minus
-                    # the standard deviation of con_extent, add ", found at the lower elevations" to the string landcoverelevstr.
-                    elif analclass[2].endswith("Landcover_R") == True:
-                    #elif analclass[2] == output+"\\Landcover_R":
-                        landcoverlist = []
-                        #What is the pathname to this land cover subclass? landcoverlist[0]
-                        landcoverlist.append(analclass[2])
-                        #What's this land cover called? landcoverlist[1]
-                        landcoverlist.append(analclass[1])
-                        currentTime = time.clock()
-                        print(str(currentTime-startTime)+" seconds have elapsed so far")
-                        print("-----performing side operations on land cover class " + analclass[1]+"-----")
-                        landcovertimes += 1
-                        # Compare the mean elevation of the significant land cover class with the mean elevation of the study area.
-                        # If the class elevation is below or above one standard deviation from the mean elevation of the study area,
-                        # add a clause to landcoverelevstr saying it's found at the higher or lower elevations. Otherwise leave it blank.
-                        attExtract = ExtractByAttributes(analclass[2], "ClassName = '"+analclass[1]+"'")
-
-                        feature = os.path.join(inmem,'extractg')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
+                    except ValueError:
+                        print("value error")
+                        print("starting over")
 
-                        attExtract.save(inmem+"\\extractg")
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
-                        with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
-                            for row in cursor:
-                                #What is this land cover class' area? landcoverlist[2]
-                                landcoverlist.append(row[0])
-                                #What is this land cover class' percentage of the overall study area? landcoverlist[3]
-                                landcoverlist.append(analclass[0])
-                                #What is this land cover subclass' rank in order of greatest to least percent of the study area? landcoverlist[4]
-                                landcoverlist.append(landcovertimes)
-                                #What is this land cover subclass' lowest elevation? landcoverlist[5]
-                                landcoverlist.append(row[1])
-                                #What is this land cover type subclass' highest elevation? landcoverlist[6]
-                                landcoverlist.append(row[2])
-                                #What is this land cover type subclass' mean elevation? landcoverlist[7]
-                                landcoverlist.append(row[3])
-                                #What is this land cover type subclass' median elevation? landcoverlist[8]
-                                landcoverlist.append(row[4])
-                        feature = os.path.join(inmem,'cong')
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Bioclimates_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top bioclimate in the area covered by this subclass? landcoverlist[9]
-                        landcoverlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top bioclimate? landcoverlist[10]
-                        landcoverlist.append((count0/landcoverlist[2])*100)
+                    except IndexError:
+                        print("index error")
+                        neq = 0
+                        seq = 0
+                        swq = 0
+                        nwq = 0
+                        zes = 0
+                        zws = 0
+                        zss = 0
+                        zns = 0
+                        zonesw = 0
+                        zonew = 0
+                        zonenw = 0
+                        zones = 0
+                        zonec = 0
+                        zonen = 0
+                        zonese = 0
+                        zonee = 0
+                        zonene = 0
+                        print("starting over")
+
+                    classlist.append(lithologylist)
+                    #print lithologylist
+
+                    if lithologylist.missing() != []:
+                        raise ValueError("Could not find "+", ".join(lithologylist.missing())+" of "+str(theclass)+".")
+
+                # LAND COVER side operations
+                # Extract the land cover class from the landcover raster. Use it as a conditional raster to cut out a piece of elevation data
+                # that matches the area of the landcover class raster. Use zonal statistics to find the mean elevation for the land cover.
+                # If the mean of the landcover is greater than the mean plus the standard deviation of the con_extent, add
+                # ", found at the higher elevations" to landcoverelevstr. If the mean of the bioclimate is less than the mean minus
+                # the standard deviation of con_extent, add ", found at the lower elevations" to the string landcoverelevstr.
+                elif analclass[2].endswith("Landcover_R") == True:
+                #elif analclass[2] == output+"\\Landcover_R":
+                    landcoverlist = LandcoverFacts()
+                    #What is the pathname to this land cover subclass? landcoverlist[0]
+                    landcoverlist.path = analclass[2]
+                    #What's this land cover called? landcoverlist[1]
+                    landcoverlist.name = analclass[1]
+                    print("-----performing side operations on land cover class " + analclass[1]+"-----")
+                    landcovertimes += 1
+                    # Compare the mean elevation of the significant land cover class with the mean elevation of the study area.
+                    # If the class elevation is below or above one standard deviation from the mean elevation of the study area,
+                    # add a clause to landcoverelevstr saying it's found at the higher or lower elevations. Otherwise leave it blank.
+                    attExtract = ExtractByAttributes(analclass[2], registryOf(analclass[2]).whereClause(analclass[1]))
+
+                    feature = os.path.join(inmem,'extractg')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+
+                    attExtract.save(inmem+"\\extractg")
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Elevation_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["Count","MIN","MAX","MEAN","MEDIAN"]) as cursor:
+                        for row in cursor:
+                            #What is this land cover class' area? landcoverlist[2]
+                            landcoverlist.area = row[0]
+                            #What is this land cover class' percentage of the overall study area? landcoverlist[3]
+                            landcoverlist.percent = analclass[0]
+                            #What is this land cover subclass' rank in order of greatest to least percent of the study area? landcoverlist[4]
+                            landcoverlist.rank = landcovertimes
+                            #What is this land cover subclass' lowest elevation? landcoverlist[5]
+                            landcoverlist.minelevation = row[1]
+                            #What is this land cover type subclass' highest elevation? landcoverlist[6]
+                            landcoverlist.maxelevation = row[2]
+                            #What is this land cover type subclass' mean elevation? landcoverlist[7]
+                            landcoverlist.meanelevation = row[3]
+                            #What is this land cover type subclass' median elevation? landcoverlist[8]
+                            landcoverlist.medianelevation = row[4]
+                    feature = os.path.join(inmem,'cong')
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Bioclimate_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Bioclimate'])
+                    #What is the top bioclimate in the area covered by this subclass? landcoverlist[9]
+                    landcoverlist.topbioclimate = classname0
+                    #What percentage of the area covered by this subclass is the top bioclimate? landcoverlist[10]
+                    landcoverlist.topbioclimatepercent = (count0/landcoverlist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Landform'])
+                    #What is the top landform in the area covered by this subclass? landcoverlist[11]
+                    landcoverlist.toplandform = classname0
+                    #What percentage of the area covered by this subclass is the top landform? landcoverlist[12]
+                    landcoverlist.toplandformpercent = (count0/landcoverlist.area)*100
+                    if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                    cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
+                    cong.save(inmem+"\\cong")
+                    count0, classname0 = topClass(inmem+"\\cong", classRegistries['Lithology'])
+                    #What is the top rock type in the area covered by this subclass? landcoverlist[13]
+                    landcoverlist.toplithology = classname0
+                    #What percentage of the area covered by this subclass is the top rock type? landcoverlist[14]
+                    landcoverlist.toplithologypercent = (count0/landcoverlist.area)*100
+                    a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+                    with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
+                        for row in cursor:
+                            #What is the mean ELU diversity in this land cover zone? landcoverlist[17]
+                            landcoverlist.meandiversity = row[0]
+                            #What is the median ELU diversity in this land cover zone? landcoverlist[18]
+                            #this is a dummy value because there is no median in floating point
+                            landcoverlist.mediandiversity = row[0]
+
+                    if landcoverlist.name in ['Urban areas']:
+                        feature = os.path.join(inmem,'Population_RS')
                         if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Landform_R")
-                        cong.save(inmem+"\\cong")
+                            arcpy.Delete_management(feature)
                         if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
+                            outputRaster0 = Con(arcpy.Raster(inmem+"\\extractg"),arcpy.Raster(inmem+"\\Population_R"), 0)
+                            outputRaster = Con(outputRaster0 != 65535, outputRaster0)
                         else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Landform_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top landform in the area covered by this subclass? landcoverlist[11]
-                        landcoverlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top landform? landcoverlist[12]
-                        landcoverlist.append((count0/landcoverlist[2])*100)
-                        if arcpy.Exists(feature):
-                        	arcpy.Delete_management(feature)
-                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\Lithology_R")
-                        cong.save(inmem+"\\cong")
-                        if arcversion == '10.5.1':
-                            JoinField_Workaround(inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
+                            outputRaster = Con(arcpy.Raster(inmem+"\\extractg"),arcpy.Raster(inmem+"\\Population_R"), 0)
+                        od = outputRaster.save(inmem +"\\Population_RS")
+                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Population_RS",inmem+"\\stattbl","DATA")
+                        if not arcpy.sa.Raster(inmem+"\\Population_RS").maximum > 0:
+                            landcoverlist.population = 0
                         else:
-                            d=arcpy.JoinField_management (inmem+"\\cong", "Value", inmem+"\\Lithology_CR", "Value", ["Value","ClassName"])
-                        sumLandCover = 0
-                        with arcpy.da.SearchCursor(inmem+"\\cong",["Count","Value","ClassName"]) as cursor:
-                            for row in sorted(cursor):
-                                count0 = row[0]
-                                classname0 = row[2]
-                        #What is the top rock type in the area covered by this subclass? landcoverlist[13]
-                        landcoverlist.append(classname0)
-                        #What percentage of the area covered by this subclass is the top rock type? landcoverlist[14]
-                        landcoverlist.append((count0/landcoverlist[2])*100)
-                        landcoverlist.append(dummyvalue) #dummy landcoverlist[15]
-                        landcoverlist.append(dummyvalue) #dummy landcoverlist[16]
-                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Ecophysdiv_R",inmem+"\\stattbl","DATA")
+                            with arcpy.da.SearchCursor(inmem+"\\stattbl",["SUM"]) as cursor:
+                                for row in cursor:
+                                    #What is the population of this subclass? landcoverlist[19]
+                                    landcoverlist.population = row[0]
+                    else:
+                        #Population will not be in text description, then just make landcoverlist[19] equal to -9999
+                        landcoverlist.population = -9999
+
+                    if arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
+                        a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Biomass_R",inmem+"\\stattbl","DATA")
                         with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
                             for row in cursor:
-                                #What is the mean ELU diversity in this land cover zone? landcoverlist[17]
-                                landcoverlist.append(row[0])
-                                #What is the median ELU diversity in this land cover zone? landcoverlist[18]
-                                #this is a dummy value because there is no median in floating point
-                                landcoverlist.append(row[0])
-
-                        if landcoverlist[1] in ['Urban areas']:
-                            feature = os.path.join(inmem,'Population_RS')
-                            if arcpy.Exists(feature):
-                            	arcpy.Delete_management(feature)
-                            if arcversion == '10.5.1':
-                                outputRaster0 = Con(arcpy.Raster(inmem+"\\extractg"),arcpy.Raster(inmem+"\\Population_R"), 0)
-                                outputRaster = Con(outputRaster0 != 65535, outputRaster0)
-                            else:
-                                outputRaster = Con(arcpy.Raster(inmem+"\\extractg"),arcpy.Raster(inmem+"\\Population_R"), 0)
-                            od = outputRaster.save(inmem +"\\Population_RS")
-                            a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Population_RS",inmem+"\\stattbl","DATA")
-                            if not arcpy.sa.Raster(inmem+"\\Population_RS").maximum > 0:
-                                landcoverlist.append(0)
-                            else:
-                                with arcpy.da.SearchCursor(inmem+"\\stattbl",["SUM"]) as cursor:
-                                    for row in cursor:
-                                        #What is the population of this subclass? landcoverlist[19]
-                                        landcoverlist.append(row[0])
+                                #What is the mean biomass per acre of this subclass? landcoverlist[20]
+                                landcoverlist.biomass = row[0]
+                    else:
+                        #What is the mean biomass per acre of this subclass? landcoverlist[20]
+                        #put dummy value in landcoverlist[20]
+                        landcoverlist.biomass = dummyvalue
+
+                    neq = 0
+                    seq = 0
+                    swq = 0
+                    nwq = 0
+                    zes = 0
+                    zws = 0
+                    zss = 0
+                    zns = 0
+                    zonesw = 0
+                    zonew = 0
+                    zonenw = 0
+                    zones = 0
+                    zonec = 0
+                    zonen = 0
+                    zonese = 0
+                    zonee = 0
+                    zonene = 0
+
+                    try:
+                        feature = os.path.join(inmem,'cong')
+                        if arcpy.Exists(feature):
+                            arcpy.Delete_management(feature)
+                        cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
+                        cong.save(inmem+"\\cong")
+                        with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
+                            for rowmwz in cursor:
+                                if rowmwz[0] == 11:
+                                    zonesw = rowmwz[1]
+                                if rowmwz[0] == 12:
+                                    zonew = rowmwz[1]
+                                if rowmwz[0] == 13:
+                                    zonenw = rowmwz[1]
+                                if rowmwz[0] == 21:
+                                    zones = rowmwz[1]
+                                if rowmwz[0] == 22:
+                                    zonec = rowmwz[1]
+                                if rowmwz[0] == 23:
+                                    zonen = rowmwz[1]
+                                if rowmwz[0] == 31:
+                                    zonese = rowmwz[1]
+                                if rowmwz[0] == 32:
+                                    zonee = rowmwz[1]
+                                if rowmwz[0] == 33:
+                                    zonene = rowmwz[1]
+                        del cong
+                        #number of cells in the southwest. landcoverlist[22]
+                        landcoverlist.zonesw = zonesw
+                        #number of cells in the west. landcoverlist[23]
+                        landcoverlist.zonew = zonew
+                        #number of cells in the northwest. landcoverlist[24]
+                        landcoverlist.zonenw = zonenw
+                        #number of cells in the south. landcoverlist[25]
+                        landcoverlist.zones = zones
+                        #number of cells in the center. landcoverlist[26]
+                        landcoverlist.zonec = zonec
+                        #number of cells in the north. landcoverlist[27]
+                        landcoverlist.zonen = zonen
+                        #number of cells in the southeast. landcoverlist[28]
+                        landcoverlist.zonese = zonese
+                        #number of cells in the east. landcoverlist[29]
+                        landcoverlist.zonee = zonee
+                        #number of cells in the northeast. landcoverlist[30]
+                        landcoverlist.zonene = zonene
+
+                        # A population table without rows leaves the population out of the text.
+                        if landcoverlist.population is None:
+                            landcoverlist.population = -9999
+
+                        neq = 0
+                        seq = 0
+                        swq = 0
+                        nwq = 0
+                        zes = 0
+                        zws = 0
+                        zss = 0
+                        zns = 0
+                        neq = landcoverlist.zonec+landcoverlist.zonen+landcoverlist.zonee+landcoverlist.zonene
+                        seq = landcoverlist.zonec+landcoverlist.zones+landcoverlist.zonee+landcoverlist.zonese
+                        swq = landcoverlist.zonesw+landcoverlist.zonew+landcoverlist.zones+landcoverlist.zonec
+                        nwq = landcoverlist.zonew+landcoverlist.zonenw+landcoverlist.zonec+landcoverlist.zonen
+                        zes = landcoverlist.zonese+landcoverlist.zonee+landcoverlist.zonene
+                        zws = landcoverlist.zonesw+landcoverlist.zonew+landcoverlist.zonenw
+                        zss = landcoverlist.zonesw+landcoverlist.zones+landcoverlist.zonese
+                        zns = landcoverlist.zonenw+landcoverlist.zonen+landcoverlist.zonene
+
+                        maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
+                        print("maxzone is "+ str(maxzone))
+
+                        #How many cells are in the most likely part of the landcover class?[31]
+                        landcoverlist.partcells = maxzone[0]
+                        #What phrase describes the most likely part of this landcover class?[32]
+                        landcoverlist.partphrase = maxzone[1]
+                        #What percentage of the most likely part of the landcover class is this landcover class?[33]
+                        if maxzone[2] != 0:
+                            landcoverlist.partpercent = (maxzone[0]/maxzone[2])*100
                         else:
-                            #Population will not be in text description, then just make landcoverlist[19] equal to -9999
-                            landcoverlist.append(-9999)
+                            landcoverlist.partpercent = 0
+
+                        neq = 0
+                        seq = 0
+                        swq = 0
+                        nwq = 0
+                        zes = 0
+                        zws = 0
+                        zss = 0
+                        zns = 0
+                        zonesw = 0
+                        zonew = 0
+                        zonenw = 0
+                        zones = 0
+                        zonec = 0
+                        zonen = 0
+                        zonese = 0
+                        zonee = 0
+                        zonene = 0
 
-                        if arcpy.sa.Raster(inmem+"\\Biomass_R").maximum > 0:
-                            a=arcpy.sa.ZonalStatisticsAsTable(inmem+"\\extractg","Value",inmem+"\\Biomass_R",inmem+"\\stattbl","DATA")
-                            with arcpy.da.SearchCursor(inmem+"\\stattbl",["MEAN"]) as cursor:
-                                for row in cursor:
-                                    #What is the mean biomass per acre of this subclass? landcoverlist[20]
-                                    landcoverlist.append(row[0])
-                        else:
-                            #What is the mean biomass per acre of this subclass? landcoverlist[20]
-                            #put dummy value in landcoverlist[20]
-                            landcoverlist.append(dummyvalue)
-                        landcoverlist.append(dummyvalue) #dummy landcoverlist[21]
+                    except ValueError:
+                        print("value error")
+                        print("starting over")
 
+                    except IndexError:
+                        print("index error")
                         neq = 0
                         seq = 0
                         swq = 0
@@ -2960,919 +4492,1384 @@ def GeoDescriber():
                         zonese = 0
                         zonee = 0
                         zonene = 0
+                        print("starting over")
 
-                        try:
-                            feature = os.path.join(inmem,'cong')
-                            if arcpy.Exists(feature):
-                            	arcpy.Delete_management(feature)
-                            cong=arcpy.sa.Con(inmem+"\\extractg",inmem+"\\mw_zonedg")
-                            cong.save(inmem+"\\cong")
-                            with arcpy.da.SearchCursor(inmem+"\\cong",["Value","Count"]) as cursor:
-                                for rowmwz in cursor:
-                                    if rowmwz[0] == 11:
-                                        zonesw = rowmwz[1]
-                                    if rowmwz[0] == 12:
-                                        zonew = rowmwz[1]
-                                    if rowmwz[0] == 13:
-                                        zonenw = rowmwz[1]
-                                    if rowmwz[0] == 21:
-                                        zones = rowmwz[1]
-                                    if rowmwz[0] == 22:
-                                        zonec = rowmwz[1]
-                                    if rowmwz[0] == 23:
-                                        zonen = rowmwz[1]
-                                    if rowmwz[0] == 31:
-                                        zonese = rowmwz[1]
-                                    if rowmwz[0] == 32:
-                                        zonee = rowmwz[1]
-                                    if rowmwz[0] == 33:
-                                        zonene = rowmwz[1]
-                            del cong
-                            #number of cells in the southwest. landcoverlist[22]
-                            landcoverlist.append(zonesw)
-                            #number of cells in the west. landcoverlist[23]
-                            landcoverlist.append(zonew)
-                            #number of cells in the northwest. landcoverlist[24]
-                            landcoverlist.append(zonenw)
-                            #number of cells in the south. landcoverlist[25]
-                            landcoverlist.append(zones)
-                            #number of cells in the center. landcoverlist[26]
-                            landcoverlist.append(zonec)
-                            #number of cells in the north. landcoverlist[27]
-                            landcoverlist.append(zonen)
-                            #number of cells in the southeast. landcoverlist[28]
-                            landcoverlist.append(zonese)
-                            #number of cells in the east. landcoverlist[29]
-                            landcoverlist.append(zonee)
-                            #number of cells in the northeast. landcoverlist[30]
-                            landcoverlist.append(zonene)
-
-##                            if len(landcoverlist) == 30 and landcoverlist[1] == 'Water bodies':
-##                                landcoverlist.insert(19,-9999)
-##                            if len(landcoverlist) == 30 and landcoverlist[1] == 'Urban areas':
-##                                landcoverlist.insert(19,-9999)
-
-                            if len(landcoverlist) == 30:
-                                landcoverlist.insert(19,-9999)
-
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            neq = landcoverlist[26]+landcoverlist[27]+landcoverlist[29]+landcoverlist[30]
-                            seq = landcoverlist[26]+landcoverlist[25]+landcoverlist[29]+landcoverlist[28]
-                            swq = landcoverlist[22]+landcoverlist[23]+landcoverlist[25]+landcoverlist[26]
-                            nwq = landcoverlist[23]+landcoverlist[24]+landcoverlist[26]+landcoverlist[27]
-                            zes = landcoverlist[28]+landcoverlist[29]+landcoverlist[30]
-                            zws = landcoverlist[22]+landcoverlist[23]+landcoverlist[24]
-                            zss = landcoverlist[22]+landcoverlist[25]+landcoverlist[28]
-                            zns = landcoverlist[24]+landcoverlist[27]+landcoverlist[30]
-
-                            maxzone = max([neq,'northeastern part',neq_n],[seq,'southeastern part',seq_n],[swq,'southwestern part',swq_n],[nwq,'northwestern part',nwq_n],[zes,'east side',zes_n],[zws,'west side',zws_n],[zss,'south side',zss_n],[zns,'north side',zns_n],[zonesw,'southwesternmost portion',zonesw_n],[zonew,'westernmost portion',zonew_n],[zonenw,'northwesternmost portion',zonenw_n],[zones,'southernmost portion',zones_n],[zonec,'most central portion',zonec_n],[zonen,'northernmost portion',zonen_n],[zonese,'southeasternmost portion',zonese_n],[zonee,'easternmost portion',zonee_n],[zonene,'northeasternmost portion',zonene_n])
-                            print "maxzone is "+ str(maxzone)
-
-                            #How many cells are in the most likely part of the landcover class?[31]
-                            landcoverlist.append(maxzone[0])
-                            #What phrase describes the most likely part of this landcover class?[32]
-                            landcoverlist.append(maxzone[1])
-                            #What percentage of the most likely part of the landcover class is this landcover class?[33]
-                            if maxzone[2] != 0:
-                                landcoverlist.append((maxzone[0]/maxzone[2])*100)
-                            else:
-                                landcoverlist.append(0)
-
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-
-                        except ValueError:
-                            print("value error")
-                            print("starting over")
-
-                        except IndexError:
-                            print("index error")
-                            neq = 0
-                            seq = 0
-                            swq = 0
-                            nwq = 0
-                            zes = 0
-                            zws = 0
-                            zss = 0
-                            zns = 0
-                            zonesw = 0
-                            zonew = 0
-                            zonenw = 0
-                            zones = 0
-                            zonec = 0
-                            zonen = 0
-                            zonese = 0
-                            zonee = 0
-                            zonene = 0
-                            print("starting over")
-
-                        classlist.append(landcoverlist)
-                        print landcoverlist
-                        print("length of landcoverlist is "+str(len(landcoverlist)))
-
-                        if len(landcoverlist) != 34:
-                            GeoDescriberTries +=1
-                            return
-
-                feature = os.path.join(inmem,'extractg')
-                if arcpy.Exists(feature):
-                	arcpy.Delete_management(feature)
+                    classlist.append(landcoverlist)
+                    print(landcoverlist)
 
-            except:
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
+                    if landcoverlist.missing() != []:
+                        raise ValueError("Could not find "+", ".join(landcoverlist.missing())+" of "+str(theclass)+".")
 
+            feature = os.path.join(inmem,'extractg')
+            if arcpy.Exists(feature):
+                    arcpy.Delete_management(feature)
 
-                #---------------------------------------------------------------------------------
-                #
-                #                               synthesis
-                #
-                #               Synthesize human readable text from classlist.
-                #               Use it to populate the description variable.
-                #
-                #---------------------------------------------------------------------------------
+        except:
+            # Get the traceback object
+            tb = sys.exc_info()[2]
+            tbinfo = traceback.format_tb(tb)[0]
+            # Concatenate information together concerning the error into a message string
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+            # Write Python error messages to log
+            err= pymsg + "\n"
+            print(err)
 
-        if studyarealist[4] > 15:
+    if len(classlist) != len(alllist) or [c for c in classlist if c.missing() != []] != []:
+        raise Exception("Found facts about "+str(len(classlist))+" of "+str(len(alllist))+" significant classes.")
+    state['classlist'] = classlist
+    state['classtimes'] = (landcovertimes, lithologytimes, bioclimatetimes, landformtimes)
 
-            try:
-                divfragment = ""
-                divstatement = ""
-                studyareasqmeters = studyarealist[4] * cellsize
-                if studyareasqmeters < 53000:
-                	if studyarealist[12] < 0.1:
-                		divfragment = "An area with very uniform landscape, "
-                	elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
-                		divfragment = "An area with uniform landscape, "
-                	elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
-                		print("")
-                	elif studyarealist[12] >= 1 and studyarealist[12] < 2:
-                		divstatement = studyarealist[0] + " has rather high landscape diversity. "
-                	elif studyarealist[12] >= 2 and studyarealist[12] < 10:
-                		divstatement = "For such a small area, "+studyarealist[0]+" has very high landscape diversity. "
-                	else: #studyarealist[12] > 10
-                		divstatement = "For such a small area, "+studyarealist[0]+" has extraordinarily high landscape diversity. "
-                elif studyareasqmeters >= 53000 and studyareasqmeters < 1000000:
-                	if studyarealist[12] < 0.1:
-                		divfragment = "A very uniform landscape, "
-                	elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
-                		divfragment = "A uniform landscape, "
-                	elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
-                		print("")
-                	elif studyarealist[12] >= 1 and studyarealist[12] < 2:
-                		print("")
-                	elif studyarealist[12] >= 2 and studyarealist[12] < 10:
-                		divstatement = "For a small area, "+studyarealist[0]+" has very high landscape diversity. "
-                	else: #studyarealist[12] > 10
-                		divstatement = "For a small area, "+studyarealist[0]+" has extraordinarily high landscape diversity. "
-                elif studyareasqmeters >= 1000000 and studyareasqmeters < 10000000:
-                	if studyarealist[12] < 0.1:
-                		divstatement = studyarealist[0]+" has extraordinarily low landscape diversity. "
-                	elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
-                		divstatement = studyarealist[0]+" has very low landscape diversity. "
-                	elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
-                		print("")
-                	elif studyarealist[12] >= 1 and studyarealist[12] < 2:
-                		print("")
-                	elif studyarealist[12] >= 2 and studyarealist[12] < 10:
-                		divstatement = studyarealist[0]+" is a highly diverse landscape. "
-                	else: #studyarealist[12] > 10
-                		divstatement = studyarealist[0]+" has extraordinarily high diversity in its landscape. "
-                elif studyareasqmeters >= 10000000 and studyareasqmeters < 100000000:
-                	if studyarealist[12] < 0.1:
-                		divstatement = "For such a large area, "+studyarealist[0]+" has extraordinarily low diversity in its landscapes. "
-                	elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
-                		divstatement = "For such a large area, "+studyarealist[0]+" has very low diversity in its landscapes. "
-                	elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
-                		print("")
-                	elif studyarealist[12] >= 1 and studyarealist[12] < 2:
-                		print("")
-                	elif studyarealist[12] >= 2 and studyarealist[12] < 10:
-                		divfragment = "A rather large area with very diverse landscapes, "
-                	else: #studyarealist[12] > 10
-                		divfragment = "A rather large area with extraordinarily diverse landscapes, "
-                else: #if studyareasqmeters >= 100000000:
-                	if studyarealist[12] < 0.1:
-                		divstatement = "For such a large area, "+studyarealist[0]+" has extraordinarily little diversity in its landscapes. "
-                	elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
-                		divstatement = "For such a large area, "+studyarealist[0]+" has very low landscape diversity. "
-                	elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
-                		divstatement = studyarealist[0]+" has rather low landscape diversity. "
-                	elif studyarealist[12] >= 1 and studyarealist[12] < 2:
-                		print("")
-                	elif studyarealist[12] >= 2 and studyarealist[12] < 10:
-                		divfragment = "A very diverse area, "
-                	else: #studyarealist[12] > 10
-                		divfragment = "An extraordinarily diverse area, "
+#-------------------------------------------------------------------------------
+#--------------------------phrase templates-------------------------------------
+# The quantity and location sentences of every class are compiled once into a
+# PhraseTable: a list of thresholds and one format string per threshold. The
+# class name, its grammatical number and its article are filled in when the
+# table is compiled, so a sentence is a lookup and a single format() call.
+class PhraseTable(object):
+    """PhraseTable(thresholds, templates)
+
+    A sentence family compiled for one class. thresholds are ascending and
+    templates holds one format string for each of them. render(value, ...)
+    formats the template of the highest threshold value is over with the
+    given slots, or returns "" if value is not over any threshold.
 
-            except:
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
+    """
+    def __init__(self, thresholds, templates):
+        self.thresholds = thresholds
+        self.templates = [""] + templates
+        #the format methods are looked up once, render() only picks one.
+        formats = [template.format for template in self.templates]
+        def render(value, **slots):
+            return formats[bisect.bisect_left(thresholds, value)](**slots)
+        self.render = render
+
+ClassPhrases = collections.namedtuple('ClassPhrases', ['quantity', 'location'])
+
+# How much of the study area a class covers, by percentage. A class of 20% or less
+# is a fraction, which is only spelled out when it is the only fraction of its kind.
+quantityLadder = [(0, None), (20, "about a quarter of "), (30, "about a third of "), (40, "just under half of "),
+                  (49, "half of "), (51, "just over half of "), (60, "much of "), (80, "most of "), (99.0, "")]
+# How much of a class is in the part of the study area where most of it is, by fraction of its cells.
+locationLadder = [(.66, "Most of {this}"), (.9, "Almost all of {this}"), (.99, "{This}")]
+grammaticalNumber = {False: {'this': "this", 'This': "This", 'is': "is", 'covers': "covers"},
+                     True: {'this': "these", 'This': "These", 'is': "are", 'covers': "cover"}}
+
+def compilePhrases(dictionary, quantity, fraction, location, plurals):
+    """compilePhrases(dictionary, quantity, fraction, location, plurals)
+
+    Compiles the quantity and location sentences of every class in
+    dictionary and returns a ClassPhrases for each, by class. quantity,
+    fraction and location are sentence patterns: {name}, {quantity} and
+    the words of grammaticalNumber are filled in now, and the doubled
+    braces are left as slots for render(). The classes in plurals take
+    plural words.
 
-        if studyarealist[4] > 15:
-            try:
-                #Define and clear the variables used to test whether
-                #elevation is a factor in temperature change.
+    """
+    phrases = {}
+    for key, name in dictionary.items():
+        words = dict(grammaticalNumber[key in plurals])
+        words['name'] = name.replace("{", "{{").replace("}", "}}")
+        templates = []
+        for threshold, amount in quantityLadder:
+            if amount is None:
+                templates.append(fraction.format(**words))
+            else:
+                templates.append(quantity.format(quantity=amount, **words))
+        leads = [lead.format(**words) for threshold, lead in locationLadder]
+        phrases[key] = ClassPhrases(PhraseTable([threshold for threshold, amount in quantityLadder], templates),
+                                    PhraseTable([threshold for threshold, lead in locationLadder],
+                                                [location.format(lead=lead, **words) for lead in leads]))
+    return phrases
+
+bioclimatePhrases = compilePhrases(bioclimate_dict,
+    "{{elevation}}{quantity}{{article}}{{area}} has a {name} bioclimate{{detail}}. {{location}}",
+    "{{elevation}}a fraction of {{article}}{{area}} has a {name} bioclimate{{detail}}. ",
+    "{lead} {name} bioclimate zone {is} in the {{part}} of the {{area}}. ",
+    ())
+landformPhrases = compilePhrases(landform_dict,
+    "{{elevation}}{quantity}{{article}}{{area}} is {{slope}}{name}{{aspect}}{{detail}}. {{location}}",
+    "{{elevation}}a fraction of {{article}}{{area}} {{slope}}{name}{{aspect}}{{detail}}. ",
+    "{lead} {name} {is} on the {{part}} of the {{area}}. ",
+    landform_dict)
+landcoverPhrases = compilePhrases(landcover_dict,
+    "{{population}}{{elevation}}{{density}}{name}{{detail}} {covers} {quantity}{{article}}{{area}}. {{location}}",
+    "{{population}}{{elevation}}{{density}}{name}{{detail}} {covers} a fraction of {{article}}{{area}}. ",
+    "{lead} {name} {is} in the {{part}} of the {{area}}. ",
+    ('Urban areas', 'Lichens and mosses'))
+lithologyPhrases = compilePhrases(lithology_dict,
+    "{name}{{detail}} underlie {quantity}{{article}}{{area}}. {{location}}",
+    "{name}{{detail}} underlie a fraction of {{article}}{{area}}. ",
+    "{lead} {name} {is} in the {{part}} of the {{area}}. ",
+    lithology_dict)
+
+# The synthesis reads nothing but the facts of the study area, so descriptions can be
+# re-worded from recorded facts without fetching or analyzing any raster.
+def synthesizeDescription(facts):
+    """synthesizeDescription(facts)
+
+    Synthesizes the four paragraph description of a study area from its
+    facts, a dictionary with its studyarealist record, the classlist of
+    class records, classtimes and the cellsize they were measured at.
+    Returns "" if nothing could be synthesized.
+
+    """
+    #the sentences read the facts by position, which is quicker from plain lists.
+    studyarealist = facts['studyarealist'].toList()
+    classlist = [row.toList() for row in facts['classlist']]
+    landcovertimes, lithologytimes, bioclimatetimes, landformtimes = facts['classtimes']
+    cellsize = facts['cellsize']
+    #proper names are used as they are, generic names such as "study area" take "the".
+    article = ""
+    if not studyarealist[0][0].isupper():
+        article = "the "
+    description = ""
+
+    #---------------------------------------------------------------------------------
+    #
+    #                               synthesis
+    #
+    #               Synthesize human readable text from classlist.
+    #               Use it to populate the description variable.
+    #
+    #---------------------------------------------------------------------------------
+
+    if studyarealist[4] > 15:
+
+        try:
+            divfragment = ""
+            divstatement = ""
+            studyareasqmeters = studyarealist[4] * cellsize
+            if studyareasqmeters < 53000:
+                    if studyarealist[12] < 0.1:
+                            divfragment = "An area with very uniform landscape, "
+                    elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
+                            divfragment = "An area with uniform landscape, "
+                    elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
+                            pass
+                    elif studyarealist[12] >= 1 and studyarealist[12] < 2:
+                            divstatement = studyarealist[0] + " has rather high landscape diversity. "
+                    elif studyarealist[12] >= 2 and studyarealist[12] < 10:
+                            divstatement = "For such a small area, "+studyarealist[0]+" has very high landscape diversity. "
+                    else: #studyarealist[12] > 10
+                            divstatement = "For such a small area, "+studyarealist[0]+" has extraordinarily high landscape diversity. "
+            elif studyareasqmeters >= 53000 and studyareasqmeters < 1000000:
+                    if studyarealist[12] < 0.1:
+                            divfragment = "A very uniform landscape, "
+                    elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
+                            divfragment = "A uniform landscape, "
+                    elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
+                            pass
+                    elif studyarealist[12] >= 1 and studyarealist[12] < 2:
+                            pass
+                    elif studyarealist[12] >= 2 and studyarealist[12] < 10:
+                            divstatement = "For a small area, "+studyarealist[0]+" has very high landscape diversity. "
+                    else: #studyarealist[12] > 10
+                            divstatement = "For a small area, "+studyarealist[0]+" has extraordinarily high landscape diversity. "
+            elif studyareasqmeters >= 1000000 and studyareasqmeters < 10000000:
+                    if studyarealist[12] < 0.1:
+                            divstatement = studyarealist[0]+" has extraordinarily low landscape diversity. "
+                    elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
+                            divstatement = studyarealist[0]+" has very low landscape diversity. "
+                    elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
+                            pass
+                    elif studyarealist[12] >= 1 and studyarealist[12] < 2:
+                            pass
+                    elif studyarealist[12] >= 2 and studyarealist[12] < 10:
+                            divstatement = studyarealist[0]+" is a highly diverse landscape. "
+                    else: #studyarealist[12] > 10
+                            divstatement = studyarealist[0]+" has extraordinarily high diversity in its landscape. "
+            elif studyareasqmeters >= 10000000 and studyareasqmeters < 100000000:
+                    if studyarealist[12] < 0.1:
+                            divstatement = "For such a large area, "+studyarealist[0]+" has extraordinarily low diversity in its landscapes. "
+                    elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
+                            divstatement = "For such a large area, "+studyarealist[0]+" has very low diversity in its landscapes. "
+                    elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
+                            pass
+                    elif studyarealist[12] >= 1 and studyarealist[12] < 2:
+                            pass
+                    elif studyarealist[12] >= 2 and studyarealist[12] < 10:
+                            divfragment = "A rather large area with very diverse landscapes, "
+                    else: #studyarealist[12] > 10
+                            divfragment = "A rather large area with extraordinarily diverse landscapes, "
+            else: #if studyareasqmeters >= 100000000:
+                    if studyarealist[12] < 0.1:
+                            divstatement = "For such a large area, "+studyarealist[0]+" has extraordinarily little diversity in its landscapes. "
+                    elif studyarealist[12] >= 0.1 and studyarealist[12] < 0.5:
+                            divstatement = "For such a large area, "+studyarealist[0]+" has very low landscape diversity. "
+                    elif studyarealist[12] >= 0.5 and studyarealist[12] < 1:
+                            divstatement = studyarealist[0]+" has rather low landscape diversity. "
+                    elif studyarealist[12] >= 1 and studyarealist[12] < 2:
+                            pass
+                    elif studyarealist[12] >= 2 and studyarealist[12] < 10:
+                            divfragment = "A very diverse area, "
+                    else: #studyarealist[12] > 10
+                            divfragment = "An extraordinarily diverse area, "
+
+        except:
+            # Get the traceback object
+            tb = sys.exc_info()[2]
+            tbinfo = traceback.format_tb(tb)[0]
+            # Concatenate information together concerning the error into a message string
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+            # Write Python error messages to log
+            err= pymsg + "\n"
+            print(err)
+
+    if studyarealist[4] > 15:
+        try:
+            #Define and clear the variables used to test whether
+            #elevation is a factor in temperature change.
+            elev = -9999
+            junk = ""
+            jjunk = ""
+            temptext = ""
+            elevationalready = 0
+            tempelevlist=[]
+            tempelevlist0=[]
+            temprangelist=[]
+            temprangelist0=[]
+
+            #Check to see if elevation is a factor in temperature change.
+            #Find the range of temperatures (without moisture) in the study area.
+            #Put them into a list called tempelevlist0.
+            templist = ['very hot','hot','warm','cool','cold','very cold']
+            for row in classlist:
+                if row[0].endswith("Bioclimate_R") == True and row[3] > 10:
+                #if row[0]== output+"\\Bioclimate_R" and row[3] > 10:
+                    junk = bioclimate_dict[row[1]].rfind(' and')
+                    jjunk =bioclimate_dict[row[1]][:junk]
+                    tempelevlist0.append(row[8])
+                    tempelevlist0.append(jjunk)
+                    tempelevlist.append(tempelevlist0)
+                tempelevlist0 = []
+            for temp in templist:
                 elev = -9999
-                junk = ""
-                jjunk = ""
-                temptext = ""
-                elevationalready = 0
-                tempelevlist=[]
-                tempelevlist0=[]
-                temprangelist=[]
-                temprangelist0=[]
-
-                #Check to see if elevation is a factor in temperature change.
-                #Find the range of temperatures (without moisture) in the study area.
-                #Put them into a list called tempelevlist0.
-                templist = ['very hot','hot','warm','cool','cold','very cold']
-                for row in classlist:
-                    if row[0].endswith("Bioclimate_R") == True and row[3] > 10:
-                    #if row[0]== output+"\\Bioclimate_R" and row[3] > 10:
-                        junk = bioclimate_dict[row[1]].rfind(' and')
-                        jjunk =bioclimate_dict[row[1]][:junk]
-                        tempelevlist0.append(row[8])
-                        tempelevlist0.append(jjunk)
-                        tempelevlist.append(tempelevlist0)
-                    tempelevlist0 = []
-                for temp in templist:
-                    elev = -9999
-                    x = 0
-                    elevsum = 0
-                    for row in sorted(tempelevlist):
-                        if temp == row[1]:
-                            x = x + 1
-                            elevsum = elevsum + row[0]
-                            elev = float(elevsum / x)
-                    if elev > -1000:
-                        temprangelist0.append(elev)
-                        temprangelist0.append(temp)
-                        temprangelist.append(temprangelist0)
-                    temprangelist0 = []
-                    elev = -9999
-                n = 1
-
-                #Elevation can be considered a factor in temperature change when there is a
-                #change in the median elevation of 300m. When this occurs, synthesize text
-                #where elevation is found to be a factor in temperature change. For example:
-                #"As the elevation increases, bioclimate temperatures drop from cool to cold."
-                #Since this may be when we bring up the subject of elevation for the first time,
-                #This may also be the time to give an elevation range for the whole study area.
-                while n < len(temprangelist):
-                    if temprangelist[n][0]-temprangelist[n-1][0] > 300:
-                        if n == 1:
-                            temptext0000 = ""
-                            temptext000 = ""
-                            temptext0000 = divfragment+studyarealist[0]+" rises in elevation from {:,}".format(studyarealist[5])+" to {:,}".format(studyarealist[6])+" meters. "
-                            temptext000 = temptext0000[0].capitalize()+temptext0000[1:-1]+" "
-                            if studyarealist[5] == -4:
-                                temptext = temptext000.replace(" rises in elevation from -4 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == -3:
-                                temptext = temptext000.replace(" rises in elevation from -3 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == -2:
-                                temptext = temptext000.replace(" rises in elevation from -2 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == -1:
-                                temptext = temptext000.replace(" rises in elevation from -1 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == 0:
-                                temptext = temptext000.replace(" rises in elevation from 0 to "," rises in elevation from sea level to ")
-                            elif studyarealist[5] == 1:
-                                temptext = temptext000.replace(" rises in elevation from 1 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == 2:
-                                temptext = temptext000.replace(" rises in elevation from 2 to "," rises in elevation from about sea level to ")
-                            elif studyarealist[5] == 3:
-                                temptext = temptext000.replace(" rises in elevation from 3 to "," rises in elevation from about sea level to ")
-                            else:
-                                temptext = temptext000
-                            temptext += "As the elevation increases, temperatures drop from "+temprangelist[n-1][1]+" to "+temprangelist[n][1]
+                x = 0
+                elevsum = 0
+                for row in sorted(tempelevlist):
+                    if temp == row[1]:
+                        x = x + 1
+                        elevsum = elevsum + row[0]
+                        elev = float(elevsum / x)
+                if elev > -1000:
+                    temprangelist0.append(elev)
+                    temprangelist0.append(temp)
+                    temprangelist.append(temprangelist0)
+                temprangelist0 = []
+                elev = -9999
+            n = 1
+
+            #Elevation can be considered a factor in temperature change when there is a
+            #change in the median elevation of 300m. When this occurs, synthesize text
+            #where elevation is found to be a factor in temperature change. For example:
+            #"As the elevation increases, bioclimate temperatures drop from cool to cold."
+            #Since this may be when we bring up the subject of elevation for the first time,
+            #This may also be the time to give an elevation range for the whole study area.
+            while n < len(temprangelist):
+                if temprangelist[n][0]-temprangelist[n-1][0] > 300:
+                    if n == 1:
+                        temptext0000 = ""
+                        temptext000 = ""
+                        temptext0000 = divfragment+studyarealist[0]+" rises in elevation from {:,}".format(studyarealist[5])+" to {:,}".format(studyarealist[6])+" meters. "
+                        temptext000 = temptext0000[0].capitalize()+temptext0000[1:-1]+" "
+                        if studyarealist[5] == -4:
+                            temptext = temptext000.replace(" rises in elevation from -4 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == -3:
+                            temptext = temptext000.replace(" rises in elevation from -3 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == -2:
+                            temptext = temptext000.replace(" rises in elevation from -2 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == -1:
+                            temptext = temptext000.replace(" rises in elevation from -1 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == 0:
+                            temptext = temptext000.replace(" rises in elevation from 0 to "," rises in elevation from sea level to ")
+                        elif studyarealist[5] == 1:
+                            temptext = temptext000.replace(" rises in elevation from 1 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == 2:
+                            temptext = temptext000.replace(" rises in elevation from 2 to "," rises in elevation from about sea level to ")
+                        elif studyarealist[5] == 3:
+                            temptext = temptext000.replace(" rises in elevation from 3 to "," rises in elevation from about sea level to ")
                         else:
-                            temptext += " and from "+temprangelist[n-1][1]+" to "+temprangelist[n][1]
-                        elevationalready = 1
-                    n = n + 1
-                if temptext != "":
-                    temptext0 = ""
-                    temptext00 = ""
-                    i = temptext.rfind(" and from")
-                    temptext0 = temptext[:i].replace(" and from ", ", ")
-                    temptext00 = temptext0 + temptext[i:].replace(" and from",", and from")
-                    temptext = temptext00+". "
-                tempsearch = [[', and from very hot to hot. ','As the elevation increases, temperatures drop from very hot to hot. '],[', and from hot to warm. ','As the elevation increases, temperatures drop from hot to warm. '],[', and from warm to cool. ','As the elevation increases, temperatures drop from warm to cool. '],[', and from cool to cold. ','As the elevation increases, temperatures drop from cool to cold. '],[', and from cold to very cold. ','As the elevation increases, temperatures drop from cold to very cold. ']]
-                for pairs in tempsearch:
-                    if temptext == pairs[0]:
-                        temptext = pairs[1]
+                            temptext = temptext000
+                        temptext += "As the elevation increases, temperatures drop from "+temprangelist[n-1][1]+" to "+temprangelist[n][1]
+                    else:
+                        temptext += " and from "+temprangelist[n-1][1]+" to "+temprangelist[n][1]
+                    elevationalready = 1
+                n = n + 1
+            if temptext != "":
+                temptext0 = ""
+                temptext00 = ""
+                i = temptext.rfind(" and from")
+                temptext0 = temptext[:i].replace(" and from ", ", ")
+                temptext00 = temptext0 + temptext[i:].replace(" and from",", and from")
+                temptext = temptext00+". "
+            tempsearch = [[', and from very hot to hot. ','As the elevation increases, temperatures drop from very hot to hot. '],[', and from hot to warm. ','As the elevation increases, temperatures drop from hot to warm. '],[', and from warm to cool. ','As the elevation increases, temperatures drop from warm to cool. '],[', and from cool to cold. ','As the elevation increases, temperatures drop from cool to cold. '],[', and from cold to very cold. ','As the elevation increases, temperatures drop from cold to very cold. ']]
+            for pairs in tempsearch:
+                if temptext == pairs[0]:
+                    temptext = pairs[1]
 
-            except:
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
+        except:
+            # Get the traceback object
+            tb = sys.exc_info()[2]
+            tbinfo = traceback.format_tb(tb)[0]
+            # Concatenate information together concerning the error into a message string
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+            # Write Python error messages to log
+            err= pymsg + "\n"
+            print(err)
 
 
-        if studyarealist[4] > 15:
-            try:
-                #Define and clear variables used in language synthesis.
-                n = 0
-                nolandformsonlitho = 1
-                nolandformsonlithostr0 = ""
-                nolandformsonlithostr00 = ""
-                nolandformsonlithostr000 = ""
-                alllitholist = []
-                bioclimatefractions = []
-                landformfractions = []
-                landcoverfractions = []
-                lithologyfractions = []
-                bioclimatefractiontext = ""
-                landformfractiontext = ""
-                landcoverfractiontext = ""
-                lithologyfractiontext = ""
-                bioclimatestr0 = ""
-                landformstr0 = ""
-                landcoverstr0 = ""
-                lithologystr0 = ""
-                elevrangestr = ""
-                elevrangestr0 = ""
-                landcoverredundency = 0
-                lithologyredundency = 0
-                bodyofwaterredundency = 0
-                predescription = ""
+    if studyarealist[4] > 15:
+        try:
+            #Define and clear variables used in language synthesis.
+            n = 0
+            nolandformsonlitho = 1
+            nolandformsonlithostr0 = ""
+            nolandformsonlithostr00 = ""
+            nolandformsonlithostr000 = ""
+            alllitholist = []
+            bioclimatefractions = []
+            landformfractions = []
+            landcoverfractions = []
+            lithologyfractions = []
+            bioclimatefractiontext = ""
+            landformfractiontext = ""
+            landcoverfractiontext = ""
+            lithologyfractiontext = ""
+            bioclimatestr0 = ""
+            landformstr0 = ""
+            landcoverstr0 = ""
+            lithologystr0 = ""
+            elevrangestr = ""
+            elevrangestr0 = ""
+            landcoverredundency = 0
+            lithologyredundency = 0
+            bodyofwaterredundency = 0
+            predescription = ""
+            description = ""
+            opener = ""
+            biolocstr = ""
+            litholocstr = ""
+            landformlocstr = ""
+            landcoverlocstr = ""
+            if divstatement == "":
                 description = ""
-                opener = ""
-                biolocstr = ""
-                litholocstr = ""
-                landformlocstr = ""
-                landcoverlocstr = ""
-                if divstatement == "":
-                    description = ""
-                else:
-                    opener = divstatement[0].capitalize()+divstatement[1:]
-                    description = opener.replace('Study area ', 'The study area ')
-                #conjunctions = ['','about a','another','yet another','still another','and another','another','another','another','another','another','another','another']
-                conjunctions = ['','about a','about a','about a','about a','about a','about a','about a','about a','about a','about a','about a','about a']
-                conjunctions_simple = ['','a','a','a','a','a','a','a','a','a','a','a','a']
-
-                #Loop through the classlist, passing data assembled in the "significant class facts" phase
-                #to conditional statements to synthesize the text.
-                currentTime = time.clock()
-                print(str(currentTime-startTime)+" seconds have elapsed so far")
-                print("Synthesizing text.")
-                for row in classlist:
-                    #surface water occurs in both land cover and lithology classes. Flag the redundency so that
-                    #it is only mentioned once in the synthesized text.
-                    if row[11] == 'Surface Water':
-                        bodyofwaterredundency = 1
-
-                    #############################################################################
-                    #if this is a bioclimate class, assemble the text in the following section:
-                    if row[0].endswith("Bioclimate_R") == True:
-                    #if row[0] == output+"\\Bioclimate_R":
-                        bioclimatefractiontext = ""
-                        bioclimatefractiontext0 = ""
-                        landcoveronbioclim = ""
-                        bioclimateelevationtext = ""
-
-                        #If a bioclimate class is mostly on one side of a watershed, assemble text for that into the variable biolocstr.
-                        #Otherwise the variable biolocstr is left blank.
-                        biolocstr = ""
-                        if row[31]/row[2] > .66:
-                        	biolocstr = "Most of this "+bioclimate_dict[row[1]]+" bioclimate zone is in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .9:
-                        	biolocstr = "Almost all of this "+bioclimate_dict[row[1]]+" bioclimate zone is in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .99:
-                        	biolocstr = "This "+bioclimate_dict[row[1]]+" bioclimate zone is in the "+row[32]+" of the "+studyarealist[1]+". "
-
-                        if row[4] == 1:
-                            description += temptext
-
-                        #If the median elevation of the bioclimate class occurs one half of a standard deviation above the mean,
-                        #add text that it occurs at the higher elevations. If it's one half of a standard deviation below
-                        #the mean, add text that it occurs at the lower elevations.
-                        if row[7] > (studyarealist[7] + ((studyarealist[10]-studyarealist[7])/2)):
-                            bioclimateelevationtext = "at the higher elevations, "
-                        if row[7] < (studyarealist[7] - ((studyarealist[7]-studyarealist[9])/2)):
-                            bioclimateelevationtext = "at the lower elevations, "
-                        if row[4] > 1:
-                            n = 1
-                            bioclimatearticle = "the "
-                        else:
-                            n = 0
-                            bioclimatearticle = article
-
-                        #If the bioclimate class has mostly one land cover type, include an adjective phrase which
-                        #gives detail about what land cover class is found there.
-                        if row[16] < 95.000001 and landcoverredundency == 0:
-                            if row[16] >= 50:
-                                landcoveronbioclim = ", which is mostly covered by "+short_landcover_dict[row[15]]
-                            if row[16] >= 89:
-                                landcoveronbioclim = ", which is almost completely covered by "+short_landcover_dict[row[15]]
-                            if row[16] >= 99:
-                                landcoveronbioclim = ", which is completely covered by "+short_landcover_dict[row[15]]
-
-                        #assemble descriptive text for the bioclimate class, capitalize it, and append it to the description variable.
-                        if row[3] > 99.0:
-                            bioclimatestr0 = bioclimateelevationtext+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 80:
-                            bioclimatestr0 = bioclimateelevationtext+"most of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 60:
-                            bioclimatestr0 = bioclimateelevationtext+"much of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 51:
-                            bioclimatestr0 = bioclimateelevationtext+"just over half of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 49:
-                            bioclimatestr0 = bioclimateelevationtext+"half of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 40:
-                            bioclimatestr0 = bioclimateelevationtext+"just under half of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 30:
-                            bioclimatestr0 = bioclimateelevationtext+conjunctions[row[4]]+" third of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-                        elif row[3] > 20:
-                            bioclimatestr0 = bioclimateelevationtext+conjunctions[row[4]]+" quarter of "+bioclimatearticle+studyarealist[n]+" has a "+ bioclimate_dict[row[1]] +" bioclimate"+landcoveronbioclim+ ". "+biolocstr
-                            description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
-
-                        #If there is more than one fraction of a class, group them together and make all the fractions into one sentence.
-                        else:
-                            bioclimatefractions.append(row)
-                            if row[4] == bioclimatetimes:
-                                if len(bioclimatefractions) < 1:
-                                    bioclimatefractiontext = ""
-                                if len(bioclimatefractions) == 1:
-                                    bioclimatefractiontext = bioclimateelevationtext+conjunctions_simple[row[4]]+ " fraction of the "+studyarealist[n]+" has a "+bioclimate_dict[row[1]]+" bioclimate"+landcoveronbioclim+". "
-                                else:
-                                    bioclimatefractiontext += "fractions of the "+studyarealist[1]+" have "
-                                    for row in bioclimatefractions:
-                                        bioclimatefractiontext += bioclimate_dict[row[1]] + ", "
-                                    bioclimatefractiontext0 = bioclimatefractiontext[:-2]+" bioclimates. "
-                                    k = bioclimatefractiontext0.rfind(",")
-                                    if len(bioclimatefractions) == 2:
-                                        bioclimatefractiontext = bioclimatefractiontext0[:k] + " and" + bioclimatefractiontext0[k+1:]
-                                    else:
-                                        bioclimatefractiontext = bioclimatefractiontext0[:k] + ", and" + bioclimatefractiontext0[k+1:]
+            else:
+                opener = divstatement[0].capitalize()+divstatement[1:]
+                description = opener.replace('Study area ', 'The study area ')
+
+            #Loop through the classlist, passing data assembled in the "significant class facts" phase
+            #to conditional statements to synthesize the text.
+            for row in classlist:
+                #surface water occurs in both land cover and lithology classes. Flag the redundency so that
+                #it is only mentioned once in the synthesized text.
+                if row[11] == 'Surface Water':
+                    bodyofwaterredundency = 1
+
+                #############################################################################
+                #if this is a bioclimate class, assemble the text in the following section:
+                if row[0].endswith("Bioclimate_R") == True:
+                #if row[0] == output+"\\Bioclimate_R":
+                    bioclimatefractiontext = ""
+                    bioclimatefractiontext0 = ""
+                    landcoveronbioclim = ""
+                    bioclimateelevationtext = ""
+
+                    #If a bioclimate class is mostly on one side of a watershed, assemble text for that into the variable biolocstr.
+                    #Otherwise the variable biolocstr is left blank.
+                    bioclimatephrases = bioclimatePhrases[row[1]]
+                    biolocstr = bioclimatephrases.location.render(row[31]/row[2], part=row[32], area=studyarealist[1])
+
+                    if row[4] == 1:
+                        description += temptext
+
+                    #If the median elevation of the bioclimate class occurs one half of a standard deviation above the mean,
+                    #add text that it occurs at the higher elevations. If it's one half of a standard deviation below
+                    #the mean, add text that it occurs at the lower elevations.
+                    if row[7] > (studyarealist[7] + ((studyarealist[10]-studyarealist[7])/2)):
+                        bioclimateelevationtext = "at the higher elevations, "
+                    if row[7] < (studyarealist[7] - ((studyarealist[7]-studyarealist[9])/2)):
+                        bioclimateelevationtext = "at the lower elevations, "
+                    if row[4] > 1:
+                        n = 1
+                        bioclimatearticle = "the "
+                    else:
+                        n = 0
+                        bioclimatearticle = article
+
+                    #If the bioclimate class has mostly one land cover type, include an adjective phrase which
+                    #gives detail about what land cover class is found there.
+                    if row[16] < 95.000001 and landcoverredundency == 0:
+                        if row[16] >= 50:
+                            landcoveronbioclim = ", which is mostly covered by "+short_landcover_dict[row[15]]
+                        if row[16] >= 89:
+                            landcoveronbioclim = ", which is almost completely covered by "+short_landcover_dict[row[15]]
+                        if row[16] >= 99:
+                            landcoveronbioclim = ", which is completely covered by "+short_landcover_dict[row[15]]
+
+                    #assemble descriptive text for the bioclimate class, capitalize it, and append it to the description variable.
+                    if row[3] > 20:
+                        bioclimatestr0 = bioclimatephrases.quantity.render(row[3], elevation=bioclimateelevationtext, article=bioclimatearticle,
+                                                                           area=studyarealist[n], detail=landcoveronbioclim, location=biolocstr)
+                        description += bioclimatestr0[0].capitalize()+bioclimatestr0[1:]
+
+                    #If there is more than one fraction of a class, group them together and make all the fractions into one sentence.
+                    else:
+                        bioclimatefractions.append(row)
                         if row[4] == bioclimatetimes:
-                            if len(bioclimatefractiontext) > 2:
-                                description += bioclimatefractiontext[0].capitalize()+bioclimatefractiontext[1:-1]+"</p><p>"
-                            else:
-                                description += "</p><p>"
-
-                    #############################################################################
-                    #if this is a landform class, assemble the text in the following section:
-                    if row[0].endswith("Landform_R") == True:
-                    #if row[0] == output+"\\Landform_R":
-                        landformfractiontext = ""
-                        landformfractiontext0 = ""
-                        landformslopetext = ""
-                        landformaspecttext = ""
-                        landformelevationtext = ""
-                        landformelevationtext0 = ""
-                        landformlithologytext = ""
-                        if row[4] > 1:
-                            n = 1
-                            landformarticle = "the "
-                        else:
-                            n = 0
-                            landformarticle = article
-
-
-                        #If a landform class is mostly on one side of a watershed, assemble text for that into the variable landformlocstr.
-                        #Otherwise the variable landformlocstr is left blank.
-                        landformlocstr = ""
-                        if row[31]/row[2] > .66:
-                        	landformlocstr = "Most of these "+landform_dict[row[1]]+" are on the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .9:
-                        	landformlocstr = "Almost all of these "+landform_dict[row[1]]+" are on the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .99:
-                        	landformlocstr = "These "+landform_dict[row[1]]+" are on the "+row[32]+" of the "+studyarealist[1]+". "
-
-                        #If landforms are hills or mountains, and the mean percent slope is > 40%,
-                        #append the adjective "extremely steep" to the description.
-                        if row[1] != 'Surface Water':
-                            if 'ills' in landform_dict[row[1]]:
-                                landformaspectext = row[21]
-            ##                    if row[19] > 8:
-            ##                        landformslopetext = "moderately sloped "
-            ##                    if row[19] > 20:
-            ##                        landformslopetext = "steep "
-                                if row[19] > 40:
-                                    landformslopetext = "extremely steep "
-                            if 'ountains' in landform_dict[row[1]]:
-                                landformaspecttext = row[21]
-            ##                    if row[19] > 8:
-            ##                        landformslopetext = "moderately sloped "
-            ##                    if row[19] > 20:
-            ##                        landformslopetext = "steep "
-                                if row[19] > 40:
-                                    landformslopetext = "extremely steep "
-
-                            #If the median elevation of the bioclimate class occurs a standard deviation above the mean,
-                            #add text that it occurs at the higher elevations. If it's a standard deviation below
-                            #the mean, add text that it occurs at the lower elevations.
-                            if row[7] > studyarealist[10]:
-                                landformelevationtext = "at higher elevations, "
-                            if row[7] < studyarealist[9]:
-                                landformelevationtext = "at lower elevations, "
-
-                            #If the landform class has mostly one rock type, include an adjective phrase which
-                            #gives detail about what lithology is found there.
-                            if row[14] < 95.000001 and lithologyredundency == 0:
-                                if row[14] >= 50:
-                                    landformlithologytext = ", mostly composed of "+lithology_dict[row[13]]
-                                if row[14] >= 89:
-                                    landformlithologytext = ", almost all composed of "+lithology_dict[row[13]]
-                                if row[14] >= 99:
-                                    landformlithologytext = ", completely composed of "+lithology_dict[row[13]]
-
-                            #assemble descriptive text for the landform class, capitalize it, and append it to the description variable.
-                            if row[3] > 99.0:
-                                landformstr0 = landformelevationtext+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 80:
-                                landformstr0 = landformelevationtext+"most of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 60:
-                                landformstr0 = landformelevationtext+"much of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 51:
-                                landformstr0 = landformelevationtext+"just over half of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 49:
-                                landformstr0 = landformelevationtext+"half of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 40:
-                                landformstr0 = landformelevationtext+"just under half of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 30:
-                                landformstr0 = landformelevationtext+conjunctions[row[4]]+" third of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-                            elif row[3] > 20:
-                                landformstr0 = landformelevationtext+conjunctions[row[4]]+" quarter of "+landformarticle+studyarealist[n]+" is "+landformslopetext+ landform_dict[row[1]] +landformaspecttext+landformlithologytext+". "+landformlocstr
-                                description += landformstr0[0].capitalize()+landformstr0[1:]
-
-                            #If there is more than one fraction of a class, group them together, making the fractions into one sentence.
+                            if len(bioclimatefractions) < 1:
+                                bioclimatefractiontext = ""
+                            if len(bioclimatefractions) == 1:
+                                bioclimatefractiontext = bioclimatephrases.quantity.render(row[3], elevation=bioclimateelevationtext, article="the ",
+                                                                                           area=studyarealist[n], detail=landcoveronbioclim)
                             else:
-                                landformfractions.append(row)
-                                if row[4] == landformtimes:
-                                    if len(landformfractions) < 1:
-                                        landformfractiontext = ""
-                                    if len(landformfractions) == 1:
-                                        landformfractiontext = landformelevationtext+conjunctions_simple[row[4]]+" fraction of the "+studyarealist[2]+" "+landformslopetext+landform_dict[row[1]]+landformaspecttext+landformlithologytext+". "
-                                    else:
-                                        landformfractiontext += "fractions of the "+studyarealist[1]+" form "
-                                        for row in landformfractions:
-                                            landformfractiontext += landform_dict[row[1]] + ", "
-                                        landformfractiontext0 = landformfractiontext[:-2]+". "
-                                        k = landformfractiontext0.rfind(",")
-                                        if len(landformfractions) == 2:
-                                            landformfractiontext = landformfractiontext0[:k] + " and" + landformfractiontext0[k+1:]
-                                        else:
-                                            landformfractiontext = landformfractiontext0[:k] + ", and" + landformfractiontext0[k+1:]
-                            if row[4] == landformtimes:
-                                if len(landformfractiontext) > 2:
-                                    description += landformfractiontext[0].capitalize()+landformfractiontext[1:-1]+"</p><p>"
+                                bioclimatefractiontext += "fractions of the "+studyarealist[1]+" have "
+                                for row in bioclimatefractions:
+                                    bioclimatefractiontext += bioclimate_dict[row[1]] + ", "
+                                bioclimatefractiontext0 = bioclimatefractiontext[:-2]+" bioclimates. "
+                                k = bioclimatefractiontext0.rfind(",")
+                                if len(bioclimatefractions) == 2:
+                                    bioclimatefractiontext = bioclimatefractiontext0[:k] + " and" + bioclimatefractiontext0[k+1:]
                                 else:
-                                    description += "</p><p>"
-
-                    #############################################################################
-                    #if this is a land cover class, assemble the text in the following section:
-                    if row[0].endswith("Landcover_R") == True:
-                    #if row[0] == output+"\\Landcover_R":
-                        landcoverfractiontext = ""
-                        landcoverfractiontext0 = ""
-                        landcoverpoptext = ""
-                        landcoverelevstr = ""
-                        densitytext = ""
-                        waterbodypoptext = ""
-                        covertext = " covers "
-                        thelandcover = landcover_dict[row[1]]
-
-                        #If a land cover class is mostly on one side of a watershed, assemble text for that into the variable landcoverlocstr.
-                        #Otherwise the variable landcoverlocstr is left blank.
-                        landcoverlocstr = ""
-                        landcoverlocstr0 = ""
-                        landcoverlocstr00 = ""
-                        if row[31]/row[2] > .66:
-                        	landcoverlocstr0 = "Most of this "+landcover_dict[row[1]]+" is in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .9:
-                        	landcoverlocstr0 = "Almost all of this "+landcover_dict[row[1]]+" is in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .99:
-                        	landcoverlocstr0 = "This "+landcover_dict[row[1]]+" is in the "+row[32]+" of the "+studyarealist[1]+". "
-                        landcoverlocstr00 = landcoverlocstr0.replace('this urban areas is','these urban areas are')
-                        landcoverlocstr = landcoverlocstr00.replace('This urban areas is','These urban areas are')
-
-                        if row[4] > 1:
-                            n = 1
-                            landcoverarticle = "the "
+                                    bioclimatefractiontext = bioclimatefractiontext0[:k] + ", and" + bioclimatefractiontext0[k+1:]
+                    if row[4] == bioclimatetimes:
+                        if len(bioclimatefractiontext) > 2:
+                            description += bioclimatefractiontext[0].capitalize()+bioclimatefractiontext[1:-1]+"</p><p>"
                         else:
-                            n = 0
-                            landcoverarticle = article
-                        if len(row) > 20:
-                            if 'Tree cover' in row[1] and row[20] > 7250:
-                                densitytext = "dense, "
-                        ##if row[1] in ['Cropland, rainfed','Cropland, rainfed - Herbaceous cover','Cropland, rainfed - Tree or shrub cover','Cropland irrigated or post-flooding','Mosaic cropland (>50%) / natural vegetation (Tree, shrub, herbaceous cover) (<50%)','Mosaic natural vegetation (Tree, shrub, herbaceous cover) (>50%) / cropland (<50%)']:
-                            ##landcoverpoptext = "with an estimated population of "+"{:,}".format(int(round(row[19],-2)))+", "
-                        if row[1] in ['Urban areas']:
-                            landcoverpoptext = "with an estimated population of "+"{:,}".format(int(round(row[19],-3)))+", "
-                            covertext = " cover "
-            ##            if row[1] in ['Water bodies']:
-            ##                waterbodypoptext = " (approximately "+str(round(studyarealist[11],1))+"% of the "+studyarealist[1]+")"
-            ##                covertext = " cover "
-                        if row[1] in ['Lichens and mosses']:
-                            covertext = " cover "
-
-                        #If the land cover class is mostly bare ground or sparsely vegetated,
-                        #give detail about type of bare ground is found there (from the lithology).
-                        if row[1] in ['Bare areas','Consolidated bare areas','Unconsolidated bare areas']:
-                            if row[14] > 50:
-                                thelandcover = landcover_dict[row[1]]+", mostly "+lithology_dict[row[13]]+","
-                            if row[14] > 90:
-                                thelandcover = landcover_dict[row[1]]+", almost all "+lithology_dict[row[13]]+","
-                            if row[14] > 99:
-                                thelandcover = landcover_dict[row[1]]+", composed of "+lithology_dict[row[13]]+","
-                        if row[1] in ['Sparse shrub (<15%)','Sparse herbaceous cover (<15%)','Sparse vegetation (tree, shrub, herbaceous cover) (<15%)','Lichens and mosses']:
-                            if row[14] > 50:
-                                thelandcover = landcover_dict[row[1]]+", mostly on "+lithology_dict[row[13]]+","
-                            if row[14] > 90:
-                                thelandcover = landcover_dict[row[1]]+", almost all of it on "+lithology_dict[row[13]]+","
-                            if row[14] > 99:
-                                thelandcover = landcover_dict[row[1]]+" on "+lithology_dict[row[13]]
-
+                            description += "</p><p>"
+
+                #############################################################################
+                #if this is a landform class, assemble the text in the following section:
+                if row[0].endswith("Landform_R") == True:
+                #if row[0] == output+"\\Landform_R":
+                    landformfractiontext = ""
+                    landformfractiontext0 = ""
+                    landformslopetext = ""
+                    landformaspecttext = ""
+                    landformelevationtext = ""
+                    landformelevationtext0 = ""
+                    landformlithologytext = ""
+                    if row[4] > 1:
+                        n = 1
+                        landformarticle = "the "
+                    else:
+                        n = 0
+                        landformarticle = article
+
+
+                    #If a landform class is mostly on one side of a watershed, assemble text for that into the variable landformlocstr.
+                    #Otherwise the variable landformlocstr is left blank.
+                    landformphrases = landformPhrases[row[1]]
+                    landformlocstr = landformphrases.location.render(row[31]/row[2], part=row[32], area=studyarealist[1])
+
+                    #If landforms are hills or mountains, and the mean percent slope is > 40%,
+                    #append the adjective "extremely steep" to the description.
+                    if row[1] != 'Surface Water':
+                        if 'ills' in landform_dict[row[1]]:
+                            landformaspectext = row[21]
+        ##                    if row[19] > 8:
+        ##                        landformslopetext = "moderately sloped "
+        ##                    if row[19] > 20:
+        ##                        landformslopetext = "steep "
+                            if row[19] > 40:
+                                landformslopetext = "extremely steep "
+                        if 'ountains' in landform_dict[row[1]]:
+                            landformaspecttext = row[21]
+        ##                    if row[19] > 8:
+        ##                        landformslopetext = "moderately sloped "
+        ##                    if row[19] > 20:
+        ##                        landformslopetext = "steep "
+                            if row[19] > 40:
+                                landformslopetext = "extremely steep "
+
+                        #If the median elevation of the bioclimate class occurs a standard deviation above the mean,
+                        #add text that it occurs at the higher elevations. If it's a standard deviation below
+                        #the mean, add text that it occurs at the lower elevations.
                         if row[7] > studyarealist[10]:
-                            landcoverelevstr = "at the higher elevations, "
+                            landformelevationtext = "at higher elevations, "
                         if row[7] < studyarealist[9]:
-                            landcoverelevstr = "at the lower elevations, "
-
-                        #assemble descriptive text for the land cover class, capitalize it, and append it to the description variable.
-                        #If one of the significant classes is bodies of water, specify the quantity from the 30m water bodies raster.
-                        if row[1] in ['Water bodies'] and studyarealist[11] > 12 and studyarealist[11] < 100:
-                            #landcoverstr0 = "Bodies of water cover "+str(round(studyarealist[11],1))+"% of the "+studyarealist[1]+". "
-                            landcoverstr0 = "Bodies of water cover about "+str(round(studyarealist[11],0))[:-2]+"% of the "+studyarealist[1]+". "
-                            description += landcoverstr0
+                            landformelevationtext = "at lower elevations, "
+
+                        #If the landform class has mostly one rock type, include an adjective phrase which
+                        #gives detail about what lithology is found there.
+                        if row[14] < 95.000001 and lithologyredundency == 0:
+                            if row[14] >= 50:
+                                landformlithologytext = ", mostly composed of "+lithology_dict[row[13]]
+                            if row[14] >= 89:
+                                landformlithologytext = ", almost all composed of "+lithology_dict[row[13]]
+                            if row[14] >= 99:
+                                landformlithologytext = ", completely composed of "+lithology_dict[row[13]]
+
+                        #assemble descriptive text for the landform class, capitalize it, and append it to the description variable.
+                        if row[3] > 20:
+                            landformstr0 = landformphrases.quantity.render(row[3], elevation=landformelevationtext, article=landformarticle,
+                                                                           area=studyarealist[n], slope=landformslopetext, aspect=landformaspecttext,
+                                                                           detail=landformlithologytext, location=landformlocstr)
+                            description += landformstr0[0].capitalize()+landformstr0[1:]
+
+                        #If there is more than one fraction of a class, group them together, making the fractions into one sentence.
                         else:
-                            if row[3] > 99.0:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+" "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 80:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+"most of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 60:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+"much of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 51:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+"just over half of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 49:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+"half of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 40:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+"just under half of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 30:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+conjunctions[row[4]]+" third of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-                            elif row[3] > 20:
-                                landcoverstr0 = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+conjunctions[row[4]]+" quarter of "+landcoverarticle+studyarealist[n]+". "+landcoverlocstr
-                                description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
-
-                            #If there is more than one fraction of a class, group them together, making the fractions into one sentence.
-                            else:
-                                landcoverfractions.append(row)
-                                if row[4] == landcovertimes:
-                                    if len(landcoverfractions) < 1:
-                                        landcoverfractiontext = ""
-                                    if len(landcoverfractions) == 1:
-                                        landcoverfractiontext = landcoverpoptext+landcoverelevstr+densitytext+thelandcover+waterbodypoptext+covertext+conjunctions_simple[row[4]]+" fraction of the "+studyarealist[n]+". "
+                            landformfractions.append(row)
+                            if row[4] == landformtimes:
+                                if len(landformfractions) < 1:
+                                    landformfractiontext = ""
+                                if len(landformfractions) == 1:
+                                    landformfractiontext = landformphrases.quantity.render(row[3], elevation=landformelevationtext, article="the ",
+                                                                                           area=studyarealist[2], slope=landformslopetext,
+                                                                                           aspect=landformaspecttext, detail=landformlithologytext)
+                                else:
+                                    landformfractiontext += "fractions of the "+studyarealist[1]+" form "
+                                    for row in landformfractions:
+                                        landformfractiontext += landform_dict[row[1]] + ", "
+                                    landformfractiontext0 = landformfractiontext[:-2]+". "
+                                    k = landformfractiontext0.rfind(",")
+                                    if len(landformfractions) == 2:
+                                        landformfractiontext = landformfractiontext0[:k] + " and" + landformfractiontext0[k+1:]
                                     else:
-                                        landcoverfractiontext += "fractions of the "+studyarealist[1]+" are covered by "
-                                        for row in landcoverfractions:
-                                            landcoverfractiontext += landcover_dict[row[1]] + ", "
-                                        landcoverfractiontext0 = landcoverfractiontext[:-2]+". "
-                                        k = landcoverfractiontext0.rfind(",")
-                                        if len(landcoverfractions) == 2:
-                                        	landcoverfractiontext = landcoverfractiontext0[:k] + " and" + landcoverfractiontext0[k+1:]
-                                        else:
-                                        	landcoverfractiontext = landcoverfractiontext0[:k] + ", and" + landcoverfractiontext0[k+1:]
-                        if row[4] == landcovertimes:
-                            if len(landcoverfractiontext) > 2:
-                                description += landcoverfractiontext[0].capitalize()+landcoverfractiontext[1:-1]+"</p><p>"
+                                        landformfractiontext = landformfractiontext0[:k] + ", and" + landformfractiontext0[k+1:]
+                        if row[4] == landformtimes:
+                            if len(landformfractiontext) > 2:
+                                description += landformfractiontext[0].capitalize()+landformfractiontext[1:-1]+"</p><p>"
                             else:
                                 description += "</p><p>"
 
-                    #############################################################################
-                    #if this is a lithology class, assemble the text in the following section:
-                    if row[0].endswith("Lithology_R") == True:
-                    #if row[0] == output+"\\Lithology_R":
-                        alllitholist.append(row)
-                        lithologyfractiontext = ""
-                        lithologyfractiontext0 = ""
-                        lithologylandformtext = ""
-                        if row[4] > 1:
-                            n = 1
-                            lithologyarticle = "the "
-                        else:
-                            n = 0
-                            lithologyarticle = article
-
-                        #If a lithology class is mostly on one side of a watershed, assemble text for that into the variable litholocstr.
-                        #Otherwise the variable litholocstr is left blank.
-                        litholocstr = ""
-                        litholocstr0 = ""
-                        litholocstr00 = ""
-                        if row[31]/row[2] > .66:
-                        	litholocstr0 = "Most of these "+lithology_dict[row[1]]+" are in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .9:
-                        	litholocstr0 = "Almost all of these "+lithology_dict[row[1]]+" are in the "+row[32]+" of the "+studyarealist[1]+". "
-                        if row[31]/row[2] > .99:
-                        	litholocstr0 = "These "+lithology_dict[row[1]]+" are in the "+row[32]+" of the "+studyarealist[1]+". "
-                        litholocstr00 = litholocstr00.replace('these unconsolidated sediment are','this unconsolidated sediment is')
-                        litholocstr = litholocstr0.replace('These unconsolidated sediment are','This unconsolidated sediment is')
-
-                        #If the lithology class is mostly one type of landform, include an adjective phrase which
-                        #gives detail about what landform is found there. #most popular landform on the grassland is landformd_dict[row[11]]
-                        if row[12] < 95.000001 and lithologyredundency == 0:
-                            if row[12] >= 50:
-                                lithologylandformtext = ", mostly forming "+landform_dict[row[11]]+","
-                                if row[3] > 20:
-                                    nolandformsonlitho = 0
-                            if row[12] >= 89:
-                                lithologylandformtext = ", almost all of which form "+landform_dict[row[11]]+","
-                                if row[3] > 20:
-                                    nolandformsonlitho = 0
-                            if row[12] >= 99:
-                                lithologylandformtext = ", forming "+landform_dict[row[11]]+","
-                                if row[3] > 20:
-                                    nolandformsonlitho = 0
-                        if row[3] > 99.0:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 80:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie most of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 60:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie much of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 51:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie just over half of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 49:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie half of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 40:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie just under half of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 30:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie "+conjunctions[row[4]]+" third of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
-                        elif row[3] > 20:
-                            lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie "+conjunctions[row[4]]+" quarter of "+lithologyarticle+studyarealist[n]+". "+litholocstr
-                            predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
+                #############################################################################
+                #if this is a land cover class, assemble the text in the following section:
+                if row[0].endswith("Landcover_R") == True:
+                #if row[0] == output+"\\Landcover_R":
+                    landcoverfractiontext = ""
+                    landcoverfractiontext0 = ""
+                    landcoverpoptext = ""
+                    landcoverelevstr = ""
+                    densitytext = ""
+                    landcoverlithologytext = ""
+
+                    #If a land cover class is mostly on one side of a watershed, assemble text for that into the variable landcoverlocstr.
+                    #Otherwise the variable landcoverlocstr is left blank.
+                    landcoverphrases = landcoverPhrases[row[1]]
+                    landcoverlocstr = landcoverphrases.location.render(row[31]/row[2], part=row[32], area=studyarealist[1])
+
+                    if row[4] > 1:
+                        n = 1
+                        landcoverarticle = "the "
+                    else:
+                        n = 0
+                        landcoverarticle = article
+                    if len(row) > 20:
+                        if 'Tree cover' in row[1] and row[20] > 7250:
+                            densitytext = "dense, "
+                    ##if row[1] in ['Cropland, rainfed','Cropland, rainfed - Herbaceous cover','Cropland, rainfed - Tree or shrub cover','Cropland irrigated or post-flooding','Mosaic cropland (>50%) / natural vegetation (Tree, shrub, herbaceous cover) (<50%)','Mosaic natural vegetation (Tree, shrub, herbaceous cover) (>50%) / cropland (<50%)']:
+                        ##landcoverpoptext = "with an estimated population of "+"{:,}".format(int(round(row[19],-2)))+", "
+                    if row[1] in ['Urban areas']:
+                        landcoverpoptext = "with an estimated population of "+"{:,}".format(int(round(row[19],-3)))+", "
+        ##            if row[1] in ['Water bodies']:
+        ##                waterbodypoptext = " (approximately "+str(round(studyarealist[11],1))+"% of the "+studyarealist[1]+")"
+        ##                covertext = " cover "
+
+                    #If the land cover class is mostly bare ground or sparsely vegetated,
+                    #give detail about type of bare ground is found there (from the lithology).
+                    if row[1] in ['Bare areas','Consolidated bare areas','Unconsolidated bare areas']:
+                        if row[14] > 50:
+                            landcoverlithologytext = ", mostly "+lithology_dict[row[13]]+","
+                        if row[14] > 90:
+                            landcoverlithologytext = ", almost all "+lithology_dict[row[13]]+","
+                        if row[14] > 99:
+                            landcoverlithologytext = ", composed of "+lithology_dict[row[13]]+","
+                    if row[1] in ['Sparse shrub (<15%)','Sparse herbaceous cover (<15%)','Sparse vegetation (tree, shrub, herbaceous cover) (<15%)','Lichens and mosses']:
+                        if row[14] > 50:
+                            landcoverlithologytext = ", mostly on "+lithology_dict[row[13]]+","
+                        if row[14] > 90:
+                            landcoverlithologytext = ", almost all of it on "+lithology_dict[row[13]]+","
+                        if row[14] > 99:
+                            landcoverlithologytext = " on "+lithology_dict[row[13]]
+
+                    if row[7] > studyarealist[10]:
+                        landcoverelevstr = "at the higher elevations, "
+                    if row[7] < studyarealist[9]:
+                        landcoverelevstr = "at the lower elevations, "
+
+                    #assemble descriptive text for the land cover class, capitalize it, and append it to the description variable.
+                    #If one of the significant classes is bodies of water, specify the quantity from the 30m water bodies raster.
+                    if row[1] in ['Water bodies'] and studyarealist[11] > 12 and studyarealist[11] < 100:
+                        #landcoverstr0 = "Bodies of water cover "+str(round(studyarealist[11],1))+"% of the "+studyarealist[1]+". "
+                        landcoverstr0 = "Bodies of water cover about "+str(round(studyarealist[11],0))[:-2]+"% of the "+studyarealist[1]+". "
+                        description += landcoverstr0
+                    else:
+                        if row[3] > 20:
+                            landcoverstr0 = landcoverphrases.quantity.render(row[3], population=landcoverpoptext, elevation=landcoverelevstr,
+                                                                             density=densitytext, article=landcoverarticle, area=studyarealist[n],
+                                                                             detail=landcoverlithologytext, location=landcoverlocstr)
+                            description += landcoverstr0[0].capitalize()+landcoverstr0[1:]
 
                         #If there is more than one fraction of a class, group them together, making the fractions into one sentence.
                         else:
-                            lithologyfractions.append(row)
-                            if row[4] == lithologytimes:
-                                if len(lithologyfractions) < 1:
-                                    lithologyfractiontext = ""
-                                if len(lithologyfractions) == 1:
-                                    lithologystr0 = lithology_dict[row[1]] +lithologylandformtext+ " underlie "+conjunctions_simple[row[4]]+" fraction of the "+studyarealist[n]+". "
+                            landcoverfractions.append(row)
+                            if row[4] == landcovertimes:
+                                if len(landcoverfractions) < 1:
+                                    landcoverfractiontext = ""
+                                if len(landcoverfractions) == 1:
+                                    landcoverfractiontext = landcoverphrases.quantity.render(row[3], population=landcoverpoptext, elevation=landcoverelevstr,
+                                                                                             density=densitytext, article="the ", area=studyarealist[n],
+                                                                                             detail=landcoverlithologytext)
                                 else:
-                                    lithologyfractiontext += "fractions of the "+studyarealist[1]+" are "
-                                    for row in lithologyfractions:
-                                        lithologyfractiontext += lithology_dict[row[1]] + ", "
-                                    lithologyfractiontext0 = lithologyfractiontext[:-2]+". "
-                                    k = lithologyfractiontext0.rfind(",")
-                                    if len(lithologyfractions) == 2:
-                                        lithologyfractiontext = lithologyfractiontext0[:k] + " and" + lithologyfractiontext0[k+1:]
+                                    landcoverfractiontext += "fractions of the "+studyarealist[1]+" are covered by "
+                                    for row in landcoverfractions:
+                                        landcoverfractiontext += landcover_dict[row[1]] + ", "
+                                    landcoverfractiontext0 = landcoverfractiontext[:-2]+". "
+                                    k = landcoverfractiontext0.rfind(",")
+                                    if len(landcoverfractions) == 2:
+                                            landcoverfractiontext = landcoverfractiontext0[:k] + " and" + landcoverfractiontext0[k+1:]
                                     else:
-                                        lithologyfractiontext = lithologyfractiontext0[:k] + ", and" + lithologyfractiontext0[k+1:]
+                                            landcoverfractiontext = landcoverfractiontext0[:k] + ", and" + landcoverfractiontext0[k+1:]
+                    if row[4] == landcovertimes:
+                        if len(landcoverfractiontext) > 2:
+                            description += landcoverfractiontext[0].capitalize()+landcoverfractiontext[1:-1]+"</p><p>"
+                        else:
+                            description += "</p><p>"
+
+                #############################################################################
+                #if this is a lithology class, assemble the text in the following section:
+                if row[0].endswith("Lithology_R") == True:
+                #if row[0] == output+"\\Lithology_R":
+                    alllitholist.append(row)
+                    lithologyfractiontext = ""
+                    lithologyfractiontext0 = ""
+                    lithologylandformtext = ""
+                    if row[4] > 1:
+                        n = 1
+                        lithologyarticle = "the "
+                    else:
+                        n = 0
+                        lithologyarticle = article
+
+                    #If a lithology class is mostly on one side of a watershed, assemble text for that into the variable litholocstr.
+                    #Otherwise the variable litholocstr is left blank.
+                    lithologyphrases = lithologyPhrases[row[1]]
+                    litholocstr = lithologyphrases.location.render(row[31]/row[2], part=row[32], area=studyarealist[1])
+
+                    #If the lithology class is mostly one type of landform, include an adjective phrase which
+                    #gives detail about what landform is found there. #most popular landform on the grassland is landformd_dict[row[11]]
+                    if row[12] < 95.000001 and lithologyredundency == 0:
+                        if row[12] >= 50:
+                            lithologylandformtext = ", mostly forming "+landform_dict[row[11]]+","
+                            if row[3] > 20:
+                                nolandformsonlitho = 0
+                        if row[12] >= 89:
+                            lithologylandformtext = ", almost all of which form "+landform_dict[row[11]]+","
+                            if row[3] > 20:
+                                nolandformsonlitho = 0
+                        if row[12] >= 99:
+                            lithologylandformtext = ", forming "+landform_dict[row[11]]+","
+                            if row[3] > 20:
+                                nolandformsonlitho = 0
+                    if row[3] > 20:
+                        lithologystr0 = lithologyphrases.quantity.render(row[3], article=lithologyarticle, area=studyarealist[n],
+                                                                         detail=lithologylandformtext, location=litholocstr)
+                        predescription += lithologystr0[0].capitalize()+lithologystr0[1:]
+
+                    #If there is more than one fraction of a class, group them together, making the fractions into one sentence.
+                    else:
+                        lithologyfractions.append(row)
                         if row[4] == lithologytimes:
-                            if nolandformsonlitho == 1:
-                                nolandformsonlithostr = "A mix of "
-                                for row in alllitholist:
-                                    if row[3] > 20:
-                                        nolandformsonlithostr += lithology_dict[row[1]]+" and "
-                                nolandformsonlithostr0 = ""
-                                nolandformsonlithostr += " predominate throughout the landforms of "+studyarealist[0]+", "+lithologyfractiontext.replace('fractions of the watershed are areas of ','along with small amounts of ')
-                                nolandformsonlithostr0 = nolandformsonlithostr.replace('A mix of  predominate throughout','A mix with no dominant lithology characterizes')
-                                nolandformsonlithostr00 = nolandformsonlithostr0.replace('. . ','. ')
-                                nolandformsonlithostr000 = nolandformsonlithostr00.replace('and  predominate','predominate')
-                                description += nolandformsonlithostr000[:-3]+nolandformsonlithostr000[-3:].replace(', ','. ') +"</p><p>"
+                            if len(lithologyfractions) < 1:
+                                lithologyfractiontext = ""
+                            if len(lithologyfractions) == 1:
+                                lithologystr0 = lithologyphrases.quantity.render(row[3], article="the ", area=studyarealist[n],
+                                                                                 detail=lithologylandformtext)
                             else:
-                                if len(lithologyfractiontext) > 2:
-                                    description += predescription+lithologyfractiontext[0].capitalize()+lithologyfractiontext[1:-1]+"</p><p>"
+                                lithologyfractiontext += "fractions of the "+studyarealist[1]+" are "
+                                for row in lithologyfractions:
+                                    lithologyfractiontext += lithology_dict[row[1]] + ", "
+                                lithologyfractiontext0 = lithologyfractiontext[:-2]+". "
+                                k = lithologyfractiontext0.rfind(",")
+                                if len(lithologyfractions) == 2:
+                                    lithologyfractiontext = lithologyfractiontext0[:k] + " and" + lithologyfractiontext0[k+1:]
                                 else:
-                                    description += predescription+"</p><p>"
+                                    lithologyfractiontext = lithologyfractiontext0[:k] + ", and" + lithologyfractiontext0[k+1:]
+                    if row[4] == lithologytimes:
+                        if nolandformsonlitho == 1:
+                            nolandformsonlithostr = "A mix of "
+                            for row in alllitholist:
+                                if row[3] > 20:
+                                    nolandformsonlithostr += lithology_dict[row[1]]+" and "
+                            nolandformsonlithostr0 = ""
+                            nolandformsonlithostr += " predominate throughout the landforms of "+studyarealist[0]+", "+lithologyfractiontext.replace('fractions of the watershed are areas of ','along with small amounts of ')
+                            nolandformsonlithostr0 = nolandformsonlithostr.replace('A mix of  predominate throughout','A mix with no dominant lithology characterizes')
+                            nolandformsonlithostr00 = nolandformsonlithostr0.replace('. . ','. ')
+                            nolandformsonlithostr000 = nolandformsonlithostr00.replace('and  predominate','predominate')
+                            description += nolandformsonlithostr000[:-3]+nolandformsonlithostr000[-3:].replace(', ','. ') +"</p><p>"
+                        else:
+                            if len(lithologyfractiontext) > 2:
+                                description += predescription+lithologyfractiontext[0].capitalize()+lithologyfractiontext[1:-1]+"</p><p>"
+                            else:
+                                description += predescription+"</p><p>"
 
-            except:
-                print("if you have a name field in your study area polygon, does the feature")
-                print("have a name? Check to make sure the field is populated.")
-                # Get the traceback object
-                tb = sys.exc_info()[2]
-                tbinfo = traceback.format_tb(tb)[0]
-                # Concatenate information together concerning the error into a message string
-                pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-                # Write Python error messages to log
-                err= pymsg + "\n"
-                print(err)
+        except:
+            print("if you have a name field in your study area polygon, does the feature")
+            print("have a name? Check to make sure the field is populated.")
+            # Get the traceback object
+            tb = sys.exc_info()[2]
+            tbinfo = traceback.format_tb(tb)[0]
+            # Concatenate information together concerning the error into a message string
+            pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+            # Write Python error messages to log
+            err= pymsg + "\n"
+            print(err)
+
+    if studyarealist[4] < 16:
+        description = "This area is too small to meaningfully describe."
+
+    return description
+
+def polygonFacts(state):
+    """polygonFacts(state)
+
+    Returns the facts synthesizeDescription() needs from the state of a
+    polygon.
+
+    """
+    return {'oid': state['record'].oid, 'studyarealist': state['studyarealist'],
+            'classlist': state['classlist'], 'classtimes': list(state['classtimes']),
+            'cellsize': cellsize}
+
+def recordFacts(facts, folder):
+    """recordFacts(facts, folder)
+
+    Writes the facts of a polygon to facts_<OBJECTID>.json in folder, so
+    its description can be synthesized again later.
+
+    """
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    recorded = dict(facts, studyarealist=list(facts['studyarealist']),
+                    classlist=[list(row) for row in facts['classlist']])
+    with open(os.path.join(folder, "facts_{0}.json".format(facts['oid'])), "w") as f:
+        json.dump(recorded, f)
+
+def loadFacts(folder):
+    """loadFacts(folder)
+
+    Returns the facts of every polygon recorded in folder by recordFacts(),
+    in OBJECTID order, with the study area and every class as fact records.
+
+    """
+    recorded = []
+    for path in glob.glob(os.path.join(folder, "facts_*.json")):
+        with open(path) as f:
+            facts = json.load(f)
+        facts['studyarealist'] = StudyAreaFacts.fromList(facts['studyarealist'])
+        facts['classlist'] = [classFacts(row) for row in facts['classlist']]
+        recorded.append(facts)
+    recorded.sort(key=lambda facts: facts['oid'])
+    return recorded
+
+# The facts of a whole run are also kept as columns in one .npz file, one row per
+# polygon and one row per significant class, so they can be searched, summed and
+# synthesized again with numpy alone.
+textFacts = set(['path', 'name', 'shortname', 'shortnamesingular', 'shortnameplural', 'topbioclimate',
+                 'toplandform', 'toplithology', 'toplandcover', 'aspect', 'partphrase'])
+
+def addColumn(table, name, values, text):
+    """addColumn(table, name, values, text)
+
+    Adds one fact of many rows to table as a numpy array: text, integers
+    when no value is a float, and floats otherwise. When integers and
+    floats are mixed, <name>_int marks the integers, so that every value
+    reads back as the type it was written as.
+
+    """
+    if text:
+        table[name] = np.array([u"" if value is None else value for value in values], dtype="U")
+        return
+    floats = [isinstance(value, float) for value in values]
+    if True not in floats:
+        table[name] = np.array(values, dtype=np.int64)
+        return
+    table[name] = np.array(values, dtype=np.float64)
+    if False in floats:
+        table[name+"_int"] = np.logical_not(floats)
+
+def columnValue(table, name, row):
+    """columnValue(table, name, row)
+
+    Returns the value in row of the column name of a facts table as the
+    type it was written as.
+
+    """
+    value = table[name][row].item()
+    if name+"_int" in table and table[name+"_int"][row]:
+        value = int(value)
+    return value
+
+def factsTable(recorded):
+    """factsTable(recorded)
+
+    Returns the facts of many polygons, as returned by loadFacts(), as a
+    dictionary of numpy columns. polygon_<fact> has one row per polygon,
+    with its oid, cellsize and the four classtimes. class_<fact> has one
+    row per significant class, with the oid of its polygon, its criterion
+    and its place in the classlist. Facts a criterion does not have are ""
+    or dummyvalue. Unused slots are left out.
+
+    """
+    loadNumpy()
+    table = {}
+    polygonFactNames = [name for name in StudyAreaFacts.__slots__ if not name.startswith("unused")]
+    addColumn(table, 'polygon_oid', [facts['oid'] for facts in recorded], False)
+    addColumn(table, 'polygon_cellsize', [facts['cellsize'] for facts in recorded], False)
+    for n, times in enumerate(['landcovertimes', 'lithologytimes', 'bioclimatetimes', 'landformtimes']):
+        addColumn(table, 'polygon_'+times, [facts['classtimes'][n] for facts in recorded], False)
+    for name in polygonFactNames:
+        addColumn(table, 'polygon_'+name, [getattr(facts['studyarealist'], name) for facts in recorded], name in textFacts)
+
+    kinds = dict((record, kind) for kind, record in classRecords.items())
+    rows = []
+    for facts in recorded:
+        for order, row in enumerate(facts['classlist']):
+            rows.append((facts['oid'], kinds[row.__class__], order, row))
+    classFactNames = []
+    for record in classRecords.values():
+        for name in record.__slots__:
+            if not name.startswith("unused") and name not in classFactNames:
+                classFactNames.append(name)
+    addColumn(table, 'class_oid', [row[0] for row in rows], False)
+    addColumn(table, 'class_kind', [row[1] for row in rows], True)
+    addColumn(table, 'class_order', [row[2] for row in rows], False)
+    for name in classFactNames:
+        text = name in textFacts
+        missing = u"" if text else dummyvalue
+        addColumn(table, 'class_'+name, [getattr(row[3], name, missing) for row in rows], text)
+    return table
+
+def writeFactsTable(recorded, path):
+    """writeFactsTable(recorded, path)
+
+    Writes the facts of many polygons to a compressed .npz file at path.
+
+    """
+    table = factsTable(recorded)
+    np.savez_compressed(path, **table)
+
+def readFactsTable(path):
+    """readFactsTable(path)
+
+    Returns the columns written by writeFactsTable() as a dictionary of
+    numpy arrays.
+
+    """
+    loadNumpy()
+    npz = np.load(path)
+    try:
+        return dict((name, npz[name]) for name in npz.files)
+    finally:
+        npz.close()
+
+def tableFacts(table):
+    """tableFacts(table)
+
+    Returns the facts of every polygon in a facts table, in the form
+    loadFacts() returns, so they can be synthesized again.
+
+    """
+    recorded = []
+    classRows = collections.defaultdict(list)
+    for n, oid in enumerate(table['class_oid'].tolist()):
+        classRows[oid].append(n)
+    for n, oid in enumerate(table['polygon_oid'].tolist()):
+        studyarea = StudyAreaFacts()
+        for name in studyarea.__slots__:
+            if not name.startswith("unused"):
+                setattr(studyarea, name, columnValue(table, 'polygon_'+name, n))
+        classlist = []
+        for row in sorted(classRows[oid], key=lambda row: table['class_order'][row]):
+            record = classRecords[table['class_kind'][row].item()]()
+            for name in record.__slots__:
+                if not name.startswith("unused"):
+                    setattr(record, name, columnValue(table, 'class_'+name, row))
+            classlist.append(record)
+        classtimes = [columnValue(table, 'polygon_'+times, n) for times in
+                      ['landcovertimes', 'lithologytimes', 'bioclimatetimes', 'landformtimes']]
+        recorded.append({'oid': oid, 'studyarealist': studyarea, 'classlist': classlist,
+                         'classtimes': classtimes, 'cellsize': columnValue(table, 'polygon_cellsize', n)})
+    return recorded
+
+def synthesisStage(state):
+    """synthesisStage(state)
+
+    Synthesizes the four paragraph description of the study area from
+    studyarealist and classlist. Raises if no description was written.
+
+    """
+    facts = polygonFacts(state)
+    if factsFolder is not None:
+        recordFacts(facts, factsFolder)
+
+    print("Synthesizing text.")
+    description = synthesizeDescription(facts)
+    if description == "":
+        raise Exception("No description was synthesized.")
+    state['description'] = description
 
-        if studyarealist[4] < 16:
-            description = "This area is too small to meaningfully describe."
+def descriptionHTML(description):
+    """descriptionHTML(description)
+
+    Returns a synthesized description as the HTML written to the
+    Description field, with every paragraph in <p></p> tags.
+
+    """
+    if description[-7:] == '</p><p>':
+        return '<p>'+description[:-7]+'</p>'
+    return '<p>'+description+'</p>'
+
+def writeStage(state):
+    """writeStage(state)
+
+    Hands the description of the polygon to the descriptionWriter.
+
+    """
+    description = state['description']
 
 # Add a field to the study area called Description, populate it with four paragraphs (separated by the </p><p> tags).
 # The Description paragraphs use adjectives that depict ranges of significant classes, such as "most of this area".
-# It is populated by the variable description. inFeatLyr FL_MollPrj
-        with arcpy.da.UpdateCursor(inFeatLyr,["OBJECTID","Description"]) as cursor:
-            for row in cursor:
-                if row[0] == intPolyID:
-                    #print(description)
-                    if description[-7:] == '</p><p>':
-                        row[1]= '<p>'+description[:-7]+'</p>'
-                    else:
-                        row[1]= '<p>'+description+'</p>'
-                    print(row[1])
-                cursor.updateRow(row)
-                GeoDescriberTries = 1
+# It is populated by the variable description. The descriptionWriter commits it in batches.
+    htmldescription = descriptionHTML(description)
+    print(htmldescription)
+    descriptionWriter.add(intPolyID, htmldescription)
+
+pipelineStages = [('fetch', fetchStage), ('mask', maskStage), ('percentages', percentagesStage),
+                  ('zones', zonesStage), ('aspect', aspectStage), ('classfacts', classFactsStage),
+                  ('synthesis', synthesisStage), ('write', writeStage)]
+
+# The state of every polygon being described, indexed by OBJECTID.
+polygonCheckpoints = {}
+
+def GeoDescriber():
+    """
+
+    GeoDescriber describes the polygon intPolyID. It runs the polygon
+    through the pipeline stages in order, skipping the stages finished
+    on an earlier try, and writes its landscape description. Raises if
+    a stage fails.
+
+    """
+    global inmem
+
+    loadGIS()
+    state = polygonCheckpoints[intPolyID]
+    #The memory governor decided whether this polygon fits in_memory or has to
+    #write its rasters to the scratch geodatabase.
+    if state['memoryMode'] == "disk":
+        inmem = tempspace
+    else:
+        inmem = "in_memory"
+
+    for name, stage in pipelineStages:
+        if name in state['done']:
+            continue
+        state['stage'] = name
+        p("*** "+name+" stage...")
+        with timings.span(name, oid=intPolyID, attempt=state['tries']+1, cells=state['cells']) as stagespan:
+            mark = memoryMark()
+            try:
+                stage(state)
+            finally:
+                #a stage that runs out of memory is recorded too.
+                recordMemory(stagespan, mark, inmem, state)
+        state['done'].append(name)
+
+#-------------------------------------------------------------------------------
+#--------------------------polygon workers--------------------------------------
+
+def describePolygon(oid):
+    """describePolygon(oid)
+
+    Describes the polygon with OBJECTID oid, trying up to three times.
+    Every try resumes at the stage where the previous try failed. Returns
+    True if the polygon was described.
+
+    """
+    global intPolyID
+    intPolyID = oid
+    record = polygonRecords[oid]
+    #The memory governor decides whether this polygon fits in_memory, needs the water
+    #layer read in windows, or has to write its rasters to the scratch geodatabase.
+    memoryMode, waterWindows = chooseMemoryMode(record, memoryBudget)
+    if memoryMode == "disk":
+        print("polygon does not fit in the memory budget, writing rasters to "+tempspace)
+    if memoryMode == "windowed":
+        print("reading the water layer in "+str(waterWindows)+" windows")
+    # tries counts the failed tries of this polygon.
+    state = {'record': record, 'memoryMode': memoryMode, 'waterWindows': waterWindows,
+             'done': [], 'stage': None, 'tries': 0, 'cells': int(estimateWork(record)['cells']),
+             'fetched': {}, 'masked': [], 'percentages': {}}
+    polygonCheckpoints[oid] = state
+    CleanUp()
+    profiler = startProfile(oid)
+    try:
+        with timings.span("polygon", oid=oid, cells=state['cells']) as polygonspan:
+            while state['tries'] < 3:
+                if state['tries'] == 1:
+                    print("second try to run GeoDescriber(), resuming at the "+str(state['stage'])+" stage")
+                if state['tries'] == 2:
+                    print("third and final try to run GeoDescriber(), resuming at the "+str(state['stage'])+" stage")
+                try:
+                    GeoDescriber()
+                    break
+                except:
+                    state['tries'] += 1
+                    print("GeoDescriber() did not work in the "+str(state['stage'])+" stage")
+                    # Get the traceback object
+                    tb = sys.exc_info()[2]
+                    tbinfo = traceback.format_tb(tb)[0]
+                    # Concatenate information together concerning the error into a message string
+                    pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+                    # Write Python error messages to log
+                    err= pymsg + "\n"
+                    print(err)
+            else:
+                print("tried three times to run GeoDescriber()")
+            polygonspan['attempt'] = min(state['tries'] + 1, 3)
+            polygonspan['described'] = 'write' in state['done']
+            polygonspan['bytes'] = sum(layer.get('bytes', 0) for layer in state['fetched'].values())
+            if 'memory' in state:
+                polygonspan.update(state['memory'])
+        print("This polygon took {0:.2f} seconds, {1:.2f} of them on the CPU.".format(polygonspan['wall'], polygonspan['cpu']))
+        if polygonspan.get('rss_peak') is not None:
+            print("Its memory peaked at {0:.0f} MB in the {1} stage.".format(polygonspan['rss_peak'] / 1048576.0,
+                                                                            polygonspan['peak_stage']))
+        if polygonspan.get('workspace_stage') is not None:
+            print("Its rasters took up to {0:.0f} MB of {1}, after the {2} stage.".format(
+                polygonspan['workspace_peak'] / 1048576.0, inmem, polygonspan['workspace_stage']))
+        return polygonspan['described']
+    finally:
+        #Delete the temporary folder used to store TIF rasters retrieved from the server.
+        if 'tempFolder' in state and os.path.exists(state['tempFolder']):
+            shutil.rmtree(state['tempFolder'])
+        del polygonCheckpoints[oid]
+        stopProfile(profiler, oid)
+
+# Worker processes do not write to the feature class. They send each description
+# to the parent process, which owns the only DescriptionWriter, so only one process
+# edits the feature class.
+class ResultQueueWriter(object):
+    """ResultQueueWriter(results)
+
+    Stands in for the DescriptionWriter in a worker process. add(oid,
+    description) puts the description on the results queue.
+
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.written = 0
+
+    def add(self, oid, description):
+        """add(oid, description)
+
+        Sends the description of one polygon to the parent process.
+
+        """
+        self.results.put(("description", oid, description))
+        self.written += 1
+
+    def close(self):
+        """close()
+
+        Nothing is buffered, so there is nothing to write.
+
+        """
+        pass
+
+def polygonWorker(workerid, context, tasks, results):
+    """polygonWorker(workerid, context, tasks, results)
+
+    Runs in a worker process. Sets up the globals GeoDescriber() needs from
+    the context dictionary, then describes every polygon of its tasks in
+    order, using its own scratch geodatabase and raster cache folder.
+    Sends a "done" message with its timings on the results queue when it
+    is finished.
 
-        del cursor, row
-        currentTime = time.clock()
-        print("This polygon took "+str(currentTime-thisPolyTime)+" seconds.")
-        print("Feature class so far has taken "+str(currentTime-startTime)+" seconds.")
+    """
+    global polygonRecords
+    global nameTable
+    global rasterCache
+    global descriptionWriter
+    global arcversion
+    global warnthreshold
+    global tempspace
+    global sr
+    global memoryBudget
+    global output
+    global cellsize
+    global fetchWorkers
+    global factsFolder
+    global profileFolder
+    global profiledIDs
+
+    descriptionWriter = ResultQueueWriter(results)
+    cachereport = None
+    try:
+        loadGIS()
+        polygonRecords = context['polygonRecords']
+        nameTable = context['nameTable']
+        arcversion = context['arcversion']
+        warnthreshold = context['warnthreshold']
+        memoryBudget = context['memoryBudget']
+        output = context['output']
+        cellsize = context['cellsize']
+        fetchWorkers = context['fetchWorkers']
+        factsFolder = context['factsFolder']
+        profileFolder = context['profileFolder']
+        profiledIDs = context['profiledIDs']
+        sr = arcpy.SpatialReference(54009)
+        arcpy.env.outputCoordinateSystem = sr
+        arcpy.env.overwriteOutput = True
+        arcpy.env.cellSize = cellsize
+
+        #every worker writes its scratch datasets to its own geodatabase.
+        scratchname = "GeoDescriber_w{0}.gdb".format(workerid)
+        tempspace = os.path.join(os.path.dirname(output), scratchname)
+        if not arcpy.Exists(tempspace):
+            arcpy.CreateFileGDB_management(os.path.dirname(output), scratchname)
+
+        rasterCache = None
+        if context['cacheFolder'] is not None:
+            rasterCache = RasterCache(os.path.join(context['cacheFolder'], "worker{0}".format(workerid)),
+                                      context['cacheTileCells'], cellsize, context['cacheMaxBytes'])
+
+        for task in tasks:
+            for oid in task:
+                print("worker {0} describing OBJECTID {1}".format(workerid, oid))
+                described = describePolygon(oid)
+                hits, lookups = cacheCounts()
+                results.put(("progress", workerid, oid, described, hits, lookups))
+        CleanUp()
+        if rasterCache is not None:
+            cachereport = rasterCache.summary()
 
     except:
         # Get the traceback object
         tb = sys.exc_info()[2]
         tbinfo = traceback.format_tb(tb)[0]
         # Concatenate information together concerning the error into a message string
-        pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
         # Write Python error messages to log
         err= pymsg + "\n"
         print(err)
 
+    results.put(("done", workerid, descriptionWriter.written, cachereport, timings.records))
+
+def runScheduled(plan, context, writer, progress=None):
+    """runScheduled(plan, context, writer, progress=None)
+
+    Starts one worker process for every non-empty list of tasks in plan,
+    as returned by planSchedule(), and passes the descriptions the workers
+    send back to writer, and the polygons they finish to the progress
+    reporter. Returns when every worker is finished.
+
+    """
+    results = mp.Queue()
+    workers = []
+    for workerid, tasks in enumerate(plan):
+        if not tasks:
+            continue
+        workercontext = dict(context)
+        oids = [oid for task in tasks for oid in task]
+        workercontext['polygonRecords'] = dict((oid, context['polygonRecords'][oid]) for oid in oids)
+        workercontext['nameTable'] = dict((oid, context['nameTable'][oid]) for oid in oids if oid in context['nameTable'])
+        #a worker with its own memory budget governs its polygons with that budget.
+        if isinstance(context['workerMemory'], (list, tuple)) and context['workerMemory'][workerid] is not None:
+            workercontext['memoryBudget'] = context['workerMemory'][workerid]
+        elif context['workerMemory'] is not None and context['memoryBudget'] is None:
+            workercontext['memoryBudget'] = context['workerMemory']
+        # workers are not daemonic, so they can start their own pool of fetch processes.
+        worker = mp.Process(target=polygonWorker, args=(workerid, workercontext, tasks, results))
+        worker.daemon = False
+        worker.start()
+        print("worker {0} started with {1} polygons in {2} tasks".format(workerid, len(oids), len(tasks)))
+        workers.append(worker)
+
+    running = len(workers)
+    while running > 0:
+        try:
+            message = results.get(True, 5)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                print("{0} workers stopped without reporting back".format(running))
+                break
+            if progress is not None:
+                progress.tick()
+            continue
+        if message[0] == "description":
+            writer.add(message[1], message[2])
+        elif message[0] == "progress":
+            if progress is not None:
+                progress.done(message[2], message[3], message[1], message[4], message[5])
+        elif message[0] == "done":
+            running -= 1
+            print("worker {0} done, {1} descriptions".format(message[1], message[2]))
+            if message[3] is not None:
+                print(message[3])
+            timings.extend(message[4])
+    for worker in workers:
+        worker.join()
+
+
+#-------------------------------------------------------------------------------
+#--------------------------command line-----------------------------------------
+# Every setting at the top of the script can be given on the command line, so
+# throughput can be tuned for each host without editing the script.
+def parseBytes(text):
+    """parseBytes(text)
+
+    Converts a size such as "512M", "4G" or "1073741824" to bytes.
+
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    text = text.strip().upper().rstrip("B")
+    try:
+        if text[-1:] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("not a size: " + text)
+
+def parseIDs(text):
+    """parseIDs(text)
+
+    Converts a list of OBJECTIDs and ranges such as "1,4,10-20" to a set.
+
+    """
+    ids = set()
+    try:
+        for item in text.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            if "-" in item:
+                first, last = item.split("-", 1)
+                ids.update(range(int(first), int(last) + 1))
+            else:
+                ids.add(int(item))
+    except ValueError:
+        raise argparse.ArgumentTypeError("not a list of OBJECTIDs: " + text)
+    return ids
+
+def parseArguments(argv=None):
+    """parseArguments(argv=None)
+
+    Parses the command line. Every option defaults to the setting at the
+    top of the script.
+
+    """
+    parser = argparse.ArgumentParser(description="Describes the landscape of every polygon of a feature class "
+                                                 "and writes the text to its Description field.")
+    parser.add_argument("input", nargs="?", default=inFeatLyr,
+                        help="polygon feature class to describe (default: %(default)s)")
+    parser.add_argument("--scratch", default=output,
+                        help="geodatabase for the rasters GeoDescriber creates (default: %(default)s)")
+    parser.add_argument("--fetch-workers", type=int, default=fetchWorkers,
+                        help="processes fetching the rasters of a polygon at once (default: %(default)s)")
+    parser.add_argument("--polygon-workers", type=int, default=polygonWorkers,
+                        help="processes describing polygons at once (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=cacheFolder,
+                        help="folder where fetched rasters are kept and reused (default: no cache)")
+    parser.add_argument("--cache-max", type=parseBytes, default=cacheMaxBytes,
+                        help="largest size of the raster cache, e.g. 2G (default: %(default)s bytes)")
+    parser.add_argument("--facts-dir", default=factsFolder,
+                        help="folder where the facts of every polygon and a facts.npz table of them are recorded (default: not recorded)")
+    parser.add_argument("--timings-dir", default=timingsFolder,
+                        help="folder where timings.json and timings.csv are written (default: summary only)")
+    parser.add_argument("--profile-dir", default=profileFolder,
+                        help="folder where polygons are profiled as profile_<OBJECTID>.pstats (default: not profiled)")
+    parser.add_argument("--profile-ids", type=parseIDs, default=profileIDs,
+                        help="only profile these OBJECTIDs, e.g. 1,4,10-20")
+    parser.add_argument("--profile-every", type=int, default=profileEvery,
+                        help="profile every Nth polygon in the order they are described")
+    parser.add_argument("--progress-interval", type=float, default=progressInterval,
+                        help="seconds between progress lines with the ETA (default: %(default)s)")
+    parser.add_argument("--status-file", default=statusFile,
+                        help="file where the progress is written as JSON (default: not written)")
+    parser.add_argument("--dry-run", action="store_true", default=dryRun,
+                        help="only plan the run: cells, downloads, cache hits, memory and runtime of every polygon")
+    parser.add_argument("--plan-file", default=planFile,
+                        help="file where the plan of a dry run is written as JSON (default: not written)")
+    parser.add_argument("--history", default=historyFile,
+                        help="timings.json of an earlier run that predicts the runtime of a dry run "
+                             "(default: timings.json in --timings-dir)")
+    parser.add_argument("--memory-budget", type=parseBytes, default=memoryBudget,
+                        help="memory budget for describing one polygon, e.g. 4G (default: no budget)")
+    parser.add_argument("--worker-memory", type=parseBytes, default=workerMemory,
+                        help="memory budget of every polygon worker, e.g. 8G (default: no budget)")
+    parser.add_argument("--ids", type=parseIDs, default=onlyIDs,
+                        help="only describe these OBJECTIDs, e.g. 1,4,10-20")
+    parser.add_argument("--skip-ids", type=parseIDs, default=skipIDs,
+                        help="do not describe these OBJECTIDs")
+    parser.add_argument("--order", choices=["oid", "hilbert", "zorder"], default=polygonOrder,
+                        help="order in which polygons are described (default: %(default)s)")
+    parser.add_argument("--cellsize", type=float, default=cellsize,
+                        help="analysis cell size in meters (default: %(default)s)")
+    parser.add_argument("--username", default=None,
+                        help="Living Atlas user name (default: $GEODESCRIBER_USERNAME)")
+    args = parser.parse_args(argv)
+    if args.fetch_workers < 1 or args.polygon_workers < 1:
+        parser.error("--fetch-workers and --polygon-workers must be at least 1")
+    if args.profile_every is not None and args.profile_every < 1:
+        parser.error("--profile-every must be at least 1")
+    return args
 
 
 if __name__ == "__main__":
 
-    # Geodescriber will count how many times it tried to describe a polygon.
-    # This count is stored in the variable GeoDescriberTries.
-    global GeoDescriberTries
-    GeoDescriberTries = 1
+    args = parseArguments()
+    inFeatLyr = args.input
+    output = args.scratch
+    tempspace = output
+    fetchWorkers = args.fetch_workers
+    polygonWorkers = args.polygon_workers
+    cacheFolder = args.cache_dir
+    cacheMaxBytes = args.cache_max
+    factsFolder = args.facts_dir
+    timingsFolder = args.timings_dir
+    profileFolder = args.profile_dir
+    profileIDs = args.profile_ids
+    profileEvery = args.profile_every
+    progressInterval = args.progress_interval
+    statusFile = args.status_file
+    dryRun = args.dry_run
+    planFile = args.plan_file
+    historyFile = args.history
+    memoryBudget = args.memory_budget
+    workerMemory = args.worker_memory
+    onlyIDs = args.ids
+    skipIDs = args.skip_ids
+    polygonOrder = args.order
+    cellsize = args.cellsize
+    #credentials go through the environment so the fetch processes inherit them.
+    #The password is only read from $GEODESCRIBER_PASSWORD, never from the command line.
+    if args.username is not None:
+        userName = os.environ["GEODESCRIBER_USERNAME"] = args.username
+
+    print("Start time is "+str(startTime))
+    loadGIS()
 
     # Make sure all temporary datasets are removed from both in_memory and disk.
     CleanUp()
 
-    ##global currentTime
-    currentTime = 0
     arcversion = arcpy.GetInstallInfo()['Version']
     if arcversion == '10.5.1':
         print("running 10.5.1")
     else:
         print("not running 10.5.1")
-    print("0 seconds have elapsed so far")
-    print("Adding field...")
-    arcpy.AddField_management (inFeatLyr, "Description", "TEXT", "", "", "50000")
-    #print(str(currentTime-startTime)+" seconds have elapsed so far")
+    if not dryRun:
+        print("Adding field...")
+        arcpy.AddField_management (inFeatLyr, "Description", "TEXT", "", "", "50000")
     sr = arcpy.SpatialReference(54009)
     arcpy.env.outputCoordinateSystem = sr
     arcpy.env.overwriteOutput = True
     warnthreshold = (cellsize * cellsize) * 1000
+    #a single worker's memory budget is also the budget of the memory governor.
+    if memoryBudget is None and workerMemory is not None and polygonWorkers == 1:
+        memoryBudget = workerMemory[0] if isinstance(workerMemory, (list, tuple)) else workerMemory
     arcpy.env.cellSize = cellsize
 
     try:
@@ -3893,43 +5890,132 @@ if __name__ == "__main__":
         tb = sys.exc_info()[2]
         tbinfo = traceback.format_tb(tb)[0]
         # Concatenate information together concerning the error into a message string
-        pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
         # Write Python error messages to log
         err= pymsg + "\n"
         print(err)
 
     print("Projecting proj into mollweide...")
     FL_MollPrj =arcpy.Project_management(inFeatLyr,output+"\\proj",sr)
-    listFeatureIDs=[]
-    with arcpy.da.SearchCursor(FL_MollPrj,["OID@"]) as cursorid:
-        for rowid in cursorid:
-            rowidk=rowid[0]
-            listFeatureIDs = listFeatureIDs + [rowidk]
-
-    #try three times to describe each polygon.
-    for intPolyID in listFeatureIDs:
-        try:
-            if GeoDescriberTries == 1:
-                CleanUp()
-                GeoDescriber()
-            if GeoDescriberTries == 2:
-                print("second try to run GeoDescriber()")
-                CleanUp()
-                GeoDescriber()
-            if GeoDescriberTries == 3:
-                print("third and final try to run GeoDescriber()")
-                CleanUp()
-                GeoDescriber()
-            if GeoDescriberTries > 3:
-                print("tried three times to run GeoDescriber()")
 
-        except:
-            print("GeoDescriber() did not work")
-            # Get the traceback object
-            tb = sys.exc_info()[2]
-            tbinfo = traceback.format_tb(tb)[0]
-            # Concatenate information together concerning the error into a message string
-            pymsg = tbinfo + "\n" + str(sys.exc_type)+ ": " + str(sys.exc_value)
-            # Write Python error messages to log
-            err= pymsg + "\n"
-            print(err)
\ No newline at end of file
+    #read every projected polygon once and keep its vertices and extents in memory.
+    print("Reading polygon geometries...")
+    polygonRecords = {}
+    for record in streamPolygons(FL_MollPrj, arcpy.SpatialReference(54034)):
+        polygonRecords[record.oid] = record
+    if onlyIDs is not None or skipIDs is not None:
+        for oid in list(polygonRecords):
+            if (onlyIDs is not None and oid not in onlyIDs) or (skipIDs is not None and oid in skipIDs):
+                del polygonRecords[oid]
+        print("Describing "+str(len(polygonRecords))+" polygons after filtering by OBJECTID")
+    print("Ordering polygons by "+polygonOrder+"...")
+    listFeatureIDs = orderPolygons(list(polygonRecords.values()), polygonOrder)
+    if profileFolder is not None:
+        profiledIDs = chooseProfiled(listFeatureIDs, profileIDs, profileEvery)
+        print("Profiling "+str(len(profiledIDs))+" polygons into "+profileFolder)
+
+    #a dry run plans the run from the polygon extents and stops before anything is fetched.
+    if dryRun:
+        polygonWork = dict((oid, estimateWork(polygonRecords[oid])) for oid in listFeatureIDs)
+        #every worker has a cache folder of its own, as in polygonWorker().
+        cachefolders = None
+        if polygonWorkers > 1:
+            plan = planSchedule(listFeatureIDs, polygonWork, polygonWorkers, workerMemory, tinyPolygonCells, tinyBatchSize)
+            if cacheFolder is not None:
+                cachefolders = [os.path.join(cacheFolder, "worker{0}".format(w)) for w in range(polygonWorkers)]
+            #every worker governs its polygons with its own budget, as in runScheduled().
+            budgets = [memoryBudget] * polygonWorkers
+            if isinstance(workerMemory, (list, tuple)):
+                budgets = [b if b is not None else memoryBudget for b in workerMemory]
+            elif workerMemory is not None and memoryBudget is None:
+                budgets = [workerMemory] * polygonWorkers
+        else:
+            plan = [[listFeatureIDs]]
+            if cacheFolder is not None:
+                cachefolders = [cacheFolder]
+            budgets = [memoryBudget]
+        if historyFile is None and timingsFolder is not None:
+            historyFile = os.path.join(timingsFolder, "timings.json")
+        model = None
+        if historyFile is not None and os.path.exists(historyFile):
+            model = runtimeModel(historyFile)
+        rows, totals = planDryRun(plan, polygonRecords, polygonWork, cachefolders, budgets, model)
+        print(dryRunReport(rows, totals))
+        if planFile is not None:
+            with open(planFile, "w") as f:
+                json.dump({'cellsize': cellsize, 'polygonWorkers': polygonWorkers, 'history': historyFile,
+                           'polygons': rows, 'totals': totals}, f, indent=1, sort_keys=True)
+            print("Wrote the plan to "+planFile)
+        sys.exit(0)
+
+    #rasters fetched from the server are kept and reused by nearby polygons.
+    rasterCache = None
+    if cacheFolder is not None:
+        rasterCache = RasterCache(cacheFolder, cacheTileCells, cellsize, cacheMaxBytes)
+
+    #resolve the name and short name of every polygon once, indexed by OBJECTID.
+    nameTable = buildNameTable(inFeatLyr)
+
+    #descriptions are buffered and written back to inFeatLyr in batches.
+    descriptionWriter = DescriptionWriter(inFeatLyr, 100)
+
+    #estimate the work of every polygon before anything is fetched.
+    polygonWork = dict((oid, estimateWork(polygonRecords[oid])) for oid in listFeatureIDs)
+    print("Estimated work: {0:.0f} cells in {1} polygons".format(
+        sum(w['cost'] for w in polygonWork.values()), len(polygonWork)))
+    progress = ProgressReporter(polygonWork, progressInterval, statusFile)
+
+    if polygonWorkers > 1:
+        #place polygons largest-first on the workers and describe them in parallel.
+        plan = planSchedule(listFeatureIDs, polygonWork, polygonWorkers, workerMemory, tinyPolygonCells, tinyBatchSize)
+        context = {'polygonRecords': polygonRecords, 'nameTable': nameTable, 'arcversion': arcversion,
+                   'warnthreshold': warnthreshold, 'memoryBudget': memoryBudget, 'workerMemory': workerMemory,
+                   'cacheFolder': cacheFolder, 'cacheTileCells': cacheTileCells, 'cacheMaxBytes': cacheMaxBytes,
+                   'output': output, 'cellsize': cellsize, 'fetchWorkers': fetchWorkers,
+                   'factsFolder': factsFolder, 'profileFolder': profileFolder, 'profiledIDs': profiledIDs}
+        runScheduled(plan, context, descriptionWriter, progress)
+    else:
+        #try three times to describe each polygon.
+        for oid in listFeatureIDs:
+            described = describePolygon(oid)
+            hits, lookups = cacheCounts()
+            progress.done(oid, described, None, hits, lookups)
+    if progress.finished() < len(polygonWork):
+        progress.report("stopped")
+
+    #write the last batch of descriptions and save the edits. A failure is reported
+    #after the rest of the end of the run, which does not depend on it.
+    closeError = None
+    try:
+        descriptionWriter.close()
+    except Exception:
+        closeError = sys.exc_info()[1]
+        # Get the traceback object
+        tb = sys.exc_info()[2]
+        tbinfo = traceback.format_tb(tb)[0]
+        # Concatenate information together concerning the error into a message string
+        pymsg = tbinfo + "\n" + str(sys.exc_info()[0])+ ": " + str(sys.exc_info()[1])
+        print(pymsg + "\n")
+    if rasterCache is not None:
+        print(rasterCache.summary())
+    #gather the recorded facts of the run into one table of columns.
+    if factsFolder is not None:
+        writeFactsTable(loadFacts(factsFolder), os.path.join(factsFolder, "facts.npz"))
+        print("Wrote the facts table "+os.path.join(factsFolder, "facts.npz"))
+    #the time taken by every stage and fetch, over all polygons and workers.
+    print(timings.summary())
+    if timingsFolder is not None:
+        if not os.path.exists(timingsFolder):
+            os.makedirs(timingsFolder)
+        timings.writeJSON(os.path.join(timingsFolder, "timings.json"))
+        timings.writeCSV(os.path.join(timingsFolder, "timings.csv"))
+        print("Wrote the timings to "+timingsFolder)
+    #the functions and tools the profiled polygons spent their time in.
+    if profileFolder is not None:
+        report = hotspots(profileFolder)
+        print(report)
+        with open(os.path.join(profileFolder, "hotspots.txt"), "w") as f:
+            f.write(report + "\n")
+    if closeError is not None:
+        print("The last descriptions could not be written to "+str(inFeatLyr)+": "+str(closeError))
+        sys.exit(1)
@@ -0,0 +1,1025 @@
+#-------------------------------------------------------------------------------
+# Name:         arcpy
+#               A stand-in for the part of arcpy that GeoDescriber uses, backed by
+#               NumPy arrays, so the whole pipeline runs and can be profiled on a
+#               machine without ArcGIS. Put the folder above this package first
+#               on the path:
+#
+#                   PYTHONPATH=benchmarks/fakearcpy python GeoDescriber.py parks.json
+#
+# Notes:        Rasters are NumPy arrays of values with a mask of the cells that
+#               have data, on a grid snapped to multiples of the cell size. They
+#               are kept in a dictionary per process, like in_memory, except
+#               for .TIF paths, which are written to disk as .npz data so that
+#               fetch processes can hand them to the parent. Feature classes read
+#               from a .json path are GeoJSON feature collections and are written
+#               back when they change.
+#
+#               Image server layers are drawn from the synthetic services of
+#               landscape.py, or fetched from imageserver.py when FAKEARCPY_SERVER
+#               holds its URL. Every spatial reference is treated as the same
+#               one, so projecting copies the data unchanged.
+#-------------------------------------------------------------------------------
+import os, time
+import io
+import json
+import re
+import functools
+
+try:
+    from urllib.request import urlopen
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import urlopen, HTTPError
+
+import numpy as np
+
+import landscape
+
+# the version GetInstallInfo() reports. '10.5.1' runs the JoinField workarounds.
+version = os.getenv("FAKEARCPY_VERSION", "10.6.1")
+# the URL of a local image server, imageserver.py, to fetch image server layers
+# from, and the seconds to wait for it. Without it the layers are drawn here.
+server = os.getenv("FAKEARCPY_SERVER")
+serverTimeout = float(os.getenv("FAKEARCPY_TIMEOUT", "60"))
+
+class ExecuteError(Exception):
+    pass
+
+#-------------------------------------------------------------------------------
+#--------------------------environment and messages-----------------------------
+
+class Environment(object):
+    """Environment()
+
+    The geoprocessing environment settings, arcpy.env.
+
+    """
+    def __init__(self):
+        self.overwriteOutput = False
+        self.workspace = None
+        self.scratchWorkspace = None
+        self.compression = None
+        self.outputCoordinateSystem = None
+        self.cellSize = "MAXOF"
+        self.extent = None
+        self.rasterStatistics = None
+        self.pyramid = None
+
+env = Environment()
+
+# the messages of the last tool that ran, for GetMessages().
+messages = []
+
+def tool(function):
+    """tool(function)
+
+    Wraps a geoprocessing tool so that it records its messages, and so
+    that any error it raises is an ExecuteError with an ERROR code.
+
+    """
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        start = time.time()
+        del messages[:]
+        messages.append("Start Time: " + time.ctime(start))
+        try:
+            result = function(*args, **kwargs)
+        except ExecuteError as e:
+            messages.append(str(e))
+            messages.append("Failed to execute ({0}).".format(function.__name__))
+            raise
+        except Exception as e:
+            error = "ERROR 999999: Error executing function. {0}".format(e)
+            messages.append(error)
+            messages.append("Failed to execute ({0}).".format(function.__name__))
+            raise ExecuteError(error)
+        messages.append("Succeeded at {0} (Elapsed Time: {1:.2f} seconds)".format(time.ctime(), time.time() - start))
+        return result
+    return run
+
+def GetMessages(severity=0):
+    return "\n".join(messages)
+
+def CheckOutExtension(name):
+    return "CheckedOut"
+
+def SetLogHistory(log):
+    pass
+
+def GetInstallInfo():
+    return {'Version': version, 'ProductName': "Desktop"}
+
+def GetParameterAsText(index):
+    return ""
+
+class Result(object):
+    """Result(output)
+
+    What a tool returns. str() is the path of its output.
+
+    """
+    def __init__(self, output):
+        self.output = output
+
+    def getOutput(self, index):
+        return self.output
+
+    def __str__(self):
+        return self.output
+
+#-------------------------------------------------------------------------------
+#--------------------------geometry---------------------------------------------
+
+class SpatialReference(object):
+    def __init__(self, code=None):
+        self.factoryCode = code
+        self.name = "WKID " + str(code)
+
+class Point(object):
+    def __init__(self, X=0.0, Y=0.0):
+        self.X = X
+        self.Y = Y
+
+class Array(object):
+    def __init__(self, items=None):
+        self.items = list(items or [])
+
+    def add(self, item):
+        self.items.append(item)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+class Extent(object):
+    def __init__(self, XMin=None, YMin=None, XMax=None, YMax=None):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.XMax = XMax
+        self.YMax = YMax
+
+    @property
+    def width(self):
+        return self.XMax - self.XMin
+
+    @property
+    def height(self):
+        return self.YMax - self.YMin
+
+def unionExtent(extents):
+    return Extent(min(e.XMin for e in extents), min(e.YMin for e in extents),
+                  max(e.XMax for e in extents), max(e.YMax for e in extents))
+
+def ringArea(ring):
+    x = ring[:, 0]
+    y = ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+class Polygon(object):
+    """Polygon(inputs, spatial_reference=None)
+
+    A polygon of parts, each a list of rings of x,y vertices. The first
+    ring of a part is its outline and the others are holes. Built from an
+    Array of Points, an Array of Arrays of Points (one part per Array), or
+    a list of parts.
+
+    """
+    def __init__(self, inputs, spatial_reference=None):
+        self.spatialReference = spatial_reference
+        items = list(inputs)
+        if items and isinstance(items[0], Point):
+            items = [Array(items)]
+        self.parts = []
+        for item in items:
+            if isinstance(item, Array):
+                self.parts.append([np.array([(point.X, point.Y) for point in item], dtype=np.float64)])
+            else:
+                self.parts.append([np.asarray(ring, dtype=np.float64) for ring in item])
+
+    def rings(self):
+        return [ring for part in self.parts for ring in part if len(ring) > 2]
+
+    def __iter__(self):
+        # points of a part, with None between its rings, as arcpy iterates them.
+        for part in self.parts:
+            points = []
+            for n, ring in enumerate(part):
+                if n > 0:
+                    points.append(None)
+                points.extend(Point(x, y) for x, y in ring)
+            yield points
+
+    @property
+    def extent(self):
+        vertices = np.vstack(self.rings())
+        return Extent(vertices[:, 0].min(), vertices[:, 1].min(), vertices[:, 0].max(), vertices[:, 1].max())
+
+    @property
+    def area(self):
+        return sum(abs(ringArea(ring)) * (1 if n == 0 else -1)
+                   for part in self.parts for n, ring in enumerate(part) if len(ring) > 2)
+
+    @property
+    def trueCentroid(self):
+        weight = 0.0
+        x = 0.0
+        y = 0.0
+        for part in self.parts:
+            for n, ring in enumerate(part):
+                if len(ring) < 3:
+                    continue
+                area = ringArea(ring)
+                if area == 0:
+                    continue
+                # holes take their area away from the part, whichever way they wind.
+                sign = (1 if n == 0 else -1) * (1 if area > 0 else -1)
+                nx = np.roll(ring[:, 0], -1)
+                ny = np.roll(ring[:, 1], -1)
+                cross = ring[:, 0] * ny - nx * ring[:, 1]
+                weight += sign * area
+                x += sign * float(np.dot(ring[:, 0] + nx, cross)) / 6.0
+                y += sign * float(np.dot(ring[:, 1] + ny, cross)) / 6.0
+        if weight == 0:
+            return Point(*np.vstack(self.rings()).mean(axis=0))
+        return Point(x / weight, y / weight)
+
+    def projectAs(self, spatial_reference):
+        return Polygon(self.parts, spatial_reference)
+
+    def rasterize(self, grid):
+        """rasterize(grid)
+
+        Returns a boolean array of the cells of grid whose centers are
+        inside the polygon, by even-odd scanlines over all of its rings.
+
+        """
+        inside = np.zeros((grid.nrows, grid.ncols), dtype=bool)
+        edges = []
+        for ring in self.rings():
+            closed = np.vstack([ring, ring[:1]])
+            edges.append(np.hstack([closed[:-1], closed[1:]]))
+        if not edges:
+            return inside
+        edges = np.vstack(edges)
+        x0, y0, x1, y1 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        sloped = y0 != y1
+        x0, y0, x1, y1 = x0[sloped], y0[sloped], x1[sloped], y1[sloped]
+        ylow = np.minimum(y0, y1)
+        yhigh = np.maximum(y0, y1)
+        extent = self.extent
+        first = max(0, int(np.floor((grid.ymax - extent.YMax) / grid.cellsize)))
+        last = min(grid.nrows, int(np.ceil((grid.ymax - extent.YMin) / grid.cellsize)) + 1)
+        for row in range(first, last):
+            y = grid.ymax - (row + 0.5) * grid.cellsize
+            crossing = (ylow <= y) & (yhigh > y)
+            xs = np.sort(x0[crossing] + (y - y0[crossing]) * (x1[crossing] - x0[crossing]) / (y1[crossing] - y0[crossing]))
+            for start, stop in zip(xs[0::2], xs[1::2]):
+                col0 = max(0, int(np.ceil((start - grid.xmin) / grid.cellsize - 0.5)))
+                col1 = min(grid.ncols - 1, int(np.floor((stop - grid.xmin) / grid.cellsize - 0.5)))
+                if col1 >= col0:
+                    inside[row, col0:col1 + 1] = True
+        return inside
+
+class ThiessenPolygon(object):
+    """ThiessenPolygon(seeds, index, extent)
+
+    The Thiessen polygon of seeds[index], clipped to extent: the part of
+    the extent nearer to that seed than to any other.
+
+    """
+    def __init__(self, seeds, index, extent):
+        self.seeds = seeds
+        self.index = index
+        self.clip = extent
+
+    @property
+    def extent(self):
+        return self.clip
+
+    def projectAs(self, spatial_reference):
+        return self
+
+    def rasterize(self, grid):
+        xs, ys = grid.centers()
+        x, y = np.meshgrid(xs, ys)
+        distances = [(x - sx) ** 2 + (y - sy) ** 2 for sx, sy in self.seeds]
+        nearest = np.argmin(np.array(distances), axis=0)
+        return ((nearest == self.index) & (x >= self.clip.XMin) & (x <= self.clip.XMax) &
+                (y >= self.clip.YMin) & (y <= self.clip.YMax))
+
+#-------------------------------------------------------------------------------
+#--------------------------datasets---------------------------------------------
+
+# Datasets of this process by key, like in_memory. Keys are lower case with
+# forward slashes, so "in_memory\\cf0" and os.path.join("in_memory", "cf0") match.
+datasets = {}
+# image server layers by name
+layers = {}
+
+def datasetKey(path):
+    return os.path.normpath(str(path).replace("\\", "/")).lower()
+
+def onDisk(path):
+    return str(path).lower().endswith((".tif", ".tiff", ".json"))
+
+def diskPath(path):
+    return str(path).replace("\\", os.sep) if os.sep != "\\" else str(path)
+
+class Grid(object):
+    """Grid(xmin, ymax, cellsize, ncols, nrows)
+
+    The cells of a raster, with row 0 at the top.
+
+    """
+    def __init__(self, xmin, ymax, cellsize, ncols, nrows):
+        self.xmin = xmin
+        self.ymax = ymax
+        self.cellsize = cellsize
+        self.ncols = ncols
+        self.nrows = nrows
+
+    @classmethod
+    def snap(cls, extent, cellsize):
+        """snap(extent, cellsize)
+
+        Returns the grid of cellsize cells covering an extent, snapped
+        outward to multiples of cellsize.
+
+        """
+        xmin = np.floor(extent.XMin / cellsize + 1e-9) * cellsize
+        ymin = np.floor(extent.YMin / cellsize + 1e-9) * cellsize
+        xmax = np.ceil(extent.XMax / cellsize - 1e-9) * cellsize
+        ymax = np.ceil(extent.YMax / cellsize - 1e-9) * cellsize
+        return cls(float(xmin), float(ymax), float(cellsize),
+                   max(0, int(round((xmax - xmin) / cellsize))), max(0, int(round((ymax - ymin) / cellsize))))
+
+    @property
+    def extent(self):
+        return Extent(self.xmin, self.ymax - self.nrows * self.cellsize,
+                      self.xmin + self.ncols * self.cellsize, self.ymax)
+
+    def centers(self):
+        return (self.xmin + (np.arange(self.ncols) + 0.5) * self.cellsize,
+                self.ymax - (np.arange(self.nrows) + 0.5) * self.cellsize)
+
+    def same(self, other):
+        return (self.ncols == other.ncols and self.nrows == other.nrows and
+                abs(self.cellsize - other.cellsize) < 1e-9 * self.cellsize and
+                abs(self.xmin - other.xmin) < 1e-6 * self.cellsize and abs(self.ymax - other.ymax) < 1e-6 * self.cellsize)
+
+class Raster(object):
+    """Raster(inRaster)
+
+    A raster: values, a mask of the cells with data, its grid, and the
+    fields of its attribute table as {field: {value: attribute}}. Raster
+    objects that are not saved are temporary, as in arcpy.
+
+    """
+    def __init__(self, inRaster):
+        source = loadRaster(inRaster)
+        self.values = source.values
+        self.mask = source.mask
+        self.grid = source.grid
+        self.fields = source.fields
+        self.catalogPath = str(inRaster)
+
+    @classmethod
+    def make(cls, values, mask, grid, fields=None):
+        raster = cls.__new__(cls)
+        raster.values = values
+        raster.mask = mask
+        raster.grid = grid
+        raster.fields = fields if fields is not None else {}
+        raster.catalogPath = None
+        return raster
+
+    @property
+    def isInteger(self):
+        return self.values.dtype.kind in "iub"
+
+    @property
+    def extent(self):
+        return self.grid.extent
+
+    @property
+    def meanCellWidth(self):
+        return self.grid.cellsize
+
+    @property
+    def width(self):
+        return self.grid.ncols
+
+    @property
+    def height(self):
+        return self.grid.nrows
+
+    @property
+    def pixelType(self):
+        # ArcGIS integer rasters have at most 32 bits.
+        kind, size = self.values.dtype.kind, self.values.dtype.itemsize
+        if kind == "b":
+            return "U1"
+        if kind == "f":
+            return "F32" if size <= 4 else "F64"
+        return ("U" if kind == "u" else "S") + str(8 * min(size, 4))
+
+    @property
+    def maximum(self):
+        if not self.mask.any():
+            return None
+        return self.values[self.mask].max().item()
+
+    @property
+    def minimum(self):
+        if not self.mask.any():
+            return None
+        return self.values[self.mask].min().item()
+
+    @property
+    def mean(self):
+        if not self.mask.any():
+            return None
+        return float(self.values[self.mask].mean())
+
+    def save(self, path):
+        saveRaster(self, path)
+        self.catalogPath = str(path)
+
+    def attributeRows(self):
+        """attributeRows()
+
+        Returns the rows of the attribute table, (value, count, fields),
+        in order of value. Only integer rasters have one.
+
+        """
+        if not self.isInteger:
+            raise ExecuteError("ERROR 000049: Failed to build attribute table. The raster is not an integer raster.")
+        values, counts = np.unique(self.values[self.mask], return_counts=True)
+        return [(value, count, dict((name, field.get(value)) for name, field in self.fields.items()))
+                for value, count in zip(values.tolist(), counts.tolist())]
+
+    def compare(self, other, operation):
+        grid = analysisGrid([self, other])
+        a, amask = sample(self, grid)
+        b, bmask = sampleInput(other, grid)
+        return Raster.make(operation(a, b).astype(np.int64), amask & bmask, grid)
+
+    def __eq__(self, other):
+        return self.compare(other, np.equal)
+
+    def __ne__(self, other):
+        return self.compare(other, np.not_equal)
+
+    def __gt__(self, other):
+        return self.compare(other, np.greater)
+
+    def __lt__(self, other):
+        return self.compare(other, np.less)
+
+    def __ge__(self, other):
+        return self.compare(other, np.greater_equal)
+
+    def __le__(self, other):
+        return self.compare(other, np.less_equal)
+
+    __hash__ = object.__hash__
+
+def saveRaster(raster, path):
+    if onDisk(path):
+        table = dict((name, dict((str(value), attribute) for value, attribute in field.items()))
+                     for name, field in raster.fields.items())
+        with open(diskPath(path), "wb") as f:
+            np.savez(f, values=raster.values, mask=raster.mask,
+                     grid=np.array([raster.grid.xmin, raster.grid.ymax, raster.grid.cellsize]),
+                     fields=np.array(json.dumps(table)))
+    else:
+        datasets[datasetKey(path)] = Raster.make(raster.values, raster.mask, raster.grid, dict(raster.fields))
+
+def readFields(text, values):
+    # the JSON of attribute fields has string keys, read back as raster values.
+    return dict((name, dict((int(value) if values.dtype.kind in "iu" else float(value), attribute)
+                            for value, attribute in field.items()))
+                for name, field in json.loads(text).items())
+
+def loadRaster(source):
+    """loadRaster(source)
+
+    Returns the Raster for a Raster, a path, a Result or an image server
+    layer name. Raises ExecuteError 000732 if there is no such raster.
+
+    """
+    if isinstance(source, Raster):
+        return source
+    path = str(source)
+    if path in layers:
+        return layers[path].render()
+    if onDisk(path):
+        if not os.path.exists(diskPath(path)):
+            raise ExecuteError("ERROR 000732: Input Raster: Dataset {0} does not exist or is not supported".format(path))
+        with open(diskPath(path), "rb") as f:
+            data = np.load(f)
+            xmin, ymax, cellsize = data['grid'].tolist()
+            values = data['values']
+            mask = data['mask']
+            fields = readFields(data['fields'].item(), values)
+        return Raster.make(values, mask, Grid(xmin, ymax, cellsize, values.shape[1], values.shape[0]), fields)
+    dataset = datasets.get(datasetKey(path))
+    if not isinstance(dataset, Raster):
+        raise ExecuteError("ERROR 000732: Input Raster: Dataset {0} does not exist or is not supported".format(path))
+    return dataset
+
+def numericCellSize():
+    try:
+        return float(str(env.cellSize))
+    except ValueError:
+        return None
+
+def analysisGrid(inputs):
+    """analysisGrid(inputs)
+
+    Returns the grid a tool writes from its inputs: the cell size of
+    env.cellSize or the largest input cell size, and env.extent, or the
+    union of the inputs with "MAXOF", or else their intersection.
+
+    """
+    rasters = [loadRaster(item) for item in inputs if not isinstance(item, (int, float))]
+    cellsize = numericCellSize() or max(raster.grid.cellsize for raster in rasters)
+    extents = [raster.extent for raster in rasters]
+    if isinstance(env.extent, Extent):
+        extent = env.extent
+    elif str(env.extent).upper() == "MAXOF":
+        extent = unionExtent(extents)
+    else:
+        extent = Extent(max(e.XMin for e in extents), max(e.YMin for e in extents),
+                        min(e.XMax for e in extents), min(e.YMax for e in extents))
+        extent.XMax = max(extent.XMax, extent.XMin)
+        extent.YMax = max(extent.YMax, extent.YMin)
+    return Grid.snap(extent, cellsize)
+
+def sample(raster, grid):
+    """sample(raster, grid)
+
+    Returns the values and mask of a raster at the cell centers of grid,
+    by nearest neighbor. Cells outside the raster have no data.
+
+    """
+    if raster.grid.same(grid):
+        return raster.values, raster.mask
+    xs, ys = grid.centers()
+    cols = np.floor((xs - raster.grid.xmin) / raster.grid.cellsize).astype(np.int64)
+    rows = np.floor((raster.grid.ymax - ys) / raster.grid.cellsize).astype(np.int64)
+    colin = (cols >= 0) & (cols < raster.grid.ncols)
+    rowin = (rows >= 0) & (rows < raster.grid.nrows)
+    values = np.zeros((grid.nrows, grid.ncols), dtype=raster.values.dtype)
+    mask = np.zeros((grid.nrows, grid.ncols), dtype=bool)
+    if colin.any() and rowin.any():
+        inside = np.ix_(rowin, colin)
+        source = np.ix_(rows[rowin], cols[colin])
+        values[inside] = raster.values[source]
+        mask[inside] = raster.mask[source]
+    return values, mask
+
+def sampleInput(item, grid):
+    if isinstance(item, (int, float)):
+        return (np.full((grid.nrows, grid.ncols), item, dtype=np.int64 if isinstance(item, int) else np.float64),
+                np.ones((grid.nrows, grid.ncols), dtype=bool))
+    return sample(loadRaster(item), grid)
+
+class Table(object):
+    """Table(fields, rows)
+
+    A table of rows, each a list with one value per field.
+
+    """
+    def __init__(self, fields, rows=None):
+        self.fields = list(fields)
+        self.rows = rows or []
+
+class FeatureClass(object):
+    """FeatureClass(shapeType, fields, rows, path=None)
+
+    Features as dictionaries of field values, with the geometry in SHAPE.
+    A feature class with a path is a GeoJSON file and save() writes it.
+
+    """
+    def __init__(self, shapeType, fields, rows, path=None):
+        self.shapeType = shapeType
+        self.fields = list(fields)
+        self.rows = rows
+        self.path = path
+
+    def nextID(self):
+        return max([0] + [row['OBJECTID'] for row in self.rows]) + 1
+
+    @classmethod
+    def read(cls, path):
+        with open(diskPath(path)) as f:
+            collection = json.load(f)
+        fields = ['OBJECTID', 'SHAPE']
+        rows = []
+        for n, feature in enumerate(collection['features']):
+            properties = dict(feature.get('properties') or {})
+            geometry = feature.get('geometry')
+            if geometry is None:
+                shape = None
+            elif geometry['type'] == "Polygon":
+                shape = Polygon([geometry['coordinates']])
+            else:
+                shape = Polygon(geometry['coordinates'])
+            row = {'OBJECTID': properties.pop('OBJECTID', n + 1), 'SHAPE': shape}
+            for name, value in properties.items():
+                if name not in fields:
+                    fields.append(name)
+                row[name] = value
+            rows.append(row)
+        for row in rows:
+            for name in fields:
+                row.setdefault(name, None)
+        return cls("Polygon", fields, rows, path)
+
+    def save(self):
+        if self.path is None:
+            return
+        features = []
+        for row in self.rows:
+            properties = dict((name, row[name]) for name in self.fields if name != 'SHAPE')
+            shape = row['SHAPE']
+            geometry = None
+            if shape is not None:
+                geometry = {'type': "MultiPolygon",
+                            'coordinates': [[ring.tolist() for ring in part] for part in shape.parts]}
+            features.append({'type': "Feature", 'properties': properties, 'geometry': geometry})
+        with open(diskPath(self.path), "w") as f:
+            json.dump({'type': "FeatureCollection", 'features': features}, f)
+
+def loadDataset(path):
+    """loadDataset(path)
+
+    Returns the raster, table or feature class at path. Raises
+    ExecuteError 000732 if it does not exist.
+
+    """
+    if isinstance(path, Raster):
+        return path
+    path = str(path)
+    if path.lower().endswith(".json"):
+        if not os.path.exists(diskPath(path)):
+            raise ExecuteError("ERROR 000732: Input Features: Dataset {0} does not exist or is not supported".format(path))
+        return FeatureClass.read(path)
+    if onDisk(path) or path in layers:
+        return loadRaster(path)
+    dataset = datasets.get(datasetKey(path))
+    if dataset is None:
+        raise ExecuteError("ERROR 000732: Input Dataset: Dataset {0} does not exist or is not supported".format(path))
+    return dataset
+
+def storeDataset(path, dataset):
+    if isinstance(dataset, FeatureClass) and str(path).lower().endswith(".json"):
+        dataset.path = str(path)
+        dataset.save()
+    else:
+        datasets[datasetKey(path)] = dataset
+
+def fieldIndex(fields, name):
+    lower = [field.lower() for field in fields]
+    if name.lower() not in lower:
+        raise ExecuteError("ERROR 000728: Field {0} does not exist within table".format(name))
+    return lower.index(name.lower())
+
+def whereFilter(where):
+    """whereFilter(where)
+
+    Parses a where clause of the form "Field IN (1, 2)" or "Field = 1"
+    into (field, set of values), or returns None for no clause.
+
+    """
+    if not where:
+        return None
+    match = re.match(r"\s*(\w+)\s+IN\s*\((.*)\)\s*$", where, re.IGNORECASE)
+    if match is None:
+        match = re.match(r"\s*(\w+)\s*=\s*(.+?)\s*$", where)
+    if match is None:
+        raise ExecuteError("ERROR 000358: Invalid expression " + where)
+    values = set()
+    for item in match.group(2).split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item[0] in "'\"":
+            values.add(item[1:-1])
+        else:
+            number = float(item)
+            values.add(int(number) if number == int(number) else number)
+    return match.group(1), values
+
+class Field(object):
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+
+#-------------------------------------------------------------------------------
+#--------------------------workspace tools--------------------------------------
+
+def Exists(dataset):
+    if isinstance(dataset, Raster):
+        return True
+    path = str(dataset)
+    if onDisk(path):
+        return os.path.exists(diskPath(path))
+    return datasetKey(path) in datasets or path in layers
+
+@tool
+def Delete_management(dataset, data_type=None):
+    if isinstance(dataset, Raster):
+        if dataset.catalogPath is not None:
+            Delete_management(dataset.catalogPath)
+        return Result("")
+    path = str(dataset)
+    if onDisk(path):
+        if os.path.exists(diskPath(path)):
+            os.remove(diskPath(path))
+    else:
+        datasets.pop(datasetKey(path), None)
+        layers.pop(path, None)
+    return Result(path)
+
+class Description(object):
+    def __init__(self, dataType, path):
+        self.dataType = dataType
+        self.catalogPath = path
+
+def Describe(path):
+    path = str(path)
+    if os.path.isdir(diskPath(path)):
+        return Description("Folder", path)
+    dataset = loadDataset(path)
+    return Description({Raster: "RasterDataset", Table: "Table", FeatureClass: "FeatureClass",
+                        Workspace: "Workspace"}[type(dataset)], path)
+
+class Workspace(object):
+    pass
+
+@tool
+def CreateFileGDB_management(out_folder_path, out_name, out_version=None):
+    path = os.path.join(str(out_folder_path), str(out_name))
+    datasets[datasetKey(path)] = Workspace()
+    return Result(path)
+
+def ListRasters(wild_card=None, raster_type=None):
+    """ListRasters(wild_card=None, raster_type=None)
+
+    Returns the names of the rasters in env.workspace: the rasters kept in
+    this process, or the .tif files of a folder on disk.
+
+    """
+    workspace = datasetKey(env.workspace)
+    names = [os.path.basename(key) for key, dataset in datasets.items()
+             if isinstance(dataset, Raster) and os.path.dirname(key) == workspace]
+    folder = diskPath(str(env.workspace))
+    if os.path.isdir(folder):
+        names += [name for name in os.listdir(folder) if onDisk(name) and not name.lower().endswith(".json")]
+    if wild_card:
+        pattern = re.compile(re.escape(wild_card).replace("\\*", ".*") + "$", re.IGNORECASE)
+        names = [name for name in names if pattern.match(name)]
+    return sorted(names)
+
+def ListFields(dataset):
+    dataset = loadDataset(dataset)
+    if isinstance(dataset, Raster):
+        return [Field("OID", "OID"), Field("Value", "Integer"), Field("Count", "Double")] + [
+            Field(name, "String") for name in sorted(dataset.fields)]
+    return [Field(name, "OID" if name == "OBJECTID" else "Geometry" if name == "SHAPE" else "String")
+            for name in dataset.fields]
+
+@tool
+def AddField_management(in_table, field_name, field_type, field_precision=None, field_scale=None,
+                        field_length=None, *args):
+    dataset = loadDataset(in_table)
+    if field_name not in dataset.fields:
+        dataset.fields.append(field_name)
+        for row in dataset.rows:
+            if isinstance(row, dict):
+                row[field_name] = None
+            else:
+                row.append(None)
+    storeDataset(in_table, dataset)
+    return Result(str(in_table))
+
+@tool
+def CreateFeatureclass_management(out_path, out_name, geometry_type="POLYGON", template=None, has_m=None,
+                                  has_z=None, spatial_reference=None):
+    path = str(out_path) + "\\" + str(out_name)
+    storeDataset(path, FeatureClass(geometry_type.title(), ['OBJECTID', 'SHAPE'], []))
+    return Result(path)
+
+@tool
+def Project_management(in_dataset, out_dataset, out_coor_system, *args):
+    source = loadDataset(in_dataset)
+    rows = [dict(row) for row in source.rows]
+    storeDataset(out_dataset, FeatureClass(source.shapeType, source.fields, rows))
+    return Result(str(out_dataset))
+
+@tool
+def CopyRows_management(in_rows, out_table, config_keyword=None):
+    source = loadDataset(in_rows)
+    if isinstance(source, Raster):
+        names = sorted(source.fields)
+        table = Table(["OBJECTID", "Value", "Count"] + names,
+                      [[n + 1, value, count] + [attributes[name] for name in names]
+                       for n, (value, count, attributes) in enumerate(source.attributeRows())])
+    else:
+        table = Table(source.fields, [list(row) for row in source.rows])
+    storeDataset(out_table, table)
+    return Result(str(out_table))
+
+def writeBack(in_raster, raster):
+    # a raster changed in place is saved again where it came from.
+    path = in_raster.catalogPath if isinstance(in_raster, Raster) else str(in_raster)
+    if path is not None:
+        saveRaster(raster, path)
+
+@tool
+def JoinField_management(in_data, in_field, join_table, join_field, fields=None):
+    target = loadRaster(in_data)
+    source = loadDataset(join_table)
+    if isinstance(source, Table):
+        # a table copied from an attribute table, as the 10.5.1 workaround joins.
+        key = fieldIndex(source.fields, join_field)
+        available = dict((name, dict((row[key], row[n]) for row in source.rows))
+                         for n, name in enumerate(source.fields))
+    else:
+        available = source.fields
+    joined = dict(target.fields)
+    for name in fields or sorted(available):
+        if name.lower() in ("value", "count", "oid", "objectid") or name not in available:
+            continue
+        joined[name] = dict(available[name])
+    writeBack(in_data, Raster.make(target.values, target.mask, target.grid, joined))
+    return Result(str(in_data))
+
+@tool
+def BuildRasterAttributeTable_management(in_raster, overwrite=None):
+    raster = loadRaster(in_raster)
+    if not raster.isInteger:
+        raise ExecuteError("ERROR 000049: Failed to build attribute table")
+    if str(overwrite).lower() == "overwrite":
+        writeBack(in_raster, Raster.make(raster.values, raster.mask, raster.grid))
+    return Result(str(in_raster))
+
+#-------------------------------------------------------------------------------
+#--------------------------raster tools-----------------------------------------
+
+@tool
+def CopyRaster_management(in_raster, out_rasterdataset, *args):
+    raster = loadRaster(in_raster)
+    saveRaster(raster, out_rasterdataset)
+    return Result(str(out_rasterdataset))
+
+@tool
+def ProjectRaster_management(in_raster, out_raster, out_coor_system, resampling_type="NEAREST", cell_size=None, *args):
+    raster = loadRaster(in_raster)
+    cellsize = float(cell_size) if cell_size not in (None, "#") else raster.grid.cellsize
+    grid = Grid.snap(raster.extent, cellsize)
+    values, mask = sample(raster, grid)
+    saveRaster(Raster.make(values, mask, grid, dict(raster.fields)), out_raster)
+    return Result(str(out_raster))
+
+@tool
+def MosaicToNewRaster_management(input_rasters, output_location, raster_dataset_name_with_extension,
+                                 coordinate_system_for_the_raster=None, pixel_type=None, cellsize=None,
+                                 number_of_bands=1, mosaic_method="FIRST", *args):
+    rasters = [loadRaster(path) for path in input_rasters]
+    grid = Grid.snap(unionExtent([raster.extent for raster in rasters]),
+                     float(cellsize) if cellsize not in (None, "#") else rasters[0].grid.cellsize)
+    values = np.zeros((grid.nrows, grid.ncols), dtype=rasters[0].values.dtype)
+    mask = np.zeros((grid.nrows, grid.ncols), dtype=bool)
+    for raster in rasters:
+        stripvalues, stripmask = sample(raster, grid)
+        fill = stripmask & ~mask
+        values[fill] = stripvalues[fill]
+        mask |= fill
+    out = os.path.join(str(output_location), raster_dataset_name_with_extension)
+    saveRaster(Raster.make(values, mask, grid, dict(rasters[0].fields)), out)
+    return Result(out)
+
+@tool
+def PolygonToRaster_conversion(in_features, value_field, out_rasterdataset=None, cell_assignment="CELL_CENTER",
+                               priority_field="NONE", cellsize=None):
+    features = loadDataset(in_features)
+    size = float(cellsize) if cellsize not in (None, "#") else numericCellSize()
+    if isinstance(env.extent, Extent):
+        extent = env.extent
+    else:
+        extent = unionExtent([row['SHAPE'].extent for row in features.rows])
+    grid = Grid.snap(extent, size)
+    values = np.zeros((grid.nrows, grid.ncols), dtype=np.int64)
+    mask = np.zeros((grid.nrows, grid.ncols), dtype=bool)
+    index = fieldIndex(features.fields, value_field)
+    for row in features.rows:
+        inside = row['SHAPE'].rasterize(grid)
+        values[inside] = row[features.fields[index]]
+        mask |= inside
+    if out_rasterdataset is None:
+        out_rasterdataset = "in_memory\\PolygonToRaster_" + str(len(datasets))
+    saveRaster(Raster.make(values, mask, grid), out_rasterdataset)
+    return Result(str(out_rasterdataset))
+
+@tool
+def CreateThiessenPolygons_analysis(in_features, out_feature_class, fields_to_copy="ONLY_FID"):
+    points = loadDataset(in_features)
+    seeds = [(row['SHAPE'].X, row['SHAPE'].Y) for row in points.rows]
+    if isinstance(env.extent, Extent):
+        clip = env.extent
+    else:
+        xs = [x for x, y in seeds]
+        ys = [y for x, y in seeds]
+        margin = 0.1 * max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+        clip = Extent(min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin)
+    rows = []
+    for n, row in enumerate(points.rows):
+        copied = dict(row) if str(fields_to_copy).upper() == "ALL" else {'OBJECTID': row['OBJECTID']}
+        copied['SHAPE'] = ThiessenPolygon(seeds, n, clip)
+        rows.append(copied)
+    fields = points.fields if str(fields_to_copy).upper() == "ALL" else ['OBJECTID', 'SHAPE']
+    storeDataset(out_feature_class, FeatureClass("Polygon", fields, rows))
+    return Result(str(out_feature_class))
+
+class ImageServerLayer(object):
+    """ImageServerLayer(service, extent, cellsize)
+
+    A layer of a synthetic image service over an extent, drawn from
+    landscape.py when it is copied.
+
+    """
+    def __init__(self, service, extent, cellsize):
+        self.service = service
+        self.extent = extent
+        self.cellsize = cellsize
+
+    def render(self):
+        grid = Grid.snap(self.extent, self.cellsize)
+        if server:
+            values, fields = requestImage(self.service, grid)
+        else:
+            xs, ys = grid.centers()
+            # a row and a column of coordinates broadcast to the grid in landscape.
+            values, fields = landscape.render(self.service, xs[np.newaxis, :], ys[:, np.newaxis])
+        return Raster.make(values, np.ones(values.shape, dtype=bool), grid, fields)
+
+def requestImage(service, grid):
+    """requestImage(service, grid)
+
+    Fetches the values and attribute fields of a service on grid from the
+    image server. A failed, throttled, timed out or corrupted response
+    raises ExecuteError 999999, as a failed copy from an image service does.
+
+    """
+    extent = grid.extent
+    url = "{0}/{1}/ImageServer/exportImage?bbox={2!r},{3!r},{4!r},{5!r}&size={6},{7}".format(
+        server.rstrip("/"), service, float(extent.XMin), float(extent.YMin), float(extent.XMax), float(extent.YMax),
+        grid.ncols, grid.nrows)
+    try:
+        response = urlopen(url, timeout=serverTimeout)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+    except HTTPError as e:
+        raise ExecuteError("ERROR 999999: Error executing function. The image service {0} returned HTTP {1}: {2}".format(
+            service, e.code, e.read().decode("utf-8", "replace")))
+    except Exception as e:
+        raise ExecuteError("ERROR 999999: Error executing function. The image service {0} did not respond: {1}".format(
+            service, e))
+    try:
+        with np.load(io.BytesIO(body)) as data:
+            values = data['values']
+            fields = readFields(data['fields'].item(), values)
+        if values.shape != (grid.nrows, grid.ncols):
+            raise ValueError("{0} by {1} cells instead of {2} by {3}".format(
+                values.shape[1], values.shape[0], grid.ncols, grid.nrows))
+    except Exception as e:
+        raise ExecuteError("ERROR 999999: Error executing function. The image service {0} returned a corrupt image: {1}".format(
+            service, e))
+    return values, fields
+
+@tool
+def MakeImageServerLayer_management(in_image_service, out_imageserver_layer, template=None, band_index=None,
+                                    mosaic_method=None, order_field=None, order_base_value=None,
+                                    lock_rasterid=None, cell_size=None, where_clause=None,
+                                    processing_template=None):
+    service = os.path.basename(str(in_image_service).replace("\\", "/"))
+    service = re.sub(r"\.ImageServer$", "", service, flags=re.IGNORECASE)
+    if service not in landscape.services:
+        raise ExecuteError("ERROR 000732: Input Image Service: Dataset {0} does not exist or is not supported".format(in_image_service))
+    if isinstance(template, Extent):
+        extent = template
+    else:
+        extent = Extent(*[float(v) for v in str(template).split()])
+    cellsize = float(cell_size) if cell_size not in (None, "#") else 30.0
+    layers[str(out_imageserver_layer)] = ImageServerLayer(service, extent, cellsize)
+    return Result(str(out_imageserver_layer))
+
+from arcpy import sa, da, mapping, management
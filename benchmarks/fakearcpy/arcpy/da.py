@@ -0,0 +1,148 @@
+#-------------------------------------------------------------------------------
+# Name:         arcpy.da
+#               Cursors over the NumPy rasters, tables and feature classes of the
+#               arcpy stand-in, and an edit session.
+#-------------------------------------------------------------------------------
+from arcpy import Raster, Table, FeatureClass, Point, ExecuteError, loadDataset, storeDataset, fieldIndex, whereFilter
+
+def rasterTable(raster):
+    """rasterTable(raster)
+
+    Returns the attribute table of an integer raster as a Table with the
+    fields OID, Value, Count and the joined fields.
+
+    """
+    names = sorted(raster.fields)
+    return Table(["OID", "Value", "Count"] + names,
+                 [[n + 1, value, count] + [attributes[name] for name in names]
+                  for n, (value, count, attributes) in enumerate(raster.attributeRows())])
+
+class Cursor(object):
+    """Cursor(in_table, field_names, where_clause=None)
+
+    The rows of a table, raster attribute table or feature class, with the
+    fields in field_names, filtered by a where clause. Tokens such as OID@,
+    SHAPE@ and SHAPE@XY read the OBJECTID and the geometry of features.
+
+    """
+    def __init__(self, in_table, field_names, where_clause=None):
+        self.path = in_table
+        if isinstance(field_names, str):
+            field_names = [name.strip() for name in field_names.split(";")]
+        self.fields = list(field_names)
+        self.dataset = loadDataset(in_table)
+        if isinstance(self.dataset, Raster):
+            self.dataset = rasterTable(self.dataset)
+        self.rows = self.dataset.rows
+        where = whereFilter(where_clause)
+        if where is not None:
+            index = self.column(where[0])
+            self.rows = [row for row in self.rows if self.get(row, index) in where[1]]
+
+    def column(self, name):
+        upper = name.upper()
+        if isinstance(self.dataset, FeatureClass):
+            if upper == "OID@":
+                return "OBJECTID"
+            if upper.startswith("SHAPE@"):
+                return upper
+            return self.dataset.fields[fieldIndex(self.dataset.fields, name)]
+        if upper == "OID@":
+            return 0
+        return fieldIndex(self.dataset.fields, name)
+
+    def get(self, row, column):
+        if column == "SHAPE@XY":
+            shape = row['SHAPE']
+            if isinstance(shape, Point):
+                return (shape.X, shape.Y)
+            centroid = shape.trueCentroid
+            return (centroid.X, centroid.Y)
+        if column == "SHAPE@":
+            return row['SHAPE']
+        return row[column]
+
+    def values(self, row):
+        return [self.get(row, self.column(name)) for name in self.fields]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        # rows changed by an update or insert cursor are stored when it closes.
+        if getattr(self, 'changed', False):
+            storeDataset(self.path, self.dataset)
+            self.changed = False
+
+    def __del__(self):
+        self.close()
+
+class SearchCursor(Cursor):
+    def __iter__(self):
+        for row in self.rows:
+            yield tuple(self.values(row))
+
+class UpdateCursor(Cursor):
+    def __iter__(self):
+        for row in self.rows:
+            self.current = row
+            yield self.values(row)
+
+    def updateRow(self, values):
+        for name, value in zip(self.fields, values):
+            column = self.column(name)
+            if column == "SHAPE@XY":
+                column = "SHAPE"
+                value = Point(*value)
+            elif column == "SHAPE@":
+                column = "SHAPE"
+            self.current[column] = value
+        self.changed = True
+
+class InsertCursor(Cursor):
+    def insertRow(self, values):
+        if not isinstance(self.dataset, FeatureClass):
+            raise ExecuteError("ERROR 999999: Insert cursors need a feature class here.")
+        row = dict((name, None) for name in self.dataset.fields)
+        row['OBJECTID'] = self.dataset.nextID()
+        for name, value in zip(self.fields, values):
+            column = self.column(name)
+            if column == "SHAPE@XY":
+                row['SHAPE'] = Point(*value)
+            elif column == "SHAPE@":
+                row['SHAPE'] = value
+            else:
+                row[column] = value
+        self.dataset.rows.append(row)
+        self.changed = True
+        return row['OBJECTID']
+
+class Editor(object):
+    """Editor(workspace)
+
+    An edit session. Edits are written as the cursors close, so it only
+    keeps track of whether it is editing.
+
+    """
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.isEditing = False
+
+    def startEditing(self, with_undo=True, multiuser_mode=True):
+        self.isEditing = True
+
+    def stopEditing(self, save_changes=True):
+        self.isEditing = False
+
+    def startOperation(self):
+        pass
+
+    def stopOperation(self):
+        pass
+
+    def abortOperation(self):
+        pass
@@ -0,0 +1,7 @@
+#-------------------------------------------------------------------------------
+# Name:         arcpy.management
+#               The data management tools under their short names.
+#-------------------------------------------------------------------------------
+from arcpy import (CopyRaster_management as CopyRaster, MakeImageServerLayer_management as MakeImageServerLayer,
+                   Delete_management as Delete, BuildRasterAttributeTable_management as BuildRasterAttributeTable,
+                   ProjectRaster_management as ProjectRaster, MosaicToNewRaster_management as MosaicToNewRaster)
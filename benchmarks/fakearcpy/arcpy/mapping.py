@@ -0,0 +1,12 @@
+#-------------------------------------------------------------------------------
+# Name:         arcpy.mapping
+#               The synthetic image services need no connection, so connection
+#               files are not written.
+#-------------------------------------------------------------------------------
+from arcpy import Result, tool
+
+@tool
+def CreateGISServerConnectionFile(connection_type, out_folder_path, out_name, server_url, server_type=None,
+                                  use_arcgis_desktop_staging_folder=None, staging_folder_path=None,
+                                  username=None, password=None, save_username_password=None):
+    return Result(str(out_folder_path) + "\\" + str(out_name))
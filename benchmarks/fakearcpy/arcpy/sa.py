@@ -0,0 +1,129 @@
+#-------------------------------------------------------------------------------
+# Name:         arcpy.sa
+#               The Spatial Analyst tools GeoDescriber uses, on NumPy rasters.
+#-------------------------------------------------------------------------------
+import numpy as np
+
+from arcpy import (Raster, Table, Result, ExecuteError, tool, loadRaster, analysisGrid, sample, sampleInput,
+                   storeDataset, whereFilter)
+
+@tool
+def Con(in_conditional_raster, in_true_raster_or_constant, in_false_raster_or_constant=None, where_clause=None):
+    inputs = [in_conditional_raster, in_true_raster_or_constant]
+    if in_false_raster_or_constant is not None:
+        inputs.append(in_false_raster_or_constant)
+    grid = analysisGrid(inputs)
+    condition, conditionmask = sample(loadRaster(in_conditional_raster), grid)
+    if where_clause is not None:
+        field, accepted = whereFilter(where_clause)
+        condition = np.isin(condition, list(accepted))
+    else:
+        condition = condition != 0
+    truevalues, truemask = sampleInput(in_true_raster_or_constant, grid)
+    if in_false_raster_or_constant is None:
+        falsevalues = np.zeros_like(truevalues)
+        falsemask = np.zeros(truemask.shape, dtype=bool)
+    else:
+        falsevalues, falsemask = sampleInput(in_false_raster_or_constant, grid)
+    values = np.where(condition, truevalues, falsevalues)
+    mask = conditionmask & np.where(condition, truemask, falsemask)
+    return Raster.make(values, mask, grid)
+
+@tool
+def ExtractByAttributes(in_raster, where_clause):
+    raster = loadRaster(in_raster)
+    field, accepted = whereFilter(where_clause)
+    if field.lower() == "value":
+        keep = np.isin(raster.values, list(accepted))
+    else:
+        attributes = raster.fields[field]
+        keep = np.isin(raster.values, [value for value, attribute in attributes.items() if attribute in accepted])
+    return Raster.make(raster.values, raster.mask & keep, raster.grid, dict(raster.fields))
+
+@tool
+def Lookup(in_raster, lookup_field):
+    raster = loadRaster(in_raster)
+    if lookup_field not in raster.fields:
+        raise ExecuteError("ERROR 000728: Field {0} does not exist within table".format(lookup_field))
+    attributes = raster.fields[lookup_field]
+    if not attributes:
+        return Raster.make(np.zeros(raster.values.shape), np.zeros(raster.mask.shape, dtype=bool), raster.grid)
+    keys = np.array(sorted(attributes), dtype=raster.values.dtype)
+    found = np.array([attributes[key] for key in keys.tolist()])
+    place = np.clip(np.searchsorted(keys, raster.values), 0, len(keys) - 1)
+    matched = keys[place] == raster.values
+    return Raster.make(found[place], raster.mask & matched, raster.grid)
+
+@tool
+def ZonalStatisticsAsTable(in_zone_data, zone_field, in_value_raster, out_table, ignore_nodata="DATA",
+                           statistics_type="ALL"):
+    zones = loadRaster(in_zone_data)
+    valueraster = loadRaster(in_value_raster)
+    grid = analysisGrid([zones, valueraster])
+    zonevalues, zonemask = sample(zones, grid)
+    values, valuemask = sample(valueraster, grid)
+    inside = zonemask & valuemask
+    zonevalues = zonevalues[inside]
+    values = values[inside]
+    fields = ["OBJECTID", zone_field, "COUNT", "AREA", "MIN", "MAX", "RANGE", "MEAN", "STD", "SUM"]
+    # as in Spatial Analyst, the median is only found for integer value rasters.
+    if valueraster.isInteger:
+        fields.append("MEDIAN")
+    rows = []
+    order = np.argsort(zonevalues, kind="mergesort")
+    zonevalues = zonevalues[order]
+    values = values[order]
+    names, starts = np.unique(zonevalues, return_index=True)
+    ends = list(starts[1:]) + [len(zonevalues)]
+    for n, (zone, start, end) in enumerate(zip(names.tolist(), starts.tolist(), ends)):
+        cells = np.sort(values[start:end])
+        row = [n + 1, zone, len(cells), len(cells) * grid.cellsize ** 2, cells[0].item(), cells[-1].item(),
+               (cells[-1] - cells[0]).item(), float(cells.mean()), float(cells.std()), cells.sum().item()]
+        if valueraster.isInteger:
+            row.append(cells[(len(cells) - 1) // 2].item())
+        rows.append(row)
+    storeDataset(out_table, Table(fields, rows))
+    return Result(str(out_table))
+
+@tool
+def Aspect(in_raster):
+    raster = loadRaster(in_raster)
+    elevation = np.where(raster.mask, raster.values, 0).astype(np.float64)
+    if raster.mask.any() and not raster.mask.all():
+        # cells without data take the mean so they do not tilt their neighbors.
+        elevation[~raster.mask] = elevation[raster.mask].mean()
+    padded = np.pad(elevation, 1, mode="edge")
+    a, b, c = padded[:-2, :-2], padded[:-2, 1:-1], padded[:-2, 2:]
+    d, f = padded[1:-1, :-2], padded[1:-1, 2:]
+    g, h, i = padded[2:, :-2], padded[2:, 1:-1], padded[2:, 2:]
+    # Horn's method, as Spatial Analyst finds slope and aspect.
+    dzdx = ((c + 2 * f + i) - (a + 2 * d + g)) / 8.0
+    dzdy = ((g + 2 * h + i) - (a + 2 * b + c)) / 8.0
+    angle = np.degrees(np.arctan2(dzdy, -dzdx))
+    aspect = np.where(angle < 0, 90.0 - angle, np.where(angle > 90.0, 360.0 - angle + 90.0, 90.0 - angle))
+    aspect = np.where((dzdx == 0) & (dzdy == 0), -1.0, aspect)
+    return Raster.make(aspect, raster.mask.copy(), raster.grid)
+
+class RemapRange(object):
+    def __init__(self, remapTable):
+        self.remapTable = [list(row) for row in remapTable]
+
+class RemapValue(object):
+    def __init__(self, remapTable):
+        self.remapTable = [list(row) for row in remapTable]
+
+@tool
+def Reclassify(in_raster, reclass_field, remap, missing_values="DATA"):
+    raster = loadRaster(in_raster)
+    values = raster.values
+    out = values.copy() if str(missing_values).upper() == "DATA" else np.zeros_like(values)
+    done = np.zeros(values.shape, dtype=bool)
+    for row in remap.remapTable:
+        if isinstance(remap, RemapRange):
+            match = (values >= row[0]) & (values <= row[1]) & ~done
+        else:
+            match = (values == row[0]) & ~done
+        out = np.where(match, row[-1], out)
+        done |= match
+    mask = raster.mask.copy() if str(missing_values).upper() == "DATA" else raster.mask & done
+    return Raster.make(np.round(out).astype(np.int64), mask, raster.grid)
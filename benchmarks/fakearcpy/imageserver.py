@@ -0,0 +1,238 @@
+#-------------------------------------------------------------------------------
+# Name:         imageserver
+#               A local stand-in for the Living Atlas image servers, serving the
+#               ten synthetic services of landscape.py over HTTP, with injected
+#               latency, throttling, failures and corrupted responses.
+# Notes:        python benchmarks/fakearcpy/imageserver.py --port 8642 --latency 0.5
+#                   --max-concurrent 4 --fail-rate 0.1 --corrupt-rate 0.05
+#
+#               The arcpy stand-in fetches its image server layers from it when
+#               FAKEARCPY_SERVER is set:
+#
+#                   FAKEARCPY_SERVER=http://127.0.0.1:8642 PYTHONPATH=benchmarks/fakearcpy
+#                       python GeoDescriber.py parks.json
+#
+#               A layer is requested as
+#               /<service>/ImageServer/exportImage?bbox=xmin,ymin,xmax,ymax&size=ncols,nrows
+#               and returned as numpy .npz data holding its values and the JSON
+#               of its attribute fields. /stats returns the counts of requests,
+#               failures, throttled and corrupted responses as JSON.
+#-------------------------------------------------------------------------------
+import sys, time
+import argparse
+import io
+import json
+import random
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+import numpy as np
+
+import landscape
+
+class Faults(object):
+    """Faults(latency=0, jitter=0, maxConcurrent=0, failRate=0, corruptRate=0,
+              failServices=(), failFirst=0, seed=0)
+
+    The faults the server injects, and the counts of what it served. A
+    request waits latency plus up to jitter seconds. Beyond maxConcurrent
+    requests in flight, requests are throttled with HTTP 429. The first
+    failFirst requests of every service, every request for the services in
+    failServices and a failRate share of the others fail with HTTP 500,
+    and a corruptRate share of the responses are truncated or have bytes
+    flipped.
+
+    """
+    def __init__(self, latency=0.0, jitter=0.0, maxConcurrent=0, failRate=0.0, corruptRate=0.0,
+                 failServices=(), failFirst=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.maxConcurrent = maxConcurrent
+        self.failRate = failRate
+        self.corruptRate = corruptRate
+        self.failServices = set(failServices)
+        self.failFirst = failFirst
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.inFlight = 0
+        self.requests = {}
+        self.stats = {'requests': 0, 'served': 0, 'failed': 0, 'throttled': 0, 'corrupted': 0, 'bytes': 0,
+                      'peak_concurrent': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def enter(self, service):
+        """enter(service)
+
+        Admits a request for service. Returns "throttled", "failed" or
+        None for a request to serve.
+
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+            self.requests[service] = self.requests.get(service, 0) + 1
+            if self.maxConcurrent and self.inFlight >= self.maxConcurrent:
+                self.stats['throttled'] += 1
+                return "throttled"
+            self.inFlight += 1
+            self.stats['peak_concurrent'] = max(self.stats['peak_concurrent'], self.inFlight)
+            if (self.requests[service] <= self.failFirst or service in self.failServices
+                    or self.random.random() < self.failRate):
+                self.stats['failed'] += 1
+                return "failed"
+            return None
+
+    def leave(self):
+        with self.lock:
+            self.inFlight -= 1
+
+    def delay(self):
+        with self.lock:
+            seconds = self.latency + self.random.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def corrupt(self, body):
+        """corrupt(body)
+
+        Returns body, or for a corruptRate share of the responses body cut
+        short or with a run of bytes flipped.
+
+        """
+        with self.lock:
+            if self.random.random() >= self.corruptRate:
+                return body
+            self.stats['corrupted'] += 1
+            cut = self.random.randint(1, max(1, len(body) - 1))
+            truncate = self.random.random() < 0.5
+        if truncate:
+            return body[:cut]
+        flipped = bytearray(body)
+        for n in range(cut, min(len(body), cut + 16)):
+            flipped[n] ^= 0xff
+        return bytes(flipped)
+
+def renderImage(service, bbox, size):
+    """renderImage(service, bbox, size)
+
+    Returns the .npz data of a service over bbox, xmin, ymin, xmax and
+    ymax, at size, columns and rows.
+
+    """
+    xmin, ymin, xmax, ymax = bbox
+    ncols, nrows = size
+    xs = xmin + (np.arange(ncols) + 0.5) * (xmax - xmin) / ncols
+    ys = ymax - (np.arange(nrows) + 0.5) * (ymax - ymin) / nrows
+    values, fields = landscape.render(service, xs[np.newaxis, :], ys[:, np.newaxis])
+    table = dict((name, dict((str(value), attribute) for value, attribute in field.items()))
+                 for name, field in fields.items())
+    data = io.BytesIO()
+    np.savez(data, values=values, fields=np.array(json.dumps(table)))
+    return data.getvalue()
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    faults = Faults()
+    quiet = False
+
+    def reply(self, status, body, contentType="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", contentType)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def error(self, status, message):
+        self.reply(status, json.dumps({'error': {'code': status, 'message': message}}).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["stats"]:
+            with self.faults.lock:
+                self.reply(200, json.dumps(self.faults.stats).encode("utf-8"))
+            return
+        if len(parts) != 3 or parts[1] != "ImageServer" or parts[2] != "exportImage":
+            self.error(404, "Not found: " + url.path)
+            return
+        service = parts[0]
+        if service not in landscape.services:
+            self.error(404, "Service not found: " + service)
+            return
+        query = parse_qs(url.query)
+        try:
+            bbox = [float(v) for v in query['bbox'][0].split(",")]
+            size = [int(v) for v in query['size'][0].split(",")]
+            if len(bbox) != 4 or len(size) != 2 or min(size) < 1:
+                raise ValueError()
+        except (KeyError, ValueError):
+            self.error(400, "Invalid bbox or size: " + url.query)
+            return
+        admitted = self.faults.enter(service)
+        if admitted == "throttled":
+            self.error(429, "Too many requests")
+            return
+        # the request leaves the count in flight before its reply is sent, so
+        # a client that sends its next request at once is not throttled.
+        try:
+            self.faults.delay()
+            if admitted != "failed":
+                body = self.faults.corrupt(renderImage(service, bbox, size))
+        finally:
+            self.faults.leave()
+        if admitted == "failed":
+            self.error(500, "Error exporting image")
+            return
+        self.faults.count('served')
+        self.faults.count('bytes', len(body))
+        self.reply(200, body, "application/octet-stream")
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+class ImageServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the synthetic Living Atlas services with injected faults.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8642, help="port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every request waits (default: %(default)s)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="up to this many more seconds every request waits (default: %(default)s)")
+    parser.add_argument("--max-concurrent", type=int, default=0,
+                        help="requests in flight beyond which requests get HTTP 429 (default: no limit)")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="share of requests that fail with HTTP 500 (default: %(default)s)")
+    parser.add_argument("--fail-first", type=int, default=0,
+                        help="requests of every service that fail before any succeeds (default: %(default)s)")
+    parser.add_argument("--fail-services", default="",
+                        help="comma separated services whose requests always fail")
+    parser.add_argument("--corrupt-rate", type=float, default=0.0,
+                        help="share of responses that are truncated or garbled (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the injected faults (default: %(default)s)")
+    parser.add_argument("--quiet", action="store_true", help="do not log every request")
+    args = parser.parse_args()
+
+    ImageRequestHandler.faults = Faults(args.latency, args.jitter, args.max_concurrent, args.fail_rate,
+                                        args.corrupt_rate, [s for s in args.fail_services.split(",") if s],
+                                        args.fail_first, args.seed)
+    ImageRequestHandler.quiet = args.quiet
+    server = ImageServer((args.host, args.port), ImageRequestHandler)
+    print("Serving {0} services on http://{1}:{2}".format(len(landscape.services), args.host, args.port))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(ImageRequestHandler.faults.stats, sort_keys=True))
@@ -0,0 +1,134 @@
+#-------------------------------------------------------------------------------
+# Name:         landscape
+#               Synthetic stand-ins for the ten Living Atlas image services that
+#               GeoDescriber fetches, for the NumPy arcpy in this folder.
+# Notes:        Every layer is a function of the map coordinates of a cell, so
+#               two fetches of overlapping extents agree where they overlap, and
+#               the raster cache and the windowed water fetch behave as they do
+#               against the real services. Set FAKEARCPY_SEED for another world.
+#-------------------------------------------------------------------------------
+import os
+import zlib
+
+import numpy as np
+
+seed = int(os.getenv("FAKEARCPY_SEED", "0"))
+
+# Class names of the four classified services, as the services name them.
+landformClasses = ['Flat or Nearly Flat Plains', 'Smooth Plains with some local relief',
+                   'Irregular Plains with Low Hills', 'Irregular Plains with Moderate Relief',
+                   'Scattered Moderate Hills', 'Moderate Hills', 'Scattered High Hills', 'High Hills',
+                   'Scattered Low Mountains', 'Low Mountains', 'Scattered High Mountains', 'High Mountains',
+                   'Tablelands with Moderate Relief', 'Tablelands with Considerable Relief',
+                   'Tablelands with High Relief', 'Tablelands with Very High Relief', 'Surface Water']
+lithologyClasses = ['Unconsolidated Sediment', 'Siliciclastic Sedimentary Rock', 'Mixed Sedimentary Rock',
+                    'Carbonate Sedimentary Rock', 'Evaporite', 'Acid Volcanic', 'Intermediate Volcanics',
+                    'Basic Volcanics', 'Acid Plutonics', 'Intermediate Plutonics', 'Basic Plutonics',
+                    'Metamorphics', 'Pyroclastics', 'Ice and Glaciers', 'Non-defined']
+bioclimateClasses = [temperature + " " + moisture
+                     for temperature in ['Very Cold', 'Cold', 'Cool', 'Warm', 'Hot', 'Very Hot']
+                     for moisture in ['Very Dry', 'Dry', 'Semi-Dry', 'Moist', 'Wet', 'Very Wet']] + ['Arctic']
+landcoverClasses = ['Cropland, rainfed', 'Cropland, rainfed - Herbaceous cover',
+                    'Cropland, rainfed - Tree or shrub cover', 'Cropland irrigated or post-flooding',
+                    'Mosaic cropland (>50%) / natural vegetation (Tree, shrub, herbaceous cover) (<50%)',
+                    'Mosaic natural vegetation (Tree, shrub, herbaceous cover) (>50%) / cropland (<50%)',
+                    'Tree cover, broadleaved, evergreen, closed to open (>15%)',
+                    'Tree cover, broadleaved, deciduous, closed to open (>15%)',
+                    'Tree cover, needleleaved, evergreen, closed to open (>15%)',
+                    'Tree cover, needleleaved, deciduous, closed to open (>15%)',
+                    'Tree cover, mixed leaf type (broadleaved and needleleaved)',
+                    'Mosaic Trees and shrub (>50%) / herbaceous cover (<50%)',
+                    'Mosaic herbaceous cover (>50%) / Trees and shrub (<50%)',
+                    'Shrubland', 'Grassland', 'Lichens and mosses', 'Sparse vegetation (tree, shrub, herbaceous cover) (<15%)',
+                    'Tree cover, flooded, fresh or brakish water', 'Tree cover, flooded, saline water',
+                    'Shrub or herbaceous cover, flooded, fresh/saline/brakish water',
+                    'Urban areas', 'Bare areas', 'Water bodies', 'Permanent snow and ice']
+
+# The service names, as the last part of the image service URLs, and the
+# wavelength in meters of the features of each layer.
+services = {
+    'World_Elevation_GMTED': 400000.0,
+    'World_Population_Estimated': 60000.0,
+    'World_Landforms_Improved_Hammond_Method': 120000.0,
+    'World_Lithology': 250000.0,
+    'World_Bioclimates': 500000.0,
+    'World_Land_Cover_ESA_2010': 80000.0,
+    'World_Slope_GMTED': 30000.0,
+    'World_Surface_Water_30m_BaseVue_2013': 12000.0,
+    'World_Ecophysiographic_Diversity_2015': 150000.0,
+    'World_Biomass': 200000.0,
+}
+
+def smoothField(x, y, name, wavelength, waves=8):
+    """smoothField(x, y, name, wavelength, waves=8)
+
+    Returns a smooth random field, roughly standard normal, at the map
+    coordinates x and y. It is a sum of plane waves with directions and
+    phases drawn from the seed and name, and lengths around wavelength.
+
+    """
+    rng = np.random.RandomState((zlib.crc32(name.encode("utf-8")) ^ seed) & 0x7fffffff)
+    angles = rng.uniform(0, np.pi, waves)
+    lengths = wavelength * rng.uniform(0.5, 2.0, waves)
+    phases = rng.uniform(0, 2 * np.pi, waves)
+    field = np.zeros(np.broadcast(x, y).shape)
+    for angle, length, phase in zip(angles, lengths, phases):
+        field += np.cos(2 * np.pi * (x * np.cos(angle) + y * np.sin(angle)) / length + phase)
+    return field / np.sqrt(waves / 2.0)
+
+def classField(x, y, name, wavelength, count):
+    """classField(x, y, name, wavelength, count)
+
+    Returns class indexes from 0 to count - 1 at x and y, in patches about
+    wavelength across. Every class covers a similar share of a large area.
+
+    """
+    uniform = 0.5 * (1 + np.tanh(0.85 * smoothField(x, y, name, wavelength)))
+    return np.minimum((uniform * count).astype(np.int64), count - 1)
+
+def classTable(namefield, classes, codefield=None):
+    """classTable(namefield, classes, codefield=None)
+
+    Returns the attribute fields of a classified layer, raster values 1 to
+    len(classes), as a dictionary of field name to {value: attribute}.
+
+    """
+    fields = {namefield: dict((n + 1, classname) for n, classname in enumerate(classes))}
+    if codefield is not None:
+        fields[codefield] = dict((n + 1, n + 1) for n in range(len(classes)))
+    return fields
+
+def render(service, x, y):
+    """render(service, x, y)
+
+    Returns the values of a service at the cell centers x and y, and the
+    attribute fields of its values as a dictionary of field name to
+    {value: attribute}.
+
+    """
+    if service not in services:
+        raise ValueError("There is no synthetic layer for the service " + service)
+    wavelength = services[service]
+    if service == 'World_Elevation_GMTED':
+        elevation = 1500 * (smoothField(x, y, service, wavelength) + 1.2) + 250 * smoothField(x, y, service + "detail", wavelength / 10)
+        return np.maximum(elevation, 0).astype(np.int64), {}
+    if service == 'World_Slope_GMTED':
+        # whole percent, as the service stores it; the pipeline reads its median.
+        return np.round(np.abs(8.0 * smoothField(x, y, service, wavelength))).astype(np.int64), {}
+    if service == 'World_Population_Estimated':
+        return np.round(10.0 * np.exp(2.0 * smoothField(x, y, service, wavelength)), 2), {}
+    if service == 'World_Biomass':
+        return np.maximum(60.0 + 45.0 * smoothField(x, y, service, wavelength), 0.0), {}
+    if service == 'World_Surface_Water_30m_BaseVue_2013':
+        # 11 is open water in BaseVue. About a tenth of the land is under water.
+        return np.where(smoothField(x, y, service, wavelength) > 1.3, 11, 1).astype(np.int64), {}
+    if service == 'World_Ecophysiographic_Diversity_2015':
+        values = classField(x, y, service, wavelength, 20) + 1
+        return values, {'ecoPhysdiv': dict((value, value / 4.0) for value in range(1, 21))}
+    if service == 'World_Landforms_Improved_Hammond_Method':
+        return classField(x, y, service, wavelength, len(landformClasses)) + 1, classTable('ClassName', landformClasses)
+    if service == 'World_Lithology':
+        return classField(x, y, service, wavelength, len(lithologyClasses)) + 1, classTable('EF_Litho', lithologyClasses)
+    if service == 'World_Bioclimates':
+        return classField(x, y, service, wavelength, len(bioclimateClasses)) + 1, classTable('Bioclimate', bioclimateClasses, 'BioClim')
+    return classField(x, y, service, wavelength, len(landcoverClasses)) + 1, classTable('ClassName', landcoverClasses, 'ELU_ID')
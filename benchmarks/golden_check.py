@@ -0,0 +1,277 @@
+#-------------------------------------------------------------------------------
+# Name:         golden_check
+#               Checks that GeoDescriber still writes the same descriptions, and
+#               that its stages stay within their time budgets, so that a speedup
+#               can be accepted with confidence.
+# Notes:        python benchmarks/golden_check.py [--only replay|pipeline|dryrun] [--update]
+#                   [--budget-scale 2]
+#
+#               replay:   the recorded facts in benchmarks/facts are synthesized
+#                         again and compared with golden/replay/description_<OID>.html.
+#                         No arcpy is needed.
+#               pipeline: the reference polygons of golden/polygons.json are described
+#                         by GeoDescriber.py against the arcpy stand-in in fakearcpy,
+#                         and their Description is compared with
+#                         golden/pipeline/description_<OID>.html.
+#               dryrun:   the reference polygons are planned by GeoDescriber.py --dry-run
+#                         with two polygon workers, and the cells, downloads, memory
+#                         mode and worker of every polygon are compared with
+#                         golden/dryrun/plan.json. The input must not change.
+#
+#               golden/budgets.json holds the most seconds a description may take to
+#               synthesize in the replay, and the most seconds every stage may take
+#               for one polygon in the pipeline. --budget-scale multiplies them for
+#               slower machines. --update writes the golden descriptions again from
+#               the current code. The exit status is 1 if anything differs or is
+#               over its budget.
+#-------------------------------------------------------------------------------
+import os, sys
+import argparse
+import difflib
+import glob
+import json
+import re
+import shutil
+import tempfile
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+import GeoDescriber
+from pipeline_benchmark import runDescriber
+
+golden = os.path.join(here, "golden")
+
+def readGolden(folder):
+    """readGolden(folder)
+
+    Returns the golden descriptions in folder as a dictionary by OBJECTID.
+
+    """
+    descriptions = {}
+    for path in glob.glob(os.path.join(folder, "description_*.html")):
+        oid = int(re.search(r"description_(\d+)\.html$", path).group(1))
+        with open(path) as f:
+            descriptions[oid] = f.read().rstrip("\n")
+    return descriptions
+
+def writeGolden(folder, descriptions):
+    if os.path.exists(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder)
+    for oid, description in descriptions.items():
+        with open(os.path.join(folder, "description_{0}.html".format(oid)), "w") as f:
+            f.write(description + "\n")
+
+def sentences(description):
+    # one sentence or paragraph tag per line, so a diff shows the sentence that changed.
+    return re.sub(r"(</p>|\. )", r"\1\n", description).splitlines()
+
+def compareDescriptions(expected, actual, label):
+    """compareDescriptions(expected, actual, label)
+
+    Returns a list of problems: polygons missing from either side, and a
+    diff by sentence for every description that differs.
+
+    """
+    problems = []
+    for oid in sorted(set(expected) | set(actual)):
+        if oid not in actual:
+            problems.append("{0} OBJECTID {1}: no description was written".format(label, oid))
+        elif oid not in expected:
+            problems.append("{0} OBJECTID {1}: there is no golden description".format(label, oid))
+        elif expected[oid] != actual[oid]:
+            diff = difflib.unified_diff(sentences(expected[oid]), sentences(actual[oid]),
+                                        "golden", "now", lineterm="", n=1)
+            problems.append("{0} OBJECTID {1}: the description differs\n{2}".format(label, oid, "\n".join(diff)))
+    return problems
+
+def checkBudgets(seconds, budgets, scale, label):
+    """checkBudgets(seconds, budgets, scale, label)
+
+    Returns a problem for every stage whose longest time, in seconds by
+    stage, is over its budget times scale.
+
+    """
+    problems = []
+    for stage, budget in sorted(budgets.items()):
+        if stage in seconds and seconds[stage] > budget * scale:
+            problems.append("{0} {1}: {2:.4f} seconds, over the budget of {3:.4f}".format(
+                label, stage, seconds[stage], budget * scale))
+    return problems
+
+def replay(repeat):
+    """replay(repeat)
+
+    Synthesizes the description of every recorded polygon repeat times.
+    Returns the descriptions as HTML by OBJECTID, and the longest mean
+    seconds of one synthesis as {'synthesis': seconds}.
+
+    """
+    descriptions = {}
+    longest = 0.0
+    for facts in GeoDescriber.loadFacts(os.path.join(here, "facts")):
+        start = GeoDescriber.clock()
+        for n in range(repeat):
+            description = GeoDescriber.synthesizeDescription(facts)
+        longest = max(longest, (GeoDescriber.clock() - start) / repeat)
+        descriptions[facts['oid']] = GeoDescriber.descriptionHTML(description)
+    return descriptions, {'synthesis': longest}
+
+def pipeline(work):
+    """pipeline(work)
+
+    Describes the reference polygons against the arcpy stand-in in the
+    folder work. Returns their descriptions by OBJECTID, and the longest
+    seconds of every stage for one polygon.
+
+    """
+    features = os.path.join(work, "polygons.json")
+    shutil.copy(os.path.join(golden, "polygons.json"), features)
+    environment = dict(os.environ, FAKEARCPY_SEED="0",
+                       PYTHONPATH=os.pathsep.join([os.path.join(here, "fakearcpy")] +
+                                                  [p for p in [os.getenv("PYTHONPATH")] if p]))
+    environment.pop("FAKEARCPY_SERVER", None)
+    environment.pop("FAKEARCPY_VERSION", None)
+    log = os.path.join(work, "run.log")
+    runDescriber([features, "--scratch", os.path.join(work, "scratch.gdb"), "--fetch-workers", "2",
+                  "--timings-dir", os.path.join(work, "timings")], environment, log)
+    with open(features) as f:
+        descriptions = dict((feature['properties']['OBJECTID'], feature['properties']['Description'])
+                            for feature in json.load(f)['features'] if feature['properties'].get('Description'))
+    seconds = {}
+    timingsPath = os.path.join(work, "timings", "timings.json")
+    if os.path.exists(timingsPath):
+        with open(timingsPath) as f:
+            for record in json.load(f):
+                if record['span'] != 'layer':
+                    seconds[record['span']] = max(seconds.get(record['span'], 0.0), record['wall'])
+    return descriptions, seconds
+
+# the facts of a dry run plan that depend on nothing but the polygons and the settings.
+planFields = ['worker', 'cells', 'extentcells', 'watercells', 'download_bytes', 'memory_mode']
+
+def dryRun(work):
+    """dryRun(work)
+
+    Plans the reference polygons with GeoDescriber.py --dry-run and two
+    polygon workers in the folder work, once without a raster cache and
+    once with a cache folder that does not exist, which the dry run must
+    not create. Returns the plan of every polygon without a cache by
+    OBJECTID, with the fields in planFields, and a list of problems.
+
+    """
+    features = os.path.join(work, "polygons.json")
+    shutil.copy(os.path.join(golden, "polygons.json"), features)
+    with open(features) as f:
+        before = f.read()
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(here, "fakearcpy")] +
+                                                              [p for p in [os.getenv("PYTHONPATH")] if p]))
+    environment.pop("FAKEARCPY_SERVER", None)
+    environment.pop("FAKEARCPY_VERSION", None)
+    planPath = os.path.join(work, "plan.json")
+    log = os.path.join(work, "dryrun.log")
+    wall, peak, status = runDescriber([features, "--scratch", os.path.join(work, "scratch.gdb"), "--dry-run",
+                                       "--polygon-workers", "2", "--plan-file", planPath], environment, log)
+    problems = []
+    if status != 0:
+        problems.append("dryrun: GeoDescriber.py --dry-run exited with {0}, see {1}".format(status, log))
+    cache = os.path.join(work, "cache")
+    cachedLog = os.path.join(work, "dryrun_cache.log")
+    wall, peak, status = runDescriber([features, "--scratch", os.path.join(work, "scratch.gdb"), "--dry-run",
+                                       "--polygon-workers", "2", "--cache-dir", cache], environment, cachedLog)
+    if status != 0:
+        problems.append("dryrun: GeoDescriber.py --dry-run --cache-dir exited with {0}, see {1}".format(status, cachedLog))
+    if os.path.exists(cache):
+        problems.append("dryrun: the dry run created the cache folder " + cache)
+    with open(features) as f:
+        if f.read() != before:
+            problems.append("dryrun: the dry run changed the input")
+    plans = {}
+    if os.path.exists(planPath):
+        with open(planPath) as f:
+            for row in json.load(f)['polygons']:
+                plans[row['oid']] = dict((name, round(row[name], 3) if isinstance(row[name], float) else row[name])
+                                         for name in planFields)
+    return plans, problems
+
+def comparePlans(expected, actual):
+    problems = []
+    for oid in sorted(set(expected) | set(actual)):
+        if oid not in actual:
+            problems.append("dryrun OBJECTID {0}: it was not planned".format(oid))
+        elif oid not in expected:
+            problems.append("dryrun OBJECTID {0}: there is no golden plan".format(oid))
+        else:
+            for name in planFields:
+                if expected[oid][name] != actual[oid][name]:
+                    problems.append("dryrun OBJECTID {0}: {1} is {2}, not {3}".format(
+                        oid, name, actual[oid][name], expected[oid][name]))
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks GeoDescriber's descriptions against golden files and time budgets.")
+    parser.add_argument("--only", choices=["replay", "pipeline", "dryrun"], default=None,
+                        help="run only one of the checks (default: both)")
+    parser.add_argument("--update", action="store_true",
+                        help="write the golden descriptions again from the current code")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every time budget by this (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="times every recorded polygon is synthesized in the replay (default: %(default)s)")
+    parser.add_argument("--work", default=None,
+                        help="folder for the pipeline run (default: a temporary folder)")
+    args = parser.parse_args()
+
+    with open(os.path.join(golden, "budgets.json")) as f:
+        budgets = json.load(f)
+    problems = []
+    checks = [args.only] if args.only else ["replay", "pipeline", "dryrun"]
+    for check in checks:
+        print("checking the " + check + "...")
+        if check == "dryrun":
+            work = tempfile.mkdtemp(prefix="geodescriber_dryrun_")
+            plans, found = dryRun(work)
+            planPath = os.path.join(golden, "dryrun", "plan.json")
+            if args.update:
+                if not os.path.exists(os.path.dirname(planPath)):
+                    os.makedirs(os.path.dirname(planPath))
+                with open(planPath, "w") as f:
+                    json.dump(dict((str(oid), plan) for oid, plan in plans.items()), f, indent=1, sort_keys=True)
+                print("  wrote the golden plan of {0} polygons to {1}".format(len(plans), planPath))
+            with open(planPath) as f:
+                expected = dict((int(oid), plan) for oid, plan in json.load(f).items())
+            found += comparePlans(expected, plans)
+            print("  planned {0} polygons".format(len(plans)))
+            if found:
+                print("  the dry run is kept in " + work)
+            else:
+                shutil.rmtree(work, ignore_errors=True)
+            problems += found
+            continue
+        if check == "replay":
+            descriptions, seconds = replay(args.repeat)
+        else:
+            work = args.work or tempfile.mkdtemp(prefix="geodescriber_golden_")
+            if not os.path.exists(work):
+                os.makedirs(work)
+            descriptions, seconds = pipeline(work)
+        folder = os.path.join(golden, check)
+        if args.update:
+            writeGolden(folder, descriptions)
+            print("  wrote {0} golden descriptions to {1}".format(len(descriptions), folder))
+        found = compareDescriptions(readGolden(folder), descriptions, check)
+        found += checkBudgets(seconds, budgets.get(check, {}), args.budget_scale, check)
+        for stage in sorted(seconds):
+            print("  {0:<12}{1:>10.4f} s  budget {2}".format(stage, seconds[stage], budgets.get(check, {}).get(stage, "-")))
+        if check == "pipeline" and args.work is None:
+            if found:
+                print("  the pipeline run is kept in " + work)
+            else:
+                shutil.rmtree(work, ignore_errors=True)
+        problems += found
+    for problem in problems:
+        print(problem)
+    if problems:
+        print("{0} problems".format(len(problems)))
+        sys.exit(1)
+    print("all descriptions match and every stage is within its budget")
@@ -0,0 +1,262 @@
+#-------------------------------------------------------------------------------
+# Name:         pipeline_benchmark
+#               Measures the throughput of the whole GeoDescriber pipeline on
+#               synthetic polygons, from tiny parks to continents, against the
+#               numpy arcpy stand-in in fakearcpy. No ArcGIS is needed.
+# Notes:        python benchmarks/pipeline_benchmark.py [--scales tiny,park,region]
+#                   [--output results.json]
+#               python benchmarks/pipeline_benchmark.py --compare old.json new.json
+#
+#               Every scale is a GeoJSON feature collection of random polygons,
+#               described by GeoDescriber.py in a process of its own. The ten
+#               layers of every polygon are drawn from the synthetic services of
+#               fakearcpy/landscape.py; with --warm they are drawn once into a
+#               raster cache before the timed run, so that the run measures the
+#               pipeline rather than the drawing. The results hold the commit,
+#               polygons per second, the seconds of every stage and fetched layer
+#               and the peak memory of every scale, and two result files can be
+#               compared with --compare.
+#-------------------------------------------------------------------------------
+import os, sys
+import argparse
+import json
+import math
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.dirname(here)
+sys.path.insert(0, root)
+import GeoDescriber
+
+# The polygon sets: the radius of the polygons in cells of the 232 m grid, and
+# how many polygons a set holds. A tiny park covers fewer than 16 cells.
+scales = {
+    'tiny': (1.8, 24),
+    'park': (15, 12),
+    'region': (120, 4),
+    'country': (600, 1),
+    'continent': (3000, 1),
+}
+scaleOrder = ['tiny', 'park', 'region', 'country', 'continent']
+
+def polygonRing(x, y, radius, rng, vertices=24):
+    """polygonRing(x, y, radius, rng, vertices=24)
+
+    Returns the closed ring of a star-shaped polygon around x and y, with
+    its vertices between 0.7 and 1.3 times radius from the center.
+
+    """
+    ring = []
+    for n in range(vertices):
+        angle = 2 * math.pi * n / vertices
+        r = radius * rng.uniform(0.7, 1.3)
+        ring.append([x + r * math.cos(angle), y + r * math.sin(angle)])
+    ring.append(ring[0])
+    return ring
+
+def makePolygons(scale, count, cellsize, seed):
+    """makePolygons(scale, count, cellsize, seed)
+
+    Returns a GeoJSON feature collection of count polygons of a scale,
+    with their centers spread over the Mollweide map so that no two of
+    them overlap.
+
+    """
+    radius = scales[scale][0] * cellsize
+    rng = random.Random("{0}:{1}".format(seed, scale))
+    features = []
+    spacing = 3 * radius
+    columns = max(1, int(math.ceil(math.sqrt(count))))
+    x0 = rng.uniform(-12e6, 12e6 - columns * spacing) if columns * spacing < 24e6 else -12e6
+    y0 = rng.uniform(-5e6, 5e6 - columns * spacing) if columns * spacing < 10e6 else -5e6
+    for n in range(count):
+        x = x0 + (n % columns + 0.5) * spacing
+        y = y0 + (n // columns + 0.5) * spacing
+        features.append({'type': 'Feature',
+                         'properties': {'OBJECTID': n + 1, 'NAME': "{0} {1}".format(scale.title(), n + 1)},
+                         'geometry': {'type': 'Polygon', 'coordinates': [polygonRing(x, y, radius, rng)]}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+def gitCommit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=root).decode().strip()
+    except Exception:
+        return None
+
+def runDescriber(arguments, environment, log):
+    """runDescriber(arguments, environment, log)
+
+    Runs GeoDescriber.py with arguments and writes its output to log.
+    Returns the wall seconds, the peak resident memory in bytes of the
+    largest of its processes, or None where that can not be read, and
+    the exit status.
+
+    """
+    start = time.time()
+    with open(log, "w") as f:
+        process = subprocess.Popen([sys.executable, os.path.join(root, "GeoDescriber.py")] + arguments,
+                                   stdout=f, stderr=subprocess.STDOUT, env=environment)
+        if hasattr(os, "wait4"):
+            pid, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+            peak = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+            peak = None
+    return time.time() - start, peak, process.returncode
+
+def stageSeconds(records):
+    """stageSeconds(records)
+
+    Returns the wall and CPU seconds and the highest resident memory peak
+    of the timed spans by name, and by layer for the fetches, as in the
+    timings summary.
+
+    """
+    stages = {}
+    for record in records:
+        key = record['span'] + (":" + record['layer'] if 'layer' in record else "")
+        stage = stages.setdefault(key, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'rss_peak': None})
+        stage['count'] += 1
+        stage['wall'] += record['wall']
+        stage['cpu'] += record['cpu']
+        if record.get('rss_peak') is not None:
+            stage['rss_peak'] = max(stage['rss_peak'] or 0, record['rss_peak'])
+    return stages
+
+def runScale(scale, count, args, work):
+    """runScale(scale, count, args, work)
+
+    Describes a polygon set of a scale in the folder work and returns its
+    results.
+
+    """
+    folder = os.path.join(work, scale)
+    os.makedirs(folder)
+    features = os.path.join(folder, "polygons.json")
+    polygons = makePolygons(scale, count, args.cellsize, args.seed)
+    with open(features, "w") as f:
+        json.dump(polygons, f)
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([args.arcpy] + [p for p in [os.getenv("PYTHONPATH")] if p]),
+                       FAKEARCPY_SEED=str(args.seed))
+    arguments = [features, "--scratch", os.path.join(folder, "scratch.gdb"), "--cellsize", str(args.cellsize),
+                 "--fetch-workers", str(args.fetch_workers), "--polygon-workers", str(args.polygon_workers)]
+    if args.warm:
+        # the untimed run draws the layers of every polygon into the cache.
+        arguments += ["--cache-dir", os.path.join(folder, "cache")]
+        runDescriber(arguments, environment, os.path.join(folder, "warm.log"))
+        # only the descriptions of the timed run are counted.
+        with open(features, "w") as f:
+            json.dump(polygons, f)
+    arguments += ["--timings-dir", os.path.join(folder, "timings")]
+    wall, peak, status = runDescriber(arguments, environment, os.path.join(folder, "run.log"))
+    with open(features) as f:
+        described = sum(1 for feature in json.load(f)['features'] if feature['properties'].get('Description'))
+    timingsPath = os.path.join(folder, "timings", "timings.json")
+    records = []
+    if os.path.exists(timingsPath):
+        with open(timingsPath) as f:
+            records = json.load(f)
+    cells = sum(record.get('cells', 0) or 0 for record in records if record['span'] == 'polygon')
+    return {'polygons': count, 'described': described, 'status': status, 'wall': wall,
+            'polygons_per_second': described / wall if wall > 0 else 0.0, 'peak_rss': peak,
+            'cells': cells, 'stages': stageSeconds(records)}
+
+def printResults(results):
+    print("{0:<11}{1:>9}{2:>11}{3:>10}{4:>14}{5:>12}".format("scale", "polygons", "described", "wall", "polygons/s", "peak MB"))
+    for scale in scaleOrder:
+        if scale not in results['scales']:
+            continue
+        r = results['scales'][scale]
+        print("{0:<11}{1:>9}{2:>11}{3:>10.2f}{4:>14.3f}{5:>12}".format(
+            scale, r['polygons'], r['described'], r['wall'], r['polygons_per_second'],
+            "-" if r['peak_rss'] is None else "{0:.0f}".format(r['peak_rss'] / 1048576.0)))
+
+def compareResults(old, new):
+    """compareResults(old, new)
+
+    Prints polygons per second, peak memory and the wall seconds of every
+    stage of two result files side by side, with the ratio new / old.
+
+    """
+    print("{0} -> {1}".format(old.get('commit'), new.get('commit')))
+    line = "{0:<30}{1:>12}{2:>12}{3:>9}"
+    for scale in scaleOrder:
+        if scale not in old['scales'] or scale not in new['scales']:
+            continue
+        a = old['scales'][scale]
+        b = new['scales'][scale]
+        print("")
+        print(line.format(scale, "old", "new", "ratio"))
+        rows = [("polygons/s", a['polygons_per_second'], b['polygons_per_second']),
+                ("peak MB", (a['peak_rss'] or 0) / 1048576.0, (b['peak_rss'] or 0) / 1048576.0)]
+        for stage in sorted(set(a['stages']) | set(b['stages'])):
+            rows.append((stage + " s", a['stages'].get(stage, {}).get('wall', 0.0),
+                         b['stages'].get(stage, {}).get('wall', 0.0)))
+        for name, x, y in rows:
+            print(line.format(name, "{0:.3f}".format(x), "{0:.3f}".format(y),
+                              "{0:.2f}".format(y / x) if x > 0 else "-"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the whole GeoDescriber pipeline on synthetic polygons.")
+    parser.add_argument("--scales", default="tiny,park,region",
+                        help="polygon sets to describe, of " + ", ".join(scaleOrder) + " (default: %(default)s)")
+    parser.add_argument("--count", type=int, default=None,
+                        help="polygons in every set (default: the count of each scale)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the polygons and the synthetic layers (default: %(default)s)")
+    parser.add_argument("--cellsize", type=float, default=GeoDescriber.cellsize,
+                        help="cell size in meters (default: %(default)s)")
+    parser.add_argument("--fetch-workers", type=int, default=GeoDescriber.fetchWorkers,
+                        help="processes fetching layers (default: %(default)s)")
+    parser.add_argument("--polygon-workers", type=int, default=1,
+                        help="processes describing polygons (default: %(default)s)")
+    parser.add_argument("--warm", action="store_true",
+                        help="draw the layers into a raster cache before the timed run")
+    parser.add_argument("--arcpy", default=os.path.join(here, "fakearcpy"),
+                        help="folder holding the arcpy package to run against (default: %(default)s)")
+    parser.add_argument("--work", default=None,
+                        help="folder for the polygons, scratch data and logs (default: a temporary folder)")
+    parser.add_argument("--output", default=None,
+                        help="JSON file the results are written to")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        compareResults(old, new)
+        sys.exit(0)
+
+    chosen = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    for scale in chosen:
+        if scale not in scales:
+            sys.exit("Unknown scale " + scale + ", choose from " + ", ".join(scaleOrder))
+    work = args.work or tempfile.mkdtemp(prefix="geodescriber_benchmark_")
+    results = {'commit': gitCommit(), 'date': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': sys.version.split()[0],
+               'seed': args.seed, 'cellsize': args.cellsize, 'fetch_workers': args.fetch_workers,
+               'polygon_workers': args.polygon_workers, 'warm': args.warm, 'scales': {}}
+    try:
+        for scale in chosen:
+            count = args.count or scales[scale][1]
+            print("describing {0} {1} polygons...".format(count, scale))
+            results['scales'][scale] = runScale(scale, count, args, work)
+            if results['scales'][scale]['described'] < count:
+                print("  only {0} of {1} described, see {2}".format(
+                    results['scales'][scale]['described'], count, os.path.join(work, scale, "run.log")))
+    finally:
+        if args.work is None and all(r['described'] == r['polygons'] for r in results['scales'].values()):
+            shutil.rmtree(work, ignore_errors=True)
+    printResults(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print("Wrote the results to " + args.output)
@@ -0,0 +1,46 @@
+#-------------------------------------------------------------------------------
+# Name:         synthesis_benchmark
+#               Measures how many descriptions per second GeoDescriber's text
+#               synthesis writes from recorded polygon facts. No arcpy is needed.
+# Notes:        python benchmarks/synthesis_benchmark.py [facts folder] [--count N]
+#
+#               The facts folder holds the facts_<OBJECTID>.json files written by
+#               GeoDescriber.py --facts-dir. It defaults to the sample facts next
+#               to this script.
+#-------------------------------------------------------------------------------
+import os, sys
+import argparse
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+import GeoDescriber
+
+def runBenchmark(recorded, count):
+    """runBenchmark(recorded, count)
+
+    Synthesizes count descriptions, cycling through the recorded facts, and
+    returns the seconds it took and the number of characters written.
+
+    """
+    characters = 0
+    start = GeoDescriber.clock()
+    for n in range(count):
+        characters += len(GeoDescriber.synthesizeDescription(recorded[n % len(recorded)]))
+    return GeoDescriber.clock() - start, characters
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the text synthesis of GeoDescriber.")
+    parser.add_argument("facts", nargs="?", default=os.path.join(here, "facts"),
+                        help="folder of recorded facts (default: %(default)s)")
+    parser.add_argument("--count", type=int, default=20000,
+                        help="descriptions to synthesize (default: %(default)s)")
+    args = parser.parse_args()
+
+    recorded = GeoDescriber.loadFacts(args.facts)
+    if not recorded:
+        sys.exit("No facts_*.json files in " + args.facts)
+    # one untimed pass so that every polygon has been synthesized once before timing.
+    runBenchmark(recorded, len(recorded))
+    seconds, characters = runBenchmark(recorded, args.count)
+    print("{0} descriptions from {1} recorded polygons in {2:.2f} seconds".format(args.count, len(recorded), seconds))
+    print("{0:.0f} descriptions per second, {1:.0f} characters per second".format(args.count / seconds, characters / seconds))